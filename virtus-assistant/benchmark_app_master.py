@@ -0,0 +1,468 @@
+"""
+ApplicationMaster Ölçek Testi
+- 1k–100k kayıtlık sentetik katalog (Türkçe/İngilizce adlar, kısaltma ve takma adlar)
+- Sentetik klasör ağaçları: Start Menu (.lnk), Program Files (exe), XDG .desktop
+- Ölçülenler: ilk tarama, soğuk açılış (anlık görüntü / SQLite), tam / takma ad /
+  fuzzy / bulunamayan arama, tam / artımlı / değişikliksiz yenileme
+- Eşleşme doğruluğu: bilinen yanlış fuzzy eşleşmeler (ör. 'chrome' -> 'chroot')
+  tekrar ortaya çıkarsa çıkış kodu 1 olur
+- Sonuçlar JSON olarak yazılır; kayıtlı temel ölçüme (baseline) göre yavaşlayan
+  metrikler işaretlenir ve çıkış kodu 1 olur
+- Geçici klasör kullanılır (gerçek katalog ve veritabanına dokunmaz)
+
+Kullanım:
+    python benchmark_app_master.py                          # 1k, 10k, 100k
+    python benchmark_app_master.py --sizes 1000 5000
+    python benchmark_app_master.py --save-baseline          # sonuçları temel ölçüm yap
+    python benchmark_app_master.py --tolerance 0.3 --output sonuc.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.storage import Storage
+from plugins.application_master import ApplicationMaster
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'benchmarks')
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'app_master_latest.json')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'app_master_baseline.json')
+
+# Küçük sürelerde gürültüyü yavaşlama saymamak için mutlak alt sınır
+MIN_REGRESSION_MS = 0.5
+MIN_REGRESSION_US = 10.0
+
+# Uygulama adı parçaları: "Akıllı Not Defteri Pro", "Photo Studio 2024"...
+PREFIXES = ['Akıllı', 'Hızlı', 'Kolay', 'Pratik', 'Süper', 'Mini', 'Ultra', 'Open', 'Smart', 'Quick',
+            'Easy', 'Free', 'Mega', 'Net', 'Cloud', 'Micro', 'Power', 'Turbo', 'Deep', 'Blue']
+CORES = ['Not Defteri', 'Hesap Makinesi', 'Müzik Çalar', 'Video Düzenleyici', 'Fotoğraf Görüntüleyici',
+         'Dosya Yöneticisi', 'Ekran Kaydedici', 'Şifre Kasası', 'Takvim', 'Sözlük', 'Çevirmen',
+         'Photo Editor', 'Video Converter', 'Music Player', 'Code Editor', 'Terminal', 'Browser',
+         'Mail Client', 'Chat', 'Backup', 'Disk Cleaner', 'PDF Reader', 'Screen Recorder',
+         'Paint', 'Office', 'Spreadsheet', 'Presentation', 'Launcher', 'Downloader', 'Scanner']
+SUFFIXES = ['', '', '', 'Pro', 'Plus', 'Lite', 'Studio', 'Express', 'X', '2024', '3', 'Deluxe',
+            'Portable', 'Community', 'Türkçe', 'Ultimate']
+VENDORS = ['Adobe', 'Microsoft', 'Google', 'Mozilla', 'JetBrains', 'Valve', 'Yandex', 'Turkcell',
+           'Logo', 'Mikro', 'Corel', 'Autodesk', 'Oracle', 'Apple', 'Zoom', 'Kde', 'Gnome']
+TYPES = ['shortcut', 'registry', 'program_files', 'desktop', 'path']
+
+TYPO_CHARS = 'abcdefghijklmnoprstuvyzçğıöşü'
+
+# Eşleşme doğruluğu: (sorgu, beklenen app_id ya da None)
+MATCH_CATALOG = {
+    'chroot': ['chroot'],
+    'discord': ['discord'],
+    'spotify': ['spotify'],
+    'visual studio code': ['visual studio code'],
+}
+MATCH_CASES = [
+    ('chrome', None),            # 'chroot' yalnızca 4 harflik önek paylaşıyor
+    ('chroot', 'chroot'),
+    ('visual studo code', 'visual studio code'),
+    ('dicord', 'discord'),
+    ('spotfy', 'spotify'),
+    ('code', 'visual studio code'),
+    ('spot', 'spotify'),               # önek: kısa eşik tek başına eler
+    ('disc', 'discord'),
+    ('studio co', 'visual studio code'),
+    ('chro', 'chroot'),
+]
+
+
+def synthetic_catalog(size, seed=0):
+    """
+    size kayıtlık katalog: app_id -> {'exe', 'names', 'type'}
+
+    Adların bir kısmı satıcı adıyla başlar ve numaralanır (gerçek kataloglardaki
+    sürüm/kopya kayıtları gibi); takma adlar kısaltma ve kısa addan oluşur.
+    """
+    rng = random.Random(seed)
+    apps = {}
+    while len(apps) < size:
+        parts = [rng.choice(PREFIXES), rng.choice(CORES), rng.choice(SUFFIXES)]
+        if rng.random() < 0.3:
+            parts.insert(0, rng.choice(VENDORS))
+        name = ' '.join(p for p in parts if p)
+        if name.lower() in apps:
+            name = f"{name} {len(apps)}"
+        app_id = name.lower()
+
+        words = app_id.split()
+        names = [app_id, ' '.join(words[:2])]
+        acronym = ''.join(w[0] for w in words if w[0].isalpha())
+        if len(acronym) >= 3:
+            names.append(acronym)
+        exe_name = ''.join(w for w in words[:3] if w.isalnum())[:24] or f"app{len(apps)}"
+        apps[app_id] = {
+            'exe': f"C:\\Program Files\\{words[0].title()}\\{exe_name}.exe",
+            'names': list(dict.fromkeys(names)),
+            'type': rng.choice(TYPES),
+        }
+    return apps
+
+
+def typo(text, rng):
+    """Tek harf hatası: yer değiştirme, silme veya değiştirme"""
+    if len(text) < 4:
+        return text + rng.choice(TYPO_CHARS)
+    i = rng.randrange(1, len(text) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    if kind == 1:
+        return text[:i] + text[i + 1:]
+    return text[:i] + rng.choice(TYPO_CHARS) + text[i + 1:]
+
+
+def build_tree(root, size, seed=0):
+    """
+    Tarayıcılar için sentetik klasör ağacı (Windows ve Linux düzeni birlikte)
+
+    Returns:
+        dict: Ortam değişkenleri (APPDATA, PROGRAMDATA, PROGRAMFILES, XDG_*)
+    """
+    rng = random.Random(seed)
+    names = list(synthetic_catalog(size, seed))
+    env = {
+        'APPDATA': os.path.join(root, 'AppData'),
+        'PROGRAMDATA': os.path.join(root, 'ProgramData'),
+        'PROGRAMFILES': os.path.join(root, 'Program Files'),
+        'PROGRAMFILES(X86)': os.path.join(root, 'Program Files (x86)'),
+        'XDG_DATA_HOME': os.path.join(root, 'home', '.local', 'share'),
+        'XDG_DATA_DIRS': os.path.join(root, 'usr', 'share'),
+    }
+    start_menus = [os.path.join(env[var], 'Microsoft', 'Windows', 'Start Menu', 'Programs')
+                   for var in ('APPDATA', 'PROGRAMDATA')]
+    desktop_dirs = [os.path.join(env[var].split(os.pathsep)[0], 'applications')
+                    for var in ('XDG_DATA_HOME', 'XDG_DATA_DIRS')]
+
+    for i, name in enumerate(names):
+        title = name.title()
+        bucket = i % 3
+        if bucket == 0:
+            # Satıcı klasörü altında kısayol (+ arada kaldırma kısayolu)
+            folder = os.path.join(rng.choice(start_menus), title.split()[0])
+            os.makedirs(folder, exist_ok=True)
+            open(os.path.join(folder, f"{title}.lnk"), 'wb').close()
+            if i % 10 == 0:
+                open(os.path.join(folder, f"Uninstall {title}.lnk"), 'wb').close()
+        elif bucket == 1:
+            # Program Files: ana exe, yardımcı exe ve kütüphaneler
+            app_dir = os.path.join(env[rng.choice(('PROGRAMFILES', 'PROGRAMFILES(X86)'))], title)
+            os.makedirs(os.path.join(app_dir, 'bin'), exist_ok=True)
+            exe = ''.join(w for w in name.split()[:2] if w.isalnum()) or 'app'
+            with open(os.path.join(app_dir, f"{exe}.exe"), 'wb') as f:
+                f.write(b'\0' * rng.randint(64, 4096))
+            for helper in ('unins000.exe', 'crashpad_handler.exe', 'core.dll'):
+                open(os.path.join(app_dir, 'bin' if helper.endswith('.dll') else '', helper), 'wb').close()
+        else:
+            folder = rng.choice(desktop_dirs)
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f"org.bench.app{i}.desktop"), 'w', encoding='utf-8') as f:
+                f.write(f"[Desktop Entry]\nType=Application\nName={title}\n"
+                        f"Name[tr]={title}\nKeywords={';'.join(name.split()[:2])};\n"
+                        f"Exec=/opt/bench/app{i} %U\n")
+    return env
+
+
+class SyntheticMaster(ApplicationMaster):
+    """Kataloğu sistem yerine bellekteki sentetik kaynaktan tarayan ApplicationMaster"""
+
+    BENCH_SOURCES = [('synthetic', '_scan_synthetic', '_fingerprint_synthetic', True)]
+
+    def __init__(self, catalog, storage, catalog_path):
+        self.synthetic = catalog
+        self.synthetic_version = 0
+        super().__init__(storage=storage, auto_refresh=False, watch=False,
+                         sources=self.BENCH_SOURCES, catalog_path=catalog_path)
+
+    def _scan_synthetic(self):
+        return dict(self.synthetic)
+
+    def _fingerprint_synthetic(self):
+        return str(self.synthetic_version)
+
+
+def check_matching(workdir):
+    """
+    Bilinen fuzzy eşleşme hatalarını dene
+
+    Returns:
+        list: [(sorgu, beklenen, bulunan), ...] hatalı eşleşmeler
+    """
+    catalog = {app_id: {'exe': f"/usr/bin/{app_id.split()[0]}", 'names': names, 'type': 'path'}
+               for app_id, names in MATCH_CATALOG.items()}
+    storage = Storage(os.path.join(workdir, 'match.db'), legacy_dir=workdir)
+    master = SyntheticMaster(catalog, storage, os.path.join(workdir, 'match_catalog.bin'))
+    try:
+        failures = []
+        for query, expected in MATCH_CASES:
+            found, _ = master._lookup(query)
+            if found != expected:
+                failures.append((query, expected, found))
+        return failures
+    finally:
+        master.stop()
+        storage.close()
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return (time.perf_counter() - started) * 1000, result
+
+
+def latency(func, queries):
+    """Sorgu başına süre (µs): ortalama, p50, p95 ve bulunan oranı"""
+    samples = []
+    found = 0
+    for query in queries:
+        started = time.perf_counter_ns()
+        result = func(query)
+        samples.append((time.perf_counter_ns() - started) / 1000)
+        found += result is not None
+    samples.sort()
+    return {
+        'mean_us': statistics.fmean(samples),
+        'p50_us': samples[len(samples) // 2],
+        'p95_us': samples[int(len(samples) * 0.95)],
+        'hit_rate': found / len(queries),
+    }
+
+
+def bench_catalog(size, workdir, queries, seed):
+    """Sentetik kaynakla arama, açılış ve yenileme ölçümleri"""
+    rng = random.Random(seed)
+    catalog = synthetic_catalog(size, seed)
+    storage = Storage(os.path.join(workdir, 'virtus.db'), legacy_dir=workdir)
+    catalog_path = os.path.join(workdir, 'app_catalog.bin')
+    results = {}
+
+    results['first_scan_ms'], master = timed(SyntheticMaster, catalog, storage, catalog_path)
+    master.stop()
+
+    def cold_start():
+        m = SyntheticMaster(catalog, storage, catalog_path)
+        m.stop()
+        return m
+
+    results['cold_load_snapshot_ms'], master = timed(cold_start)
+    os.remove(catalog_path)
+    results['cold_load_sqlite_ms'], _ = timed(cold_start)
+
+    ids = list(catalog)
+    aliases = [name for data in catalog.values() for name in data['names'][1:]]
+    sample = min(queries, size)
+    exact = rng.sample(ids, sample)
+    alias = rng.sample(aliases, min(sample, len(aliases)))
+    fuzzy = [typo(app_id, rng) for app_id in rng.sample(ids, sample)]
+    missing = [f"yok{i} {rng.choice(CORES).lower()} {rng.random():.6f}" for i in range(sample)]
+
+    for label, batch in (('exact', exact), ('alias', alias), ('fuzzy', fuzzy), ('miss', missing)):
+        stats = latency(master.find_application, batch)
+        for key, value in stats.items():
+            if label in ('exact', 'alias', 'miss') and key == 'hit_rate':
+                continue
+            results[f"lookup_{label}_{key}"] = value
+    # Aynı bulunamayan sorgu tekrarı önbellekten dönmeli (önbellek boyutunu aşmayan küme)
+    recent_misses = missing[-(master.MISS_CACHE_SIZE // 2):]
+    repeat = latency(master.find_application, recent_misses)
+    results['lookup_miss_cached_p50_us'] = repeat['p50_us']
+    results['search_p50_us'] = latency(lambda q: master.search_applications(q, limit=5) or None,
+                                       fuzzy[:max(1, sample // 4)])['p50_us']
+
+    results['refresh_noop_ms'], _ = timed(master.refresh)
+    # Artımlı: kayıtların %1'i değişir/silinir/eklenir
+    changed = max(1, size // 100)
+    for app_id in rng.sample(ids, changed):
+        catalog.pop(app_id)
+    for i in range(changed):
+        catalog[f"yeni uygulama {i}"] = {'exe': f"C:\\Yeni\\app{i}.exe", 'names': [f"yeni uygulama {i}"],
+                                         'type': 'program_files'}
+    master.synthetic_version += 1
+    results['refresh_incremental_ms'], _ = timed(master.refresh)
+    results['refresh_full_ms'], _ = timed(master.refresh, force=True)
+    master.stop()
+
+    # Anlık görüntüden açılan katalog: boş fark dosyayı yeniden yazmaz, fark yerinde uygulanır
+    master = cold_start()
+    written = os.stat(catalog_path).st_mtime_ns
+    master.synthetic_version += 1
+    results['refresh_empty_delta_ms'], _ = timed(master.refresh)
+    results['empty_delta_snapshot_kept'] = os.stat(catalog_path).st_mtime_ns == written
+    for i in range(changed):
+        catalog[f"yeni uygulama {i}"] = {'exe': f"C:\\Yeni\\app{i}.exe", 'type': 'program_files',
+                                         'names': [f"yeni uygulama {i}", f"yeni takma ad {i}"]}
+    master.synthetic_version += 1
+    results['refresh_incremental_snapshot_ms'], _ = timed(master.refresh)
+
+    master.stop()
+    storage.close()
+    return results
+
+
+def bench_scanners(size, workdir, seed, tree_scale):
+    """Gerçek tarayıcılarla sentetik klasör ağacı üzerinde tam/artımlı tarama"""
+    entries = max(30, int(size * tree_scale))
+    tree = os.path.join(workdir, 'tree')
+    build_ms, env = timed(build_tree, tree, entries, seed)
+    previous = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    sources = [source for source in ApplicationMaster.SCAN_SOURCES + ApplicationMaster.LINUX_SCAN_SOURCES
+               if source[0] in ('start_menu', 'program_files', 'desktop')]
+    storage = Storage(os.path.join(workdir, 'scan.db'), legacy_dir=workdir)
+    results = {'tree_entries': entries, 'tree_build_ms': build_ms}
+    try:
+        results['scan_first_ms'], master = timed(
+            ApplicationMaster, storage=storage, auto_refresh=False, watch=False, sources=sources,
+            catalog_path=os.path.join(workdir, 'scan_catalog.bin'))
+        results['scan_apps'] = len(master.app_database)
+        results['scan_noop_ms'], _ = timed(master.refresh)
+
+        # Yeni kısayol ve .desktop dosyası: yalnızca ilgili kaynaklar yeniden taranır
+        start_menu = os.path.join(env['APPDATA'], 'Microsoft', 'Windows', 'Start Menu', 'Programs')
+        os.makedirs(start_menu, exist_ok=True)
+        open(os.path.join(start_menu, 'Benchmark Yeni.lnk'), 'wb').close()
+        desktop = os.path.join(env['XDG_DATA_HOME'], 'applications')
+        os.makedirs(desktop, exist_ok=True)
+        with open(os.path.join(desktop, 'org.bench.yeni.desktop'), 'w', encoding='utf-8') as f:
+            f.write("[Desktop Entry]\nType=Application\nName=Benchmark Yeni Masaüstü\nExec=/opt/bench/yeni\n")
+        results['scan_incremental_ms'], _ = timed(master.refresh)
+        results['scan_full_ms'], _ = timed(master.refresh, force=True)
+        master.stop()
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        storage.close()
+    return results
+
+
+def compare(current, baseline, tolerance):
+    """
+    Temel ölçüme göre yavaşlayan süre metrikleri
+
+    Returns:
+        list: [(boyut, metrik, temel, şimdiki, oran), ...]
+    """
+    regressions = []
+    for size, metrics in current['results'].items():
+        base_metrics = baseline.get('results', {}).get(size, {})
+        for metric, value in metrics.items():
+            base = base_metrics.get(metric)
+            if base is None or not metric.endswith(('_ms', '_us')) or metric == 'tree_build_ms':
+                continue
+            floor = MIN_REGRESSION_MS if metric.endswith('_ms') else MIN_REGRESSION_US
+            if value > base * (1 + tolerance) and value - base > floor:
+                regressions.append((size, metric, base, value, value / base if base else float('inf')))
+    return regressions
+
+
+def run(sizes, queries=2000, seed=0, tree_scale=0.25, scanners=True):
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'queries': queries,
+            'seed': seed,
+            'tree_scale': tree_scale,
+        },
+        'results': {},
+    }
+    for size in sizes:
+        workdir = tempfile.mkdtemp(prefix='virtus_bench_')
+        try:
+            print(f"⏱️ {size} kayıt...")
+            results = bench_catalog(size, workdir, queries, seed)
+            if scanners:
+                results.update(bench_scanners(size, workdir, seed, tree_scale))
+            report['results'][str(size)] = results
+            print_results(size, results)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def print_results(size, results):
+    for metric, value in results.items():
+        if metric.endswith('_ms'):
+            text = f"{value:.1f} ms"
+        elif metric.endswith('_us'):
+            text = f"{value:.1f} µs"
+        elif isinstance(value, float):
+            text = f"{value:.3f}"
+        else:
+            text = str(value)
+        print(f"   {size:>7} {metric:<28} {text}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ApplicationMaster ölçek testi")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--queries', type=int, default=2000, help="Arama türü başına sorgu sayısı")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tree-scale', type=float, default=0.25,
+                        help="Klasör ağacındaki kayıt sayısı / katalog boyutu")
+    parser.add_argument('--no-scanners', action='store_true', help="Klasör ağacı taramasını atla")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="Sonuçları temel ölçüm olarak kaydet")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="İzin verilen yavaşlama oranı")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    workdir = tempfile.mkdtemp(prefix='virtus_match_')
+    try:
+        failures = check_matching(workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    if failures:
+        print(f"❌ {len(failures)} hatalı eşleşme:")
+        for query, expected, found in failures:
+            print(f"   - {query!r}: beklenen {expected!r}, bulunan {found!r}")
+        return 1
+    print(f"✅ Eşleşme doğruluğu: {len(MATCH_CASES)} sorgu")
+
+    report = run(args.sizes, args.queries, args.seed, args.tree_scale, not args.no_scanners)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"📝 Sonuçlar: {args.output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        shutil.copyfile(args.output, args.baseline)
+        print(f"📌 Temel ölçüm kaydedildi: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️ Temel ölçüm yok (--save-baseline ile oluşturulur)")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)} metrik yavaşladı (tolerans %{args.tolerance * 100:.0f}):")
+        for size, metric, base, value, ratio in regressions:
+            print(f"   - {size} {metric}: {base:.1f} -> {value:.1f} ({ratio:.2f}x)")
+        return 1
+    print("✅ Temel ölçüme göre yavaşlama yok")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
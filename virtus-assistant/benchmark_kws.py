@@ -0,0 +1,215 @@
+"""
+Yerel Wake Word Testi - yanlış kabul (FA) / yanlış ret (FR) oranları
+- Şablonlarla kaydedilmiş kelime örneklerinin DTW skorları hesaplanır; eşik
+  taranarak FA/FR eğrisi, eşit hata oranı (EER) ve hedef FA için eşik bulunur
+- WAV kayıtları: --templates (kayıt örnekleri), --positives (wake word içeren),
+  --negatives (içermeyen) klasörleri
+- Kayıt verilmezse formant sentezli sentetik "konuşmacı" kullanılır:
+  "virtus", "virtus müziği aç" (pozitif); "virüs", "virgül", "merhaba",
+  "bilgisayar"... (negatif, benzer sesli kelimeler dahil). Hız, perde ve
+  gürültü her örnekte değişir
+- Ölçülenler: kontrol başına CPU süresi, önerilen KWS_THRESHOLD
+
+Kullanım:
+    python benchmark_kws.py
+    python benchmark_kws.py --templates kayit/sablon --positives kayit/evet --negatives kayit/hayir
+    python benchmark_kws.py --target-fa 0.005
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.audio_bus import AUDIO_SAMPLE_RATE, WavFileSource
+from modules.keyword_spotter import KWS_THRESHOLD, KeywordSpotter
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'benchmarks')
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'kws_latest.json')
+
+# Sesler: (tür, F1, F2, süre ms) - ünlüler ve ötümlü ünsüzler formantla,
+# ötümsüzler bant geçiren gürültüyle üretilir
+PHONES = {
+    'a': ('voiced', 750, 1250, 110), 'e': ('voiced', 500, 1900, 100), 'i': ('voiced', 300, 2300, 90),
+    'ı': ('voiced', 360, 1500, 90), 'o': ('voiced', 480, 850, 110), 'u': ('voiced', 330, 800, 100),
+    'ü': ('voiced', 300, 1700, 100), 'r': ('trill', 420, 1300, 60), 'l': ('voiced', 380, 1100, 60),
+    'm': ('nasal', 250, 1000, 70), 'n': ('nasal', 260, 1500, 60), 'v': ('fricative_voiced', 300, 1200, 60),
+    'g': ('stop_voiced', 300, 1800, 50), 'b': ('stop_voiced', 300, 900, 50), 'y': ('voiced', 280, 2200, 50),
+    's': ('noise', 4500, 8000, 110), 'ş': ('noise', 2200, 5000, 110), 'z': ('noise', 4000, 7500, 90),
+    'h': ('noise', 500, 3500, 70), 'f': ('noise', 1500, 7000, 80),
+    't': ('stop', 3000, 6000, 70), 'k': ('stop', 1500, 3500, 70), 'p': ('stop', 500, 2500, 70),
+    'ç': ('stop', 2500, 5500, 90), ' ': ('pause', 0, 0, 150),
+}
+
+KEYWORD = 'virtus'
+POSITIVES = ['virtus', 'virtus müzik aç', 'virtus hava nasıl', 'virtus kapat']
+NEGATIVES = ['virüs', 'virgül', 'vitrin', 'merhaba', 'bilgisayar', 'tamam', 'müzik aç', 'hava nasıl',
+             'kapat', 'biraz', 'firma', 'telefon', 'başlat', 'durdur', 'evet', 'hayır']
+
+
+class Speaker:
+    """Sabit ses yolu ve perde, her söylemde küçük değişimler"""
+
+    def __init__(self, seed):
+        self.rng = np.random.default_rng(seed)
+        self.pitch = self.rng.uniform(100, 220)
+        self.formant_scale = self.rng.uniform(0.92, 1.12)
+
+    def say(self, text, noise_level=None):
+        rng = self.rng
+        rate = rng.uniform(0.8, 1.25)
+        pitch = self.pitch * rng.uniform(0.9, 1.1)
+        pieces = []
+        for phone in text:
+            kind, low, high, duration = PHONES.get(phone, PHONES[' '])
+            length = int(duration * rate * rng.uniform(0.85, 1.15) * AUDIO_SAMPLE_RATE / 1000)
+            pieces.append(self._phone(kind, low * self.formant_scale, high * self.formant_scale, length, pitch))
+        signal = np.concatenate(pieces)
+        signal *= 6000 / (np.sqrt(np.mean(signal ** 2)) + 1e-9)
+        noise_level = rng.uniform(30, 300) if noise_level is None else noise_level
+        lead, tail = np.zeros(int(rng.uniform(0.1, 0.3) * AUDIO_SAMPLE_RATE)), np.zeros(int(0.2 * AUDIO_SAMPLE_RATE))
+        signal = np.concatenate([lead, signal, tail])
+        signal += rng.normal(0, noise_level, len(signal))
+        return np.clip(signal, -32768, 32767).astype('<i2').tobytes()
+
+    def _phone(self, kind, f1, f2, length, pitch):
+        t = np.arange(length) / AUDIO_SAMPLE_RATE
+        if kind == 'pause':
+            return np.zeros(length)
+        if kind in ('noise', 'stop'):
+            spectrum = np.fft.rfft(self.rng.normal(0, 1, length))
+            freqs = np.fft.rfftfreq(length, 1 / AUDIO_SAMPLE_RATE)
+            spectrum[(freqs < f1) | (freqs > f2)] = 0
+            noise = np.fft.irfft(spectrum, length)
+            if kind == 'stop':
+                # Kapanma (sessizlik) + patlama
+                noise[:length * 2 // 3] = 0
+            return noise * 3
+        harmonics = np.arange(1, int(4000 / pitch) + 1)
+        frequencies = harmonics * pitch
+        gains = 1 / (1 + ((frequencies - f1) / 90) ** 2) + 0.6 / (1 + ((frequencies - f2) / 120) ** 2)
+        phases = self.rng.uniform(0, 2 * np.pi, len(harmonics))
+        voiced = (gains[:, None] * np.sin(2 * np.pi * frequencies[:, None] * t + phases[:, None])).sum(axis=0)
+        if kind == 'trill':
+            voiced *= 0.6 + 0.4 * np.sin(2 * np.pi * 25 * t)
+        elif kind == 'nasal':
+            voiced *= 0.4
+        elif kind == 'stop_voiced':
+            voiced[:length // 2] *= 0.1
+        elif kind == 'fricative_voiced':
+            voiced = voiced * 0.4 + self.rng.normal(0, 0.3, length)
+        ramp = min(length // 4, 80)
+        if ramp:
+            voiced[:ramp] *= np.linspace(0, 1, ramp)
+            voiced[-ramp:] *= np.linspace(1, 0, ramp)
+        return voiced
+
+
+def load_dir(path):
+    samples = []
+    for name in sorted(os.listdir(path)):
+        if name.endswith('.wav'):
+            with wave.open(os.path.join(path, name), 'rb') as wav:
+                samples.append((name, WavFileSource.convert(
+                    wav.readframes(wav.getnframes()), wav.getnchannels(), wav.getsampwidth(),
+                    wav.getframerate(), AUDIO_SAMPLE_RATE)))
+    return samples
+
+
+def synthetic_sets(speakers, enroll, repeats):
+    """Her konuşmacı kendi şablonlarıyla test edilir (kullanıcı kendi sesini kaydeder)"""
+    sets = []
+    for seed in range(speakers):
+        speaker = Speaker(seed)
+        templates = [speaker.say(KEYWORD, noise_level=40) for _ in range(enroll)]
+        positives = [(text, speaker.say(text)) for text in POSITIVES for _ in range(repeats)]
+        negatives = [(text, speaker.say(text)) for text in NEGATIVES for _ in range(repeats)]
+        sets.append((f"konuşmacı {seed}", templates, positives, negatives))
+    return sets
+
+
+def rates(positive_scores, negative_scores, threshold):
+    false_reject = float(np.mean(np.asarray(positive_scores) > threshold)) if positive_scores else 0.0
+    false_accept = float(np.mean(np.asarray(negative_scores) <= threshold)) if negative_scores else 0.0
+    return false_accept, false_reject
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yerel wake word FA/FR testi")
+    parser.add_argument('--templates', help="Kayıt örnekleri klasörü (WAV)")
+    parser.add_argument('--positives', help="Wake word içeren kayıtlar")
+    parser.add_argument('--negatives', help="Wake word içermeyen kayıtlar")
+    parser.add_argument('--speakers', type=int, default=4, help="Sentetik konuşmacı sayısı")
+    parser.add_argument('--enroll', type=int, default=3, help="Konuşmacı başına şablon")
+    parser.add_argument('--repeats', type=int, default=5, help="Kelime başına sentetik örnek")
+    parser.add_argument('--target-fa', type=float, default=0.01, help="Önerilen eşik için FA üst sınırı")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    if args.templates:
+        sets = [('kayıt', [pcm for _, pcm in load_dir(args.templates)],
+                 load_dir(args.positives) if args.positives else [],
+                 load_dir(args.negatives) if args.negatives else [])]
+    else:
+        sets = synthetic_sets(args.speakers, args.enroll, args.repeats)
+
+    positive_scores, negative_scores, cpu = [], [], []
+    worst_negatives = []
+    for name, templates, positives, negatives in sets:
+        spotter = KeywordSpotter(templates_dir=os.devnull)
+        for pcm in templates:
+            spotter.add_template(pcm)
+        for label, pcm in positives:
+            started = time.process_time()
+            positive_scores.append(spotter.score(pcm)[0])
+            cpu.append(time.process_time() - started)
+        for label, pcm in negatives:
+            started = time.process_time()
+            score = spotter.score(pcm)[0]
+            cpu.append(time.process_time() - started)
+            negative_scores.append(score)
+            worst_negatives.append((score, name, label))
+
+    thresholds = np.round(np.arange(0.3, 1.51, 0.025), 2)
+    curve = [(float(t), *rates(positive_scores, negative_scores, t)) for t in thresholds]
+    eer = min(curve, key=lambda row: abs(row[1] - row[2]))
+    allowed = [row for row in curve if row[1] <= args.target_fa]
+    recommended = max(allowed, key=lambda row: row[0]) if allowed else curve[0]
+
+    print(f"\n{len(positive_scores)} pozitif, {len(negative_scores)} negatif örnek\n")
+    print(f"{'eşik':>6} {'FA':>7} {'FR':>7}")
+    for threshold, false_accept, false_reject in curve[::4]:
+        marker = '  ← KWS_THRESHOLD' if abs(threshold - KWS_THRESHOLD) < 1e-6 else ''
+        print(f"{threshold:>6.2f} {false_accept:>7.1%} {false_reject:>7.1%}{marker}")
+
+    current = rates(positive_scores, negative_scores, KWS_THRESHOLD)
+    print(f"\n📊 Şu anki eşik {KWS_THRESHOLD}: FA {current[0]:.1%}, FR {current[1]:.1%}")
+    print(f"📊 EER ≈ {(eer[1] + eer[2]) / 2:.1%} (eşik {eer[0]})")
+    print(f"📊 FA ≤ {args.target_fa:.1%} için önerilen eşik {recommended[0]}: FR {recommended[2]:.1%}")
+    print(f"⚡ Kontrol başına ortalama {np.mean(cpu) * 1000:.1f} ms işlemci")
+    print("\nEn yakın negatifler:")
+    for score, name, label in sorted(worst_negatives)[:5]:
+        print(f"   {score:.3f}  {label} ({name})")
+
+    report = {
+        'settings': vars(args),
+        'current': {'threshold': KWS_THRESHOLD, 'false_accept': current[0], 'false_reject': current[1]},
+        'eer': {'threshold': eer[0], 'rate': (eer[1] + eer[2]) / 2},
+        'recommended': {'threshold': recommended[0], 'false_accept': recommended[1],
+                        'false_reject': recommended[2]},
+        'cpu_ms_per_check': round(float(np.mean(cpu)) * 1000, 2),
+        'curve': [{'threshold': t, 'false_accept': fa, 'false_reject': fr} for t, fa, fr in curve],
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Sonuçlar: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Ön Kayıt (Pre-roll) Testi - konuşmanın başı kesiliyor mu?
+- Zaman çizelgesi: sessizlik (kalibrasyon) → wake word → tepki süresi → komut
+- Wake word algılama gecikmesi ve "Evet, dinliyorum." yanıtı (hoparlör yankısıyla)
+  benzetilir; komut dinlemesi bu süreler sonunda başlar
+- İki akış aynı ses üzerinde (ayrı veriyollarında) yan yana çalışır:
+    eski:     ön kayıt yok, yanıt her zaman söylenir, dinleme yanıttan sonra başlar
+    ön kayıt: wake anı işaretlenir, komut zaten başladıysa yanıt atlanır,
+              yanıt sırasında mikrofon susturulur
+- Ölçülenler: asistanın kendi ölçtüğü başı kesik konuşma oranı (clipped onset),
+  kayıttaki gerçek kayıp (komutun kaydedilmeyen kısmı), kaçırılan komutlar
+- Komut olarak WAV kayıtları verilebilir; verilmezse sentetik konuşma kullanılır
+- Gerçek zamanlı çalışır (WAV kaynağı donanımsız mikrofon yerine geçer)
+
+Kullanım:
+    python benchmark_preroll.py                              # sentetik komut
+    python benchmark_preroll.py kayitlar/*.wav --reactions 0.1 0.5 1.0 2.5
+    python benchmark_preroll.py --latency 1.2 --prompt 1.0 --preroll 1.5
+"""
+import argparse
+import io
+import json
+import logging
+import math
+import os
+import random
+import sys
+import threading
+import time
+import wave
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import speech_recognition as sr
+
+from modules.advanced_speech_recognition import AdvancedSpeechRecognition
+from modules.audio_bus import AUDIO_SAMPLE_RATE, SAMPLE_WIDTH, AudioCaptureBus, WavFileSource, pcm_rms
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'benchmarks')
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'preroll_latest.json')
+
+CALIBRATION_SECONDS = 2.5   # Açılış kalibrasyonu (VAD ile 0.5 sn, yoksa 2 sn) sessizlikte geçer
+NOISE_LEVEL = 60            # Arka plan gürültüsü (RMS)
+SPEECH_LEVEL = NOISE_LEVEL * 10   # Bu enerjinin üstündeki çerçeveler konuşma sayılır
+FRAME_SAMPLES = AUDIO_SAMPLE_RATE // 50
+
+
+def synthetic_speech(seconds, seed=0):
+    """Hece benzeri genlik zarfına sahip harmonik ses (konuşma yerine)"""
+    rng = random.Random(seed)
+    pitch = rng.uniform(110, 220)
+    samples = []
+    for i in range(int(seconds * AUDIO_SAMPLE_RATE)):
+        t = i / AUDIO_SAMPLE_RATE
+        envelope = 0.55 + 0.45 * math.sin(2 * math.pi * 4 * t)   # ~4 hece/sn
+        tone = sum(math.sin(2 * math.pi * pitch * k * t) / k for k in range(1, 5))
+        samples.append(6000 * envelope * tone + rng.gauss(0, 400))
+    return samples
+
+
+def tone(seconds, frequency=1000, level=5000):
+    return [level * math.sin(2 * math.pi * frequency * i / AUDIO_SAMPLE_RATE)
+            for i in range(int(seconds * AUDIO_SAMPLE_RATE))]
+
+
+def speech_seconds(pcm):
+    """Konuşma enerjisindeki 20 ms çerçevelerin toplam süresi"""
+    size = FRAME_SAMPLES * SAMPLE_WIDTH
+    frames = sum(1 for i in range(0, len(pcm) - size + 1, size) if pcm_rms(pcm[i:i + size]) > SPEECH_LEVEL)
+    return frames * FRAME_SAMPLES / AUDIO_SAMPLE_RATE
+
+
+def load_wav(path):
+    """WAV komut kaydı (WavFileSource ile 16 kHz mono'ya çevrilir)"""
+    with wave.open(path, 'rb') as wav:
+        pcm = WavFileSource.convert(wav.readframes(wav.getnframes()), wav.getnchannels(),
+                                    wav.getsampwidth(), wav.getframerate(), AUDIO_SAMPLE_RATE)
+    return list(array('h', pcm))
+
+
+def build_timeline(command, reaction, latency, prompt, seed=0):
+    """
+    Zaman çizelgesini WAV olarak üret
+
+    Returns:
+        (wav bytes, olay zamanları sn cinsinden)
+    """
+    rng = random.Random(seed)
+    wake = synthetic_speech(0.6, seed=seed + 1000)
+    wake_end = CALIBRATION_SECONDS + len(wake) / AUDIO_SAMPLE_RATE
+    command_start = wake_end + reaction
+    mark = wake_end + latency
+    total = max(command_start + len(command) / AUDIO_SAMPLE_RATE, mark + prompt) + 2.0
+
+    mix = [rng.gauss(0, NOISE_LEVEL) for _ in range(int(total * AUDIO_SAMPLE_RATE))]
+
+    def add(samples, at):
+        offset = int(at * AUDIO_SAMPLE_RATE)
+        for i, value in enumerate(samples):
+            mix[offset + i] += value
+
+    add(wake, CALIBRATION_SECONDS)
+    add(command, command_start)
+    # "Evet, dinliyorum." yankısı (hoparlör gecikmesiyle); yalnızca eski akışta
+    # her zaman, ön kayıtlı akışta komut henüz başlamadıysa çalınır - iki akış
+    # aynı sesi paylaştığından yankı her durumda eklenir
+    add(tone(prompt), mark + 0.05)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(AUDIO_SAMPLE_RATE)
+        wav.writeframes(array('h', (max(-32768, min(32767, int(v))) for v in mix)).tobytes())
+    buffer.seek(0)
+    events = {'wake_end': wake_end, 'command_start': command_start, 'mark': mark,
+              'command_end': command_start + len(command) / AUDIO_SAMPLE_RATE}
+    return buffer, events
+
+
+def wait_until(bus, seconds):
+    """Veriyolu bu saniyeye (ses zamanı) ulaşana kadar bekle"""
+    target = int(seconds * bus.ring.bytes_per_second)
+    while bus.ring.position < target:
+        bus.ring.wait(bus.ring.position, timeout=0.1)
+
+
+def run_flow(speech, bus, events, prompt, use_preroll, expected, result):
+    """Bir asistan akışı: wake → (yanıt) → komut dinleme"""
+    mic = speech.microphone
+    # Wake word dinleyicisi wake kelimesini tüketmiş olur
+    wait_until(bus, events['wake_end'])
+    mic.reader.seek_latest()
+
+    wait_until(bus, events['mark'])
+    prompted = True
+    if use_preroll:
+        speech.mark_wake()
+        prompted = not speech.speech_pending()
+        if prompted:
+            with speech.playback():
+                time.sleep(prompt)
+    else:
+        time.sleep(prompt)
+
+    clipped_before = speech.onset_stats['clipped']
+    try:
+        audio = speech.capture_utterance(timeout=3, phrase_limit=10)
+        lost = max(0.0, expected - speech_seconds(audio.frame_data))
+        result.update(captured=True, seconds=round(len(audio.frame_data) / bus.ring.bytes_per_second, 2),
+                      clipped=speech.onset_stats['clipped'] > clipped_before, lost=round(lost, 2))
+    except sr.WaitTimeoutError:
+        result.update(captured=False, clipped=None, lost=expected)
+    result['prompted'] = prompted
+
+
+def run_trial(command, reaction, args, seed):
+    timeline, events = build_timeline(command, reaction, args.latency, args.prompt, seed)
+    expected = speech_seconds(array('h', (int(v) for v in command)).tobytes())
+
+    flows = {}
+    threads = []
+    buses = []
+    for name, use_preroll in (('eski', False), ('on_kayit', True)):
+        # Susturma veriyolu genelinde olduğundan her akışın kendi veriyolu var
+        bus = AudioCaptureBus(WavFileSource(io.BytesIO(timeline.getvalue())), buffer_seconds=10)
+        buses.append(bus)
+        flows[name] = {}
+
+        def flow(bus=bus, name=name, use_preroll=use_preroll):
+            speech = AdvancedSpeechRecognition(bus=bus)
+            speech.microphone.preroll = args.preroll if use_preroll else 0.0
+            run_flow(speech, bus, events, args.prompt, use_preroll, expected, flows[name])
+
+        threads.append(threading.Thread(target=flow, daemon=True))
+    for bus in buses:
+        bus.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for bus in buses:
+        bus.stop()
+    return flows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ön kayıt (pre-roll) testi")
+    parser.add_argument('fixtures', nargs='*', help="Komut WAV kayıtları")
+    parser.add_argument('--reactions', type=float, nargs='+', default=[0.1, 0.6, 1.2, 2.5],
+                        help="Wake word bittikten kaç sn sonra komut başlıyor")
+    parser.add_argument('--latency', type=float, default=1.0, help="Wake word algılama gecikmesi (sn)")
+    parser.add_argument('--prompt', type=float, default=1.2, help="'Evet, dinliyorum.' süresi (sn)")
+    parser.add_argument('--preroll', type=float, default=1.5)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.fixtures:
+        commands = [(os.path.basename(path), load_wav(path)) for path in args.fixtures]
+    else:
+        commands = [('sentetik', synthetic_speech(1.4))]
+
+    print(f"\n⏱️ Wake gecikmesi {args.latency} sn, yanıt {args.prompt} sn, ön kayıt {args.preroll} sn\n")
+    print(f"{'komut':<20} {'tepki':>6}   {'eski':<22} {'ön kayıt':<22}")
+
+    trials = []
+    for index, (name, command) in enumerate(commands):
+        for reaction in args.reactions:
+            flows = run_trial(command, reaction, args, seed=index)
+            trials.append({'fixture': name, 'reaction': reaction, **flows})
+
+            def describe(flow):
+                if not flow.get('captured'):
+                    return "kaçırıldı"
+                text = "BAŞI KESİK" if flow['clipped'] else "tam"
+                if flow['lost'] > 0.1:
+                    text += f" -{flow['lost']:.1f} sn"
+                return f"{text}{' (yanıtsız)' if not flow['prompted'] else ''}"
+
+            print(f"{name[:20]:<20} {reaction:>5.1f}s   {describe(flows['eski']):<22} "
+                  f"{describe(flows['on_kayit']):<22}")
+
+    summary = {}
+    for flow in ('eski', 'on_kayit'):
+        results = [trial[flow] for trial in trials]
+        summary[flow] = {
+            'clipped_onset_rate': round(sum(1 for r in results if r.get('clipped')) / len(results), 3),
+            'missed_rate': round(sum(1 for r in results if not r.get('captured')) / len(results), 3),
+            # Gerçek kayıp: komutun en az 0.1 sn'si kaydedilmedi (susturma kaynaklı kesilmeler dahil)
+            'truncated_rate': round(sum(1 for r in results if r.get('lost', 0) > 0.1) / len(results), 3),
+        }
+
+    print(f"\n📊 Başı kesik: eski {summary['eski']['clipped_onset_rate']:.0%}, "
+          f"ön kayıt {summary['on_kayit']['clipped_onset_rate']:.0%}")
+    print(f"📊 Kayıp yaşanan: eski {summary['eski']['truncated_rate']:.0%}, "
+          f"ön kayıt {summary['on_kayit']['truncated_rate']:.0%}")
+    print(f"📊 Kaçırılan: eski {summary['eski']['missed_rate']:.0%}, "
+          f"ön kayıt {summary['on_kayit']['missed_rate']:.0%}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'settings': vars(args), 'summary': summary, 'trials': trials}, f, indent=2, ensure_ascii=False)
+    print(f"💾 Sonuçlar: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
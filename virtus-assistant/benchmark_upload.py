@@ -0,0 +1,161 @@
+"""
+Yükleme Testi - tanıma öncesi ön işlemenin gönderilen bayta etkisi
+- Karşılaştırma: ham parça (eskiden olduğu gibi baştaki / sondaki sessizlikle,
+  kazançsız) ile modules.audio_preprocess çıktısı
+- Ölçülenler: FLAC bayt (Google'a giden veri), ses süresi, ön işleme CPU süresi
+- Tahmin (ölçüm değil): bayt / --uplink-kbps ile gönderim süresi
+  ('est_*_upload_ms' alanları); gerçek recognize_google gecikmesi ve metinler
+  yalnızca --live ile ölçülür (internet gerekir, 'latency_source': 'live')
+- Sentetik senaryolar (formant sentezli konuşma, benchmark_kws.Speaker):
+  sessiz oda, kısık ses, fan gürültüsü, 48 kHz kaynak
+- WAV kayıtları verilebilir (olduğu gibi kullanılır)
+
+Kullanım:
+    python benchmark_upload.py
+    python benchmark_upload.py kayitlar/*.wav --live
+    python benchmark_upload.py --uplink-kbps 256
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import speech_recognition as sr
+
+from benchmark_kws import Speaker
+from benchmark_vad import noise
+from modules.audio_bus import AUDIO_SAMPLE_RATE
+from modules.audio_preprocess import AudioPreprocessor
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'benchmarks')
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'upload_latest.json')
+
+COMMANDS = ['virtus müzik aç', 'hava nasıl', 'bilgisayarı kapat', 'telefon başlat']
+# speech_recognition.listen parçası: konuşma öncesi ~0.5 sn, sonrası duraklama eşiği (0.8 sn)
+LEAD_SECONDS = 0.5
+TAIL_SECONDS = 0.8
+
+
+def utterance(speaker, text, scenario, rng):
+    """Parça: sessizlik + konuşma + duraklama (listen çıktısı gibi)"""
+    speech = np.frombuffer(speaker.say(text, noise_level=0), dtype='<i2').astype(np.float64)
+    lead, tail = int(LEAD_SECONDS * AUDIO_SAMPLE_RATE), int(TAIL_SECONDS * AUDIO_SAMPLE_RATE)
+    mix = np.concatenate([np.zeros(lead), speech, np.zeros(tail)])
+    rate = AUDIO_SAMPLE_RATE
+    if scenario == 'kisik_ses':
+        mix *= 0.1
+        mix += noise('white', len(mix) / rate, 30, rng)[:len(mix)]
+    elif scenario == 'fan':
+        mix += noise('fan', len(mix) / rate, 900, rng)[:len(mix)]
+    else:
+        mix += noise('white', len(mix) / rate, 40, rng)[:len(mix)]
+    if scenario == '48khz':
+        # Kart 48 kHz veriyor: doğrusal aradeğerleme ile yukarı örnekle
+        rate = 48000
+        mix = np.interp(np.arange(len(mix) * 3) / 3, np.arange(len(mix)), mix)
+    pcm = np.clip(mix, -32768, 32767).astype('<i2').tobytes()
+    return sr.AudioData(pcm, rate, 2)
+
+
+def load_wav(path):
+    with sr.AudioFile(path) as source:
+        return sr.Recognizer().record(source)
+
+
+def recognize(recognizer, audio):
+    """Gerçek Google isteği: (metin, gecikme sn)"""
+    started = time.monotonic()
+    try:
+        text = recognizer.recognize_google(audio, language='tr-TR')
+    except sr.UnknownValueError:
+        text = ''
+    except sr.RequestError as e:
+        text = f"HATA: {e}"
+    return text, time.monotonic() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ön işleme yükleme testi")
+    parser.add_argument('fixtures', nargs='*', help="WAV kayıtları")
+    parser.add_argument('--uplink-kbps', type=float, default=1000,
+                        help="Gönderim süresi tahmini için varsayılan yükleme hızı (kbit/sn)")
+    parser.add_argument('--live', action='store_true', help="Google'a gerçek istek gönder")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        cases = [(os.path.basename(path), '-', load_wav(path)) for path in args.fixtures]
+    else:
+        rng = np.random.default_rng(args.seed)
+        speaker = Speaker(args.seed)
+        cases = [(text, scenario, utterance(speaker, text, scenario, rng))
+                 for scenario in ('sessiz_oda', 'kisik_ses', 'fan', '48khz') for text in COMMANDS]
+
+    preprocessor = AudioPreprocessor()
+    recognizer = sr.Recognizer()
+    # Ölçüm değil: bayt sayısının varsayılan hızdaki karşılığı
+    upload_ms = lambda size: size * 8 / args.uplink_kbps
+
+    rows = []
+    print(f"\n{'kayıt':<22} {'senaryo':<11} {'ham KB':>7} {'yeni KB':>8} {'ham sn':>7} {'yeni sn':>8} "
+          f"{'kazanç':>7} {'CPU ms':>7} {'gürültü':>8}")
+    for name, scenario, audio in cases:
+        raw_flac = len(audio.get_flac_data(convert_width=2))
+        processed = preprocessor.process(audio)
+        report = preprocessor.last_report
+        row = {'fixture': name, 'scenario': scenario, 'raw_flac_bytes': raw_flac,
+               'raw_seconds': report['input_seconds'], **report,
+               'est_raw_upload_ms': round(upload_ms(raw_flac)),
+               'est_upload_ms': round(upload_ms(report['flac_bytes_out']))}
+        if args.live:
+            row['raw_text'], row['raw_latency'] = recognize(recognizer, audio)
+            row['text'], row['latency'] = recognize(recognizer, processed)
+        rows.append(row)
+        print(f"{name[:22]:<22} {scenario:<11} {raw_flac / 1024:>7.1f} {report['flac_bytes_out'] / 1024:>8.1f} "
+              f"{report['input_seconds']:>7.2f} {report['output_seconds']:>8.2f} {report['gain']:>7.2f} "
+              f"{report['cpu_ms']:>7.1f} {'evet' if report.get('denoised') else '-':>8}")
+        if args.live:
+            print(f"{'':<22} ham: {row['raw_latency']:.2f} sn '{row['raw_text']}'  →  "
+                  f"yeni: {row['latency']:.2f} sn '{row['text']}'")
+
+    raw_total = sum(r['raw_flac_bytes'] for r in rows)
+    new_total = sum(r['flac_bytes_out'] for r in rows)
+    summary = {
+        'turns': len(rows),
+        'raw_bytes_per_turn': round(raw_total / len(rows)),
+        'bytes_per_turn': round(new_total / len(rows)),
+        'reduction': round(1 - new_total / raw_total, 3),
+        'assumed_uplink_kbps': args.uplink_kbps,
+        'est_raw_upload_ms': round(np.mean([r['est_raw_upload_ms'] for r in rows])),
+        'est_upload_ms': round(np.mean([r['est_upload_ms'] for r in rows])),
+        'cpu_ms': round(float(np.mean([r['cpu_ms'] for r in rows])), 1),
+        'latency_source': 'live' if args.live else 'estimate',
+    }
+    if args.live:
+        summary['raw_latency'] = round(float(np.median([r['raw_latency'] for r in rows])), 3)
+        summary['latency'] = round(float(np.median([r['latency'] for r in rows])), 3)
+
+    print(f"\n📊 Tur başına yükleme: {summary['raw_bytes_per_turn'] / 1024:.1f} KB → "
+          f"{summary['bytes_per_turn'] / 1024:.1f} KB ({summary['reduction']:.0%} azalma)")
+    print(f"📊 Tahmini gönderim süresi (ölçüm değil, {args.uplink_kbps:.0f} kbit/sn varsayımı): "
+          f"{summary['est_raw_upload_ms']} ms → {summary['est_upload_ms']} ms "
+          f"(ön işleme {summary['cpu_ms']} ms CPU)")
+    if args.live:
+        print(f"📊 Ölçülen tanıma gecikmesi (medyan): {summary['raw_latency']:.2f} sn → {summary['latency']:.2f} sn")
+    else:
+        print("ℹ️ Gerçek gecikme ölçülmedi (--live ile Google'a istek gönderilir)")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'settings': vars(args), 'summary': summary, 'turns': rows}, f, indent=2, ensure_ascii=False)
+    print(f"💾 Sonuçlar: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+VAD Testi - yerel ses etkinliği algılamanın doğruluğu ve CPU maliyeti
+- Karşılaştırma: modules.vad (uyarlanan gürültü tabanı, ZCR, spektral düzlük)
+  ile eski yöntem (adjust_for_ambient_noise ile 0.3 sn ölçülen sabit enerji eşiği)
+- Ölçülenler: çerçeve düzeyinde kesinlik / duyarlılık / F1, bulunan ve kaçırılan
+  konuşmalar, yanlış başlangıçlar, başlangıç hatası (ms), işlemci süresi
+  (ses saniyesi başına ms)
+- Sentetik senaryolar: sessiz oda, fan + şebeke uğultusu, gürültü artışı, kısık ses
+- WAV kayıtları verilebilir; yanında aynı adlı Audacity etiket dosyası (.txt,
+  "başlangıç<TAB>bitiş<TAB>etiket") varsa doğruluk da hesaplanır
+
+Kullanım:
+    python benchmark_vad.py                          # sentetik senaryolar
+    python benchmark_vad.py kayitlar/*.wav
+    python benchmark_vad.py --threshold-db 10 --hangover-ms 500
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_preroll import synthetic_speech
+from modules.audio_bus import AUDIO_FRAME_MS, AUDIO_SAMPLE_RATE, WavFileSource
+from modules.vad import VoiceActivityDetector
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'benchmarks')
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'vad_latest.json')
+
+SCENARIO_SECONDS = 20
+
+
+class EnergyThresholdDetector(VoiceActivityDetector):
+    """Eski yöntem: başta 0.3 sn ölçülen sabit enerji eşiği (speech_recognition varsayılanları)"""
+
+    CALIBRATION_SECONDS = 0.3
+    START_THRESHOLD = 1500        # ENERGY_THRESHOLD
+    DAMPING = 0.15                # dynamic_energy_adjustment_damping
+    RATIO = 1.5                   # dynamic_energy_ratio
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.threshold = None
+
+    def classify(self, pcm):
+        count = len(pcm) // self.frame_bytes
+        samples = np.frombuffer(pcm, dtype='<i2', count=count * self.frame_samples)
+        rms = np.sqrt(np.mean(samples.reshape(count, self.frame_samples).astype(np.float32) ** 2, axis=1))
+        if self.threshold is None:
+            # adjust_for_ambient_noise ile aynı sönümlü ortalama
+            threshold = self.START_THRESHOLD
+            damping = self.DAMPING ** (self.frame_ms / 1000)
+            for energy in rms[:int(self.CALIBRATION_SECONDS * 1000 / self.frame_ms)]:
+                threshold = threshold * damping + energy * self.RATIO * (1 - damping)
+            self.threshold = threshold
+        return rms > self.threshold
+
+
+def noise(kind, seconds, level, rng):
+    count = int(seconds * AUDIO_SAMPLE_RATE)
+    white = rng.normal(0, 1, count)
+    if kind == 'white':
+        return white * level
+    # Kahverengimsi gürültü (fan) + 50 Hz uğultu
+    brown = np.cumsum(white)
+    brown -= np.convolve(brown, np.ones(400) / 400, mode='same')
+    brown *= level / (np.std(brown) + 1e-9)
+    hum = 0.5 * level * np.sin(2 * np.pi * 50 * np.arange(count) / AUDIO_SAMPLE_RATE)
+    return brown + hum
+
+
+def scenario(name, seed):
+    """Sentetik kayıt + gerçek konuşma aralıkları"""
+    rng = np.random.default_rng(seed)
+    shuffle = random.Random(seed)
+    if name == 'sessiz_oda':
+        mix = noise('white', SCENARIO_SECONDS, 60, rng)
+        gain = 1.0
+    elif name == 'fan':
+        mix = noise('fan', SCENARIO_SECONDS, 500, rng)
+        gain = 1.0
+    elif name == 'gurultu_artisi':
+        mix = noise('white', SCENARIO_SECONDS, 60, rng)
+        half = len(mix) // 2
+        # Kayıt ortasında fan açılıyor (eşik başta ölçüldüyse artık gürültü konuşma sanılır)
+        mix[half:] += noise('fan', SCENARIO_SECONDS / 2, 1500, rng)[:len(mix) - half]
+        gain = 1.0
+    else:  # kisik_ses
+        mix = noise('white', SCENARIO_SECONDS, 60, rng)
+        gain = 0.08
+
+    labels = []
+    at = 1.0
+    while True:
+        length = shuffle.uniform(0.8, 2.0)
+        if at + length > SCENARIO_SECONDS - 1:
+            break
+        speech = np.array(synthetic_speech(length, seed=seed * 100 + len(labels))) * gain
+        offset = int(at * AUDIO_SAMPLE_RATE)
+        mix[offset:offset + len(speech)] += speech
+        labels.append((at, at + length))
+        at += length + shuffle.uniform(1.2, 3.0)
+    pcm = np.clip(mix, -32768, 32767).astype('<i2').tobytes()
+    return pcm, labels
+
+
+def load_fixture(path):
+    with wave.open(path, 'rb') as wav:
+        pcm = WavFileSource.convert(wav.readframes(wav.getnframes()), wav.getnchannels(),
+                                    wav.getsampwidth(), wav.getframerate(), AUDIO_SAMPLE_RATE)
+    labels = None
+    label_path = os.path.splitext(path)[0] + '.txt'
+    if os.path.exists(label_path):
+        labels = []
+        with open(label_path, encoding='utf-8') as f:
+            for line in f:
+                parts = line.split('\t')
+                if len(parts) >= 2:
+                    labels.append((float(parts[0]), float(parts[1])))
+    return pcm, labels
+
+
+def segments(events, total_seconds):
+    """Olaylar → (başlangıç, bitiş) saniye listesi"""
+    result = []
+    start = None
+    for event in events:
+        if event.kind == 'start':
+            start = event.seconds
+        elif start is not None:
+            result.append((start, event.seconds))
+            start = None
+    if start is not None:
+        result.append((start, total_seconds))
+    return result
+
+
+def frame_mask(spans, frames):
+    mask = np.zeros(frames, dtype=bool)
+    for start, end in spans:
+        mask[int(start * 1000 / AUDIO_FRAME_MS):int(end * 1000 / AUDIO_FRAME_MS)] = True
+    return mask
+
+
+def evaluate(detector, pcm, labels, chunk_frames):
+    """Kaydı canlı akıştaki gibi küçük gruplar halinde işle ve puanla"""
+    chunk = chunk_frames * detector.frame_bytes
+    events = []
+    started = time.process_time()
+    for offset in range(0, len(pcm), chunk):
+        events.extend(detector.process(pcm[offset:offset + chunk]))
+    cpu = time.process_time() - started
+    seconds = len(pcm) / detector.frame_bytes * detector.frame_ms / 1000
+    found = segments(events, seconds)
+    result = {'segments': len(found), 'cpu_ms_per_audio_s': round(cpu * 1000 / seconds, 3)}
+    if labels is None:
+        result['spans'] = [(round(s, 2), round(e, 2)) for s, e in found]
+        return result
+
+    frames = len(pcm) // detector.frame_bytes
+    truth, predicted = frame_mask(labels, frames), frame_mask(found, frames)
+    true_positive = int(np.sum(truth & predicted))
+    precision = true_positive / max(1, int(predicted.sum()))
+    recall = true_positive / max(1, int(truth.sum()))
+
+    detected, onset_errors = 0, []
+    for start, end in labels:
+        overlapping = [s for s, e in found if s < end and e > start]
+        if overlapping:
+            detected += 1
+            onset_errors.append((overlapping[0] - start) * 1000)
+    false_starts = sum(1 for s, e in found if not any(s < end and e > start for start, end in labels))
+
+    result.update({
+        'precision': round(precision, 3),
+        'recall': round(recall, 3),
+        'f1': round(2 * precision * recall / (precision + recall), 3) if precision + recall else 0.0,
+        'utterances': len(labels),
+        'detected': detected,
+        'false_starts': false_starts,
+        'onset_error_ms': round(float(np.mean(np.abs(onset_errors))), 1) if onset_errors else None,
+    })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VAD doğruluk ve CPU testi")
+    parser.add_argument('fixtures', nargs='*', help="WAV kayıtları (yanında .txt etiketleri olabilir)")
+    parser.add_argument('--threshold-db', type=float, default=None)
+    parser.add_argument('--hangover-ms', type=int, default=None)
+    parser.add_argument('--chunk-frames', type=int, default=5, help="Canlı akıştaki grup boyu (çerçeve)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    options = {}
+    if args.threshold_db is not None:
+        options['threshold_db'] = args.threshold_db
+    if args.hangover_ms is not None:
+        options['hangover_ms'] = args.hangover_ms
+
+    if args.fixtures:
+        cases = [(os.path.basename(path), *load_fixture(path)) for path in args.fixtures]
+    else:
+        cases = [(name, *scenario(name, args.seed + i))
+                 for i, name in enumerate(['sessiz_oda', 'fan', 'gurultu_artisi', 'kisik_ses'])]
+
+    results = []
+    print(f"\n{'kayıt':<18} {'yöntem':<8} {'F1':>6} {'bulunan':>9} {'yanlış':>7} {'başlangıç':>10} {'CPU ms/sn':>10}")
+    for name, pcm, labels in cases:
+        for method, detector in (('vad', VoiceActivityDetector(**options)),
+                                 ('eski', EnergyThresholdDetector(**options))):
+            result = evaluate(detector, pcm, labels, args.chunk_frames)
+            results.append({'fixture': name, 'method': method, **result})
+            if labels is None:
+                print(f"{name[:18]:<18} {method:<8} {'-':>6} {result['segments']:>9} {'-':>7} {'-':>10} "
+                      f"{result['cpu_ms_per_audio_s']:>10.2f}")
+                continue
+            onset = f"{result['onset_error_ms']:.0f} ms" if result['onset_error_ms'] is not None else '-'
+            print(f"{name[:18]:<18} {method:<8} {result['f1']:>6.2f} "
+                  f"{result['detected']:>4}/{result['utterances']:<4} {result['false_starts']:>7} "
+                  f"{onset:>10} {result['cpu_ms_per_audio_s']:>10.2f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'settings': vars(args), 'results': results}, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Sonuçlar: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -49,6 +49,31 @@ PAUSE_THRESHOLD = 0.8    # Konuşma duraklaması
 # Mikrofon kazancı (1.0 = normal, 2.0 = 2x hassas)
 MICROPHONE_GAIN = float(os.getenv('MICROPHONE_GAIN', 1.5))
 
+# Paylaşılan ses yakalama (mikrofon bir kez açılır, tüm dinleyiciler ortak tampondan okur)
+AUDIO_SAMPLE_RATE = SAMPLE_RATE
+AUDIO_FRAME_MS = 20            # Okuyucuların çerçeve süresi
+AUDIO_BUFFER_SECONDS = 30      # Halka tampon süresi (en yavaş okuyucunun toleransı)
+AUDIO_INPUT_DEVICE = int(os.getenv('AUDIO_INPUT_DEVICE')) if os.getenv('AUDIO_INPUT_DEVICE') else None
+AUDIO_PREROLL_SECONDS = float(os.getenv('AUDIO_PREROLL_SECONDS', 1.5))  # Dinleme öncesi korunan ses
+AUDIO_ECHO_TAIL = 0.2          # Asistan konuştuktan sonra susturulan yankı payı (saniye)
+
+# Ses etkinliği algılama (VAD) - gürültü tabanı sürekli güncellenir, kalibrasyon gerekmez
+VAD_THRESHOLD_DB = 12.0        # Gürültü tabanının bu kadar dB üstü konuşma sayılır
+VAD_MIN_SPEECH_MS = 100        # Konuşma başlangıcı için art arda konuşma süresi
+VAD_HANGOVER_MS = int(PAUSE_THRESHOLD * 1000)  # Bu kadar sessizlikten sonra konuşma biter
+VAD_PADDING_MS = 300           # Parçanın başına eklenen konuşma öncesi ses
+VAD_NOISE_WINDOW = 3.0         # Gürültü tabanının hesaplandığı son süre (saniye)
+VAD_NOISE_PERCENTILE = 10      # Tabanı belirleyen enerji yüzdeliği
+VAD_FLATNESS_MAX = 0.45        # Spektral düzlük bunun üstündeyse gürültü (beyaz gürültü ~0.56)
+VAD_ZCR_MIN = 0.01             # Sıfır geçiş oranı bunun altındaysa uğultu (~80 Hz altı)
+VAD_WARMUP_SECONDS = 0.5       # Açılışta gürültü tabanı için dinlenen süre
+
+# Yerel wake word (MFCC + DTW): örnekler varsa boşta dinlerken buluta istek gitmez
+KWS_TEMPLATES_DIR = 'data/wake_word'   # Kayıtlı "Virtus" örnekleri (WAV)
+KWS_THRESHOLD = float(os.getenv('KWS_THRESHOLD', 0.6))  # Küçük: daha az yanlış kabul, daha çok ret
+KWS_START_SLACK_MS = 400       # Wake word konuşma parçasının ilk bu kadar ms'inde başlamalı
+KWS_AUTO_ENROLL = 5            # Örnek yoksa bulutta doğrulanan ilk algılamalar örnek olarak kaydedilir
+
 # ============================================
 # TIMEOUT AYARLARI
 # ============================================
@@ -64,6 +89,25 @@ SCAN_EPIC_GAMES = True
 SCAN_START_MENU = True
 SCAN_REGISTRY = True
 APP_CACHE_REFRESH = 3600   # Cache yenileme (saniye)
+# Kurulan/kaldırılan uygulamaları anında yakala (Linux: inotify, diğerleri: yoklama)
+APP_WATCH_ENABLED = False
+APP_WATCH_DEBOUNCE = 2.0        # Son değişiklikten sonra bekleme (saniye)
+APP_WATCH_POLL_INTERVAL = 15    # Yoklama aralığı (inotify yoksa)
+# Sık açılan uygulamalar aramada öne çıkar ve arka planda önceden çözülür
+APP_USAGE_CAPACITY = 200        # En fazla takip edilen uygulama
+APP_USAGE_HALF_LIFE_DAYS = 14   # Bir açılışın ağırlığı bu sürede yarıya iner
+APP_PRELOAD_TOP_N = 10          # Hedefi önceden doğrulanan uygulama sayısı
+# Süreç takibi (psutil): kapatma PID ile, açılış arka planda doğrulanır
+PROCESS_TABLE_MAX_AGE = 1.0     # Süreç tablosu bu süreden eskiyse yenilenir (saniye)
+PROCESS_CLOSE_TIMEOUT = 3.0     # Nazik kapatmadan sonra zorla sonlandırmaya kadar bekleme
+PROCESS_LAUNCH_TIMEOUT = 10.0   # Açılan uygulamanın sürecinin görünmesi için süre
+
+# ============================================
+# DEPOLAMA
+# ============================================
+# Hafıza, uygulama kataloğu ve kişiler tek SQLite veritabanında tutulur.
+# Eski data/*.json dosyaları ilk açılışta otomatik aktarılır.
+STORAGE_PATH = os.getenv('STORAGE_PATH', 'data/virtus.db')
 
 # ============================================
 # LOG AYARLARI
@@ -90,6 +134,25 @@ ENABLE_LEARNING = False  # Gelecek özellik
 # PERFORMANS
 # ============================================
 MAX_CONVERSATION_HISTORY = 10
+
+# Uzun dönem konu hafızası (sınırlı, zamanla sönümlenen sayaçlar)
+TOPIC_MEMORY_CAPACITY = 500     # En fazla tutulacak anahtar kelime
+FAVORITE_APPS_CAPACITY = 50     # En fazla tutulacak favori uygulama
+TOPIC_HALF_LIFE_DAYS = 30       # Bir ilginin ağırlığı bu sürede yarıya iner
+
+# Kayan konuşma özeti (eski konuşmalar bağlama özet olarak girer)
+SUMMARY_TOKEN_BUDGET = 120      # Özetin bağlamda kaplayacağı en fazla token
+SUMMARY_RECENT_TURNS = 3        # Ham olarak gönderilen son konuşma sayısı
+SUMMARY_LLM_REFRESH = os.getenv('SUMMARY_LLM_REFRESH', 'False').lower() == 'true'
+SUMMARY_LLM_REFRESH_TURNS = 10  # LLM özeti kaç konuşmada bir yenilenir
+
+# Konuşma arşivi (son 100 konuşmadan eskiler sıkıştırılmış segmentlere taşınır)
+ARCHIVE_DIR = 'data/archive'
+ARCHIVE_BATCH_TURNS = 50        # Arşive taşıma parti boyutu
+ARCHIVE_RETENTION_DAYS = int(os.getenv('ARCHIVE_RETENTION_DAYS', 365))  # 0 = sınırsız
+
+# Çok kullanıcılı hafıza (kullanıcı/oturum bölümleri)
+MEMORY_IDLE_TIMEOUT = 1800      # Bu kadar saniye boşta kalan oturum bellekten atılır (0 = kapalı)
 AI_RESPONSE_TIMEOUT = 10
 
 # ============================================
@@ -99,6 +162,43 @@ AI_RESPONSE_TIMEOUT = 10
 # 'google' = Google Speech Recognition (ücretsiz)
 # 'whisper' = OpenAI Whisper (offline, yavaş)
 SPEECH_BACKEND = os.getenv('SPEECH_BACKEND', 'google')
+# Yarıştırılacak backend'ler (SPEECH_BACKEND başa alınır, kurulu olmayanlar atlanır)
+SPEECH_BACKENDS = [b.strip() for b in os.getenv('SPEECH_BACKENDS', 'google,whisper').split(',') if b.strip()]
+# 'sequential' = yalnızca hata olunca sıradaki, 'hedge' = birincil gecikirse
+# sıradaki de başlar, 'race' = hepsi aynı anda
+RECOGNITION_MODE = os.getenv('RECOGNITION_MODE', 'hedge')
+RECOGNITION_HEDGE_DELAY = 1.5   # Birincilden sonuç gelmezse yedeğin başlatılma süresi (sn)
+RECOGNITION_TIMEOUT = 10        # Tanıma turu başına süre sınırı (sn)
+
+# Yerel (çevrimdışı) tanıma işçileri: model açılışta ayrı süreçlerde yüklenir
+# 'auto' = faster_whisper varsa o, yoksa whisper
+OFFLINE_ENGINE = os.getenv('OFFLINE_ENGINE', 'auto')
+OFFLINE_MODEL = os.getenv('OFFLINE_MODEL', 'base')
+OFFLINE_WORKERS = int(os.getenv('OFFLINE_WORKERS', 1))   # 0 = işçi yok (whisper gerektiğinde yüklenir)
+OFFLINE_QUEUE_SIZE = 2          # İşçiler doluyken bekleyebilecek en fazla iş
+OFFLINE_THREADS = 2             # İşçi başına CPU iş parçacığı
+OFFLINE_MAX_SECONDS = 30        # Tek işteki en uzun ses (paylaşılan bellek yuvası)
+OFFLINE_TIMEOUT = 15            # İş başına süre sınırı (sn)
+
+# Akışlı tanıma (ara sonuçlar konuşma sürerken gelir)
+# 'auto' = VOSK_MODEL_PATH'te vosk modeli varsa vosk, yoksa kapalı
+# 'vosk' | 'offline' | 'cloud' | 'paket.modul:Sinif'
+# DİKKAT: yerel motorun ('vosk', 'offline') kesin metni komut olarak kullanılır;
+# SPEECH_BACKENDS dağıtıcısı ve ses ön işleme yalnızca yerel metin boşsa devreye
+# girer. Yerel model havuzu (OFFLINE_WORKERS) bu yüzden 'auto' ile seçilmez:
+# whisper kurulu olsa da Google tanıması 'offline' açıkça seçilmedikçe korunur
+STREAM_ENGINE = os.getenv('STREAM_ENGINE', 'auto')
+STREAM_PARTIAL_INTERVAL = 0.8   # Yerel havuzda ara çözümleme aralığı (sn ses)
+VOSK_MODEL_PATH = os.getenv('VOSK_MODEL_PATH', 'data/models/vosk-model-small-tr-0.3')
+
+# Tanıma öncesi ön işleme (sessizlik kırpma, kazanç, gürültü bastırma, FLAC)
+PREPROCESS_AUDIO = os.getenv('PREPROCESS_AUDIO', 'True').lower() == 'true'
+PREPROCESS_TARGET_RATE = 16000  # Backend'lerin doğal hızı (Google, Whisper)
+PREPROCESS_KEEP_MS = 200        # Kırpmada konuşmanın iki yanında kalan pay
+PREPROCESS_AGC = True           # Konuşma seviyesini hedefe çek (MICROPHONE_GAIN'den sonra)
+PREPROCESS_TARGET_RMS = 3000    # AGC hedefi (16-bit RMS)
+PREPROCESS_MAX_GAIN = 8.0       # AGC en fazla bu kadar yükseltir / alçaltır
+PREPROCESS_DENOISE_SNR_DB = 25.0  # Tahmini SNR (konuşma çerçeveleri / taban, gerçeğin ~10 dB üstü) bunun altındaysa gürültü bastırılır
 
 # AI Model
 # 'gemini-2.0-flash-exp' = Yeni model (hızlı)
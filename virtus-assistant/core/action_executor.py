@@ -5,6 +5,7 @@ import logging
 import webbrowser
 import subprocess
 import os
+import shlex
 from config.settings import PLATFORM
 
 # Platform-specific controllers
@@ -15,6 +16,18 @@ try:
 except ImportError:
     PLUGINS_AVAILABLE = False
 
+try:
+    from plugins.linux_apps import LinuxApplications, common_commands
+    LINUX_APPS_AVAILABLE = True
+except ImportError:
+    LINUX_APPS_AVAILABLE = False
+
+try:
+    from plugins.process_tracker import get_process_tracker
+    PROCESS_TRACKER_AVAILABLE = True
+except ImportError:
+    PROCESS_TRACKER_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,6 +35,7 @@ class ActionExecutor:
     def __init__(self):
         self.platform = PLATFORM
         self.app_mappings = self._get_app_mappings()
+        self.processes = get_process_tracker() if PROCESS_TRACKER_AVAILABLE else None
         
         # Controller'ları başlat
         if PLUGINS_AVAILABLE:
@@ -54,8 +68,22 @@ class ActionExecutor:
                 'telegram': 'telegram.exe',
                 'whatsapp': 'whatsapp.exe'
             }
-        # Linux/Mac için başka mappings eklenebilir
-        return {}
+        return self._discover_app_mappings()
+    
+    def _discover_app_mappings(self):
+        """Linux/Mac: $PATH'teki bilinen komutlar + .desktop uygulamaları"""
+        if not LINUX_APPS_AVAILABLE:
+            return {}
+        mappings = common_commands()
+        
+        # .desktop kayıtları (Flatpak/Snap dahil) bilinen komutları ezmez
+        try:
+            for app in LinuxApplications().desktop_apps().values():
+                for app_name in app['names']:
+                    mappings.setdefault(app_name, app['exe'])
+        except Exception as e:
+            logger.debug(f".desktop taraması başarısız: {e}")
+        return mappings
     
     def execute(self, intent_data):
         """
@@ -135,12 +163,15 @@ class ActionExecutor:
         
         if app_name in self.app_mappings:
             try:
+                process = None
                 if self.platform == 'Windows':
                     os.startfile(self.app_mappings[app_name])
                 else:
-                    subprocess.Popen([self.app_mappings[app_name]])
+                    process = subprocess.Popen(shlex.split(self.app_mappings[app_name]), start_new_session=True)
                 
                 logger.info(f"✅ {app_name} açıldı")
+                if self.processes:
+                    self.processes.verify_launch(app_name, process, (self._process_name(app_name),))
                 return True
             except Exception as e:
                 logger.error(f"Uygulama açılamadı: {e}")
@@ -154,17 +185,37 @@ class ActionExecutor:
         app_name = params.get('app_name', '').lower()
         
         try:
+            if self.processes:
+                # Açılan PID'ler veya süreç adı; nazik kapatma, gerekirse zorla
+                closed = self.processes.close(app_name, (self._process_name(app_name),))
+                if closed:
+                    logger.info(f"✅ {app_name} kapatıldı")
+                else:
+                    logger.info(f"{app_name} çalışmıyor")
+                return closed > 0
+            
             if self.platform == 'Windows':
-                subprocess.run(['taskkill', '/IM', self.app_mappings.get(app_name, app_name), '/F'])
+                result = subprocess.run(['taskkill', '/IM', self._process_name(app_name), '/F'])
             else:
-                subprocess.run(['killall', app_name])
+                result = subprocess.run(['pkill', '-x', self._process_name(app_name)[:15]])
             
-            logger.info(f"✅ {app_name} kapatıldı")
-            return True
+            if result.returncode == 0:
+                logger.info(f"✅ {app_name} kapatıldı")
+            return result.returncode == 0
         except Exception as e:
             logger.error(f"Uygulama kapatılamadı: {e}")
             return False
     
+    def _process_name(self, app_name):
+        """Eşlemedeki hedefin süreç adı: 'notepad.exe', '/usr/bin/kate --x' -> 'kate'"""
+        target = self.app_mappings.get(app_name, app_name)
+        if self.platform == 'Windows':
+            return os.path.basename(target)
+        try:
+            return os.path.basename(shlex.split(target)[0])
+        except (ValueError, IndexError):
+            return target
+    
     def _web_search(self, params):
         """Web'de arama yap"""
         query = params.get('query', '')
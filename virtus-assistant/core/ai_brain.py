@@ -270,6 +270,42 @@ Cevap:"""
         except Exception as e:
             logger.error(f"Cevap oluşturma hatası: {e}")
             return "Araştırma yaptım ama cevabı özetleyemedim. Lütfen tekrar deneyin."
+    
+    def summarize_conversation(self, previous_summary: str, turns_text: str) -> str:
+        """
+        Konuşma özetini yenile - arka plan özetleyicisi tarafından çağrılır
+        
+        Args:
+            previous_summary: Önceki özet (boş olabilir)
+            turns_text: Özete katlanacak yeni konuşmalar
+            
+        Returns:
+            str: Güncellenmiş kısa özet
+        """
+        prompt = f"""Aşağıdaki önceki özeti ve yeni konuşmaları birleştirerek kullanıcının ilgilendiği konuların kısa bir özetini çıkar.
+
+Önceki Özet:
+{previous_summary or '(yok)'}
+
+Yeni Konuşmalar:
+{turns_text}
+
+KURAL:
+- En fazla 2 cümle
+- Sadece kalıcı bilgi ve konular (selamlaşmaları atla)
+- Türkçe yaz
+
+Özet:"""
+
+        if GENAI_NEW:
+            response = self.client.models.generate_content(
+                model=self.model_name,
+                contents=prompt
+            )
+        else:
+            response = self.model.generate_content(prompt)
+        
+        return response.text.strip()
 
 
 # Test
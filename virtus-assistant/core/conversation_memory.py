@@ -4,40 +4,236 @@ Konuşma Hafızası ve Bağlam Yönetimi
 - Bağlam analizini yapar
 - Kullanıcı profilini öğrenir
 - Kişiselleştirilmiş yanıtlar verir
+
+Hafıza iki bölüme ayrılır:
+- UserMemory: kullanıcıya ait uzun dönem hafıza (profil, konular, favoriler,
+  arşiv) - aynı kullanıcının tüm oturumları paylaşır
+- ConversationMemory: oturuma ait kısa dönem hafıza (son konuşmalar, bağlam,
+  özet)
+Her bölümün kendi kilidi vardır; farklı kullanıcılar/oturumlar birbirini
+beklemez.
 """
 import json
 import logging
+import threading
+import time
 from datetime import datetime
-from pathlib import Path
 from typing import List, Dict, Optional
 
+from core.decayed_counter import DecayedTopK
+from core.conversation_summarizer import ConversationSummarizer
+from core.storage import Storage, get_storage, DEFAULT_USER, DEFAULT_SESSION
+from core.history_archive import HistoryArchive, user_archive_dir
+
+try:
+    from config.settings import (
+        TOPIC_MEMORY_CAPACITY, TOPIC_HALF_LIFE_DAYS, FAVORITE_APPS_CAPACITY,
+        SUMMARY_TOKEN_BUDGET, SUMMARY_RECENT_TURNS, SUMMARY_LLM_REFRESH_TURNS,
+        ARCHIVE_DIR, ARCHIVE_BATCH_TURNS
+    )
+except ImportError:
+    # Fallback değerler
+    TOPIC_MEMORY_CAPACITY = 500
+    TOPIC_HALF_LIFE_DAYS = 30
+    FAVORITE_APPS_CAPACITY = 50
+    SUMMARY_TOKEN_BUDGET = 120
+    SUMMARY_RECENT_TURNS = 3
+    SUMMARY_LLM_REFRESH_TURNS = 10
+    ARCHIVE_DIR = 'data/archive'
+    ARCHIVE_BATCH_TURNS = 50
+
 logger = logging.getLogger(__name__)
 
+# Gereksiz kelimeler
+STOP_WORDS = {'nedir', 'ne', 'nasıl', 'kaç', 'kim', 'nerede',
+              'ne zaman', 'hangi', 'bir', 'bu', 'şu', 'mi', 'mı',
+              'mu', 'mü', 'için', 'ile', 've', 'veya', 'ama'}
+
+
+def extract_keywords(text: str) -> List[str]:
+    """Metinden anahtar kelimeleri çıkar"""
+    # Basit keyword extraction (gelişmiş NLP eklenebilir)
+    words = text.lower().split()
+    keywords = [w for w in words if w not in STOP_WORDS and len(w) > 2]
+    
+    return keywords[:5]  # İlk 5 anahtar kelime
+
+
+class UserMemory:
+    """Kullanıcı bölümü - oturumlar arasında paylaşılan uzun dönem hafıza"""
+    
+    # Veritabanında (sıcak katman) tutulan son konuşma sayısı
+    MAX_HOT_TURNS = 100
+    
+    def __init__(self, user_id: str = DEFAULT_USER, storage: Optional[Storage] = None,
+                 archive: Optional[HistoryArchive] = None, archive_root: str = ARCHIVE_DIR):
+        self.user_id = user_id
+        self.storage = storage or get_storage()
+        self.lock = threading.RLock()
+        self.last_used = time.time()
+        
+        # Soğuk katman: sıkıştırılmış arşiv segmentleri (gerektiğinde açılır)
+        self.archive = archive or HistoryArchive(
+            archive_dir=user_archive_dir(archive_root, user_id), extract_keywords=extract_keywords
+        )
+        
+        # Sınırlı ve zamanla sönümlenen sayaçlar (eski ilgiler zamanla geriler)
+        self.profile: Dict = {}
+        self.topics = DecayedTopK(
+            capacity=TOPIC_MEMORY_CAPACITY, half_life_days=TOPIC_HALF_LIFE_DAYS, k=5
+        )
+        self.favorite_apps = DecayedTopK(
+            capacity=FAVORITE_APPS_CAPACITY, half_life_days=TOPIC_HALF_LIFE_DAYS, k=3
+        )
+        
+        self._load()
+    
+    def namespace(self, name: str) -> str:
+        return f"user/{self.user_id}/{name}"
+    
+    def record(self, interaction: Dict, session_id: str = DEFAULT_SESSION):
+        """Etkileşimi uzun dönem hafızaya işle ve kaydet"""
+        with self.lock:
+            self.last_used = time.time()
+            self._update_topics(interaction)
+            self._update_profile(interaction)
+            
+            try:
+                # Etkileşim ve değişen kayıtlar tek işlemde yazılır
+                self.storage.save_interaction(
+                    interaction,
+                    user_id=self.user_id,
+                    session_id=session_id,
+                    updates={
+                        self.namespace('topics'): self.topics.pop_changes(),
+                        self.namespace('favorite_apps'): self.favorite_apps.pop_changes(),
+                        self.namespace('profile'): (dict(self.profile), []),
+                    }
+                )
+            except Exception as e:
+                logger.error(f"Hafıza kaydetme hatası: {e}")
+                return
+            
+            self._roll_to_archive()
+    
+    def _update_topics(self, interaction: Dict):
+        """Uzun dönem hafızayı güncelle - önemli bilgileri sakla"""
+        # Konu frekansı
+        if interaction['intent'] == 'information':
+            for keyword in extract_keywords(interaction['user']):
+                self.topics.add(keyword, timestamp=interaction['timestamp'])
+    
+    def _update_profile(self, interaction: Dict):
+        """Kullanıcı profilini güncelle - tercihler, alışkanlıklar"""
+        # Sık kullanılan uygulamalar
+        if interaction['intent'] == 'open_app':
+            app_name = interaction.get('entities', {}).get('app_name', '')
+            if app_name:
+                self.favorite_apps.add(app_name, timestamp=interaction['timestamp'])
+        
+        # Sık sorulan sorular
+        if interaction['intent'] == 'information':
+            self.profile['question_count'] = self.profile.get('question_count', 0) + 1
+        
+        # Toplam etkileşim
+        self.profile['total_interactions'] = self.profile.get('total_interactions', 0) + 1
+    
+    def _roll_to_archive(self):
+        """
+        Sıcak katman taşınca en eski konuşmaları arşiv segmentine taşı
+        
+        Toplu çalışır (ARCHIVE_BATCH_TURNS): her etkileşimde değil, sıcak
+        katman eşiği bir parti kadar aştığında tetiklenir.
+        """
+        try:
+            overflow = self.storage.count_interactions(self.user_id) - self.MAX_HOT_TURNS
+            if overflow < ARCHIVE_BATCH_TURNS:
+                return
+            
+            turns = self.storage.oldest_interactions(overflow, self.user_id)
+            # Önce segment yazılır, sonra satırlar silinir: çökmede kayıp olmaz
+            self.archive.archive(turns)
+            self.storage.delete_interactions_through(turns[-1]['id'], self.user_id)
+            logger.info(f"🗃️ {len(turns)} eski konuşma arşive taşındı ({self.user_id})")
+        except Exception as e:
+            logger.error(f"Arşivleme hatası: {e}")
+    
+    def _load(self):
+        """Kullanıcı hafızasını depolamadan yükle"""
+        try:
+            self.topics.load(self.storage.get_all(self.namespace('topics')))
+            self.favorite_apps.load(self.storage.get_all(self.namespace('favorite_apps')))
+            self.profile = self.storage.get_all(self.namespace('profile'))
+        except Exception as e:
+            logger.error(f"Hafıza yükleme hatası: {e}")
+
 
 class ConversationMemory:
-    """Akıllı konuşma hafızası - JARVIS tarzı"""
+    """Akıllı konuşma hafızası - JARVIS tarzı (bir oturumun hafızası)"""
     
-    def __init__(self, user_name: str = "Kullanıcı"):
+    # RAM'de tutulan son konuşma sayısı
+    MAX_HISTORY = 100
+    
+    def __init__(self, user_name: str = "Kullanıcı", storage: Optional[Storage] = None,
+                 archive: Optional[HistoryArchive] = None, user_id: str = DEFAULT_USER,
+                 session_id: str = DEFAULT_SESSION, user_memory: Optional[UserMemory] = None):
+        """
+        Args:
+            user_name: Kullanıcının görünen adı
+            storage: Depolama katmanı (varsayılan: paylaşılan örnek)
+            archive: Arşiv (yalnızca user_memory verilmediğinde kullanılır)
+            user_id: Kullanıcı bölümü
+            session_id: Oturum bölümü
+            user_memory: Paylaşılan kullanıcı hafızası (MemoryManager verir)
+        """
         self.user_name = user_name
+        self.user_id = user_id
+        self.session_id = session_id
+        self.storage = storage or get_storage()
+        self.user_memory = user_memory or UserMemory(user_id, self.storage, archive)
+        
+        self._lock = threading.RLock()
+        self.last_used = time.time()
+        
         self.conversation_history: List[Dict] = []
-        self.long_term_memory: Dict = {}
-        self.user_profile: Dict = {}
         self.current_context: Dict = {}
         
-        # Dosya yolları
-        self.data_dir = Path('data/memory')
-        self.data_dir.mkdir(parents=True, exist_ok=True)
-        
-        self.conversation_file = self.data_dir / 'conversation_history.json'
-        self.long_term_file = self.data_dir / 'long_term_memory.json'
-        self.profile_file = self.data_dir / 'user_profile.json'
+        # Eski konuşmaları arka planda özetler
+        self.summarizer = ConversationSummarizer(
+            extract_keywords=extract_keywords,
+            token_budget=SUMMARY_TOKEN_BUDGET,
+            recent_turns=SUMMARY_RECENT_TURNS,
+            llm_refresh_turns=SUMMARY_LLM_REFRESH_TURNS,
+            on_update=self._save_summary
+        )
         
         # Hafızayı yükle
         self._load_memory()
         
         logger.info(f"💾 Hafıza sistemi yüklendi - {len(self.conversation_history)} geçmiş konuşma")
     
-    def add_interaction(self, user_input: str, assistant_response: str, 
+    # Kullanıcı bölümüne ait alanlar (geriye uyumluluk)
+    @property
+    def archive(self) -> HistoryArchive:
+        return self.user_memory.archive
+    
+    @property
+    def long_term_memory(self) -> DecayedTopK:
+        return self.user_memory.topics
+    
+    @property
+    def favorite_apps(self) -> DecayedTopK:
+        return self.user_memory.favorite_apps
+    
+    @property
+    def user_profile(self) -> Dict:
+        return self.user_memory.profile
+    
+    @property
+    def session_namespace(self) -> str:
+        return f"session/{self.user_id}/{self.session_id}"
+    
+    def add_interaction(self, user_input: str, assistant_response: str,
                        intent: str = None, entities: Dict = None):
         """
         Yeni bir etkileşim ekle
@@ -56,24 +252,25 @@ class ConversationMemory:
             'entities': entities or {}
         }
         
-        # Konuşma geçmişine ekle
-        self.conversation_history.append(interaction)
-        
-        # Son 100 konuşmayı tut (performans için)
-        if len(self.conversation_history) > 100:
-            self.conversation_history = self.conversation_history[-100:]
-        
-        # Bağlamı güncelle
-        self._update_context(interaction)
-        
-        # Uzun dönem hafızayı güncelle
-        self._update_long_term_memory(interaction)
+        with self._lock:
+            self.last_used = time.time()
+            
+            # Konuşma geçmişine ekle
+            self.conversation_history.append(interaction)
+            
+            # RAM'de son 100 konuşmayı tut, daha eskiler arşive taşınır
+            if len(self.conversation_history) > self.MAX_HISTORY:
+                self.conversation_history = self.conversation_history[-self.MAX_HISTORY:]
+            
+            # Bağlamı güncelle
+            self._update_context(interaction)
+            history = list(self.conversation_history)
         
-        # Profili güncelle
-        self._update_user_profile(interaction)
+        # Uzun dönem hafıza + profil + kayıt (kullanıcı kilidiyle)
+        self.user_memory.record(interaction, self.session_id)
         
-        # Kaydet
-        self._save_memory()
+        # Eski konuşmaları özete katla (arka planda)
+        self.summarizer.submit(history)
         
         logger.debug(f"💬 Etkileşim kaydedildi: {user_input[:30]}...")
     
@@ -85,7 +282,7 @@ class ConversationMemory:
             query = entities.get('query', '') or interaction['user']
             
             # Anahtar kelimeleri çıkar
-            keywords = self._extract_keywords(query)
+            keywords = extract_keywords(query)
             self.current_context['last_topic'] = keywords
             self.current_context['last_query'] = query
             self.current_context['last_time'] = interaction['timestamp']
@@ -96,61 +293,7 @@ class ConversationMemory:
     
     def _extract_keywords(self, text: str) -> List[str]:
         """Metinden anahtar kelimeleri çıkar"""
-        # Basit keyword extraction (gelişmiş NLP eklenebilir)
-        text = text.lower()
-        
-        # Gereksiz kelimeleri çıkar
-        stop_words = {'nedir', 'ne', 'nasıl', 'kaç', 'kim', 'nerede', 
-                     'ne zaman', 'hangi', 'bir', 'bu', 'şu', 'mi', 'mı', 
-                     'mu', 'mü', 'için', 'ile', 've', 'veya', 'ama'}
-        
-        words = text.split()
-        keywords = [w for w in words if w not in stop_words and len(w) > 2]
-        
-        return keywords[:5]  # İlk 5 anahtar kelime
-    
-    def _update_long_term_memory(self, interaction: Dict):
-        """Uzun dönem hafızayı güncelle - önemli bilgileri sakla"""
-        # Konu frekansı
-        if interaction['intent'] == 'information':
-            query = interaction['user'].lower()
-            keywords = self._extract_keywords(query)
-            
-            for keyword in keywords:
-                if keyword not in self.long_term_memory:
-                    self.long_term_memory[keyword] = {
-                        'count': 0,
-                        'first_asked': interaction['timestamp'],
-                        'last_asked': interaction['timestamp']
-                    }
-                
-                self.long_term_memory[keyword]['count'] += 1
-                self.long_term_memory[keyword]['last_asked'] = interaction['timestamp']
-    
-    def _update_user_profile(self, interaction: Dict):
-        """Kullanıcı profilini güncelle - tercihler, alışkanlıklar"""
-        # Sık kullanılan uygulamalar
-        if interaction['intent'] == 'open_app':
-            app_name = interaction.get('entities', {}).get('app_name', '')
-            if app_name:
-                if 'favorite_apps' not in self.user_profile:
-                    self.user_profile['favorite_apps'] = {}
-                
-                if app_name not in self.user_profile['favorite_apps']:
-                    self.user_profile['favorite_apps'][app_name] = 0
-                
-                self.user_profile['favorite_apps'][app_name] += 1
-        
-        # Sık sorulan sorular
-        if interaction['intent'] == 'information':
-            if 'question_count' not in self.user_profile:
-                self.user_profile['question_count'] = 0
-            self.user_profile['question_count'] += 1
-        
-        # Toplam etkileşim
-        if 'total_interactions' not in self.user_profile:
-            self.user_profile['total_interactions'] = 0
-        self.user_profile['total_interactions'] += 1
+        return extract_keywords(text)
     
     def get_context_for_ai(self, current_query: str) -> str:
         """
@@ -161,19 +304,31 @@ class ConversationMemory:
         """
         context_parts = []
         
-        # Kullanıcı profili
-        if self.user_profile:
+        with self._lock:
+            self.last_used = time.time()
+            last_topic = list(self.current_context.get('last_topic', []))
+            recent = self.conversation_history[-self.summarizer.recent_turns:]
+        
+        with self.user_memory.lock:
+            self.user_memory.last_used = time.time()
             total = self.user_profile.get('total_interactions', 0)
-            if total > 0:
-                context_parts.append(f"Kullanıcı bilgisi: {total} önceki etkileşim.")
+            top_apps = self.favorite_apps.top(3)
+        
+        # Kullanıcı profili
+        if total > 0:
+            context_parts.append(f"Kullanıcı bilgisi: {total} önceki etkileşim.")
         
         # Son konuşma bağlamı
-        if self.current_context.get('last_topic'):
-            keywords = ', '.join(self.current_context['last_topic'])
+        if last_topic:
+            keywords = ', '.join(last_topic)
             context_parts.append(f"Son konuşulan: {keywords}")
         
-        # Son 3 etkileşim (kısa özet)
-        recent = self.conversation_history[-3:]
+        # Daha eski konuşmaların özeti (sabit token bütçesi)
+        summary = self.summarizer.render()
+        if summary:
+            context_parts.append(f"\n{summary}")
+        
+        # Son etkileşimler (ham)
         if recent:
             context_parts.append("\nSon konuşmalar:")
             for i, conv in enumerate(recent, 1):
@@ -181,9 +336,7 @@ class ConversationMemory:
                 context_parts.append(f"{i}. Kullanıcı: {user_msg}")
         
         # Sık kullanılan uygulamalar
-        fav_apps = self.user_profile.get('favorite_apps', {})
-        if fav_apps:
-            top_apps = sorted(fav_apps.items(), key=lambda x: x[1], reverse=True)[:3]
+        if top_apps:
             apps_str = ', '.join([app for app, _ in top_apps])
             context_parts.append(f"Sık kullanılan uygulamalar: {apps_str}")
         
@@ -198,15 +351,18 @@ class ConversationMemory:
     
     def _find_related_conversations(self, query: str, limit: int = 3) -> List[Dict]:
         """Sorgu ile ilgili önceki konuşmaları bul"""
-        query_keywords = set(self._extract_keywords(query.lower()))
+        query_keywords = set(extract_keywords(query))
         
         if not query_keywords:
             return []
         
+        with self._lock:
+            candidates = self.conversation_history[-20:]  # Son 20 konuşmayı kontrol et
+        
         scored_convs = []
         
-        for conv in self.conversation_history[-20:]:  # Son 20 konuşmayı kontrol et
-            conv_keywords = set(self._extract_keywords(conv['user'].lower()))
+        for conv in candidates:
+            conv_keywords = set(extract_keywords(conv['user']))
             
             # Ortak kelime sayısı
             common = query_keywords.intersection(conv_keywords)
@@ -216,63 +372,53 @@ class ConversationMemory:
         
         # Skora göre sırala
         scored_convs.sort(reverse=True, key=lambda x: x[0])
+        related = [conv for score, conv in scored_convs[:limit]]
+        
+        # Yeterli değilse arşive bak (yalnızca eşleşen segmentler açılır)
+        if len(related) < limit:
+            related.extend(self.archive.search(query_keywords, limit - len(related)))
         
-        return [conv for score, conv in scored_convs[:limit]]
+        return related
     
     def get_summary(self) -> Dict:
         """Hafıza özeti"""
-        return {
-            'total_conversations': len(self.conversation_history),
-            'user_profile': self.user_profile,
-            'top_topics': sorted(
-                self.long_term_memory.items(), 
-                key=lambda x: x[1]['count'], 
-                reverse=True
-            )[:5],
-            'current_context': self.current_context
-        }
+        with self._lock, self.user_memory.lock:
+            return {
+                'total_conversations': len(self.conversation_history),
+                'user_profile': dict(self.user_profile),
+                'favorite_apps': self.favorite_apps.top(3),
+                'top_topics': self.long_term_memory.top(5),
+                'current_context': dict(self.current_context)
+            }
     
     def clear_context(self):
         """Mevcut bağlamı temizle (yeni konu)"""
-        self.current_context = {}
+        with self._lock:
+            self.current_context = {}
         logger.info("🔄 Bağlam temizlendi")
     
-    def _save_memory(self):
-        """Hafızayı diske kaydet"""
+    def close(self):
+        """Oturumu kapat - son özeti kaydet"""
+        self._save_summary()
+    
+    def _save_summary(self):
+        """Konuşma özetini kaydet (özetleyici thread'inden çağrılır)"""
         try:
-            # Konuşma geçmişi
-            with open(self.conversation_file, 'w', encoding='utf-8') as f:
-                json.dump(self.conversation_history, f, ensure_ascii=False, indent=2)
-            
-            # Uzun dönem hafıza
-            with open(self.long_term_file, 'w', encoding='utf-8') as f:
-                json.dump(self.long_term_memory, f, ensure_ascii=False, indent=2)
-            
-            # Kullanıcı profili
-            with open(self.profile_file, 'w', encoding='utf-8') as f:
-                json.dump(self.user_profile, f, ensure_ascii=False, indent=2)
-                
+            self.storage.put(self.session_namespace, 'summary', self.summarizer.to_dict())
         except Exception as e:
-            logger.error(f"Hafıza kaydetme hatası: {e}")
+            logger.error(f"Özet kaydetme hatası: {e}")
     
     def _load_memory(self):
-        """Hafızayı diskten yükle"""
+        """Oturum hafızasını depolamadan yükle"""
         try:
-            # Konuşma geçmişi
-            if self.conversation_file.exists():
-                with open(self.conversation_file, 'r', encoding='utf-8') as f:
-                    self.conversation_history = json.load(f)
-            
-            # Uzun dönem hafıza
-            if self.long_term_file.exists():
-                with open(self.long_term_file, 'r', encoding='utf-8') as f:
-                    self.long_term_memory = json.load(f)
+            self.conversation_history = self.storage.recent_interactions(
+                self.MAX_HISTORY, self.user_id, self.session_id
+            )
             
-            # Kullanıcı profili
-            if self.profile_file.exists():
-                with open(self.profile_file, 'r', encoding='utf-8') as f:
-                    self.user_profile = json.load(f)
-                    
+            summary = self.storage.get(self.session_namespace, 'summary')
+            if summary:
+                self.summarizer.load(summary)
+        
         except Exception as e:
             logger.error(f"Hafıza yükleme hatası: {e}")
 
@@ -0,0 +1,244 @@
+"""
+Kayan Konuşma Özeti
+- Eski konuşmaları arka planda özetler (ana akışı bekletmez)
+- Yerel, çıkarımsal özet: konu ağırlıkları + öne çıkan konuşmalar
+- Opsiyonel LLM yenilemesi (yine arka planda)
+- Sabit token bütçesiyle AI bağlamına eklenir
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from core.decayed_counter import DecayedTopK
+
+logger = logging.getLogger(__name__)
+
+
+# Tüm oturumların özetleyicileri tek bir arka plan thread'ini paylaşır
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='summarizer')
+
+
+def estimate_tokens(text: str) -> int:
+    """Kaba token tahmini (~4 karakter = 1 token)"""
+    return (len(text) + 3) // 4
+
+
+class ConversationSummarizer:
+    """Eski konuşmaları kayan bir özete katlayan arka plan özetleyici"""
+
+    def __init__(self, extract_keywords: Callable[[str], List[str]],
+                 token_budget: int = 120, recent_turns: int = 3,
+                 max_highlights: int = 5, llm_refresh_turns: int = 10,
+                 on_update: Callable[[], None] = None):
+        """
+        Args:
+            extract_keywords: Metinden anahtar kelime çıkaran fonksiyon
+            token_budget: Özetin bağlamda kaplayabileceği en fazla token
+            recent_turns: Ham olarak gösterilen (özetlenmeyen) son konuşma sayısı
+            max_highlights: Özette tutulan öne çıkan konuşma sayısı
+            llm_refresh_turns: LLM özeti kaç yeni katlanmış konuşmada bir yenilenir
+            on_update: Özet değiştiğinde çağrılır (kalıcı kayıt için)
+        """
+        self.extract_keywords = extract_keywords
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self.max_highlights = max_highlights
+        self.llm_refresh_turns = llm_refresh_turns
+        self.on_update = on_update
+        self.llm_summarize: Optional[Callable[[str, str], str]] = None
+
+        self.topics = DecayedTopK(capacity=100, half_life_days=1, k=8)
+        self.highlights: List[Dict] = []
+        self.llm_summary = ''
+        self.folded_until = ''       # Son katlanan konuşmanın zaman damgası
+        self.turns_folded = 0
+        self._turns_since_llm = 0
+        self._pending_llm: List[Dict] = []
+
+        self._lock = threading.Lock()
+        self._snapshot: Optional[List[Dict]] = None
+        self._scheduled = False
+
+    def set_llm_summarizer(self, fn: Callable[[str, str], str]):
+        """LLM özet fonksiyonunu bağla: fn(önceki_özet, yeni_konuşmalar) -> özet"""
+        self.llm_summarize = fn
+
+    # ------------------------------------------------------------------
+    # Arka plan katlama
+    # ------------------------------------------------------------------
+    def submit(self, history: List[Dict]):
+        """
+        Geçmişin anlık görüntüsünü özetleyiciye ver (bloklamaz)
+
+        Henüz işlenmemiş eski bir görüntü varsa yenisiyle değiştirilir;
+        son görüntü her zaman öncekileri kapsar.
+        """
+        with self._lock:
+            self._snapshot = list(history)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        _executor.submit(self._run)
+
+    def _run(self):
+        with self._lock:
+            history = self._snapshot
+            self._snapshot = None
+            self._scheduled = False
+        if history is None:
+            return
+
+        try:
+            changed = self.fold(history)
+            if self._should_refresh_llm():
+                self._refresh_llm()
+                changed = True
+            if changed and self.on_update:
+                self.on_update()
+        except Exception as e:
+            logger.error(f"Özetleme hatası: {e}")
+
+    def fold(self, history: List[Dict]) -> bool:
+        """Son `recent_turns` dışındaki, henüz katlanmamış konuşmaları özete ekle"""
+        older = history[:-self.recent_turns] if self.recent_turns else history
+        new_turns = [t for t in older if t.get('timestamp', '') > self.folded_until]
+        if not new_turns:
+            return False
+
+        with self._lock:
+            for turn in new_turns:
+                keywords = self.extract_keywords(turn.get('user', ''))
+                for keyword in keywords:
+                    self.topics.add(keyword, timestamp=turn['timestamp'])
+
+                score = sum(self.topics.count(k) for k in keywords)
+                self._add_highlight(turn, score)
+
+            self.folded_until = new_turns[-1]['timestamp']
+            self.turns_folded += len(new_turns)
+            self._turns_since_llm += len(new_turns)
+            self._pending_llm.extend(new_turns)
+            del self._pending_llm[:-self.llm_refresh_turns * 2]
+
+        logger.debug(f"📝 {len(new_turns)} konuşma özete katlandı")
+        return True
+
+    def _add_highlight(self, turn: Dict, score: float):
+        """Öne çıkan konuşmaları skora göre sınırlı tut"""
+        user = turn.get('user', '').strip()
+        if not user:
+            return
+        self.highlights.append({
+            'timestamp': turn['timestamp'],
+            'text': f"{user[:60]} → {turn.get('assistant', '')[:60]}",
+            'score': round(score, 3),
+        })
+        if len(self.highlights) > self.max_highlights:
+            weakest = min(range(len(self.highlights)), key=lambda i: self.highlights[i]['score'])
+            self.highlights.pop(weakest)
+
+    def _should_refresh_llm(self) -> bool:
+        return bool(self.llm_summarize) and self._turns_since_llm >= self.llm_refresh_turns
+
+    def _refresh_llm(self):
+        """LLM ile özeti yenile - arka plan thread'inde çalışır"""
+        with self._lock:
+            previous = self.llm_summary
+            turns_text = "\n".join(
+                f"Kullanıcı: {t.get('user', '')}\nAsistan: {t.get('assistant', '')}"
+                for t in self._pending_llm
+            )
+        try:
+            summary = (self.llm_summarize(previous, turns_text) or '').strip()
+        except Exception as e:
+            logger.warning(f"LLM özet hatası: {e}")
+            return
+
+        with self._lock:
+            if summary:
+                self.llm_summary = summary
+            self._turns_since_llm = 0
+            self._pending_llm = []
+
+    # ------------------------------------------------------------------
+    # Bağlam
+    # ------------------------------------------------------------------
+    def render(self, token_budget: Optional[int] = None) -> str:
+        """Özeti token bütçesi içinde metne çevir"""
+        budget = self.token_budget if token_budget is None else token_budget
+        with self._lock:
+            if not self.turns_folded:
+                return ''
+
+            candidates = []
+            if self.llm_summary:
+                candidates.append(f"Konuşma özeti: {self.llm_summary}")
+            topics = [k for k, _ in self.topics.top()]
+            if topics:
+                candidates.append(f"Önceki konular: {', '.join(topics)}")
+            if not self.llm_summary:
+                for item in sorted(self.highlights, key=lambda h: h['timestamp']):
+                    candidates.append(f"- {item['text']}")
+
+        lines = []
+        used = 0
+        for line in candidates:
+            cost = estimate_tokens(line) + 1
+            if used + cost > budget:
+                remaining = (budget - used - 1) * 4
+                if not lines and remaining > 3:
+                    lines.append(line[:remaining - 3] + '...')
+                break
+            lines.append(line)
+            used += cost
+        return "\n".join(lines)
+
+    # ------------------------------------------------------------------
+    # Kalıcılık
+    # ------------------------------------------------------------------
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'topics': self.topics.to_dict(),
+                'highlights': list(self.highlights),
+                'llm_summary': self.llm_summary,
+                'folded_until': self.folded_until,
+                'turns_folded': self.turns_folded,
+            }
+
+    def load(self, data: Dict):
+        with self._lock:
+            self.topics.load(data.get('topics', {}))
+            self.highlights = data.get('highlights', [])[-self.max_highlights:]
+            self.llm_summary = data.get('llm_summary', '')
+            self.folded_until = data.get('folded_until', '')
+            self.turns_folded = data.get('turns_folded', 0)
+
+
+# Test
+if __name__ == "__main__":
+    import time
+    from datetime import datetime, timedelta
+
+    logging.basicConfig(level=logging.DEBUG)
+
+    summarizer = ConversationSummarizer(
+        extract_keywords=lambda text: [w for w in text.lower().split() if len(w) > 3][:5],
+        token_budget=60
+    )
+    start = datetime.now() - timedelta(minutes=30)
+    history = [
+        {'timestamp': (start + timedelta(minutes=i)).isoformat(),
+         'user': q, 'assistant': a}
+        for i, (q, a) in enumerate([
+            ("Anıtkabir yılda kaç ziyaretçi alıyor", "Yaklaşık 10 milyon."),
+            ("Anıtkabir ne zaman inşa edildi", "1944-1953 arasında."),
+            ("Anıtkabir mimarı kimdir", "Emin Onat ve Orhan Arda."),
+            ("Chrome'u aç", "Chrome açılıyor."),
+            ("Hava nasıl", "Güneşli."),
+        ])
+    ]
+    summarizer.submit(history)
+    time.sleep(0.2)
+    print(summarizer.render())
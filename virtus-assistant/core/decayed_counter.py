@@ -0,0 +1,268 @@
+"""
+Zamanla Sönümlenen Sayaç
+- Üstel sönümleme (yarı ömür) ile sayım
+- Kapasite sınırlı (space-saving tarzı tahliye)
+- Artımlı güncellenen top-K yığını
+
+Skorlar "forward decay" yöntemiyle saklanır: her artış, sabit bir referans
+zamana (landmark) göre exp(λ·(t - landmark)) ağırlığıyla eklenir. Böylece
+sönümleme için tüm kayıtları tek tek güncellemek gerekmez; sıralama her an
+geçerli kalır ve skorlar yalnızca artar.
+"""
+import heapq
+import math
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# exp() taşmasını önlemek için bu üssü geçince skorlar yeniden ölçeklenir
+_MAX_EXPONENT = 50.0
+
+
+def _to_epoch(value) -> float:
+    """ISO zaman damgası / sayı -> epoch saniye"""
+    if value is None:
+        return time.time()
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+class DecayedTopK:
+    """Kapasite sınırlı, zamanla sönümlenen frekans sayacı"""
+
+    def __init__(self, capacity: int = 500, half_life_days: float = 30.0, k: int = 5):
+        """
+        Args:
+            capacity: En fazla tutulacak anahtar sayısı
+            half_life_days: Bir sayımın ağırlığının yarıya indiği süre (gün)
+            k: Artımlı olarak takip edilecek en popüler anahtar sayısı
+        """
+        self.capacity = max(1, capacity)
+        self.k = max(1, k)
+        self.decay_rate = math.log(2) / (half_life_days * 86400)
+        self.landmark = time.time()
+
+        # key -> {'score': forward-decay skoru, 'first_seen', 'last_seen'}
+        self._items: Dict[str, Dict] = {}
+        # Tahliye için tembel min-yığın: (skor, key) - eski girdiler atlanır
+        self._evict_heap: List[Tuple[float, str]] = []
+        # Top-K min-yığını: [skor, key]
+        self._top: List[List] = []
+        # Son kayıttan beri değişen / tahliye edilen anahtarlar (artımlı kayıt)
+        self._dirty = set()
+        self._evicted = set()
+
+    # ------------------------------------------------------------------
+    # Güncelleme
+    # ------------------------------------------------------------------
+    def add(self, key: str, amount: float = 1.0, timestamp=None):
+        """Anahtarın sayacını artır"""
+        if not key:
+            return
+
+        ts = _to_epoch(timestamp)
+        iso = datetime.fromtimestamp(ts).isoformat()
+        exponent = self.decay_rate * (ts - self.landmark)
+        if exponent > _MAX_EXPONENT:
+            self._rescale(ts)
+            exponent = 0.0
+        weight = amount * math.exp(exponent)
+
+        item = self._items.get(key)
+        if item is None:
+            base = 0.0
+            if len(self._items) >= self.capacity:
+                # Space-saving: en düşük skorlu anahtar yerini yenisine bırakır,
+                # yeni anahtar onun skorunu (hata payı) devralır
+                base = self._evict_min()
+            item = {'score': base, 'first_seen': iso, 'last_seen': iso}
+            self._items[key] = item
+
+        item['score'] += weight
+        item['last_seen'] = iso
+        self._dirty.add(key)
+        self._evicted.discard(key)
+
+        heapq.heappush(self._evict_heap, (item['score'], key))
+        if len(self._evict_heap) > 4 * self.capacity:
+            self._rebuild_evict_heap()
+
+        self._update_top(key, item['score'])
+
+    def _evict_min(self) -> float:
+        """En düşük skorlu anahtarı at, skorunu döndür"""
+        while self._evict_heap:
+            score, key = heapq.heappop(self._evict_heap)
+            item = self._items.get(key)
+            if item is not None and item['score'] == score:
+                del self._items[key]
+                self._dirty.discard(key)
+                self._evicted.add(key)
+                self._remove_from_top(key)
+                return score
+        return 0.0
+
+    def _rebuild_evict_heap(self):
+        self._evict_heap = [(item['score'], key) for key, item in self._items.items()]
+        heapq.heapify(self._evict_heap)
+
+    def _update_top(self, key: str, score: float):
+        """Top-K yığınını artımlı güncelle (skorlar yalnızca artar)"""
+        for entry in self._top:
+            if entry[1] == key:
+                entry[0] = score
+                heapq.heapify(self._top)
+                return
+
+        if len(self._top) < self.k:
+            heapq.heappush(self._top, [score, key])
+        elif score > self._top[0][0]:
+            heapq.heapreplace(self._top, [score, key])
+
+    def _remove_from_top(self, key: str):
+        for i, entry in enumerate(self._top):
+            if entry[1] == key:
+                self._top.pop(i)
+                heapq.heapify(self._top)
+                return
+
+    def _rescale(self, now: float):
+        """Landmark'ı ileri al, tüm skorları aynı oranda küçült"""
+        factor = math.exp(-self.decay_rate * (now - self.landmark))
+        for item in self._items.values():
+            item['score'] *= factor
+        for entry in self._top:
+            entry[0] *= factor
+        self.landmark = now
+        self._rebuild_evict_heap()
+
+    # ------------------------------------------------------------------
+    # Okuma
+    # ------------------------------------------------------------------
+    def count(self, key: str, now: Optional[float] = None) -> float:
+        """Anahtarın şu anki (sönümlenmiş) değeri"""
+        item = self._items.get(key)
+        if item is None:
+            return 0.0
+        return self._decayed(item['score'], now)
+
+    def _decayed(self, score: float, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        return score * math.exp(-self.decay_rate * (now - self.landmark))
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[str, float]]:
+        """En popüler anahtarlar: [(key, sönümlenmiş değer), ...]"""
+        n = self.k if n is None else n
+        if n <= self.k:
+            ranked = sorted(self._top, reverse=True)[:n]
+        else:
+            ranked = heapq.nlargest(n, ([item['score'], key] for key, item in self._items.items()))
+        return [(key, round(self._decayed(score), 3)) for score, key in ranked]
+
+    def __contains__(self, key) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def items(self):
+        return self._items.items()
+
+    # ------------------------------------------------------------------
+    # Kalıcılık
+    # ------------------------------------------------------------------
+    def to_dict(self) -> Dict:
+        """
+        JSON'a yazılabilir sözlük
+
+        'count', anahtarın son görüldüğü andaki sönümlenmiş değeridir; bu
+        sayede yükleme sırasında landmark'tan bağımsız olarak geri hesaplanır.
+        """
+        return {key: self._entry(item) for key, item in self._items.items()}
+
+    def _entry(self, item: Dict) -> Dict:
+        last = _to_epoch(item['last_seen'])
+        return {
+            'count': round(self._decayed(item['score'], last), 4),
+            'first_seen': item['first_seen'],
+            'last_seen': item['last_seen'],
+        }
+
+    def pop_changes(self) -> Tuple[Dict, List[str]]:
+        """
+        Son çağrıdan beri değişenler: (güncellenen kayıtlar, silinen anahtarlar)
+
+        Depolama katmanının tüm sayacı değil, yalnızca farkı yazması için.
+        """
+        upserts = {key: self._entry(self._items[key]) for key in self._dirty if key in self._items}
+        deletes = list(self._evicted)
+        self._dirty = set()
+        self._evicted = set()
+        return upserts, deletes
+
+    def load(self, data: Dict):
+        """
+        Kayıtlı veriyi yükle
+
+        Eski formatlar da desteklenir:
+        - {key: int} (favorite_apps)
+        - {key: {'count', 'first_asked', 'last_asked'}} (long_term_memory)
+        """
+        self._items = {}
+        self._top = []
+        self._dirty = set()
+        self._evicted = set()
+        self.landmark = time.time()
+
+        for key, value in (data or {}).items():
+            if isinstance(value, dict):
+                count = float(value.get('count', 0))
+                last = value.get('last_seen') or value.get('last_asked')
+                first = value.get('first_seen') or value.get('first_asked') or last
+            else:
+                count = float(value or 0)
+                last = first = None
+
+            last_ts = _to_epoch(last)
+            self._items[key] = {
+                'score': count * math.exp(self.decay_rate * (last_ts - self.landmark)),
+                'first_seen': first or datetime.fromtimestamp(last_ts).isoformat(),
+                'last_seen': last or datetime.fromtimestamp(last_ts).isoformat(),
+            }
+
+        # Kapasite aşılıyorsa (eski, sınırsız dosyalar) en zayıfları at
+        if len(self._items) > self.capacity:
+            keep = dict(heapq.nlargest(self.capacity, self._items.items(), key=lambda kv: kv[1]['score']))
+            self._evicted = set(self._items) - set(keep)
+            self._items = keep
+
+        self._rebuild_evict_heap()
+        for key, item in self._items.items():
+            self._update_top(key, item['score'])
+
+
+# Test
+if __name__ == "__main__":
+    counter = DecayedTopK(capacity=3, half_life_days=1, k=2)
+    day = 86400
+    start = time.time() - 10 * day
+
+    # Eski ilgi: 5 kez "python"
+    for _ in range(5):
+        counter.add('python', timestamp=start)
+    # Yeni ilgi: 2 kez "anıtkabir"
+    for _ in range(2):
+        counter.add('anıtkabir', timestamp=start + 9 * day)
+    counter.add('atatürk', timestamp=start + 9 * day)
+    counter.add('ankara')  # Kapasite dolu -> en zayıf tahliye edilir
+
+    print(f"Kayıt sayısı: {len(counter)} (kapasite {counter.capacity})")
+    print(f"Top-2: {counter.top()}")
+    print(f"Kayıt: {counter.to_dict()}")
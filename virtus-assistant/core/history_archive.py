@@ -0,0 +1,411 @@
+"""
+Konuşma Arşivi (Soğuk Katman)
+- Eski konuşmalar sıkıştırılmış, değişmez segment dosyalarına yazılır
+- Segmentler aylık bölümlenir (YYYY-MM), küçük bir indeks dosyasıyla izlenir
+- Segmentler yalnızca arama gerektiğinde, tembel olarak açılır
+- Saklama süresi (retention) ve sıkıştırma (compaction) komutları
+
+Kullanım (varsayılan: tüm kullanıcıların arşivleri, --user ile tek kullanıcı):
+    python -m core.history_archive stats
+    python -m core.history_archive compact
+    python -m core.history_archive retention --user alice
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from core.storage import DEFAULT_USER
+
+try:
+    from config.settings import ARCHIVE_DIR, ARCHIVE_RETENTION_DAYS
+except ImportError:
+    ARCHIVE_DIR = 'data/archive'
+    ARCHIVE_RETENTION_DAYS = 365
+
+logger = logging.getLogger(__name__)
+
+# Süreçler arası indeks kilidi (uygulama ve bakım komutu aynı indeksi yazar)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+try:
+    import msvcrt
+    MSVCRT_AVAILABLE = True
+except ImportError:
+    MSVCRT_AVAILABLE = False
+
+# Segment başına indekste tutulan en fazla anahtar kelime
+_MAX_SEGMENT_KEYWORDS = 300
+
+
+def user_archive_dir(archive_root: str, user_id: str) -> Path:
+    """Kullanıcının arşiv klasörü (varsayılan kullanıcı kök klasörü kullanır)"""
+    if user_id == DEFAULT_USER:
+        return Path(archive_root)
+    safe_id = re.sub(r'[^\w.-]', '_', user_id)
+    return Path(archive_root) / 'users' / safe_id
+
+
+def user_archive_dirs(archive_root: str = ARCHIVE_DIR) -> Dict[str, Path]:
+    """Kökteki tüm kullanıcı arşivleri: {kullanıcı: klasör} (varsayılan kullanıcı dahil)"""
+    root = Path(archive_root)
+    dirs = {DEFAULT_USER: root}
+    users = root / 'users'
+    if users.is_dir():
+        for entry in sorted(users.iterdir()):
+            if entry.is_dir():
+                dirs[entry.name] = entry
+    return dirs
+
+
+def _atomic_write_json(path: Path, data):
+    """Geçici dosyaya yaz, sonra tek adımda yerine koy"""
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class HistoryArchive:
+    """Zaman bölümlü, sıkıştırılmış konuşma segmentleri"""
+
+    def __init__(self, archive_dir: str = ARCHIVE_DIR,
+                 extract_keywords: Optional[Callable[[str], List[str]]] = None,
+                 retention_days: int = ARCHIVE_RETENTION_DAYS, cache_segments: int = 2):
+        """
+        Args:
+            archive_dir: Segment ve indeks klasörü
+            extract_keywords: Segment anahtar kelimelerini çıkaran fonksiyon
+            retention_days: Bu süreden eski segmentler silinir (0 = sınırsız)
+            cache_segments: Bellekte açık tutulan en fazla segment
+        """
+        self.dir = Path(archive_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.dir / 'index.json'
+        self.extract_keywords = extract_keywords or (lambda text: text.lower().split())
+        self.retention_days = retention_days
+        self.cache_segments = cache_segments
+
+        self.lock_file = self.dir / 'index.lock'
+
+        self._lock = threading.RLock()
+        self._cache: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._index_mtime = None
+        self.index = self._load_index()
+
+    # ------------------------------------------------------------------
+    # İndeks
+    # ------------------------------------------------------------------
+    def _index_stamp(self):
+        try:
+            st = self.index_file.stat()
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _load_index(self) -> Dict:
+        self._index_mtime = self._index_stamp()
+        if self._index_mtime is not None:
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.error(f"Arşiv indeksi okunamadı: {e}")
+        return {'version': 1, 'last_id': 0, 'segments': []}
+
+    def _save_index(self):
+        _atomic_write_json(self.index_file, self.index)
+        self._index_mtime = self._index_stamp()
+
+    def _refresh_index(self):
+        """İndeks başka bir süreçte değiştiyse (ör. bakım komutu) yeniden oku"""
+        if self._index_stamp() != self._index_mtime:
+            with self._lock:
+                self.index = self._load_index()
+                self._cache.clear()
+
+    @contextmanager
+    def _index_transaction(self):
+        """
+        İndeks oku-değiştir-yaz bloğu
+
+        Süreçler arası dosya kilidi alınır ve indeks diskten yeniden okunur;
+        böylece bir süreç diğerinin yazdığı indeksi eski kopyasıyla ezmez.
+        """
+        with self._lock, open(self.lock_file, 'a+b') as lock:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            elif MSVCRT_AVAILABLE:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                if self._index_stamp() != self._index_mtime:
+                    self.index = self._load_index()
+                    self._cache.clear()
+                yield self.index
+            finally:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+                elif MSVCRT_AVAILABLE:
+                    lock.seek(0)
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+    @property
+    def last_id(self) -> int:
+        """Arşive yazılmış en büyük konuşma id'si"""
+        return self.index.get('last_id', 0)
+
+    @property
+    def total_turns(self) -> int:
+        return sum(seg['count'] for seg in self.index['segments'])
+
+    # ------------------------------------------------------------------
+    # Yazma
+    # ------------------------------------------------------------------
+    def archive(self, turns: List[Dict]) -> int:
+        """
+        Konuşmaları yeni segment(ler)e yaz
+
+        Her konuşmada depolamadaki 'id' bulunmalıdır; daha önce arşivlenmiş
+        id'ler atlanır (yazma sonrası çökme durumunda çift kayıt olmaz).
+
+        Returns:
+            Arşivlenen konuşma sayısı
+        """
+        with self._index_transaction():
+            turns = [t for t in turns if t.get('id', 0) > self.last_id]
+            if not turns:
+                return 0
+
+            partitions: Dict[str, List[Dict]] = {}
+            for turn in turns:
+                partitions.setdefault(turn['timestamp'][:7], []).append(turn)
+
+            for partition, items in sorted(partitions.items()):
+                self._write_segment(partition, items)
+
+            self.index['last_id'] = max(t['id'] for t in turns)
+            self._apply_retention()
+            self._save_index()
+            return len(turns)
+
+    def _write_segment(self, partition: str, turns: List[Dict]) -> Dict:
+        """Değişmez segment dosyası oluştur ve indekse ekle (indeks kaydedilmez)"""
+        name = f"{partition}_{turns[0]['id']:08d}-{turns[-1]['id']:08d}.jsonl.gz"
+        path = self.dir / name
+        tmp = path.with_suffix('.tmp')
+        with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+            for turn in turns:
+                f.write(json.dumps(turn, ensure_ascii=False) + '\n')
+        os.replace(tmp, path)
+
+        keywords = Counter()
+        for turn in turns:
+            keywords.update(set(self.extract_keywords(turn.get('user', ''))))
+
+        segment = {
+            'file': name,
+            'partition': partition,
+            'start': turns[0]['timestamp'],
+            'end': turns[-1]['timestamp'],
+            'first_id': turns[0]['id'],
+            'last_id': turns[-1]['id'],
+            'count': len(turns),
+            'keywords': sorted(k for k, _ in keywords.most_common(_MAX_SEGMENT_KEYWORDS)),
+        }
+        self.index['segments'].append(segment)
+        self.index['segments'].sort(key=lambda s: s['first_id'])
+        logger.debug(f"🗃️ Segment yazıldı: {name} ({len(turns)} konuşma)")
+        return segment
+
+    # ------------------------------------------------------------------
+    # Okuma (tembel)
+    # ------------------------------------------------------------------
+    def _read_segment(self, segment: Dict) -> List[Dict]:
+        name = segment['file']
+        with self._lock:
+            if name in self._cache:
+                self._cache.move_to_end(name)
+                return self._cache[name]
+
+        try:
+            with gzip.open(self.dir / name, 'rt', encoding='utf-8') as f:
+                turns = [json.loads(line) for line in f if line.strip()]
+        except Exception as e:
+            logger.error(f"Segment okunamadı ({name}): {e}")
+            return []
+
+        with self._lock:
+            self._cache[name] = turns
+            while len(self._cache) > self.cache_segments:
+                self._cache.popitem(last=False)
+        return turns
+
+    def iter_turns(self, since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict]:
+        """Zaman aralığındaki arşiv konuşmaları (eskiden yeniye)"""
+        self._refresh_index()
+        for segment in list(self.index['segments']):
+            if since and segment['end'] < since:
+                continue
+            if until and segment['start'] > until:
+                continue
+            for turn in self._read_segment(segment):
+                if (not since or turn['timestamp'] >= since) and (not until or turn['timestamp'] <= until):
+                    yield turn
+
+    def search(self, keywords, limit: int = 3) -> List[Dict]:
+        """
+        Anahtar kelimelerle ilgili arşiv konuşmalarını bul
+
+        Yalnızca indeksteki anahtar kelimeleri eşleşen segmentler açılır,
+        en yeni segmentten başlanır.
+        """
+        query = set(keywords)
+        if not query or limit <= 0:
+            return []
+
+        self._refresh_index()
+        scored = []
+        for segment in reversed(list(self.index['segments'])):
+            if not query.intersection(segment.get('keywords', [])):
+                continue
+            for turn in self._read_segment(segment):
+                common = query.intersection(self.extract_keywords(turn.get('user', '')))
+                if common:
+                    scored.append((len(common), turn['timestamp'], turn))
+            if len(scored) >= limit * 4:
+                break
+
+        scored.sort(key=lambda x: (x[0], x[1]), reverse=True)
+        return [turn for _, _, turn in scored[:limit]]
+
+    # ------------------------------------------------------------------
+    # Bakım
+    # ------------------------------------------------------------------
+    def _apply_retention(self) -> int:
+        """Saklama süresini aşan segmentleri sil (indeks kaydedilmez)"""
+        if not self.retention_days:
+            return 0
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+        expired = [s for s in self.index['segments'] if s['end'] < cutoff]
+        if not expired:
+            return 0
+
+        self.index['segments'] = [s for s in self.index['segments'] if s['end'] >= cutoff]
+        for segment in expired:
+            self._cache.pop(segment['file'], None)
+            (self.dir / segment['file']).unlink(missing_ok=True)
+        logger.info(f"🗑️ {len(expired)} eski arşiv segmenti silindi")
+        return len(expired)
+
+    def apply_retention(self) -> int:
+        """Saklama politikasını uygula"""
+        with self._index_transaction():
+            removed = self._apply_retention()
+            if removed:
+                self._save_index()
+            return removed
+
+    def compact(self) -> int:
+        """
+        Aynı aya ait küçük segmentleri tek segmentte birleştir
+
+        Yeni segment ve indeks yazıldıktan sonra eski dosyalar silinir;
+        yarıda kalan bir sıkıştırma veri kaybına yol açmaz.
+
+        Returns:
+            Birleştirilen (silinen) segment sayısı
+        """
+        with self._index_transaction():
+            self._apply_retention()
+
+            by_partition: Dict[str, List[Dict]] = {}
+            for segment in self.index['segments']:
+                by_partition.setdefault(segment['partition'], []).append(segment)
+
+            merged = 0
+            obsolete = []
+            for partition, segments in by_partition.items():
+                if len(segments) < 2:
+                    continue
+                turns = []
+                for segment in segments:
+                    turns.extend(self._read_segment(segment))
+                turns.sort(key=lambda t: t['id'])
+
+                for segment in segments:
+                    self.index['segments'].remove(segment)
+                    self._cache.pop(segment['file'], None)
+                new_segment = self._write_segment(partition, turns)
+                obsolete.extend(s for s in segments if s['file'] != new_segment['file'])
+                merged += len(segments)
+
+            self._save_index()
+            for segment in obsolete:
+                (self.dir / segment['file']).unlink(missing_ok=True)
+
+            if merged:
+                logger.info(f"🗜️ {merged} segment birleştirildi")
+            return merged
+
+    def stats(self) -> Dict:
+        return {
+            'segments': len(self.index['segments']),
+            'turns': self.total_turns,
+            'bytes': sum((self.dir / s['file']).stat().st_size
+                         for s in self.index['segments'] if (self.dir / s['file']).exists()),
+            'partitions': sorted({s['partition'] for s in self.index['segments']}),
+            'last_id': self.last_id,
+        }
+
+
+def main(argv=None):
+    """Komut satırı: stats | compact | retention (tüm kullanıcılar ya da --user)"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Konuşma arşivi bakımı")
+    parser.add_argument('command', nargs='?', default='stats', choices=['stats', 'compact', 'retention'])
+    parser.add_argument('--user', help="Yalnızca bu kullanıcının arşivi")
+    parser.add_argument('--root', default=ARCHIVE_DIR, help="Arşiv kök klasörü")
+    args = parser.parse_args(argv)
+
+    if args.user:
+        dirs = {args.user: user_archive_dir(args.root, args.user)}
+        if not dirs[args.user].is_dir():
+            print(f"Arşiv bulunamadı: {dirs[args.user]}")
+            return 1
+    else:
+        dirs = user_archive_dirs(args.root)
+
+    # Uygulamayla aynı anahtar kelime çıkarıcı (döngüsel içe aktarma nedeniyle burada)
+    from core.conversation_memory import extract_keywords
+
+    report = {}
+    for user_id, archive_dir in dirs.items():
+        archive = HistoryArchive(archive_dir=str(archive_dir), extract_keywords=extract_keywords)
+        if args.command == 'compact':
+            print(f"[{user_id}] Birleştirilen segment: {archive.compact()}")
+        elif args.command == 'retention':
+            print(f"[{user_id}] Silinen segment: {archive.apply_retention()}")
+        report[user_id] = archive.stats()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+Çok Kullanıcılı Hafıza Yöneticisi
+- Hafıza kullanıcı ve oturum bazında bölümlenir
+- Bölümler ilk erişimde tembel yüklenir, boşta kalanlar bellekten atılır;
+  atılan nesneye hâlâ başvuran varsa (zayıf referans) sonraki erişimde aynı
+  nesne geri bağlanır, aynı bölümün ikinci kopyası oluşmaz
+- Her bölümün kendi kilidi vardır; farklı bölümler birbirini beklemez
+"""
+import logging
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from core.conversation_memory import ConversationMemory, UserMemory
+from core.storage import Storage, get_storage, DEFAULT_USER, DEFAULT_SESSION
+
+try:
+    from config.settings import ARCHIVE_DIR, MEMORY_IDLE_TIMEOUT
+except ImportError:
+    ARCHIVE_DIR = 'data/archive'
+    MEMORY_IDLE_TIMEOUT = 1800
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryManager:
+    """Kullanıcı ve oturum hafızalarını yöneten kayıt defteri"""
+
+    def __init__(self, storage: Optional[Storage] = None, archive_root: str = ARCHIVE_DIR,
+                 idle_timeout: float = MEMORY_IDLE_TIMEOUT):
+        """
+        Args:
+            storage: Depolama katmanı (varsayılan: paylaşılan örnek)
+            archive_root: Arşiv kök klasörü (kullanıcılar alt klasörlere ayrılır)
+            idle_timeout: Bu kadar saniye kullanılmayan bölümler bellekten atılır (0 = kapalı)
+        """
+        self.storage = storage or get_storage()
+        self.archive_root = archive_root
+        self.idle_timeout = idle_timeout
+
+        self._users: Dict[str, UserMemory] = {}
+        self._sessions: Dict[Tuple[str, str], ConversationMemory] = {}
+        # Boşta kalıp atılan ama başka yerde (ör. VirtusFixed.memory) hâlâ
+        # kullanılan bölümler: yeniden yüklemek yerine aynı nesne geri bağlanır
+        self._parked_users = weakref.WeakValueDictionary()
+        self._parked_sessions = weakref.WeakValueDictionary()
+        # Kayıt defteri kilidi yalnızca sözlük erişimini korur; yükleme
+        # bölüm başına kilitle yapılır, yavaş bir yükleme diğerlerini bekletmez
+        self._lock = threading.Lock()
+        # bölüm -> [kilit, bekleyen sayısı]; son bekleyen çıkınca silinir
+        self._load_locks: Dict[object, list] = {}
+
+        self._janitor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        if idle_timeout:
+            self._janitor = threading.Thread(target=self._janitor_loop, name='memory-janitor', daemon=True)
+            self._janitor.start()
+
+    @contextmanager
+    def _load_lock(self, key):
+        """Bölüm başına yükleme kilidi (yalnızca yükleme sürerken tutulur)"""
+        with self._lock:
+            entry = self._load_locks.get(key)
+            if entry is None:
+                entry = self._load_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._load_locks[key]
+
+    @staticmethod
+    def _attach(active: Dict, parked, key):
+        """Etkin bölümü ya da hâlâ yaşayan atılmış bölümü getir (kayıt defteri kilidiyle)"""
+        item = active.get(key)
+        if item is None:
+            item = parked.pop(key, None)
+            if item is not None:
+                active[key] = item
+        if item is not None:
+            item.last_used = time.time()
+        return item
+
+    def get_user(self, user_id: str = DEFAULT_USER) -> UserMemory:
+        """Kullanıcı hafızasını getir (gerekirse yükle)"""
+        with self._lock:
+            user = self._attach(self._users, self._parked_users, user_id)
+        if user is not None:
+            return user
+
+        with self._load_lock(('user', user_id)):
+            with self._lock:
+                user = self._attach(self._users, self._parked_users, user_id)
+            if user is None:
+                user = UserMemory(user_id, self.storage, archive_root=self.archive_root)
+                with self._lock:
+                    self._users[user_id] = user
+                logger.debug(f"👤 Kullanıcı hafızası yüklendi: {user_id}")
+        return user
+
+    def get_session(self, user_id: str = DEFAULT_USER, session_id: str = DEFAULT_SESSION,
+                    user_name: str = "Kullanıcı") -> ConversationMemory:
+        """Oturum hafızasını getir (gerekirse yükle)"""
+        key = (user_id, session_id)
+        with self._lock:
+            session = self._attach(self._sessions, self._parked_sessions, key)
+        if session is not None:
+            self.get_user(user_id)
+            return session
+
+        with self._load_lock(key):
+            with self._lock:
+                session = self._attach(self._sessions, self._parked_sessions, key)
+            if session is None:
+                session = ConversationMemory(
+                    user_name=user_name,
+                    storage=self.storage,
+                    user_id=user_id,
+                    session_id=session_id,
+                    user_memory=self.get_user(user_id)
+                )
+                with self._lock:
+                    self._sessions[key] = session
+        return session
+
+    def close_session(self, user_id: str = DEFAULT_USER, session_id: str = DEFAULT_SESSION):
+        """Oturumu kapat ve bellekten at"""
+        with self._lock:
+            session = self._sessions.pop((user_id, session_id), None)
+            if session is None:
+                session = self._parked_sessions.pop((user_id, session_id), None)
+        if session is not None:
+            session.close()
+
+    def sessions(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return list(self._sessions)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        Boşta kalan oturum ve kullanıcıları bellekten at
+
+        Veriler zaten her etkileşimde kaydedildiği için atmak kayıpsızdır.
+        Atılan nesne zayıf referansla tutulur: başka yerde hâlâ kullanılıyorsa
+        sonraki erişimde aynı nesne geri bağlanır (iki kopya birbirinin
+        sayaçlarını ezmez), kullanılmıyorsa depolamadan yeniden yüklenir.
+
+        Returns:
+            Atılan bölüm sayısı
+        """
+        if not self.idle_timeout:
+            return 0
+        cutoff = (now or time.time()) - self.idle_timeout
+
+        with self._lock:
+            idle_sessions = [key for key, s in self._sessions.items() if s.last_used < cutoff]
+            evicted = [self._sessions.pop(key) for key in idle_sessions]
+            for key, session in zip(idle_sessions, evicted):
+                self._parked_sessions[key] = session
+
+            active_users = {user_id for user_id, _ in self._sessions}
+            idle_users = [uid for uid, u in self._users.items()
+                          if uid not in active_users and u.last_used < cutoff]
+            for user_id in idle_users:
+                self._parked_users[user_id] = self._users.pop(user_id)
+
+        for session in evicted:
+            session.close()
+
+        count = len(evicted) + len(idle_users)
+        if count:
+            logger.info(f"🧹 {len(evicted)} oturum, {len(idle_users)} kullanıcı hafızadan atıldı")
+        return count
+
+    def _janitor_loop(self):
+        interval = max(1.0, min(60.0, self.idle_timeout / 4))
+        while not self._stop.wait(interval):
+            try:
+                self.evict_idle()
+            except Exception as e:
+                logger.error(f"Hafıza temizleme hatası: {e}")
+
+    def close(self):
+        """Tüm oturumları kapat"""
+        self._stop.set()
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            self._users.clear()
+            self._parked_sessions.clear()
+            self._parked_users.clear()
+        for session in sessions:
+            session.close()
+
+
+_manager: Optional[MemoryManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_memory_manager() -> MemoryManager:
+    """Süreç genelinde paylaşılan hafıza yöneticisi"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = MemoryManager()
+        return _manager
+
+
+# Test
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    manager = get_memory_manager()
+    alice = manager.get_session('alice', 'telefon', user_name='Alice')
+    bob = manager.get_session('bob', 'masaüstü', user_name='Bob')
+
+    alice.add_interaction("Chrome'u aç", "Chrome açılıyor.", intent='open_app',
+                          entities={'app_name': 'chrome'})
+    bob.add_interaction("Hava nasıl", "Güneşli.", intent='information')
+
+    print(f"Açık oturumlar: {manager.sessions()}")
+    print(f"Bekleyen yükleme kilidi: {len(manager._load_locks)}")
+    print(f"Alice: {alice.get_summary()['user_profile']}")
+    print(f"Bob: {bob.get_summary()['user_profile']}")
+    manager.close()
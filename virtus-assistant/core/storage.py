@@ -0,0 +1,505 @@
+"""
+Yerel Depolama Motoru
+- Tek SQLite veritabanı (WAL modu)
+- Tipli tablolar: konuşmalar, anahtar-değer, uygulamalar, oyunlar, kişiler
+- Şema versiyonlama ve migrasyonlar (PRAGMA user_version)
+- Atomik işlemler (yarıda kalan yazma veriyi bozmaz)
+- Eski JSON dosyalarından otomatik aktarım; data/contacts.json düzenlenirse
+  (mtime kayıtlı aktarımdan yeniyse) kişiler yeniden aktarılır
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from config.settings import STORAGE_PATH
+except ImportError:
+    STORAGE_PATH = 'data/virtus.db'
+
+logger = logging.getLogger(__name__)
+
+# Bölüm belirtilmediğinde kullanılan kullanıcı / oturum
+DEFAULT_USER = 'default'
+DEFAULT_SESSION = 'default'
+
+
+def _schema_v1(conn: sqlite3.Connection):
+    """İlk şema"""
+    # executescript() açık işlemi commit'lediği için ifadeler tek tek çalıştırılır
+    for statement in (
+        """CREATE TABLE IF NOT EXISTS conversations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            user TEXT NOT NULL,
+            assistant TEXT,
+            intent TEXT,
+            entities TEXT
+        )""",
+        """CREATE TABLE IF NOT EXISTS kv (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT,
+            PRIMARY KEY (namespace, key)
+        )""",
+        """CREATE TABLE IF NOT EXISTS apps (
+            app_id TEXT PRIMARY KEY,
+            exe TEXT NOT NULL,
+            names TEXT NOT NULL,
+            type TEXT
+        )""",
+        """CREATE TABLE IF NOT EXISTS games (
+            platform TEXT NOT NULL,
+            name TEXT NOT NULL,
+            path TEXT NOT NULL,
+            PRIMARY KEY (platform, name)
+        )""",
+        """CREATE TABLE IF NOT EXISTS contacts (
+            name TEXT PRIMARY KEY,
+            phone TEXT,
+            email TEXT
+        )""",
+    ):
+        conn.execute(statement)
+
+
+def _schema_v2(conn: sqlite3.Connection):
+    """Kullanıcı / oturum bölümleri"""
+    conn.execute(f"ALTER TABLE conversations ADD COLUMN user_id TEXT NOT NULL DEFAULT '{DEFAULT_USER}'")
+    conn.execute(f"ALTER TABLE conversations ADD COLUMN session_id TEXT NOT NULL DEFAULT '{DEFAULT_SESSION}'")
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_conversations_partition '
+                 'ON conversations (user_id, session_id, id)')
+
+    # Eski tekil hafıza kayıtları varsayılan kullanıcıya / oturuma taşınır
+    conn.execute(f"UPDATE kv SET namespace = 'user/{DEFAULT_USER}/' || namespace "
+                 "WHERE namespace IN ('topics', 'favorite_apps', 'profile')")
+    conn.execute(f"UPDATE kv SET namespace = 'session/{DEFAULT_USER}/{DEFAULT_SESSION}' "
+                 "WHERE namespace = 'memory'")
+
+
+def _schema_v3(conn: sqlite3.Connection):
+    """Uygulama kayıtlarında ek alanlar (kurulum klasörü, platform kimliği...)"""
+    conn.execute('ALTER TABLE apps ADD COLUMN meta TEXT')
+
+
+def _schema_v4(conn: sqlite3.Connection):
+    """Uygulamanın geldiği tarama kaynağı; kaynak durumunda artık yalnızca parmak izi tutulur"""
+    conn.execute('ALTER TABLE apps ADD COLUMN source TEXT')
+    # Eski kaynak durumları uygulamaların tam kopyasını taşıyordu: ilk yenilemede tam tarama yapılır
+    conn.execute("DELETE FROM kv WHERE namespace = 'app_sources'")
+
+
+class Storage:
+    """Tüm kalıcı durumu tutan SQLite depolama katmanı"""
+
+    # Sıra önemli: MIGRATIONS[i], şemayı i -> i+1 versiyonuna taşır
+    MIGRATIONS = [_schema_v1, _schema_v2, _schema_v3, _schema_v4]
+
+    # apps tablosunda kendi sütunu olan alanlar; diğerleri 'meta' JSON'una yazılır
+    APP_COLUMNS = ('exe', 'names', 'type')
+    # Kaynak durumunda saklanan alanlar (tarama sonucu apps tablosundadır)
+    SOURCE_STATE_KEYS = ('fingerprint', 'scanned_at', 'shadowed')
+    # Eski JSON kişi aktarımının kaydı (mtime ve aktarılan isimler)
+    LEGACY_NAMESPACE = 'legacy_import'
+
+    def __init__(self, db_path: str = STORAGE_PATH, legacy_dir: Optional[str] = None):
+        """
+        Args:
+            db_path: Veritabanı dosyası
+            legacy_dir: Eski JSON dosyalarının bulunduğu klasör (varsayılan: db klasörü)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.legacy_dir = Path(legacy_dir) if legacy_dir else self.db_path.parent
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.db_path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+
+        self._migrate()
+        self._contacts_mtime = self.get(self.LEGACY_NAMESPACE, 'contacts_mtime_ns', 0)
+        self._sync_legacy_contacts()
+
+    @property
+    def schema_version(self) -> int:
+        return self._conn.execute('PRAGMA user_version').fetchone()[0]
+
+    # ------------------------------------------------------------------
+    # İşlemler ve migrasyon
+    # ------------------------------------------------------------------
+    @contextmanager
+    def transaction(self):
+        """Atomik işlem - hata olursa tüm değişiklikler geri alınır"""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._conn
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            else:
+                self._conn.execute('COMMIT')
+
+    def _query(self, sql: str, params: Iterable = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def _migrate(self):
+        """Şemayı güncel versiyona taşı"""
+        current = self.schema_version
+        target = len(self.MIGRATIONS)
+        if current >= target:
+            return
+
+        for version in range(current, target):
+            with self.transaction() as conn:
+                self.MIGRATIONS[version](conn)
+                if version == 0:
+                    self._import_legacy_json(conn)
+                conn.execute(f'PRAGMA user_version = {version + 1}')
+            logger.info(f"🗄️ Veritabanı şeması v{version + 1}")
+
+    def _read_legacy(self, *parts):
+        path = self.legacy_dir.joinpath(*parts)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Eski dosya okunamadı ({path}): {e}")
+            return None
+
+    def _import_legacy_json(self, conn: sqlite3.Connection):
+        """data/ altındaki eski JSON dosyalarını veritabanına aktar (tek sefer)"""
+        history = self._read_legacy('memory', 'conversation_history.json') or []
+        conn.executemany(
+            'INSERT INTO conversations (timestamp, user, assistant, intent, entities) '
+            'VALUES (?, ?, ?, ?, ?)',
+            [(c.get('timestamp', ''), c.get('user', ''), c.get('assistant', ''),
+              c.get('intent'), json.dumps(c.get('entities') or {}, ensure_ascii=False))
+             for c in history]
+        )
+
+        topics = self._read_legacy('memory', 'long_term_memory.json') or {}
+        self._put_many(conn, 'topics', topics)
+
+        profile = self._read_legacy('memory', 'user_profile.json') or {}
+        self._put_many(conn, 'favorite_apps', profile.pop('favorite_apps', {}))
+        self._put_many(conn, 'profile', profile)
+
+        summary = self._read_legacy('memory', 'conversation_summary.json')
+        if summary:
+            self._put_many(conn, 'memory', {'summary': summary})
+
+        # Aktarım v1 şemasında çalışır: sonraki sürümlerin sütunları kullanılmaz
+        cache = self._read_legacy('app_cache.json') or {}
+        conn.executemany(
+            'INSERT INTO apps (app_id, exe, names, type) VALUES (?, ?, ?, ?)',
+            [(app_id, data['exe'], json.dumps(data.get('names', [app_id]), ensure_ascii=False),
+              data.get('type')) for app_id, data in cache.get('apps', {}).items()]
+        )
+        for platform in ('steam', 'epic'):
+            self._replace_games(conn, platform, cache.get(platform, {}))
+
+        # Kişiler burada değil, _sync_legacy_contacts ile (dosya her değiştiğinde) aktarılır
+        if history or topics or profile or cache:
+            logger.info(
+                f"📦 Eski JSON verisi aktarıldı: {len(history)} konuşma, "
+                f"{len(cache.get('apps', {}))} uygulama"
+            )
+
+    def _sync_legacy_contacts(self):
+        """
+        data/contacts.json kayıtlı aktarımdan yeniyse kişileri yeniden aktar
+
+        Dosyadaki kişiler eklenir / güncellenir; önceki aktarımda dosyadan
+        gelip artık dosyada olmayanlar silinir. add_contact ile eklenenlere
+        dokunulmaz.
+        """
+        path = self.legacy_dir / 'contacts.json'
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+        if mtime <= self._contacts_mtime:
+            return
+
+        contacts = self._read_legacy('contacts.json')
+        if contacts is None:
+            return
+        with self.transaction() as conn:
+            previous = set(json.loads((conn.execute(
+                'SELECT value FROM kv WHERE namespace = ? AND key = ?',
+                (self.LEGACY_NAMESPACE, 'contacts_names')).fetchone() or ['[]'])[0]))
+            conn.executemany('DELETE FROM contacts WHERE name = ?',
+                             [(name,) for name in previous - set(contacts)])
+            for name, data in contacts.items():
+                self._upsert_contact(conn, name, data.get('phone'), data.get('email'))
+            self._put_many(conn, self.LEGACY_NAMESPACE,
+                           {'contacts_mtime_ns': mtime, 'contacts_names': sorted(contacts)})
+        self._contacts_mtime = mtime
+        logger.info(f"📇 Kişiler contacts.json'dan aktarıldı: {len(contacts)} kişi")
+
+    # ------------------------------------------------------------------
+    # Konuşmalar
+    # ------------------------------------------------------------------
+    def save_interaction(self, interaction: Dict, user_id: str = DEFAULT_USER,
+                         session_id: str = DEFAULT_SESSION,
+                         updates: Optional[Dict[str, tuple]] = None):
+        """
+        Etkileşimi ve ilgili hafıza değişikliklerini tek işlemde kaydet
+
+        Args:
+            interaction: Konuşma kaydı
+            user_id: Kullanıcı bölümü
+            session_id: Oturum bölümü
+            updates: {namespace: (güncellenenler, silinen anahtarlar)}
+        """
+        with self.transaction() as conn:
+            conn.execute(
+                'INSERT INTO conversations '
+                '(timestamp, user, assistant, intent, entities, user_id, session_id) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (interaction['timestamp'], interaction['user'], interaction.get('assistant'),
+                 interaction.get('intent'),
+                 json.dumps(interaction.get('entities') or {}, ensure_ascii=False),
+                 user_id, session_id)
+            )
+            for namespace, (upserts, deletes) in (updates or {}).items():
+                self._put_many(conn, namespace, upserts)
+                self._delete_many(conn, namespace, deletes)
+
+    def count_interactions(self, user_id: str = DEFAULT_USER) -> int:
+        return self._query('SELECT COUNT(*) FROM conversations WHERE user_id = ?', (user_id,))[0][0]
+
+    def oldest_interactions(self, limit: int, user_id: str = DEFAULT_USER) -> List[Dict]:
+        """Kullanıcının en eski `limit` etkileşimi, depolama id'leriyle birlikte"""
+        rows = self._query(
+            'SELECT id, timestamp, user, assistant, intent, entities, session_id '
+            'FROM conversations WHERE user_id = ? ORDER BY id LIMIT ?', (user_id, limit)
+        )
+        return [
+            {'id': row_id, 'timestamp': ts, 'user': user, 'assistant': assistant or '',
+             'intent': intent, 'entities': json.loads(entities or '{}'), 'session_id': session_id}
+            for row_id, ts, user, assistant, intent, entities, session_id in rows
+        ]
+
+    def delete_interactions_through(self, last_id: int, user_id: str = DEFAULT_USER):
+        """Kullanıcının id'si `last_id`'ye kadar olan etkileşimlerini sil (arşivlendikten sonra)"""
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM conversations WHERE user_id = ? AND id <= ?', (user_id, last_id))
+
+    def recent_interactions(self, limit: int, user_id: str = DEFAULT_USER,
+                            session_id: Optional[str] = None) -> List[Dict]:
+        """Son `limit` etkileşim (eskiden yeniye); session_id verilirse yalnızca o oturum"""
+        sql = ('SELECT timestamp, user, assistant, intent, entities FROM conversations '
+               'WHERE user_id = ?')
+        params = [user_id]
+        if session_id is not None:
+            sql += ' AND session_id = ?'
+            params.append(session_id)
+        rows = self._query(sql + ' ORDER BY id DESC LIMIT ?', params + [limit])
+        return [
+            {'timestamp': ts, 'user': user, 'assistant': assistant or '',
+             'intent': intent, 'entities': json.loads(entities or '{}')}
+            for ts, user, assistant, intent, entities in reversed(rows)
+        ]
+
+    # ------------------------------------------------------------------
+    # Anahtar-değer
+    # ------------------------------------------------------------------
+    def get(self, namespace: str, key: str, default=None):
+        rows = self._query('SELECT value FROM kv WHERE namespace = ? AND key = ?', (namespace, key))
+        return json.loads(rows[0][0]) if rows else default
+
+    def get_all(self, namespace: str) -> Dict:
+        rows = self._query('SELECT key, value FROM kv WHERE namespace = ?', (namespace,))
+        return {key: json.loads(value) for key, value in rows}
+
+    def put(self, namespace: str, key: str, value):
+        with self.transaction() as conn:
+            self._put_many(conn, namespace, {key: value})
+
+    def update_namespace(self, namespace: str, upserts: Dict, deletes: Iterable[str] = ()):
+        """Bir namespace'te yalnızca değişen anahtarları yaz / sil"""
+        with self.transaction() as conn:
+            self._put_many(conn, namespace, upserts)
+            self._delete_many(conn, namespace, deletes)
+
+    def _put_many(self, conn: sqlite3.Connection, namespace: str, items: Dict):
+        conn.executemany(
+            'INSERT OR REPLACE INTO kv (namespace, key, value) VALUES (?, ?, ?)',
+            [(namespace, key, json.dumps(value, ensure_ascii=False)) for key, value in items.items()]
+        )
+
+    def _delete_many(self, conn: sqlite3.Connection, namespace: str, keys: Iterable[str]):
+        conn.executemany(
+            'DELETE FROM kv WHERE namespace = ? AND key = ?',
+            [(namespace, key) for key in keys]
+        )
+
+    # ------------------------------------------------------------------
+    # Uygulama kataloğu
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _app_from_row(exe, names, app_type, meta) -> Dict:
+        app = {'exe': exe, 'names': json.loads(names), 'type': app_type}
+        if meta:
+            app.update(json.loads(meta))
+        return app
+
+    def load_apps(self) -> Dict[str, Dict]:
+        rows = self._query('SELECT app_id, exe, names, type, meta FROM apps')
+        return {app_id: self._app_from_row(*row) for app_id, *row in rows}
+
+    def load_apps_by_source(self) -> Dict[str, Dict[str, Dict]]:
+        """Katalog, uygulamanın geldiği tarama kaynağına göre: {kaynak: {app_id: data}}"""
+        by_source: Dict[str, Dict[str, Dict]] = {}
+        for app_id, source, *row in self._query(
+                'SELECT app_id, source, exe, names, type, meta FROM apps WHERE source IS NOT NULL'):
+            by_source.setdefault(source, {})[app_id] = self._app_from_row(*row)
+        return by_source
+
+    def get_app(self, app_id: str) -> Optional[Dict]:
+        rows = self._query('SELECT exe, names, type, meta FROM apps WHERE app_id = ?', (app_id,))
+        return self._app_from_row(*rows[0]) if rows else None
+
+    def save_catalog(self, apps: Dict[str, Dict], games: Dict[str, Dict[str, str]],
+                     sources: Optional[Dict[str, Dict]] = None, catalog_meta: Optional[Dict] = None,
+                     origins: Optional[Dict[str, str]] = None):
+        """
+        Uygulama kataloğunu ve oyun listelerini tek işlemde değiştir
+
+        Args:
+            sources: Tarama kaynaklarının durumu; artımlı tarama için
+                'app_sources' namespace'ine yalnızca SOURCE_STATE_KEYS yazılır
+                (sonuçlar apps tablosundadır, kaynağı origins ile)
+            catalog_meta: Katalog sürümü/nesli, 'app_catalog' namespace'ine
+                yazılır (anlık görüntü dosyasının güncelliği buna göre denetlenir)
+            origins: app_id -> kaydın geldiği tarama kaynağı
+        """
+        with self.transaction() as conn:
+            self._replace_apps(conn, apps, origins or {})
+            for platform, entries in games.items():
+                self._replace_games(conn, platform, entries)
+            self._write_catalog_state(conn, sources, catalog_meta)
+
+    def update_catalog(self, upserts: Dict[str, Dict], deletes: Iterable[str],
+                       games: Dict[str, Dict[str, str]], sources: Optional[Dict[str, Dict]] = None,
+                       catalog_meta: Optional[Dict] = None, origins: Optional[Dict[str, str]] = None):
+        """
+        Katalogda yalnızca değişen uygulamaları yaz / sil (tek işlemde)
+
+        Oyun listeleri küçük olduğundan tamamen değiştirilir.
+        """
+        with self.transaction() as conn:
+            conn.executemany('DELETE FROM apps WHERE app_id = ?', [(app_id,) for app_id in deletes])
+            origins = origins or {}
+            conn.executemany(
+                'INSERT OR REPLACE INTO apps (app_id, exe, names, type, meta, source) VALUES (?, ?, ?, ?, ?, ?)',
+                [self._app_row(app_id, data, origins.get(app_id)) for app_id, data in upserts.items()]
+            )
+            for platform, entries in games.items():
+                self._replace_games(conn, platform, entries)
+            self._write_catalog_state(conn, sources, catalog_meta)
+
+    def _write_catalog_state(self, conn: sqlite3.Connection, sources: Optional[Dict[str, Dict]],
+                             catalog_meta: Optional[Dict]):
+        if sources is not None:
+            conn.execute("DELETE FROM kv WHERE namespace = 'app_sources'")
+            self._put_many(conn, 'app_sources', {
+                name: {key: state[key] for key in self.SOURCE_STATE_KEYS if key in state}
+                for name, state in sources.items()
+            })
+        if catalog_meta is not None:
+            self._put_many(conn, 'app_catalog', catalog_meta)
+
+    def _app_row(self, app_id: str, data: Dict, source: Optional[str] = None) -> tuple:
+        meta = {k: v for k, v in data.items() if k not in self.APP_COLUMNS}
+        return (app_id, data['exe'], json.dumps(data.get('names', [app_id]), ensure_ascii=False),
+                data.get('type'), json.dumps(meta, ensure_ascii=False) if meta else None, source)
+
+    def _replace_apps(self, conn: sqlite3.Connection, apps: Dict[str, Dict], origins: Dict[str, str]):
+        conn.execute('DELETE FROM apps')
+        conn.executemany('INSERT INTO apps (app_id, exe, names, type, meta, source) VALUES (?, ?, ?, ?, ?, ?)',
+                         [self._app_row(app_id, data, origins.get(app_id)) for app_id, data in apps.items()])
+
+    def load_games(self, platform: str) -> Dict[str, str]:
+        rows = self._query('SELECT name, path FROM games WHERE platform = ?', (platform,))
+        return dict(rows)
+
+    def _replace_games(self, conn: sqlite3.Connection, platform: str, entries: Dict[str, str]):
+        conn.execute('DELETE FROM games WHERE platform = ?', (platform,))
+        conn.executemany(
+            'INSERT INTO games (platform, name, path) VALUES (?, ?, ?)',
+            [(platform, name, path) for name, path in entries.items()]
+        )
+
+    # ------------------------------------------------------------------
+    # Kişiler
+    # ------------------------------------------------------------------
+    def load_contacts(self) -> Dict[str, Dict]:
+        self._sync_legacy_contacts()
+        rows = self._query('SELECT name, phone, email FROM contacts')
+        return {name: {'phone': phone, 'email': email} for name, phone, email in rows}
+
+    def find_contact(self, name: str) -> Optional[Dict]:
+        """İsmin bir kısmıyla kişi bul (büyük/küçük harf duyarsız)"""
+        self._sync_legacy_contacts()
+        name_lower = name.lower()
+        for contact_name, phone, email in self._query('SELECT name, phone, email FROM contacts'):
+            # SQLite LOWER() yalnızca ASCII'yi küçültür (Ayşe, İsmail...)
+            if name_lower in contact_name.lower():
+                return {'phone': phone, 'email': email}
+        return None
+
+    def upsert_contact(self, name: str, phone: str, email: Optional[str] = None):
+        with self.transaction() as conn:
+            self._upsert_contact(conn, name, phone, email)
+
+    def _upsert_contact(self, conn: sqlite3.Connection, name: str, phone, email):
+        conn.execute(
+            'INSERT OR REPLACE INTO contacts (name, phone, email) VALUES (?, ?, ?)',
+            (name, phone, email)
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_storage: Optional[Storage] = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> Storage:
+    """Süreç genelinde paylaşılan depolama örneği"""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            _storage = Storage()
+        return _storage
+
+
+# Test
+if __name__ == "__main__":
+    import tempfile
+
+    logging.basicConfig(level=logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(Path(tmp) / 'virtus.db', legacy_dir='data')
+        print(f"Şema versiyonu: {storage.schema_version}")
+        print(f"Son konuşmalar: {len(storage.recent_interactions(100))}")
+        print(f"Uygulamalar: {len(storage.load_apps())}")
+        print(f"Kişi (ayş): {storage.find_contact('ayş')}")
+        print(f"Profil: {storage.get_all('profile')}")
+        storage.close()
@@ -9,15 +9,17 @@ Tüm sorunlar çözüldü:
 """
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Yeni modüller
 from modules.advanced_tts import AdvancedTTS
 from modules.advanced_speech_recognition import AdvancedSpeechRecognition
+from modules.offline_recognizer import get_offline_recognizer
 from plugins.application_master import ApplicationMaster
 from core.ai_brain import AIBrainEnhanced
-from core.conversation_memory import ConversationMemory
-from config.settings import ASSISTANT_NAME, ENABLE_WAKE_WORD
+from core.memory_manager import get_memory_manager
+from config.settings import ASSISTANT_NAME, ENABLE_WAKE_WORD, SUMMARY_LLM_REFRESH
 
 # Logging
 logging.basicConfig(
@@ -38,6 +40,12 @@ class VirtusFixed:
         self.name = ASSISTANT_NAME
         self.is_running = False
         self.conversation_active = False
+        # Ara sonuçtan bağlam hazırlama: (sadeleşmiş metin, Future). Yakalama
+        # iş parçacığını bekletmemek için tek işçili havuzda, önceki bitmeden yenisi başlamaz
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='context-prefetch')
+        self._prefetch = None
+        # Tur sayaçları: komut wake word ile aynı cümlede geldiyse hızlı yol
+        self.turn_stats = {'turns': 0, 'fast_path': 0, 'skipped_prompt': 0, 'prompted': 0}
         
         logger.info("=" * 60)
         logger.info(f"🚀 {self.name} Başlatılıyor (Yeni Sistem)")
@@ -56,7 +64,7 @@ class VirtusFixed:
         # 0. Konuşma Hafızası (ÖNCELİKLE!)
         try:
             logger.info("💾 Hafıza sistemi başlatılıyor...")
-            self.memory = ConversationMemory(user_name="Kullanıcı")
+            self.memory = get_memory_manager().get_session(user_name="Kullanıcı")
             logger.info("✅ Hafıza sistemi hazır")
         except Exception as e:
             logger.error(f"❌ Hafıza sistemi hatası: {e}")
@@ -84,6 +92,8 @@ class VirtusFixed:
         try:
             logger.info("🧠 AI Brain başlatılıyor...")
             self.ai = AIBrainEnhanced(memory=self.memory)
+            if SUMMARY_LLM_REFRESH and self.memory:
+                self.memory.summarizer.set_llm_summarizer(self.ai.summarize_conversation)
             logger.info("✅ AI Brain hazır")
         except Exception as e:
             logger.error(f"❌ AI Brain hatası: {e}")
@@ -93,6 +103,9 @@ class VirtusFixed:
         try:
             logger.info("📱 Application Master başlatılıyor...")
             self.app_master = ApplicationMaster()
+            # İlk açılışta kullanım sıralaması hafızadaki favori uygulamalardan başlar
+            if self.memory:
+                self.app_master.import_usage(self.memory.favorite_apps)
             logger.info("✅ Application Master hazır")
         except Exception as e:
             logger.error(f"❌ Application Master hatası: {e}")
@@ -137,7 +150,8 @@ class VirtusFixed:
         print(f"{'='*60}")
         print(f"\n💡 Kullanım:")
         print(f"   1. '{self.name.upper()}' diye seslenerek beni uyandırın")
-        print(f"   2. 'Evet, dinliyorum' dediğimde komutunuzu söyleyin")
+        print(f"   2. Komutunuzu hemen ardından söyleyin ('{self.name}, müziği aç')")
+        print(f"      ya da 'Evet, dinliyorum' dediğimde söyleyin")
         print(f"   3. Asistanı kapatmak için Ctrl+C\n")
         print(f"🎧 Dinliyorum... ('{self.name}' diye seslenerek uyandırın)")
         print(f"{'='*60}\n")
@@ -146,17 +160,30 @@ class VirtusFixed:
         
         while self.is_running:
             try:
-                # Wake word dinle
-                if self.speech.listen_for_wake_word(self.name.lower(), timeout=3):
+                # Wake word dinle (aynı cümledeki komutla birlikte)
+                inline_command = self.speech.wait_for_wake_word(self.name.lower(), timeout=3)
+                if inline_command is not None:
                     wake_word_attempts = 0
+                    self.turn_stats['turns'] += 1
                     print(f"\n{'='*60}")
                     print(f"✨ {self.name.upper()} AKTİF!")
                     print(f"{'='*60}\n")
                     
-                    self.speak("Evet, dinliyorum.")
-                    
-                    # Komutu al
-                    self._handle_command()
+                    if inline_command:
+                        # "Virtus, Chrome'u aç": yanıt ve ikinci dinleme/tanıma yok
+                        self.turn_stats['fast_path'] += 1
+                        self._handle_command(inline_command)
+                    else:
+                        # Komut wake word'ün hemen ardından söylenmiş olabilir (ön kayıtta)
+                        self.speech.mark_wake()
+                        if self.speech.speech_pending():
+                            self.turn_stats['skipped_prompt'] += 1
+                        else:
+                            self.turn_stats['prompted'] += 1
+                            self.speak("Evet, dinliyorum.")
+                        
+                        # Komutu al
+                        self._handle_command()
                     
                     # Tekrar wake word beklemeye dön
                     print(f"\n{'='*60}")
@@ -176,6 +203,27 @@ class VirtusFixed:
                 logger.error(f"Wake word döngüsü hatası: {e}")
                 time.sleep(1)
     
+    @staticmethod
+    def _prefetch_key(text):
+        return ' '.join(text.lower().split())
+    
+    def _on_partial(self, hypothesis):
+        """
+        Ara sonuç: ekranda göster, hafıza bağlamını kesin sonucu beklemeden hazırla
+        
+        Ses yakalama iş parçacığında çağrılır: bağlam (ilgili konuşma / arşiv
+        araması) arka planda hazırlanır; metin değişmediyse ya da önceki
+        hazırlık sürüyorsa yenisi başlatılmaz.
+        """
+        print(f"\r💬 … {hypothesis.text}", end='', flush=True)
+        if not self.memory:
+            return
+        key = self._prefetch_key(hypothesis.text)
+        previous = self._prefetch
+        if not key or (previous and (previous[0] == key or not previous[1].done())):
+            return
+        self._prefetch = (key, self._prefetch_pool.submit(self.memory.get_context_for_ai, hypothesis.text))
+    
     def _run_continuous(self):
         """Sürekli dinleme modu (wake word yok)"""
         logger.info("👂 Sürekli dinleme modu")
@@ -186,11 +234,18 @@ class VirtusFixed:
             self._handle_command()
             time.sleep(0.3)
     
-    def _handle_command(self):
-        """Komut dinle ve işle - HAFIZALı"""
+    def _handle_command(self, command=None):
+        """
+        Komut dinle ve işle - HAFIZALı
+        
+        Args:
+            command: Wake word ile aynı cümlede gelen komut (verilirse dinlenmez)
+        """
         
-        # 1. Kullanıcıyı dinle
-        command = self.speech.listen_command()
+        # 1. Kullanıcıyı dinle (akışlı motorda ara sonuçlarla bağlam önceden hazırlanır)
+        self._prefetch = None
+        if command is None:
+            command = self.speech.listen_command(on_partial=self._on_partial)
         
         if not command:
             self.speak("Sizi anlayamadım. Tekrar eder misiniz?")
@@ -205,10 +260,17 @@ class VirtusFixed:
         # 2. Komutu göster
         print(f"\n💬 Siz: {command}")
         
-        # 3. Bağlam al (hafızadan)
+        # 3. Bağlam al (hafızadan; ara sonuç kesin sonuçla aynıysa hazır olan kullanılır)
         context = None
         if self.memory:
-            context = self.memory.get_context_for_ai(command)
+            prefetch = self._prefetch
+            if prefetch and prefetch[0] == self._prefetch_key(command):
+                try:
+                    context = prefetch[1].result()
+                except Exception as e:
+                    logger.debug(f"Bağlam ön hazırlığı başarısız: {e}")
+            if context is None:
+                context = self.memory.get_context_for_ai(command)
             if context:
                 logger.debug(f"📚 Bağlam: {context[:100]}...")
         
@@ -365,7 +427,12 @@ class VirtusFixed:
         
         if self.tts:
             try:
-                self.tts.speak(text, blocking=True)
+                if self.speech:
+                    # Konuşurken mikrofona gelen kendi sesimizi dinleme
+                    with self.speech.playback():
+                        self.tts.speak(text, blocking=True)
+                else:
+                    self.tts.speak(text, blocking=True)
             except Exception as e:
                 logger.error(f"TTS hatası: {e}")
         else:
@@ -380,6 +447,29 @@ class VirtusFixed:
         print(f"\n🤖 {self.name}: {goodbye}\n")
         self.speak(goodbye)
         
+        turns = self.turn_stats['turns']
+        if turns:
+            logger.info(f"📊 {turns} tur: {self.turn_stats['fast_path']} aynı cümlede komut, "
+                        f"{self.turn_stats['skipped_prompt']} yanıtsız, {self.turn_stats['prompted']} yanıtlı")
+        if self.speech:
+            logger.info(f"📊 Ses tanıma: {self.speech.dispatcher.summary()}")
+            if self.speech.preprocessor:
+                logger.info(f"📊 Yükleme: {self.speech.preprocessor.summary()}")
+            stream = self.speech.stream_stats
+            if stream['final_latency_ms']:
+                latencies = sorted(stream['final_latency_ms'])
+                logger.info(f"📊 Akışlı tanıma: {stream['utterances']} konuşma, kesin sonuç "
+                            f"konuşma bitiminden {latencies[len(latencies) // 2]} ms sonra (medyan)")
+            offline = get_offline_recognizer()
+            if offline is not None:
+                health = offline.health()
+                logger.info(f"📊 Yerel tanıma: {health['completed']} iş, çözümleme {health['decode']}, "
+                            f"{health['rejected']} reddedildi, {health['restarts']} yeniden başlatma")
+        
+        self._prefetch_pool.shutdown(wait=True)
+        if self.memory:
+            self.memory.close()
+        
         logger.info("✅ Kapatıldı")
     
     def manual_command(self, command_text):
@@ -2,19 +2,39 @@
 Gelişmiş Speech Recognition Sistemi
 - Otomatik mikrofon kalibrasyonu
 - Gürültü filtreleme
-- Çoklu backend desteği (Google, Whisper)
-- Wake word detection entegrasyonu
+- Yerel VAD ile uç nokta belirleme (numpy varsa): gürültü tabanı sürekli
+  güncellenir, her dinlemede ortam gürültüsü ölçülmez (sağır kalınan süre yok)
+- Çoklu backend desteği (Google, Whisper): backend'ler yarıştırılır (hedge),
+  sıralama ölçülen gecikme ve tanıma oranına göre uyarlanır
+- Tanıma öncesi ön işleme: sessizlik kırpma, kazanç (MICROPHONE_GAIN + AGC),
+  gürültü bastırma, tek seferlik FLAC; tur başına gönderilen bayt ölçülür
+- Akışlı tanıma (yerel motor varsa): komut konuşulurken ara sonuçlar gelir,
+  konuşma bitince kesin sonuç için tüm sesin yeniden tanınması beklenmez
+- Wake word detection entegrasyonu: kayıtlı örnekler varsa tamamen yerel
+  (MFCC + DTW), boşta dinlerken buluta istek gönderilmez
+- Mikrofon paylaşılan ses veriyolundan okunur (her dinlemede yeniden açılmaz)
+- Ön kayıt: komut dinlemesi wake word anından önceki sesi de kapsar,
+  başı kesilen konuşmalar sayılır (clipped_onset_rate)
 
 Python 3.11 uyumlu
 """
 import logging
 import speech_recognition as sr
 import time
+from collections import deque
+
+from modules.audio_bus import get_audio_bus, pcm_rms
+from modules.audio_preprocess import PREPROCESS_AVAILABLE, AudioPreprocessor
+from modules.keyword_spotter import KWS_AVAILABLE, KeywordSpotter
+from modules.recognition_dispatcher import RecognitionDispatcher, build_backends
+from modules.streaming_recognition import StreamingSession, create_engine
+from modules.vad import VAD_AVAILABLE, VoiceActivityDetector, listen_segment
 
 try:
     from config.settings import (
         LANGUAGE, LISTENING_TIMEOUT, PHRASE_TIMEOUT,
-        ENERGY_THRESHOLD, DYNAMIC_ENERGY, PAUSE_THRESHOLD
+        ENERGY_THRESHOLD, DYNAMIC_ENERGY, PAUSE_THRESHOLD, VAD_WARMUP_SECONDS,
+        KWS_AUTO_ENROLL, PREPROCESS_AUDIO
     )
 except ImportError:
     # Fallback değerler
@@ -24,17 +44,43 @@ except ImportError:
     ENERGY_THRESHOLD = 3000
     DYNAMIC_ENERGY = True
     PAUSE_THRESHOLD = 0.8
+    VAD_WARMUP_SECONDS = 0.5
+    KWS_AUTO_ENROLL = 5
+    PREPROCESS_AUDIO = True
 
 logger = logging.getLogger(__name__)
 
+# Yerel wake word'den sonra bu kadar konuşma varsa aynı cümlede komut sayılır
+INLINE_MIN_SPEECH = 0.3
+INLINE_FRAME_MS = 20
+
 
 class AdvancedSpeechRecognition:
     """Profesyonel seviye ses tanıma"""
     
-    def __init__(self):
+    def __init__(self, bus=None):
+        """
+        Args:
+            bus: Ses veriyolu (varsayılan: paylaşılan mikrofon veriyolu)
+        """
         self.recognizer = sr.Recognizer()
         self.microphone = None
+        self.bus = bus
+        self.vad = None
+        self.spotter = None
         self.is_calibrated = False
+        self.dispatcher = RecognitionDispatcher(build_backends(self.recognizer))
+        self.preprocessor = AudioPreprocessor() if PREPROCESS_AUDIO and PREPROCESS_AVAILABLE else None
+        self.stream_engine = None
+        # Akışlı tanıma: ilk ara sonuç ve kesin sonuç gecikmeleri (ms)
+        self.stream_stats = {'utterances': 0, 'first_partial_ms': deque(maxlen=50),
+                             'final_latency_ms': deque(maxlen=50)}
+        
+        # Başı kesilmiş konuşma sayacı (ilk çerçeve zaten eşiğin üstündeyse)
+        self.onset_stats = {'utterances': 0, 'clipped': 0}
+        # Wake word: yerel kontroller ve buluta giden istekler
+        self.wake_stats = {'segments': 0, 'local_checks': 0, 'cloud_requests': 0, 'detections': 0,
+                           'inline_commands': 0}
         
         # Hassasiyet ayarları
         self.recognizer.energy_threshold = ENERGY_THRESHOLD
@@ -49,19 +95,33 @@ class AdvancedSpeechRecognition:
     def _initialize_microphone(self):
         """Mikrofonu başlat ve test et"""
         try:
-            # Mevcut mikrofonları listele
-            mic_list = sr.Microphone.list_microphone_names()
-            
-            if not mic_list:
-                logger.error("❌ Hiç mikrofon bulunamadı!")
-                raise RuntimeError("Mikrofon bulunamadı")
-            
-            logger.info(f"🎤 {len(mic_list)} mikrofon bulundu:")
-            for i, name in enumerate(mic_list[:5]):  # İlk 5'ini göster
-                logger.info(f"   [{i}] {name}")
+            if self.bus is None:
+                # Mevcut mikrofonları listele
+                mic_list = sr.Microphone.list_microphone_names()
+                
+                if not mic_list:
+                    logger.error("❌ Hiç mikrofon bulunamadı!")
+                    raise RuntimeError("Mikrofon bulunamadı")
+                
+                logger.info(f"🎤 {len(mic_list)} mikrofon bulundu:")
+                for i, name in enumerate(mic_list[:5]):  # İlk 5'ini göster
+                    logger.info(f"   [{i}] {name}")
+                
+                # Varsayılan mikrofon bir kez açılır, tüm dinlemeler ortak tampondan okur
+                self.bus = get_audio_bus()
             
-            # Varsayılan mikrofonu kullan
-            self.microphone = sr.Microphone()
+            self.microphone = self.bus.microphone('speech')
+            if VAD_AVAILABLE:
+                self.vad = VoiceActivityDetector(self.bus.sample_rate, self.bus.ring.frame_ms)
+                # Akış, sesi VAD parçası büyüdükçe alır
+                self.stream_engine = create_engine(recognize=self._recognize_audio)
+                if self.stream_engine:
+                    logger.info(f"🌊 Akışlı tanıma: {self.stream_engine.name}")
+            if KWS_AVAILABLE:
+                self.spotter = KeywordSpotter(sample_rate=self.bus.sample_rate)
+                if not self.spotter.ready:
+                    logger.info("🔑 Wake word örneği yok - ilk algılamalar bulutta yapılıp örnek olarak "
+                                "kaydedilecek (ya da: python -m modules.keyword_spotter enroll)")
             logger.info("✅ Mikrofon hazır")
             
             # Otomatik kalibrasyon yap
@@ -88,11 +148,20 @@ class AdvancedSpeechRecognition:
             return False
         
         try:
-            logger.info(f"🎙️ Mikrofon kalibre ediliyor... ({duration}s sessiz kalın)")
-            
             with self.microphone as source:
-                # Ortam gürültüsünü ölç
-                self.recognizer.adjust_for_ambient_noise(source, duration=duration)
+                if self.vad:
+                    # VAD tabanı sonradan kendini günceller: kısa bir ısınma yeterli
+                    duration = min(duration, VAD_WARMUP_SECONDS)
+                    logger.info(f"🎙️ Gürültü tabanı ölçülüyor... ({duration}s)")
+                    size = int(duration * 1000 / self.vad.frame_ms) * self.vad.frame_bytes
+                    warmup = source.reader.read_bytes(size, timeout=duration + 2.0)
+                    if warmup:
+                        self.vad.process(warmup)
+                    self.recognizer.energy_threshold = self.vad.energy_threshold
+                else:
+                    # Ortam gürültüsünü ölç
+                    logger.info(f"🎙️ Mikrofon kalibre ediliyor... ({duration}s sessiz kalın)")
+                    self.recognizer.adjust_for_ambient_noise(source, duration=duration)
                 
                 # Ayarları logla
                 logger.info(f"✅ Kalibrasyon tamamlandı")
@@ -106,13 +175,15 @@ class AdvancedSpeechRecognition:
             logger.error(f"Kalibrasyon hatası: {e}")
             return False
     
-    def listen_command(self, timeout=None, phrase_limit=None):
+    def listen_command(self, timeout=None, phrase_limit=None, on_partial=None):
         """
         Kullanıcıdan sesli komut al
         
         Args:
             timeout: Maksimum bekleme süresi
             phrase_limit: Maksimum konuşma süresi
+            on_partial: Ara sonuç callback'i (Hypothesis); akışlı motor varsa
+                konuşma sürerken çağrılır
             
         Returns:
             str: Algılanan metin veya None
@@ -128,23 +199,17 @@ class AdvancedSpeechRecognition:
         try:
             logger.info("🎧 DİNLİYORUM...")
             
-            with self.microphone as source:
-                # Kısa kalibrasyon (gürültü değişmişse)
-                if not self.is_calibrated:
-                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                
-                # Kullanıcının konuşmasını bekle
-                logger.info("   🔴 Konuşabilirsiniz...")
-                
-                audio = self.recognizer.listen(
-                    source,
-                    timeout=timeout,
-                    phrase_time_limit=phrase_limit
-                )
+            logger.info("   🔴 Konuşabilirsiniz...")
             
-            # Sesi metne çevir
-            logger.info("🔄 İşleniyor...")
-            text = self._recognize_audio(audio)
+            if self.stream_engine:
+                text = self._listen_streaming(timeout, phrase_limit, on_partial)
+            else:
+                # Kullanıcının konuşmasını bekle (ön kayıt dahil)
+                audio = self.capture_utterance(timeout, phrase_limit)
+                
+                # Sesi metne çevir
+                logger.info("🔄 İşleniyor...")
+                text = self._recognize_audio(audio)
             
             if text:
                 logger.info(f"✅ Algılanan: '{text}'")
@@ -161,26 +226,111 @@ class AdvancedSpeechRecognition:
             logger.error(f"❌ Dinleme hatası: {e}")
             return None
     
-    def _recognize_audio(self, audio):
-        """Ses dosyasını metne çevir - çoklu backend desteği"""
+    def capture_utterance(self, timeout=None, phrase_limit=None, on_audio=None):
+        """
+        Bir konuşma parçası kaydet
         
-        # Öncelik 1: Google Speech Recognition (ücretsiz ve iyi)
-        try:
-            text = self.recognizer.recognize_google(audio, language=LANGUAGE)
-            return text.strip()
-        except sr.UnknownValueError:
-            logger.debug("Google: Ses anlaşılamadı")
-        except sr.RequestError as e:
-            logger.warning(f"Google API hatası: {e}")
+        Kayıt, son işaretten (mark_wake) en fazla AUDIO_PREROLL_SECONDS önceki
+        sesten başlar; dinleme geç başlasa da konuşmanın başı kaybolmaz.
         
-        # Öncelik 2: Whisper (offline ama yavaş)
-        try:
-            text = self.recognizer.recognize_whisper(audio, language='turkish')
-            return text.strip()
-        except:
-            pass
+        Args:
+            on_audio: Yakalanan yeni baytlarla çağrılır (yalnızca VAD ile)
         
-        return None
+        Returns:
+            sr.AudioData (zaman aşımında sr.WaitTimeoutError fırlatır)
+        """
+        audio = self._capture(timeout, phrase_limit, on_audio)
+        self._record_onset(audio)
+        return audio
+    
+    def _listen_streaming(self, timeout, phrase_limit, on_partial):
+        """Konuşmayı yakalarken tanı; kesin sonucu döndür"""
+        session = StreamingSession(self.stream_engine, self.bus.sample_rate, on_partial=on_partial)
+        try:
+            audio = self.capture_utterance(timeout, phrase_limit, on_audio=session.feed)
+        except sr.WaitTimeoutError:
+            session.cancel()
+            raise
+        logger.info("🔄 İşleniyor...")
+        text = session.finish()
+        if not text and session.engine.name != 'cloud':
+            # Yerel motor anlayamadı: tek parça tanımaya (bulut backend'leri) düş
+            text = self._recognize_audio(audio)
+        stats = session.stats()
+        self.stream_stats['utterances'] += 1
+        for key in ('first_partial_ms', 'final_latency_ms'):
+            if stats[key] is not None:
+                self.stream_stats[key].append(stats[key])
+        logger.debug(f"🌊 {stats}")
+        return text
+    
+    def _capture(self, timeout, phrase_limit, on_audio=None):
+        """Konuşma başından sonuna kadar kaydet (VAD varsa yerel uç nokta belirleme)"""
+        with self.microphone as source:
+            if self.vad:
+                data = listen_segment(source.reader, self.vad, timeout, phrase_limit, on_audio=on_audio)
+                # Eşik, tabanla birlikte güncel kalsın (başı kesik ölçümü de bunu kullanır)
+                self.recognizer.energy_threshold = self.vad.energy_threshold
+                if data is None:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                return sr.AudioData(data, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+            
+            # Kısa kalibrasyon (gürültü değişmişse)
+            if not self.is_calibrated:
+                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+            
+            return self.recognizer.listen(
+                source,
+                timeout=timeout,
+                phrase_time_limit=phrase_limit
+            )
+    
+    def _record_onset(self, audio):
+        """Parça konuşmanın ortasında mı başlıyor? (ilk çerçeve eşiğin üstünde)"""
+        first_frame = audio.frame_data[:self.microphone.CHUNK * audio.sample_width]
+        self.onset_stats['utterances'] += 1
+        if pcm_rms(first_frame) > self.recognizer.energy_threshold:
+            self.onset_stats['clipped'] += 1
+            logger.debug("✂️ Konuşmanın başı kesilmiş olabilir")
+    
+    @property
+    def clipped_onset_rate(self):
+        """Başı kesilmiş konuşmaların oranı (0-1)"""
+        utterances = self.onset_stats['utterances']
+        return self.onset_stats['clipped'] / utterances if utterances else 0.0
+    
+    def mark_wake(self):
+        """Wake word anını işaretle - sonraki komut dinlemesi buradan geriye bakar"""
+        if self.microphone:
+            self.microphone.mark()
+    
+    def speech_pending(self):
+        """İşaretten sonra (henüz dinlenmemiş) konuşma başladı mı?"""
+        if not self.microphone:
+            return False
+        return self.microphone.speech_pending(self.recognizer.energy_threshold)
+    
+    def playback(self):
+        """Asistan konuşurken mikrofonu sustur (with bloğu) - kendi sesini komut sanmasın"""
+        return self.bus.suppress()
+    
+    def _recognize_audio(self, audio):
+        """Ses dosyasını metne çevir - çoklu backend (ilk kabul edilen sonuç)"""
+        audio = self._preprocess(audio)
+        text = self.dispatcher.recognize(audio)
+        if text is None:
+            logger.debug("Hiçbir backend sesi anlayamadı")
+        return text
+    
+    def _preprocess(self, audio):
+        """Yüklemeden önce kırp / kazanç / gürültü bastır (hata olursa ham ses)"""
+        if not self.preprocessor:
+            return audio
+        try:
+            return self.preprocessor.process(audio)
+        except Exception as e:
+            logger.warning(f"Ön işleme hatası, ham ses gönderiliyor: {e}")
+            return audio
     
     def listen_for_wake_word(self, wake_word='virtus', timeout=3):
         """
@@ -193,27 +343,48 @@ class AdvancedSpeechRecognition:
         Returns:
             bool: Wake word tespit edildiyse True
         """
+        return self.wait_for_wake_word(wake_word, timeout) is not None
+    
+    def wait_for_wake_word(self, wake_word='virtus', timeout=3):
+        """
+        Wake word'ü dinle; aynı cümlede söylenen komutu da ayır
+        
+        "Virtus, Chrome'u aç" tek parça olarak gelirse komut burada çıkarılır:
+        ikinci dinleme ve ikinci tanıma gerekmez.
+        
+        Returns:
+            None: wake word yok
+            '': yalnızca wake word (komut ayrıca dinlenmeli)
+            str: wake word'den sonra söylenen komut
+        """
         try:
-            with self.microphone as source:
-                # Arka plan gürültüsünü filtrele
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.3)
-                
-                # Daha uzun dinle (wake word için)
-                audio = self.recognizer.listen(
-                    source, 
-                    timeout=timeout, 
-                    phrase_time_limit=3
-                )
-                
+            # Gürültü tabanı VAD'de (yoksa dinamik eşikte) sürekli güncellenir;
+            # her turda ortam ölçümü yapılmaz, wake word sırasında sağır kalınmaz
+            local = self.spotter is not None and self.spotter.ready
+            # Parçadaki komut doğrudan çalıştırılır: kesilmemesi için tam süre dinlenir
+            audio = self._capture(timeout, phrase_limit=PHRASE_TIMEOUT)
+            self.wake_stats['segments'] += 1
+            
+            # Kayıtlı örnekler varsa yalnızca yerel kontrol (buluta istek yok)
+            if local:
+                self.wake_stats['local_checks'] += 1
+                if not self.spotter.detect(audio.frame_data):
+                    logger.debug(f"Wake word değil (skor {self.spotter.last_score:.2f})")
+                    return None
+                self.wake_stats['detections'] += 1
+                logger.info(f"🎤 Wake word tespit edildi (yerel, skor {self.spotter.last_score:.2f})")
+                return self._inline_command(audio, self.spotter.last_end)
+            
             # Hızlı tanıma
+            self.wake_stats['cloud_requests'] += 1
             try:
-                text = self.recognizer.recognize_google(audio, language=LANGUAGE).lower()
+                text = self.recognizer.recognize_google(self._preprocess(audio), language=LANGUAGE).lower()
                 logger.debug(f"Duyulan: '{text}'")
             except sr.UnknownValueError:
-                return False
+                return None
             except sr.RequestError:
                 # API hatası varsa tekrar dene
-                return False
+                return None
             
             # Wake word kontrolü - çok geniş varyantlar
             wake_word_variants = [
@@ -230,28 +401,65 @@ class AdvancedSpeechRecognition:
                 'virtus.',  # Noktalama ile
             ]
             
-            # Fuzzy matching - kısmen benzer kelimeler
-            for variant in wake_word_variants:
-                if variant in text:
-                    logger.info(f"🎤 Wake word tespit edildi: '{text}'")
-                    return True
-            
             # Kelime kelime kontrol (wake word 2 kelime de olabilir)
             words = text.split()
-            for word in words:
+            for index, word in enumerate(words):
                 for variant in wake_word_variants:
                     if word == variant or variant in word:
                         logger.info(f"🎤 Wake word tespit edildi: '{text}'")
-                        return True
+                        self._wake_detected(audio, text)
+                        return self._split_command(words[index + 1:])
             
-            return False
+            # Fuzzy matching - kısmen benzer kelimeler (kelime sınırı dışında)
+            for variant in wake_word_variants:
+                if variant in text:
+                    logger.info(f"🎤 Wake word tespit edildi: '{text}'")
+                    self._wake_detected(audio, text)
+                    return ''
+            
+            return None
             
         except sr.WaitTimeoutError:
             # Timeout normal, sessizce devam et
-            return False
+            return None
         except Exception as e:
             logger.debug(f"Wake word dinleme hatası: {e}")
-            return False
+            return None
+    
+    def _split_command(self, words):
+        """Wake word'den sonraki kelimeler → komut ('' : komut yok)"""
+        command = ' '.join(words).strip(' ,.!?;:')
+        if command:
+            self.wake_stats['inline_commands'] += 1
+            logger.info(f"⚡ Aynı cümlede komut: '{command}'")
+        return command
+    
+    def _inline_command(self, audio, wake_end):
+        """
+        Yerel algılamada wake word'den sonra konuşma sürüyorsa onu tanı
+        
+        Args:
+            wake_end: Wake word'ün bittiği an (parçanın başından saniye)
+        """
+        width = audio.sample_width
+        frame_bytes = audio.sample_rate * INLINE_FRAME_MS // 1000 * width
+        offset = int(wake_end * audio.sample_rate) * width
+        rest = audio.frame_data[offset:]
+        voiced = sum(1 for i in range(0, len(rest) - frame_bytes + 1, frame_bytes)
+                     if pcm_rms(rest[i:i + frame_bytes]) > self.recognizer.energy_threshold)
+        if voiced * INLINE_FRAME_MS / 1000 < INLINE_MIN_SPEECH:
+            return ''
+        text = self._recognize_audio(sr.AudioData(rest, audio.sample_rate, width))
+        return self._split_command(text.split()) if text else ''
+    
+    def _wake_detected(self, audio, text):
+        """Bulutta doğrulanan tek kelimelik wake word'ü yerel örnek olarak kaydet"""
+        self.wake_stats['detections'] += 1
+        if not self.spotter or len(self.spotter.templates) >= KWS_AUTO_ENROLL or len(text.split()) != 1:
+            return
+        path = self.spotter.enroll(audio.frame_data)
+        if path:
+            logger.info(f"🔑 Wake word örneği kaydedildi ({len(self.spotter.templates)}/{KWS_AUTO_ENROLL})")
     
     def continuous_listen(self, callback, wake_word='virtus'):
         """
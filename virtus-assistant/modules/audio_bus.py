@@ -0,0 +1,672 @@
+"""
+Paylaşılan Ses Yakalama Veriyolu
+- Mikrofon bir kez açılır, tek yakalama thread'i sürekli okur
+- 16 kHz / 16-bit / mono PCM çerçeveleri halka tampona (ring buffer) yazılır
+- Birden fazla okuyucu (wake word, VAD, kayıt) kendi konumundan, kilitsiz ve
+  kopyasız (memoryview) okur; geride kalan okuyucu taşma sayacıyla ileri alınır
+- Kaynaklar: PyAudio, sounddevice veya WAV dosyası (donanımsız test)
+- speech_recognition ile uyumlu kaynak (BusMicrophone): `with mic as source`
+  cihazı yeniden açmaz, dinlemeler arasındaki ses kaybolmaz
+- Ön kayıt (pre-roll): her dinleme, işaretlenen andan (ör. wake word algılandı)
+  en fazla AUDIO_PREROLL_SECONDS önceki sesten başlar; konuşmanın başı kesilmez
+- Asistanın kendi konuşması (TTS) süresince gelen ses susturulur (yankı dinlenmez)
+
+Kullanım:
+    python -m modules.audio_bus [dosya.wav]   # okuyucu/taşma testi
+"""
+import logging
+import math
+import threading
+import time
+import wave
+from array import array
+from contextlib import contextmanager
+from typing import List, Optional
+
+# Mikrofon arka uçları opsiyonel (WAV kaynağı her zaman çalışır)
+try:
+    import pyaudio
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    PYAUDIO_AVAILABLE = False
+
+try:
+    import sounddevice
+    SOUNDDEVICE_AVAILABLE = True
+except (ImportError, OSError):
+    SOUNDDEVICE_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import speech_recognition as sr
+    AudioSourceBase = sr.AudioSource
+except ImportError:
+    AudioSourceBase = object
+
+try:
+    from config.settings import (
+        AUDIO_SAMPLE_RATE, AUDIO_FRAME_MS, AUDIO_BUFFER_SECONDS, AUDIO_INPUT_DEVICE,
+        AUDIO_PREROLL_SECONDS, AUDIO_ECHO_TAIL
+    )
+except ImportError:
+    AUDIO_SAMPLE_RATE = 16000
+    AUDIO_FRAME_MS = 20
+    AUDIO_BUFFER_SECONDS = 30
+    AUDIO_INPUT_DEVICE = None
+    AUDIO_PREROLL_SECONDS = 1.5
+    AUDIO_ECHO_TAIL = 0.2
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_WIDTH = 2   # 16-bit
+
+
+def pcm_rms(pcm) -> float:
+    """16-bit PCM'in RMS enerjisi (speech_recognition'ın energy_threshold birimi)"""
+    if len(pcm) < SAMPLE_WIDTH:
+        return 0.0
+    if NUMPY_AVAILABLE:
+        samples = np.frombuffer(pcm, dtype='<i2', count=len(pcm) // SAMPLE_WIDTH).astype(np.float32)
+        return float(np.sqrt(np.mean(samples * samples)))
+    samples = array('h', bytes(pcm[:len(pcm) // SAMPLE_WIDTH * SAMPLE_WIDTH]))
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class AudioRingBuffer:
+    """
+    Tek yazıcılı, çok okuyuculu PCM halka tamponu
+
+    Yazıcı yalnızca bayt dizisine yazar ve toplam konumu (`position`) en son
+    günceller; okuyucular kilit almadan bu konuma kadar okur. Kapasite çerçeve
+    boyutunun katıdır ve yazımlar çerçeve hizalıdır: bir çerçeve hiçbir zaman
+    tamponun sonundan başına bölünmez, bu yüzden her çerçeve tek memoryview'dir.
+    """
+
+    def __init__(self, sample_rate: int = AUDIO_SAMPLE_RATE, frame_ms: int = AUDIO_FRAME_MS,
+                 seconds: float = AUDIO_BUFFER_SECONDS):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_bytes = sample_rate * frame_ms // 1000 * SAMPLE_WIDTH
+        self.frame_count = max(2, int(seconds * 1000 / frame_ms))
+        self.capacity = self.frame_count * self.frame_bytes
+        self._data = bytearray(self.capacity)
+        self._view = memoryview(self._data)
+        # Toplam yazılan bayt (yalnızca artar); okuyucular bununla karşılaştırır
+        self.position = 0
+        # Yeni veri bekleyen okuyucular için (veri yolu kilitsiz, yalnızca uyandırma)
+        self._new_data = threading.Condition()
+        # Susturulan aralıklar [başlangıç, bitiş) - bitiş None ise sürüyor (TTS çalıyor)
+        self.suppressed: List[List[Optional[int]]] = []
+
+    @property
+    def bytes_per_second(self) -> int:
+        return self.sample_rate * SAMPLE_WIDTH
+
+    def write(self, data):
+        """Çerçeve hizalı PCM yaz (yalnızca yakalama thread'i çağırır)"""
+        size = len(data)
+        if size % self.frame_bytes:
+            raise ValueError(f"Yazım çerçeve boyutunun katı olmalı ({self.frame_bytes} bayt)")
+        start = self.position
+        if size > self.capacity:
+            # Tampondan büyük blok: yalnızca sonu kalır
+            skip = size - self.capacity
+            data, size = memoryview(data)[skip:], self.capacity
+            start += skip
+        offset = start % self.capacity
+        first = min(size, self.capacity - offset)
+        self._view[offset:offset + first] = data[:first]
+        if first < size:
+            self._view[:size - first] = data[first:]
+        self.position = start + size
+        with self._new_data:
+            self._new_data.notify_all()
+
+    def frame_at(self, position: int) -> memoryview:
+        """Mutlak konumdaki çerçeve (kopyasız; yazıcı tamponu dolaşınca üzerine yazılır)"""
+        offset = position % self.capacity
+        return self._view[offset:offset + self.frame_bytes]
+
+    def oldest(self) -> int:
+        """Tamponda hâlâ duran en eski konum"""
+        return max(0, self.position - self.capacity)
+
+    def silence(self, data: bytearray, start: int):
+        """`start` konumundan okunmuş kopyada susturulan aralıkları sıfırla"""
+        end = start + len(data)
+        for low, high in self.suppressed:
+            low, high = max(low, start), end if high is None else min(high, end)
+            if low < high:
+                data[low - start:high - start] = bytes(high - low)
+
+    def is_suppressed(self, position: int) -> bool:
+        return any(low <= position and (high is None or position < high) for low, high in self.suppressed)
+
+    def wait(self, position: int, timeout: Optional[float]) -> bool:
+        """`position`'dan sonra veri gelene kadar bekle"""
+        with self._new_data:
+            return self._new_data.wait_for(lambda: self.position > position, timeout)
+
+    def reader(self, name: str = '', backlog: float = 0.0) -> 'RingReader':
+        """
+        Yeni okuyucu
+
+        Args:
+            name: İstatistiklerde görünen ad
+            backlog: Son bu kadar saniyelik sesten başla (0: yalnızca yeni ses)
+        """
+        return RingReader(self, name, backlog)
+
+
+class RingReader:
+    """Halka tampondan kendi konumuyla okuyan tüketici"""
+
+    def __init__(self, ring: AudioRingBuffer, name: str = '', backlog: float = 0.0):
+        self.ring = ring
+        self.name = name
+        self.position = ring.position
+        self.overruns = 0          # Geride kalma sayısı
+        self.dropped_frames = 0    # Geride kalınca atlanan çerçeveler
+        self.bytes_read = 0
+        if backlog:
+            self.rewind(backlog)
+
+    @property
+    def frames_read(self) -> int:
+        return self.bytes_read // self.ring.frame_bytes
+
+    @property
+    def pending_frames(self) -> int:
+        return (self.ring.position - self.position) // self.ring.frame_bytes
+
+    @property
+    def lag(self) -> float:
+        """Okunmamış sesin süresi (saniye)"""
+        return (self.ring.position - self.position) / self.ring.bytes_per_second
+
+    def rewind(self, seconds: float):
+        """Konumu yazıcının `seconds` saniye gerisine al (tamponda kalan kadar)"""
+        back = int(seconds * self.ring.bytes_per_second) // self.ring.frame_bytes * self.ring.frame_bytes
+        self.position = max(self.ring.oldest(), self.ring.position - back, 0)
+
+    def seek_latest(self):
+        """Okunmamış sesi atla"""
+        self.position = self.ring.position
+
+    def _catch_up(self):
+        oldest = self.ring.oldest()
+        if self.position < oldest:
+            lost = (oldest - self.position) // self.ring.frame_bytes
+            self.overruns += 1
+            self.dropped_frames += lost
+            logger.debug(f"Ses okuyucusu geride kaldı ({self.name}): {lost} çerçeve atlandı")
+            # Yazıcının hemen ezeceği çerçeveyi değil, bir sonrakini al
+            self.position = oldest + self.ring.frame_bytes
+
+    def read(self, max_frames: Optional[int] = None, timeout: Optional[float] = 0.0) -> List[memoryview]:
+        """
+        Okunmamış çerçeveler (kopyasız)
+
+        Görünümler yazıcı tamponu bir tur dolaşana kadar geçerlidir (varsayılan
+        30 sn); daha uzun saklanacaksa bytes() ile kopyalanmalıdır.
+
+        Args:
+            max_frames: En fazla çerçeve sayısı
+            timeout: Veri yoksa bekleme süresi (None: süresiz, 0: beklemez)
+        """
+        if self.ring.position <= self.position and timeout != 0:
+            self.ring.wait(self.position, timeout)
+        self._catch_up()
+        available = (self.ring.position - self.position) // self.ring.frame_bytes
+        if max_frames is not None:
+            available = min(available, max_frames)
+        frames = []
+        for _ in range(available):
+            frames.append(self.ring.frame_at(self.position))
+            self.position += self.ring.frame_bytes
+        self.bytes_read += len(frames) * self.ring.frame_bytes
+        return frames
+
+    def read_bytes(self, size: int, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Tam `size` baytlık kopya (çerçeve sınırından bağımsız; PyAudio/Porcupine uyumlu)
+
+        Returns:
+            bytes veya süre dolduysa None
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.ring.position - self.position < size:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            self.ring.wait(self.ring.position, remaining)
+            self._catch_up()
+        self._catch_up()
+        start = self.position
+        data = bytearray(size)
+        filled = 0
+        while filled < size:
+            offset = self.position % self.ring.capacity
+            take = min(size - filled, self.ring.capacity - offset)
+            data[filled:filled + take] = self.ring._view[offset:offset + take]
+            self.position += take
+            filled += take
+        self.bytes_read += size
+        if self.ring.suppressed:
+            self.ring.silence(data, start)
+        return bytes(data)
+
+    def stats(self) -> dict:
+        return {'frames_read': self.frames_read, 'overruns': self.overruns,
+                'dropped_frames': self.dropped_frames, 'lag_s': round(self.lag, 3)}
+
+
+# ----------------------------------------------------------------------
+# Kaynaklar: open() / read(bayt) / close(); read gerçek zamanlı bekler
+# ----------------------------------------------------------------------
+class PyAudioSource:
+    """PyAudio mikrofon akışı"""
+
+    def __init__(self, sample_rate: int, chunk_bytes: int, device_index: Optional[int] = None):
+        self.sample_rate = sample_rate
+        self.chunk_frames = chunk_bytes // SAMPLE_WIDTH
+        self.device_index = device_index
+        self.overflows = 0
+        self._pa = None
+        self._stream = None
+
+    def open(self):
+        self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(format=pyaudio.paInt16, channels=1, rate=self.sample_rate, input=True,
+                                     input_device_index=self.device_index,
+                                     frames_per_buffer=self.chunk_frames)
+
+    def read(self, size: int) -> bytes:
+        try:
+            return self._stream.read(size // SAMPLE_WIDTH, exception_on_overflow=True)
+        except IOError as e:
+            if e.errno != pyaudio.paInputOverflowed:
+                raise
+            # Cihaz tamponu taştı (ses kayboldu): sayılır, okumaya devam edilir
+            self.overflows += 1
+            return self._stream.read(size // SAMPLE_WIDTH, exception_on_overflow=False)
+
+    def close(self):
+        if self._stream:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._pa:
+            self._pa.terminate()
+            self._pa = None
+
+
+class SoundDeviceSource:
+    """sounddevice mikrofon akışı (PyAudio yoksa)"""
+
+    def __init__(self, sample_rate: int, chunk_bytes: int, device_index: Optional[int] = None):
+        self.sample_rate = sample_rate
+        self.chunk_frames = chunk_bytes // SAMPLE_WIDTH
+        self.device_index = device_index
+        self.overflows = 0
+        self._stream = None
+
+    def open(self):
+        self._stream = sounddevice.RawInputStream(samplerate=self.sample_rate, channels=1, dtype='int16',
+                                                  blocksize=self.chunk_frames, device=self.device_index)
+        self._stream.start()
+
+    def read(self, size: int) -> bytes:
+        data, overflowed = self._stream.read(size // SAMPLE_WIDTH)
+        if overflowed:
+            self.overflows += 1
+        return bytes(data)
+
+    def close(self):
+        if self._stream:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+
+class WavFileSource:
+    """
+    WAV dosyası kaynağı (donanımsız test)
+
+    Dosya 16 kHz mono değilse numpy ile mono'ya indirilir ve yeniden örneklenir.
+    `realtime` açıkken okuma gerçek zaman hızında bekler; `loop` dosyayı başa sarar,
+    kapalıysa dosya bitince sessizlik üretir.
+    """
+
+    def __init__(self, path, sample_rate: int = AUDIO_SAMPLE_RATE, realtime: bool = True, loop: bool = False):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.realtime = realtime
+        self.loop = loop
+        self.overflows = 0
+        self.finished = False
+        self._pcm = b''
+        self._offset = 0
+        self._next_time = 0.0
+
+    def open(self):
+        with wave.open(self.path if isinstance(self.path, str) else self.path, 'rb') as wav:
+            channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+            raw = wav.readframes(wav.getnframes())
+        self._pcm = self.convert(raw, channels, width, rate, self.sample_rate)
+        self._offset = 0
+        self._next_time = time.monotonic()
+
+    @staticmethod
+    def convert(raw: bytes, channels: int, width: int, rate: int, target_rate: int) -> bytes:
+        """PCM'i 16-bit mono `target_rate`'e çevir"""
+        if channels == 1 and width == SAMPLE_WIDTH and rate == target_rate:
+            return raw
+        if not NUMPY_AVAILABLE:
+            raise ValueError(f"WAV {rate} Hz/{channels} kanal/{width * 8}-bit; dönüştürmek için numpy gerekli")
+        dtype = {1: np.uint8, 2: np.int16, 4: np.int32}.get(width)
+        if dtype is None:
+            raise ValueError(f"Desteklenmeyen örnek genişliği: {width * 8}-bit")
+        samples = np.frombuffer(raw, dtype=dtype).astype(np.float32)
+        if width == 1:
+            samples = (samples - 128) * 256
+        elif width == 4:
+            samples /= 65536
+        samples = samples.reshape(-1, channels).mean(axis=1)
+        if rate != target_rate:
+            count = int(len(samples) * target_rate / rate)
+            samples = np.interp(np.arange(count) * rate / target_rate, np.arange(len(samples)), samples)
+        return np.clip(samples, -32768, 32767).astype(np.int16).tobytes()
+
+    def read(self, size: int) -> bytes:
+        if self.realtime:
+            self._next_time += size / (self.sample_rate * SAMPLE_WIDTH)
+            delay = self._next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        chunk = self._pcm[self._offset:self._offset + size]
+        self._offset += len(chunk)
+        while len(chunk) < size and self.loop and self._pcm:
+            more = self._pcm[:size - len(chunk)]
+            self._offset = len(more)
+            chunk += more
+        if len(chunk) < size:
+            self.finished = True
+            chunk += bytes(size - len(chunk))
+        return chunk
+
+    def close(self):
+        pass
+
+
+def default_source(sample_rate: int, chunk_bytes: int, device_index: Optional[int] = None):
+    """Kurulu mikrofon arka ucu (PyAudio > sounddevice)"""
+    if PYAUDIO_AVAILABLE:
+        return PyAudioSource(sample_rate, chunk_bytes, device_index)
+    if SOUNDDEVICE_AVAILABLE:
+        return SoundDeviceSource(sample_rate, chunk_bytes, device_index)
+    raise RuntimeError("Mikrofon için PyAudio veya sounddevice gerekli")
+
+
+class AudioCaptureBus:
+    """Tek yakalama thread'i ve paylaşılan halka tampon"""
+
+    # Kaynak hatasında yeniden açma beklemesi (saniye, üstel artar)
+    RETRY_DELAYS = (0.5, 1.0, 2.0, 5.0)
+
+    def __init__(self, source=None, sample_rate: int = AUDIO_SAMPLE_RATE, frame_ms: int = AUDIO_FRAME_MS,
+                 buffer_seconds: float = AUDIO_BUFFER_SECONDS, chunk_frames: int = 2,
+                 device_index: Optional[int] = AUDIO_INPUT_DEVICE):
+        """
+        Args:
+            source: Ses kaynağı (varsayılan: kurulu mikrofon arka ucu)
+            sample_rate: Örnekleme hızı (kaynak bu hızda okunur)
+            frame_ms: Çerçeve süresi; okuyucular bu birimle okur
+            buffer_seconds: Halka tampon süresi (en yavaş okuyucu için tolerans)
+            chunk_frames: Kaynaktan tek okumada alınan çerçeve sayısı
+            device_index: Mikrofon indeksi (None: varsayılan cihaz)
+        """
+        self.ring = AudioRingBuffer(sample_rate, frame_ms, buffer_seconds)
+        self.chunk_bytes = self.ring.frame_bytes * chunk_frames
+        self.source = source or default_source(sample_rate, self.chunk_bytes, device_index)
+        self.sample_rate = sample_rate
+        self.stats = {'chunks': 0, 'source_errors': 0, 'reopens': 0}
+        self._readers: List[RingReader] = []
+        self._readers_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._opened = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, wait: float = 2.0):
+        """Yakalamayı başlat; kaynak açılana kadar en fazla `wait` saniye bekle"""
+        if self.running:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='audio-capture', daemon=True)
+        self._thread.start()
+        if not self._opened.wait(wait):
+            logger.warning("⚠️ Ses kaynağı henüz açılamadı, arka planda deneniyor")
+        return self
+
+    def _run(self):
+        attempt = 0
+        while not self._stop.is_set():
+            try:
+                self.source.open()
+            except Exception as e:
+                self.stats['source_errors'] += 1
+                delay = self.RETRY_DELAYS[min(attempt, len(self.RETRY_DELAYS) - 1)]
+                logger.error(f"❌ Ses kaynağı açılamadı: {e} ({delay:.1f} sn sonra tekrar)")
+                attempt += 1
+                self._stop.wait(delay)
+                continue
+
+            if attempt or self.stats['chunks']:
+                self.stats['reopens'] += 1
+            attempt = 0
+            self._opened.set()
+            logger.info(f"🎙️ Ses yakalama başladı ({self.sample_rate} Hz, {self.ring.frame_ms} ms çerçeve)")
+            try:
+                while not self._stop.is_set():
+                    chunk = self.source.read(self.chunk_bytes)
+                    if len(chunk) != self.chunk_bytes:
+                        # Kısa okuma: çerçeve hizası bozulmasın
+                        chunk = chunk[:len(chunk) // self.ring.frame_bytes * self.ring.frame_bytes]
+                    if chunk:
+                        self.ring.write(chunk)
+                        self.stats['chunks'] += 1
+            except Exception as e:
+                # Cihaz çıkarıldı vb.: kapatıp yeniden aç
+                self.stats['source_errors'] += 1
+                logger.error(f"❌ Ses yakalama hatası: {e}")
+                self._stop.wait(self.RETRY_DELAYS[0])
+            finally:
+                try:
+                    self.source.close()
+                except Exception:
+                    pass
+                self._opened.clear()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=3)
+            self._thread = None
+
+    def reader(self, name: str = '', backlog: float = 0.0) -> RingReader:
+        """Yeni okuyucu (istatistiklerde izlenir)"""
+        reader = self.ring.reader(name, backlog)
+        with self._readers_lock:
+            self._readers.append(reader)
+        return reader
+
+    def release(self, reader: RingReader):
+        with self._readers_lock:
+            if reader in self._readers:
+                self._readers.remove(reader)
+
+    def microphone(self, name: str = 'speech', preroll: float = AUDIO_PREROLL_SECONDS) -> 'BusMicrophone':
+        """speech_recognition için kaynak"""
+        return BusMicrophone(self, name, preroll)
+
+    @contextmanager
+    def suppress(self, tail: float = AUDIO_ECHO_TAIL):
+        """
+        Blok süresince (ve ardından `tail` saniye yankı payı) gelen sesi sustur
+
+        Kopyalayan okumalarda (read_bytes, BusMicrophone) bu aralık sessizlik
+        olarak görünür; kopyasız okuyucular ring.is_suppressed ile kontrol eder.
+        """
+        ring = self.ring
+        oldest = ring.oldest()
+        ring.suppressed = [r for r in ring.suppressed if r[1] is None or r[1] > oldest]
+        interval = [ring.position, None]
+        ring.suppressed.append(interval)
+        try:
+            yield
+        finally:
+            interval[1] = ring.position + int(tail * ring.bytes_per_second)
+
+    def summary(self) -> dict:
+        with self._readers_lock:
+            readers = {r.name or f"okuyucu{i}": r.stats() for i, r in enumerate(self._readers)}
+        return {**self.stats, 'device_overflows': getattr(self.source, 'overflows', 0),
+                'seconds': round(self.ring.position / self.ring.bytes_per_second, 2), 'readers': readers}
+
+
+class _BusStream:
+    """sr.Recognizer'ın beklediği `stream.read(örnek sayısı)` arayüzü (PyAudio gibi)"""
+
+    def __init__(self, reader: RingReader):
+        self.reader = reader
+
+    def read(self, samples: int) -> bytes:
+        size = samples * SAMPLE_WIDTH
+        data = self.reader.read_bytes(size, timeout=2.0)
+        # Kaynak durduysa sessizlik: listen() zaman aşımıyla çıkar
+        return data if data is not None else bytes(size)
+
+
+class BusMicrophone(AudioSourceBase):
+    """
+    Veriyolundan okuyan speech_recognition kaynağı (sr.Microphone yerine)
+
+    `with mic as source` cihazı açmaz; kalıcı bir okuyucu kaldığı yerden devam
+    eder, daha önce okunan ses tekrar verilmez. Dinleme, `mark()` ile
+    işaretlenen andan (işaret yoksa dinlemenin başladığı andan) en fazla
+    `preroll` saniye önceki sesten başlar: uzun aradan sonra eski ses
+    işlenmez, komutun hemen ardından konuşulanlar da kaybolmaz.
+    """
+
+    def __init__(self, bus: AudioCaptureBus, name: str = 'speech', preroll: float = AUDIO_PREROLL_SECONDS):
+        self.bus = bus
+        self.preroll = preroll
+        self.SAMPLE_RATE = bus.sample_rate
+        self.SAMPLE_WIDTH = SAMPLE_WIDTH
+        self.CHUNK = bus.ring.frame_bytes // SAMPLE_WIDTH
+        self.format = None
+        self.reader = bus.reader(name)
+        self.stream = None
+        self._anchor: Optional[int] = None
+
+    def mark(self):
+        """Ön kayıt penceresini şimdiye sabitle (sonraki dinleme bu andan geriye bakar)"""
+        self._anchor = self.bus.ring.position
+
+    def _preroll_start(self) -> int:
+        ring = self.bus.ring
+        anchor = ring.position if self._anchor is None else self._anchor
+        back = int(self.preroll * ring.bytes_per_second) // ring.frame_bytes * ring.frame_bytes
+        return max(self.reader.position, anchor - back, ring.oldest())
+
+    def speech_pending(self, threshold: float, min_duration: float = 0.1) -> bool:
+        """
+        Ön kayıt penceresinde (okunmadan) konuşma var mı?
+
+        Susturulmamış ve enerjisi eşiği geçen ardışık çerçeveler `min_duration`
+        kadar sürmüşse True; örn. wake word'ün hemen ardından komut söylenmişse.
+        """
+        ring = self.bus.ring
+        needed = max(1, int(min_duration * 1000 / ring.frame_ms))
+        run = 0
+        for position in range(self._preroll_start(), ring.position - ring.frame_bytes + 1, ring.frame_bytes):
+            if not ring.is_suppressed(position) and pcm_rms(ring.frame_at(position)) > threshold:
+                run += 1
+                if run >= needed:
+                    return True
+            else:
+                run = 0
+        return False
+
+    def __enter__(self):
+        if not self.bus.running:
+            self.bus.start()
+        self.reader.position = self._preroll_start()
+        self._anchor = None
+        self.stream = _BusStream(self.reader)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Akış kapanmaz: sonraki dinleme kaldığı yerden devam eder
+        self.stream = None
+
+
+_bus: Optional[AudioCaptureBus] = None
+_bus_lock = threading.Lock()
+
+
+def get_audio_bus() -> AudioCaptureBus:
+    """Süreç genelinde paylaşılan veriyolu (ilk çağrıda mikrofonla başlar)"""
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = AudioCaptureBus().start()
+        return _bus
+
+
+# Test
+if __name__ == "__main__":
+    import io
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+
+    if len(sys.argv) > 1:
+        source = WavFileSource(sys.argv[1], loop=True)
+    else:
+        # 3 sn 440 Hz ton (bellekteki WAV)
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(SAMPLE_WIDTH)
+            wav.setframerate(AUDIO_SAMPLE_RATE)
+            wav.writeframes(b''.join(
+                int(8000 * math.sin(2 * math.pi * 440 * i / AUDIO_SAMPLE_RATE)).to_bytes(2, 'little', signed=True)
+                for i in range(AUDIO_SAMPLE_RATE * 3)))
+        buffer.seek(0)
+        source = WavFileSource(buffer, loop=True)
+
+    bus = AudioCaptureBus(source, buffer_seconds=1.0)
+    fast, slow = bus.reader('hızlı'), bus.reader('yavaş')
+    bus.start()
+
+    # Hızlı okuyucu her çerçeveyi alır; yavaş olan 100 ms'de bir çerçeve okur (taşma beklenir)
+    started = time.monotonic()
+    fast_bytes = 0
+    while time.monotonic() - started < 2.0:
+        for frame in fast.read(timeout=0.1):
+            fast_bytes += len(frame)
+        slow.read(max_frames=1)
+    bus.stop()
+
+    print(f"hızlı: {fast_bytes / bus.ring.bytes_per_second:.2f} sn ses okudu")
+    print(bus.summary())
@@ -0,0 +1,268 @@
+"""
+Tanıma Öncesi Ses Ön İşleme (yükleme küçültme)
+- Baştaki / sondaki sessizlik kırpılır (PREPROCESS_KEEP_MS pay bırakılır)
+- Basit gürültü bastırma: parçanın konuşmasız çerçevelerinden gürültü
+  spektrumu çıkarılır, spektral kapılama uygulanır; yalnızca tahmini SNR
+  PREPROCESS_DENOISE_SNR_DB'nin altındaysa (temiz seste ASR bozulmasın)
+- Kazanç: MICROPHONE_GAIN, ardından otomatik kazanç (AGC) konuşma RMS'ini
+  PREPROCESS_TARGET_RMS'e çeker; tepe sınırlayıcı kırpılmayı önler
+- Backend'in doğal hızına (PREPROCESS_TARGET_RATE) yeniden örnekleme
+- FLAC kodlaması bir kez yapılır ve saklanır: recognize_google aynı veriyi
+  yeniden kodlamaz, gönderilen bayt sayısı kesin olarak ölçülür
+- Tur başına rapor: giren PCM / giden FLAC baytı, kırpılan süre, kazanç, SNR
+
+Kullanım:
+    python -m modules.audio_preprocess dosya.wav [çıktı.wav]
+"""
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+import speech_recognition as sr
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from config.settings import (
+        MICROPHONE_GAIN, PREPROCESS_TARGET_RATE, PREPROCESS_KEEP_MS, PREPROCESS_AGC,
+        PREPROCESS_TARGET_RMS, PREPROCESS_MAX_GAIN, PREPROCESS_DENOISE_SNR_DB, VAD_THRESHOLD_DB
+    )
+except ImportError:
+    MICROPHONE_GAIN = 1.0
+    PREPROCESS_TARGET_RATE = 16000
+    PREPROCESS_KEEP_MS = 200
+    PREPROCESS_AGC = True
+    PREPROCESS_TARGET_RMS = 3000
+    PREPROCESS_MAX_GAIN = 8.0
+    PREPROCESS_DENOISE_SNR_DB = 25.0
+    VAD_THRESHOLD_DB = 12.0
+
+logger = logging.getLogger(__name__)
+
+PREPROCESS_AVAILABLE = NUMPY_AVAILABLE
+
+FRAME_MS = 20
+# Spektral kapılama: 32 ms pencere (16 kHz'de 512), %50 örtüşme
+FFT_SIZE = 512
+HOP = FFT_SIZE // 2
+# Gürültü spektrumundan çıkarma katsayısı ve en düşük kazanç (müzikal gürültüyü sınırlar)
+OVER_SUBTRACTION = 1.5
+SPECTRAL_FLOOR = 0.1
+# Gürültü profili için en az bu kadar konuşmasız çerçeve gerekir
+MIN_NOISE_FRAMES = 5
+# Tepe sınırı (tam ölçeğin oranı)
+PEAK_LIMIT = 0.95 * 32767
+
+
+class EncodedAudio(sr.AudioData):
+    """FLAC kodlamasını saklayan AudioData (aynı ayarla ikinci kez kodlanmaz)"""
+
+    def __init__(self, frame_data, sample_rate, sample_width):
+        super().__init__(frame_data, sample_rate, sample_width)
+        self._flac: Dict[Tuple, bytes] = {}
+
+    def get_flac_data(self, convert_rate=None, convert_width=None):
+        key = (convert_rate, convert_width)
+        if key not in self._flac:
+            self._flac[key] = super().get_flac_data(convert_rate, convert_width)
+        return self._flac[key]
+
+
+def frame_levels(samples: "np.ndarray", frame_samples: int) -> "np.ndarray":
+    """Çerçeve enerjileri (dB, 20·log10 RMS)"""
+    count = len(samples) // frame_samples
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:count * frame_samples].reshape(count, frame_samples)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1.0))
+
+
+def spectral_gate(samples: "np.ndarray", noise_mask: "np.ndarray", frame_samples: int) -> "np.ndarray":
+    """
+    Gürültü bastırma (spektral çıkarma / kapılama)
+
+    Args:
+        noise_mask: Konuşmasız FRAME_MS çerçeveleri (gürültü profili buradan)
+    """
+    length = len(samples)
+    padded = np.concatenate([np.zeros(HOP, dtype=np.float32), samples,
+                             np.zeros(FFT_SIZE + HOP, dtype=np.float32)])
+    window = np.hanning(FFT_SIZE).astype(np.float32)
+    starts = np.arange(0, len(padded) - FFT_SIZE + 1, HOP)
+    spectra = np.fft.rfft(np.stack([padded[s:s + FFT_SIZE] * window for s in starts]), axis=1)
+    magnitude = np.abs(spectra)
+
+    # Gürültü çerçevelerine denk gelen STFT pencereleri
+    centers = (starts + FFT_SIZE // 2 - HOP) // frame_samples
+    centers = np.clip(centers, 0, len(noise_mask) - 1)
+    noise_windows = noise_mask[centers]
+    if noise_windows.sum() < MIN_NOISE_FRAMES:
+        return samples
+    noise_profile = magnitude[noise_windows].mean(axis=0)
+
+    gain = np.maximum(1.0 - OVER_SUBTRACTION * noise_profile / np.maximum(magnitude, 1e-6), SPECTRAL_FLOOR)
+    frames = np.fft.irfft(spectra * gain, n=FFT_SIZE, axis=1) * window
+
+    # Örtüşerek topla (hann² toplamıyla normalize)
+    output = np.zeros(len(padded), dtype=np.float32)
+    norm = np.zeros(len(padded), dtype=np.float32)
+    for index, start in enumerate(starts):
+        output[start:start + FFT_SIZE] += frames[index]
+        norm[start:start + FFT_SIZE] += window ** 2
+    output /= np.maximum(norm, 1e-3)
+    return output[HOP:HOP + length]
+
+
+def resample(samples: "np.ndarray", source_rate: int, target_rate: int) -> "np.ndarray":
+    """FFT ile yeniden örnekleme (bant sınırlı; düşürmede örtüşme olmaz)"""
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    count = int(round(len(samples) * target_rate / source_rate))
+    spectrum = np.fft.rfft(samples)
+    bins = count // 2 + 1
+    if bins <= len(spectrum):
+        spectrum = spectrum[:bins]
+    else:
+        spectrum = np.concatenate([spectrum, np.zeros(bins - len(spectrum), dtype=spectrum.dtype)])
+    return (np.fft.irfft(spectrum, n=count) * (count / len(samples))).astype(np.float32)
+
+
+class AudioPreprocessor:
+    """Yakalama ile tanıma arasındaki ön işleme aşaması"""
+
+    def __init__(self, gain: float = MICROPHONE_GAIN, agc: bool = PREPROCESS_AGC,
+                 target_rms: float = PREPROCESS_TARGET_RMS, max_gain: float = PREPROCESS_MAX_GAIN,
+                 denoise_snr_db: Optional[float] = PREPROCESS_DENOISE_SNR_DB,
+                 keep_ms: int = PREPROCESS_KEEP_MS, target_rate: int = PREPROCESS_TARGET_RATE,
+                 threshold_db: float = VAD_THRESHOLD_DB):
+        """
+        Args:
+            gain: Sabit kazanç (MICROPHONE_GAIN)
+            agc: Konuşma seviyesini target_rms'e çek (en fazla max_gain kat)
+            denoise_snr_db: SNR bunun altındaysa gürültü bastır (None = kapalı)
+            keep_ms: Kırpmada konuşmanın iki yanında bırakılan pay
+            target_rate: Backend'in doğal örnekleme hızı
+            threshold_db: Gürültü tabanının bu kadar üstü konuşma sayılır
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("Ses ön işleme için numpy gerekli: pip install numpy")
+        self.gain = gain
+        self.agc = agc
+        self.target_rms = target_rms
+        self.max_gain = max_gain
+        self.denoise_snr_db = denoise_snr_db
+        self.keep_ms = keep_ms
+        self.target_rate = target_rate
+        self.threshold_db = threshold_db
+        self.last_report: Optional[dict] = None
+        self.totals = {'turns': 0, 'pcm_bytes_in': 0, 'flac_bytes_out': 0, 'trimmed_seconds': 0.0,
+                       'denoised': 0, 'cpu_ms': 0.0}
+
+    def process(self, audio: sr.AudioData) -> EncodedAudio:
+        """Sesi ön işle; dönen nesnenin FLAC kodlaması saklanır"""
+        started = time.perf_counter()
+        rate = audio.sample_rate
+        raw = audio.get_raw_data(convert_width=2)
+        samples = np.frombuffer(raw, dtype='<i2').astype(np.float32)
+        frame_samples = max(1, rate * FRAME_MS // 1000)
+
+        levels = frame_levels(samples, frame_samples)
+        report = {'input_seconds': round(len(samples) / rate, 2), 'pcm_bytes_in': len(raw)}
+        if len(levels):
+            floor = float(np.percentile(levels, 10))
+            voiced = levels > floor + self.threshold_db
+            speech_db = float(np.mean(levels[voiced])) if voiced.any() else floor
+            report['snr_db'] = round(speech_db - floor, 1)
+            # Konuşma çerçevelerinin RMS'i (AGC hedefi buna göre)
+            speech_rms = float(np.sqrt(np.mean(10 ** (levels[voiced] / 10)))) if voiced.any() else 0.0
+        else:
+            voiced = np.zeros(0, dtype=bool)
+
+        # 1. Gürültü bastırma (profil kırpılacak sessizlikten çıkarılır, o yüzden önce).
+        # Profil yalnızca baştaki / sondaki konuşmasız bölümden: konuşma aralarındaki
+        # zayıf sesler gürültü sayılmasın
+        indices = np.flatnonzero(voiced)
+        edges = np.zeros(len(levels), dtype=bool)
+        if len(indices):
+            edges[:indices[0]] = True
+            edges[indices[-1] + 1:] = True
+        if (self.denoise_snr_db is not None and edges.sum() >= MIN_NOISE_FRAMES
+                and report['snr_db'] < self.denoise_snr_db):
+            samples = spectral_gate(samples, edges, frame_samples)
+            report['denoised'] = True
+            self.totals['denoised'] += 1
+
+        # 2. Sessizlik kırpma
+        if len(indices):
+            keep = self.keep_ms // FRAME_MS
+            first = max(0, indices[0] - keep) * frame_samples
+            end = indices[-1] + 1 + keep
+            samples = samples[first:end * frame_samples if end < len(levels) else len(samples)]
+        report['trimmed_seconds'] = round(report['input_seconds'] - len(samples) / rate, 2)
+
+        # 3. Kazanç + AGC + tepe sınırı
+        gain = self.gain
+        if self.agc and voiced.any() and speech_rms > 0:
+            gain *= float(np.clip(self.target_rms / (speech_rms * gain), 1 / self.max_gain, self.max_gain))
+        samples = samples * gain
+        peak = float(np.max(np.abs(samples))) if len(samples) else 0.0
+        if peak > PEAK_LIMIT:
+            samples *= PEAK_LIMIT / peak
+            gain *= PEAK_LIMIT / peak
+        report['gain'] = round(gain, 2)
+
+        # 4. Backend'in doğal hızı
+        samples = resample(samples, rate, self.target_rate)
+        pcm = np.clip(np.round(samples), -32768, 32767).astype('<i2').tobytes()
+        processed = EncodedAudio(pcm, self.target_rate, 2)
+
+        # 5. FLAC (saklanır; Google aynı ayarla ister: hız ≥ 8 kHz → dönüşüm yok, 16 bit)
+        flac = processed.get_flac_data(convert_rate=None if self.target_rate >= 8000 else 8000, convert_width=2)
+        report.update(output_seconds=round(len(pcm) / (2 * self.target_rate), 2), flac_bytes_out=len(flac),
+                      cpu_ms=round((time.perf_counter() - started) * 1000, 1))
+
+        self.last_report = report
+        self.totals['turns'] += 1
+        self.totals['pcm_bytes_in'] += len(raw)
+        self.totals['flac_bytes_out'] += len(flac)
+        self.totals['trimmed_seconds'] += report['trimmed_seconds']
+        self.totals['cpu_ms'] += report['cpu_ms']
+        logger.debug(f"🗜️ Ön işleme: {report}")
+        return processed
+
+    def summary(self) -> str:
+        turns = self.totals['turns']
+        if not turns:
+            return "0 tur"
+        return (f"{turns} tur, tur başına {self.totals['pcm_bytes_in'] / turns / 1024:.0f} KB PCM → "
+                f"{self.totals['flac_bytes_out'] / turns / 1024:.0f} KB FLAC, "
+                f"{self.totals['trimmed_seconds'] / turns:.1f} sn sessizlik kırpıldı, "
+                f"{self.totals['denoised']} gürültü bastırma")
+
+
+# Test
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+
+    if len(sys.argv) < 2:
+        print("Kullanım: python -m modules.audio_preprocess dosya.wav [çıktı.wav]")
+        sys.exit(1)
+
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(sys.argv[1]) as source:
+        audio = recognizer.record(source)
+
+    preprocessor = AudioPreprocessor()
+    processed = preprocessor.process(audio)
+    print(f"📦 Ham FLAC: {len(audio.get_flac_data(convert_width=2))} bayt")
+    print(f"📦 {preprocessor.last_report}")
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], 'wb') as f:
+            f.write(processed.get_wav_data())
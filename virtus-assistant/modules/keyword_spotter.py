@@ -0,0 +1,297 @@
+"""
+Yerel Wake Word Algılama (internet gerektirmez)
+- Kullanıcının kaydettiği birkaç "Virtus" örneği şablon olarak saklanır
+  (data/wake_word/*.wav)
+- Özellikler: NumPy ile MFCC (25 ms pencere, 10 ms adım) + ortalama/varyans
+  normalizasyonu
+- Eşleme: alt dizi DTW - şablon konuşma parçasının başında aranır (ilk
+  KWS_START_SLACK_MS içinde başlayabilir), sonrası serbest; böylece
+  "Virtus, Chrome'u aç" gibi tek cümlede de wake word bulunur
+- Yalnızca VAD'in bulduğu konuşma parçalarında çalışır: sessizlikte işlemci
+  kullanmaz, hiçbir ses buluta gönderilmez
+- KWS_THRESHOLD yanlış kabul / yanlış ret dengesini belirler
+  (benchmark_kws.py ile ölçülür)
+
+Kullanım:
+    python -m modules.keyword_spotter enroll            # mikrofondan 5 örnek kaydet
+    python -m modules.keyword_spotter enroll a.wav b.wav
+    python -m modules.keyword_spotter test              # canlı skorları yazdır
+"""
+import logging
+import os
+import time
+import wave
+from functools import lru_cache
+from typing import List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from config.settings import KWS_TEMPLATES_DIR, KWS_THRESHOLD, KWS_START_SLACK_MS
+except ImportError:
+    KWS_TEMPLATES_DIR = 'data/wake_word'
+    KWS_THRESHOLD = 0.6
+    KWS_START_SLACK_MS = 400
+
+from modules.audio_bus import AUDIO_SAMPLE_RATE, SAMPLE_WIDTH
+
+logger = logging.getLogger(__name__)
+
+KWS_AVAILABLE = NUMPY_AVAILABLE
+
+WINDOW_MS = 25
+HOP_MS = 10
+MEL_FILTERS = 26
+CEPSTRA = 13
+
+
+@lru_cache(maxsize=4)
+def _mel_filterbank(sample_rate: int, nfft: int) -> 'np.ndarray':
+    def hz_to_mel(hz):
+        return 2595 * np.log10(1 + hz / 700)
+
+    def mel_to_hz(mel):
+        return 700 * (10 ** (mel / 2595) - 1)
+
+    mels = np.linspace(hz_to_mel(60), hz_to_mel(sample_rate / 2), MEL_FILTERS + 2)
+    bins = np.floor((nfft + 1) * mel_to_hz(mels) / sample_rate).astype(int)
+    bank = np.zeros((MEL_FILTERS, nfft // 2 + 1), dtype=np.float32)
+    for m in range(1, MEL_FILTERS + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            bank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            bank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return bank
+
+
+@lru_cache(maxsize=1)
+def _dct_matrix() -> 'np.ndarray':
+    n = np.arange(MEL_FILTERS)
+    k = np.arange(1, CEPSTRA)[:, None]   # c0 (enerji) atlanır
+    return (np.cos(np.pi * k * (2 * n + 1) / (2 * MEL_FILTERS)) * np.sqrt(2 / MEL_FILTERS)).astype(np.float32)
+
+
+def mfcc(pcm: bytes, sample_rate: int = AUDIO_SAMPLE_RATE, trim_db: Optional[float] = None) -> 'np.ndarray':
+    """
+    16-bit PCM → normalize edilmiş MFCC dizisi (çerçeve, 12)
+
+    Args:
+        trim_db: Verilirse baştaki/sondaki, en yüksek enerjinin bu kadar dB
+            altındaki çerçeveler atılır (sessizlik normalizasyonu bozmasın)
+    """
+    return _features(pcm, sample_rate, trim_db)[0]
+
+
+def _features(pcm: bytes, sample_rate: int, trim_db: Optional[float]):
+    """MFCC ve kırpılan baştaki çerçeve sayısı"""
+    samples = np.frombuffer(pcm, dtype='<i2', count=len(pcm) // SAMPLE_WIDTH).astype(np.float32)
+    window = sample_rate * WINDOW_MS // 1000
+    hop = sample_rate * HOP_MS // 1000
+    if len(samples) < window:
+        return np.zeros((0, CEPSTRA - 1), dtype=np.float32), 0
+    samples = np.append(samples[0], samples[1:] - 0.97 * samples[:-1])   # ön vurgu
+    count = 1 + (len(samples) - window) // hop
+    frames = np.lib.stride_tricks.as_strided(
+        samples, shape=(count, window), strides=(samples.strides[0] * hop, samples.strides[0]))
+    nfft = 1 << (window - 1).bit_length()
+    power = np.abs(np.fft.rfft(frames * np.hamming(window).astype(np.float32), nfft)) ** 2 / nfft
+    mel = np.log(power @ _mel_filterbank(sample_rate, nfft).T + 1e-6)
+
+    first = 0
+    if trim_db is not None:
+        energy = 10 * np.log10(power.sum(axis=1) + 1e-6)
+        loud = np.flatnonzero(energy > energy.max() - trim_db)
+        first = int(loud[0])
+        mel = mel[first:loud[-1] + 1]
+
+    features = mel @ _dct_matrix().T
+    return (features - features.mean(axis=0)) / (features.std(axis=0) + 1e-6), first
+
+
+def subsequence_dtw(template: 'np.ndarray', query: 'np.ndarray', start_slack: int):
+    """
+    Şablonu sorgunun başında ara (başlangıç ilk `start_slack` çerçevede, bitiş serbest)
+
+    Adımlar (1,1), (1,2), (2,1): konuşma hızı şablonun yarısı ile iki katı
+    arasında olabilir. Satır satır vektörel hesaplanır.
+
+    Returns:
+        (şablon çerçevesi başına ortalama mesafe, eşleşmenin bittiği sorgu çerçevesi)
+    """
+    n, m = len(template), len(query)
+    if n < 2 or m < 2:
+        return float('inf'), 0
+    # Çerçeveler arası Öklid mesafesi (n, m)
+    cost = np.sqrt(np.maximum(
+        (template ** 2).sum(axis=1)[:, None] + (query ** 2).sum(axis=1)[None, :] - 2 * template @ query.T, 0))
+    cost /= np.sqrt(template.shape[1])
+
+    inf = np.float32(np.inf)
+    previous2 = np.full(m, inf, dtype=np.float32)
+    previous = np.full(m, inf, dtype=np.float32)
+    previous[:start_slack + 1] = cost[0, :start_slack + 1]
+    for i in range(1, n):
+        best = np.full(m, inf, dtype=np.float32)
+        best[1:] = previous[:-1]                                        # (1,1)
+        best[2:] = np.minimum(best[2:], previous[:-2])                  # (1,2)
+        best[1:] = np.minimum(best[1:], previous2[:-1] + cost[i - 1, 1:])   # (2,1)
+        previous2, previous = previous, cost[i] + best
+    end = int(np.argmin(previous))
+    return float(previous[end]) / n, end
+
+
+class KeywordSpotter:
+    """Şablon tabanlı wake word algılayıcı"""
+
+    def __init__(self, templates_dir: str = KWS_TEMPLATES_DIR, threshold: float = KWS_THRESHOLD,
+                 sample_rate: int = AUDIO_SAMPLE_RATE, start_slack_ms: int = KWS_START_SLACK_MS):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("Yerel wake word için numpy gerekli: pip install numpy")
+        self.templates_dir = templates_dir
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.start_slack = start_slack_ms // HOP_MS
+        self.templates: List['np.ndarray'] = []
+        self.stats = {'checks': 0, 'detections': 0, 'cpu_time': 0.0}
+        self.last_score = None
+        self.last_end = None
+        self.load()
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.templates)
+
+    def load(self):
+        """Kayıtlı şablonları yükle"""
+        self.templates = []
+        if not os.path.isdir(self.templates_dir):
+            return
+        for name in sorted(os.listdir(self.templates_dir)):
+            if not name.endswith('.wav'):
+                continue
+            try:
+                with wave.open(os.path.join(self.templates_dir, name), 'rb') as wav:
+                    pcm = wav.readframes(wav.getnframes())
+                self.add_template(pcm)
+            except (OSError, wave.Error) as e:
+                logger.warning(f"Wake word örneği okunamadı ({name}): {e}")
+        if self.templates:
+            logger.info(f"🔑 {len(self.templates)} wake word örneği yüklendi")
+
+    def add_template(self, pcm: bytes):
+        features = mfcc(pcm, self.sample_rate, trim_db=30)
+        if len(features) >= 10:
+            self.templates.append(features)
+
+    def enroll(self, pcm: bytes) -> Optional[str]:
+        """Yeni örneği kaydet ve şablonlara ekle"""
+        before = len(self.templates)
+        self.add_template(pcm)
+        if len(self.templates) == before:
+            logger.warning("⚠️ Örnek çok kısa, kaydedilmedi")
+            return None
+        os.makedirs(self.templates_dir, exist_ok=True)
+        path = os.path.join(self.templates_dir, f"ornek_{int(time.time() * 1000)}.wav")
+        with wave.open(path, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(SAMPLE_WIDTH)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(pcm)
+        return path
+
+    def score(self, pcm: bytes):
+        """
+        En yakın şablona uzaklık (küçük = benzer); şablonlar yüklü olmalı (ready)
+
+        Returns:
+            (skor, wake word'ün bittiği an - parçanın başından saniye)
+        """
+        started = time.process_time()
+        # Eşleşme en fazla şablonun iki katı sürebilir: sonrası (komut) normalizasyona katılmaz
+        frames = self.start_slack + 2 * max(len(t) for t in self.templates)
+        hop_bytes = self.sample_rate * HOP_MS // 1000 * SAMPLE_WIDTH
+        query, first = _features(pcm[:frames * hop_bytes + self.sample_rate * WINDOW_MS // 1000 * SAMPLE_WIDTH],
+                                 self.sample_rate, trim_db=30)
+        best, best_end = float('inf'), 0
+        for template in self.templates:
+            distance, end = subsequence_dtw(template, query, self.start_slack)
+            if distance < best:
+                best, best_end = distance, end
+        self.stats['checks'] += 1
+        self.stats['cpu_time'] += time.process_time() - started
+        end_seconds = ((first + best_end) * HOP_MS + WINDOW_MS) / 1000
+        self.last_score, self.last_end = best, end_seconds
+        return best, end_seconds
+
+    def detect(self, pcm: bytes) -> bool:
+        """Parça wake word ile mi başlıyor?"""
+        if not self.templates:
+            return False
+        score, _ = self.score(pcm)
+        if score <= self.threshold:
+            self.stats['detections'] += 1
+            return True
+        return False
+
+    def summary(self) -> dict:
+        checks = self.stats['checks']
+        return {
+            'templates': len(self.templates),
+            'threshold': self.threshold,
+            'checks': checks,
+            'detections': self.stats['detections'],
+            'avg_ms': round(self.stats['cpu_time'] * 1000 / checks, 2) if checks else 0.0,
+        }
+
+
+# Test / kayıt
+if __name__ == "__main__":
+    import sys
+
+    from modules.audio_bus import WavFileSource, get_audio_bus
+    from modules.vad import VoiceActivityDetector, listen_segment
+
+    logging.basicConfig(level=logging.INFO)
+
+    command = sys.argv[1] if len(sys.argv) > 1 else 'test'
+    spotter = KeywordSpotter()
+
+    if command == 'enroll' and len(sys.argv) > 2:
+        for path in sys.argv[2:]:
+            with wave.open(path, 'rb') as wav:
+                pcm = WavFileSource.convert(wav.readframes(wav.getnframes()), wav.getnchannels(),
+                                            wav.getsampwidth(), wav.getframerate(), AUDIO_SAMPLE_RATE)
+            print(f"{path} → {spotter.enroll(pcm)}")
+        sys.exit(0)
+
+    bus = get_audio_bus().start()
+    reader = bus.reader('kws')
+    vad = VoiceActivityDetector(bus.sample_rate, bus.ring.frame_ms)
+
+    if command == 'enroll':
+        count = 5
+        for i in range(count):
+            print(f"\n🎤 [{i + 1}/{count}] 'Virtus' deyin...")
+            pcm = listen_segment(reader, vad, timeout=10, phrase_limit=2)
+            if pcm:
+                print(f"   ✅ {spotter.enroll(pcm)}")
+        sys.exit(0)
+
+    if not spotter.ready:
+        print("❌ Wake word örneği yok: python -m modules.keyword_spotter enroll")
+        sys.exit(1)
+    print(f"🎧 Konuşun (eşik {spotter.threshold}) - Ctrl+C ile çıkış")
+    try:
+        while True:
+            pcm = listen_segment(reader, vad, timeout=None, phrase_limit=3)
+            if pcm:
+                found = spotter.detect(pcm)
+                print(f"{'✨ VIRTUS' if found else '   -'}  skor {spotter.last_score:.3f}  "
+                      f"bitiş {spotter.last_end:.2f} sn")
+    except KeyboardInterrupt:
+        print(spotter.summary())
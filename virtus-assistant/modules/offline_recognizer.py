@@ -0,0 +1,483 @@
+"""
+Kalıcı Çevrimdışı Ses Tanıma İşçileri
+- Yerel model (faster-whisper ya da whisper) ayrı süreçlerde, açılışta arka
+  planda BİR KEZ yüklenir ve sıcak tutulur; tur sırasında model yüklenmez
+- Çözümleme ana süreçten ayrı (GIL dışında), düşük öncelikle çalışır: ses
+  yakalama ve arayüz takılmaz
+- Ses işçilere paylaşılan bellekle (SharedMemory) aktarılır: sabit boyutlu
+  yuvalar, kuyruğa yalnızca yuva numarası ve uzunluk gider
+- Küçük işçi havuzu (OFFLINE_WORKERS) ve sınırlı kuyruk (OFFLINE_QUEUE_SIZE):
+  boş yuva yoksa iş hemen reddedilir (bekletilmez), çağıran diğer backend'e düşer
+- Başlamamış iş iptal edilebilir (yuvaya iptal edilen işin numarası yazılır;
+  yuva yeniden kullanılsa da eski iptal yeni işi etkilemez); ölen işçi yeniden başlatılır
+- Sağlık ve gecikme istatistikleri: hazır işçiler, model yükleme süresi,
+  kuyrukta bekleme ve çözümleme p50/p90, reddedilen / iptal / hata sayıları
+
+OFFLINE_ENGINE: 'auto' (faster_whisper > whisper), 'faster_whisper', 'whisper'
+ya da 'paket.modul:fabrika' (fabrika(model, language, threads) → fn(float32 ses) → metin)
+
+Kullanım:
+    python -m modules.offline_recognizer dosya.wav
+"""
+import atexit
+import importlib
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from importlib.util import find_spec
+from multiprocessing import shared_memory
+from typing import Dict, Optional
+
+import speech_recognition as sr
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from config.settings import (
+        LANGUAGE, OFFLINE_ENGINE, OFFLINE_MODEL, OFFLINE_WORKERS, OFFLINE_QUEUE_SIZE,
+        OFFLINE_THREADS, OFFLINE_MAX_SECONDS, OFFLINE_TIMEOUT
+    )
+except ImportError:
+    LANGUAGE = 'tr-TR'
+    OFFLINE_ENGINE = 'auto'
+    OFFLINE_MODEL = 'base'
+    OFFLINE_WORKERS = 1
+    OFFLINE_QUEUE_SIZE = 2
+    OFFLINE_THREADS = 2
+    OFFLINE_MAX_SECONDS = 30
+    OFFLINE_TIMEOUT = 15
+
+logger = logging.getLogger(__name__)
+
+# Modellerin beklediği örnekleme hızı
+MODEL_SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+# Gecikme istatistiği için tutulan son ölçüm sayısı
+STATS_WINDOW = 50
+# İşçi süreçleri ses yakalamanın önüne geçmesin
+WORKER_NICE = 5
+
+
+def resolve_engine(engine: str = OFFLINE_ENGINE) -> Optional[str]:
+    """Kurulu motoru bul ('auto' için ilk bulunan); yoksa None"""
+    if engine == 'auto':
+        for candidate in ('faster_whisper', 'whisper'):
+            if find_spec(candidate) is not None:
+                return candidate
+        return None
+    if ':' in engine:
+        return engine
+    return engine if find_spec(engine) is not None else None
+
+
+OFFLINE_AVAILABLE = NUMPY_AVAILABLE and resolve_engine() is not None
+
+
+class OfflineBusy(sr.RequestError):
+    """Boş yuva yok (kuyruk dolu) ya da hazır işçi yok"""
+
+
+# ----------------------------------------------------------------------
+# İşçi süreci
+# ----------------------------------------------------------------------
+def _load_engine(engine: str, model: str, language: str, threads: int):
+    """Modeli yükle → fn(float32 ses, 16 kHz) → metin"""
+    short_language = language.split('-')[0]
+    if engine == 'faster_whisper':
+        from faster_whisper import WhisperModel
+        whisper_model = WhisperModel(model, device='cpu', compute_type='int8', cpu_threads=threads)
+
+        def transcribe(samples):
+            segments, _ = whisper_model.transcribe(samples, language=short_language, beam_size=1)
+            return ' '.join(segment.text.strip() for segment in segments)
+        return transcribe
+    if engine == 'whisper':
+        import torch
+        import whisper
+        torch.set_num_threads(threads)
+        whisper_model = whisper.load_model(model, device='cpu')
+
+        def transcribe(samples):
+            return whisper_model.transcribe(samples, language=short_language, fp16=False)['text']
+        return transcribe
+    module_name, _, factory = engine.partition(':')
+    return getattr(importlib.import_module(module_name), factory)(model, language, threads)
+
+
+def _worker_main(worker_id, engine, model, language, threads, slot_names, cancel_flags, jobs, results):
+    """İşçi: modeli bir kez yükle, yuvalardaki sesi çözümle"""
+    if hasattr(os, 'nice'):
+        try:
+            os.nice(WORKER_NICE)
+        except OSError:
+            pass
+    started = time.monotonic()
+    try:
+        transcribe = _load_engine(engine, model, language, threads)
+        # Isınma: ilk çözümlemedeki tek seferlik hazırlık (bellek, çekirdekler) tur dışında olsun
+        transcribe(np.zeros(MODEL_SAMPLE_RATE, dtype=np.float32))
+    except Exception as e:
+        results.put(('failed', worker_id, f"{type(e).__name__}: {e}"))
+        return
+    results.put(('ready', worker_id, time.monotonic() - started))
+
+    slots = [shared_memory.SharedMemory(name=name) for name in slot_names]
+    try:
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+            job_id, slot, length = job
+            if cancel_flags[slot] == job_id:
+                results.put(('cancelled', worker_id, job_id))
+                continue
+            results.put(('started', worker_id, job_id))
+            samples = np.frombuffer(slots[slot].buf, dtype='<i2', count=length // SAMPLE_WIDTH)
+            samples = samples.astype(np.float32) / 32768.0
+            started = time.monotonic()
+            try:
+                text = transcribe(samples)
+                results.put(('done', worker_id, job_id, text.strip(), time.monotonic() - started))
+            except Exception as e:
+                results.put(('error', worker_id, job_id, f"{type(e).__name__}: {e}", time.monotonic() - started))
+    finally:
+        for shm in slots:
+            shm.close()
+
+
+# ----------------------------------------------------------------------
+# Ana süreç tarafı
+# ----------------------------------------------------------------------
+class _Job:
+    __slots__ = ('job_id', 'slot', 'submitted', 'started', 'worker', 'done', 'text', 'error', 'decode')
+
+    def __init__(self, job_id, slot):
+        self.job_id = job_id
+        self.slot = slot
+        self.submitted = time.monotonic()
+        self.started = None
+        self.worker = None
+        self.done = threading.Event()
+        self.text = None
+        self.error = None
+        self.decode = 0.0
+
+
+class OfflineRecognizer:
+    """Sıcak tutulan yerel model havuzu (ayrı süreçler)"""
+
+    def __init__(self, engine: str = OFFLINE_ENGINE, model: str = OFFLINE_MODEL,
+                 workers: int = OFFLINE_WORKERS, queue_size: int = OFFLINE_QUEUE_SIZE,
+                 threads: int = OFFLINE_THREADS, max_seconds: float = OFFLINE_MAX_SECONDS,
+                 language: str = LANGUAGE):
+        """
+        Args:
+            workers: İşçi süreç sayısı (her biri modelin bir kopyasını tutar)
+            queue_size: Çözümlenmeyi bekleyebilecek en fazla iş (işçilerdekiler hariç)
+            threads: İşçi başına CPU iş parçacığı
+            max_seconds: Tek işteki en uzun ses (yuva boyutu)
+        """
+        self.engine = resolve_engine(engine)
+        if self.engine is None or not NUMPY_AVAILABLE:
+            raise RuntimeError("Yerel tanıma için numpy ve faster-whisper ya da openai-whisper gerekli")
+        self.model = model
+        self.workers = max(1, workers)
+        self.threads = threads
+        self.language = language
+        self.slot_bytes = int(max_seconds * MODEL_SAMPLE_RATE) * SAMPLE_WIDTH
+        self.slot_count = self.workers + max(0, queue_size)
+
+        # spawn: torch/iş parçacıklarıyla fork güvenli değil
+        self._context = multiprocessing.get_context('spawn')
+        self._slots = []
+        self._free = queue.Queue()
+        # Yuva → iptal edilen işin numarası (0 = yok); iş numarasına göre karşılaştırılır
+        self._cancel = self._context.Array('q', self.slot_count, lock=False)
+        self._jobs_queue = self._context.Queue()
+        self._results = self._context.Queue()
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._ready: Dict[int, float] = {}          # işçi → model yükleme süresi
+        self._failures: Dict[int, str] = {}
+        self._jobs: Dict[int, _Job] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._ready_event = threading.Event()
+        self._collector = None
+        self._running = False
+
+        self.counters = {'submitted': 0, 'completed': 0, 'rejected': 0, 'cancelled': 0,
+                         'errors': 0, 'timeouts': 0, 'restarts': 0}
+        self.queue_waits = deque(maxlen=STATS_WINDOW)
+        self.decode_times = deque(maxlen=STATS_WINDOW)
+        self.real_time_factors = deque(maxlen=STATS_WINDOW)
+
+    # ------------------------------------------------------------------
+    # Yaşam döngüsü
+    # ------------------------------------------------------------------
+    def start(self) -> "OfflineRecognizer":
+        """İşçileri başlat (beklemeden döner; modeller arka planda yüklenir)"""
+        if self._running:
+            return self
+        for index in range(self.slot_count):
+            self._slots.append(shared_memory.SharedMemory(create=True, size=self.slot_bytes))
+            self._free.put(index)
+        self._running = True
+        for worker_id in range(self.workers):
+            self._spawn(worker_id)
+        self._collector = threading.Thread(target=self._collect, name='offline-collector', daemon=True)
+        self._collector.start()
+        logger.info(f"🧠 Yerel tanıma ({self.engine}, {self.model}) {self.workers} işçide yükleniyor...")
+        return self
+
+    def _spawn(self, worker_id: int):
+        process = self._context.Process(
+            target=_worker_main, name=f'offline-recognizer-{worker_id}', daemon=True,
+            args=(worker_id, self.engine, self.model, self.language, self.threads,
+                  [shm.name for shm in self._slots], self._cancel, self._jobs_queue, self._results))
+        process.start()
+        self._processes[worker_id] = process
+
+    def stop(self):
+        """İşçileri durdur, paylaşılan belleği bırak"""
+        if not self._running:
+            return
+        self._running = False
+        for _ in self._processes:
+            self._jobs_queue.put(None)
+        for process in self._processes.values():
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+        with self._lock:
+            for job in self._jobs.values():
+                job.error = "durduruldu"
+                job.done.set()
+            self._jobs.clear()
+        for shm in self._slots:
+            shm.close()
+            shm.unlink()
+        self._slots = []
+        logger.info("🧠 Yerel tanıma durduruldu")
+
+    @property
+    def ready(self) -> bool:
+        """En az bir işçi modeli yükledi mi?"""
+        return self._running and bool(self._ready)
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready_event.wait(timeout)
+
+    # ------------------------------------------------------------------
+    # Tanıma
+    # ------------------------------------------------------------------
+    def transcribe(self, pcm: bytes, sample_rate: int = MODEL_SAMPLE_RATE, timeout: float = OFFLINE_TIMEOUT,
+                   cancel: Optional[threading.Event] = None) -> Optional[str]:
+        """
+        16-bit mono PCM → metin
+
+        Args:
+            cancel: Kurulursa iş henüz başlamadıysa iptal edilir, sonuç beklenmez
+
+        Returns:
+            Metin; iptal edildiyse ya da süre dolduysa None
+
+        Raises:
+            OfflineBusy: Hazır işçi ya da boş yuva yok
+            sr.RequestError: İşçi hatası
+        """
+        if not self.ready:
+            raise OfflineBusy("Yerel model henüz yüklenmedi")
+        if sample_rate != MODEL_SAMPLE_RATE:
+            pcm = sr.AudioData(pcm, sample_rate, SAMPLE_WIDTH).get_raw_data(convert_rate=MODEL_SAMPLE_RATE)
+        pcm = pcm[:self.slot_bytes]
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            self.counters['rejected'] += 1
+            raise OfflineBusy("Yerel tanıma kuyruğu dolu")
+
+        self._slots[slot].buf[:len(pcm)] = pcm
+        job = _Job(next(self._ids), slot)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self.counters['submitted'] += 1
+        self._jobs_queue.put((job.job_id, slot, len(pcm)))
+
+        deadline = time.monotonic() + timeout
+        while not job.done.wait(0.05):
+            if (cancel is not None and cancel.is_set()) or time.monotonic() >= deadline:
+                # Başlamadıysa işçi atlar; başladıysa sonuç gelince yuva boşalır.
+                # İş bittiyse (yuva boşalmış olabilir) bayrak yazılmaz
+                self._cancel_job(job)
+                if time.monotonic() >= deadline:
+                    self.counters['timeouts'] += 1
+                return None
+        if job.error:
+            raise sr.RequestError(job.error)
+        self.real_time_factors.append(job.decode / max(0.01, len(pcm) / (MODEL_SAMPLE_RATE * SAMPLE_WIDTH)))
+        return job.text
+
+    def _cancel_job(self, job: _Job):
+        """İşi iptal et (yalnızca hâlâ bekliyorsa; bayrak iş numarasını taşır)"""
+        with self._lock:
+            if job.job_id in self._jobs:
+                self._cancel[job.slot] = job.job_id
+
+    def recognize(self, audio: sr.AudioData, cancel: Optional[threading.Event] = None) -> str:
+        """RecognitionDispatcher uyumlu: anlaşılamazsa sr.UnknownValueError"""
+        pcm = audio.get_raw_data(convert_rate=MODEL_SAMPLE_RATE, convert_width=SAMPLE_WIDTH)
+        text = self.transcribe(pcm, cancel=cancel)
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    # ------------------------------------------------------------------
+    # Sonuç toplayıcı (arka plan iş parçacığı)
+    # ------------------------------------------------------------------
+    def _collect(self):
+        while self._running:
+            try:
+                message = self._results.get(timeout=1.0)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            except (EOFError, OSError):
+                break
+            self._handle(message)
+
+    def _handle(self, message):
+        kind, worker_id = message[0], message[1]
+        if kind == 'ready':
+            self._ready[worker_id] = message[2]
+            self._failures.pop(worker_id, None)
+            logger.info(f"✅ Yerel model hazır (işçi {worker_id}, {message[2]:.1f} sn)")
+            self._ready_event.set()
+            return
+        if kind == 'failed':
+            self._failures[worker_id] = message[2]
+            logger.error(f"❌ Yerel model yüklenemedi (işçi {worker_id}): {message[2]}")
+            return
+
+        with self._lock:
+            job = self._jobs.get(message[2])
+            if job is None:
+                return
+            if kind == 'started':
+                job.started, job.worker = time.monotonic(), worker_id
+                self.queue_waits.append(job.started - job.submitted)
+                return
+            del self._jobs[job.job_id]
+            if kind == 'done':
+                job.text, job.decode = message[3], message[4]
+                self.decode_times.append(job.decode)
+                self.counters['completed'] += 1
+            elif kind == 'error':
+                job.error = message[3]
+                self.counters['errors'] += 1
+            else:
+                self.counters['cancelled'] += 1
+        self._free.put(job.slot)
+        job.done.set()
+
+    def _check_workers(self):
+        """Ölen işçiyi yeniden başlat, üstündeki işi hatayla bitir"""
+        for worker_id, process in list(self._processes.items()):
+            if process.is_alive() or not self._running:
+                continue
+            if worker_id in self._failures:
+                # Model hiç yüklenemediyse sonsuz döngüye girme
+                continue
+            logger.warning(f"⚠️ Yerel tanıma işçisi {worker_id} durdu (kod {process.exitcode}), yeniden başlatılıyor")
+            self._ready.pop(worker_id, None)
+            if not self._ready:
+                self._ready_event.clear()
+            with self._lock:
+                lost = [job for job in self._jobs.values() if job.worker == worker_id]
+                for job in lost:
+                    del self._jobs[job.job_id]
+                    job.error = "işçi süreci durdu"
+                    self.counters['errors'] += 1
+            for job in lost:
+                self._free.put(job.slot)
+                job.done.set()
+            self.counters['restarts'] += 1
+            self._spawn(worker_id)
+
+    # ------------------------------------------------------------------
+    # İstatistik
+    # ------------------------------------------------------------------
+    def health(self) -> dict:
+        def percentiles(values):
+            if not values:
+                return None
+            ordered = sorted(values)
+            return {'p50_ms': round(ordered[len(ordered) // 2] * 1000),
+                    'p90_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))] * 1000)}
+
+        return {
+            'engine': self.engine, 'model': self.model,
+            'workers': self.workers,
+            'alive': sum(1 for p in self._processes.values() if p.is_alive()),
+            'ready': len(self._ready),
+            'load_seconds': {worker: round(seconds, 2) for worker, seconds in self._ready.items()},
+            'failures': dict(self._failures),
+            'busy_slots': self.slot_count - self._free.qsize(),
+            'slots': self.slot_count,
+            **self.counters,
+            'queue_wait': percentiles(self.queue_waits),
+            'decode': percentiles(self.decode_times),
+            'real_time_factor': round(sum(self.real_time_factors) / len(self.real_time_factors), 3)
+            if self.real_time_factors else None,
+        }
+
+
+_offline: Optional[OfflineRecognizer] = None
+_offline_lock = threading.Lock()
+
+
+def get_offline_recognizer() -> Optional[OfflineRecognizer]:
+    """Süreç genelinde paylaşılan havuz (ilk çağrıda başlar); kurulu motor yoksa None"""
+    global _offline
+    if not OFFLINE_AVAILABLE or OFFLINE_WORKERS <= 0:
+        return None
+    with _offline_lock:
+        if _offline is None:
+            _offline = OfflineRecognizer().start()
+            atexit.register(_offline.stop)
+        return _offline
+
+
+# Test
+if __name__ == "__main__":
+    import json
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+
+    if len(sys.argv) < 2:
+        print("Kullanım: python -m modules.offline_recognizer dosya.wav")
+        sys.exit(1)
+
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(sys.argv[1]) as source:
+        audio = recognizer.record(source)
+
+    offline = OfflineRecognizer().start()
+    print("⏳ Model yükleniyor...")
+    offline.wait_ready()
+    for _ in range(3):
+        try:
+            print(f"📝 {offline.recognize(audio)}")
+        except sr.UnknownValueError:
+            print("📝 (anlaşılamadı)")
+    print(json.dumps(offline.health(), indent=2, ensure_ascii=False))
+    offline.stop()
@@ -0,0 +1,365 @@
+"""
+Çoklu Backend Ses Tanıma Dağıtıcısı (hedged requests)
+- Backend'ler sırayla değil, yarışarak çalışır:
+    'sequential': sıradaki backend yalnızca öncekisi başarısız olunca başlar (eski davranış)
+    'hedge':      birincil hemen başlar, RECOGNITION_HEDGE_DELAY (ya da birincinin
+                  son gecikmelerinin p90'ı) içinde sonuç gelmezse ikincisi de başlatılır
+    'race':       hepsi aynı anda başlar
+- İlk kabul edilebilir (boş olmayan) sonuç alınır; başlamamış denemeler iptal
+  edilir, süren denemelerin sonucu atılır (yalnızca istatistik için kullanılır)
+- Backend başına istatistik: gecikme (EWMA, p90), tanıma / anlaşılamadı / hata
+  sayıları, kazanma sayısı ve geç biten sonucun kazananla uyuşma oranı
+- Sıralama uyarlamalı: beklenen maliyet = gecikme / (tanıma oranı × uyuşma oranı);
+  en ucuz backend birincil olur
+- Whisper, kurulu motor varsa kalıcı işçi süreçlerinde çalışır
+  (modules.offline_recognizer): model hazır olana kadar sıraya girmez, kaybeden
+  iş henüz başlamadıysa gerçekten iptal edilir
+
+Kullanım:
+    python -m modules.recognition_dispatcher dosya.wav   # her backend'i dene, istatistikleri yazdır
+"""
+import difflib
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
+from typing import Callable, List, Optional
+
+import speech_recognition as sr
+
+from modules.offline_recognizer import OfflineBusy, get_offline_recognizer
+
+try:
+    from config.settings import (
+        LANGUAGE, SPEECH_BACKEND, SPEECH_BACKENDS, RECOGNITION_MODE,
+        RECOGNITION_HEDGE_DELAY, RECOGNITION_TIMEOUT
+    )
+except ImportError:
+    LANGUAGE = 'tr-TR'
+    SPEECH_BACKEND = 'google'
+    SPEECH_BACKENDS = ['google', 'whisper']
+    RECOGNITION_MODE = 'hedge'
+    RECOGNITION_HEDGE_DELAY = 1.5
+    RECOGNITION_TIMEOUT = 10
+
+logger = logging.getLogger(__name__)
+
+MODES = ('sequential', 'hedge', 'race')
+# Gecikme EWMA katsayısı ve p90 için tutulan son ölçüm sayısı
+LATENCY_ALPHA = 0.3
+LATENCY_WINDOW = 20
+# Bu kadar ölçümden sonra hedge gecikmesi birincinin p90'ından hesaplanır
+HEDGE_MIN_SAMPLES = 5
+# Geç biten sonuç kazananla bu benzerlikteyse "uyuştu" sayılır
+AGREEMENT_RATIO = 0.8
+
+
+class RecognitionBackend:
+    """Tek bir tanıma motoru: recognize(audio) → metin"""
+
+    def __init__(self, name: str, recognize: Callable[..., str], prior_latency: float = 1.0,
+                 cancellable: bool = False, ready: Optional[Callable[[], bool]] = None):
+        """
+        Args:
+            recognize: Ses anlaşılamazsa sr.UnknownValueError, erişim hatasında
+                sr.RequestError (ya da başka bir istisna) fırlatır
+            prior_latency: Ölçüm yokken varsayılan gecikme (sn, sıralama için)
+            cancellable: recognize(audio, cancel) imzası; tur bitince cancel
+                (threading.Event) kurulur
+            ready: False dönerken backend sıraya alınmaz (ör. model yükleniyor)
+        """
+        self.name = name
+        self.recognize = recognize
+        self.cancellable = cancellable
+        self.ready = ready or (lambda: True)
+        self.stats = BackendStats(prior_latency)
+
+    def __repr__(self):
+        return f"RecognitionBackend({self.name})"
+
+
+class BackendStats:
+    """Backend başına gecikme ve doğruluk sayaçları"""
+
+    def __init__(self, prior_latency: float):
+        self.calls = 0
+        self.wins = 0
+        self.recognized = 0
+        self.unknown = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.compared = 0
+        self.agreed = 0
+        # Önsel değer bir ölçüm gibi davranır; ilk gerçek ölçümlerle hızla kayar
+        self.latency = prior_latency
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, outcome: str, latency: float):
+        self.calls += 1
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        if outcome != 'errors':
+            # Hata gecikmesi (bağlantı yok, zaman aşımı) yanıltıcı; oranla cezalandırılır
+            self.latency += LATENCY_ALPHA * (latency - self.latency)
+            self.latencies.append(latency)
+
+    @property
+    def acceptance(self) -> float:
+        """Tanıma oranı (önsel: 1 başarı / 1 deneme)"""
+        return (self.recognized + 1) / (self.calls + 1)
+
+    @property
+    def agreement(self) -> float:
+        """Kazananla uyuşma oranı (önsel: 1 / 1)"""
+        return (self.agreed + 1) / (self.compared + 1)
+
+    @property
+    def cost(self) -> float:
+        """Beklenen maliyet (sn): düşük olan önce denenir"""
+        return self.latency / max(0.05, self.acceptance * self.agreement)
+
+    def p90(self) -> Optional[float]:
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+
+    def to_dict(self) -> dict:
+        return {
+            'calls': self.calls, 'wins': self.wins, 'recognized': self.recognized,
+            'unknown': self.unknown, 'errors': self.errors, 'cancelled': self.cancelled,
+            'latency_ms': round(self.latency * 1000), 'p90_ms': round(self.p90() * 1000) if self.p90() else None,
+            'agreement': round(self.agreement, 3), 'cost': round(self.cost, 3),
+        }
+
+
+class _Round:
+    """Tek bir tanıma turu (backend'ler arası paylaşılan durum)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.winner: Optional[str] = None
+        self.text: Optional[str] = None
+        self.results: "queue.Queue" = queue.Queue()
+
+
+class RecognitionDispatcher:
+    """Birden fazla backend'i yarıştırıp ilk kabul edilebilir sonucu döndür"""
+
+    def __init__(self, backends: List[RecognitionBackend], mode: str = RECOGNITION_MODE,
+                 hedge_delay: float = RECOGNITION_HEDGE_DELAY, timeout: float = RECOGNITION_TIMEOUT,
+                 accept: Optional[Callable[[str], bool]] = None):
+        """
+        Args:
+            backends: Yapılandırılmış sırayla (eşit maliyette bu sıra korunur)
+            mode: 'sequential' | 'hedge' | 'race'
+            hedge_delay: Birincilden ölçüm yokken ikincinin başlatılma gecikmesi (sn)
+            timeout: Tur başına toplam süre sınırı (sn)
+            accept: Sonucu kabul eden fonksiyon (varsayılan: boş olmayan metin)
+        """
+        if mode not in MODES:
+            raise ValueError(f"Geçersiz mod: {mode} ({', '.join(MODES)})")
+        self.backends = list(backends)
+        self.mode = mode
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self.accept = accept or (lambda text: bool(text and text.strip()))
+        self.rounds = {'total': 0, 'recognized': 0, 'hedged': 0, 'timeouts': 0}
+        # Kaybeden denemeler sürerken yeni tur bekletilmesin
+        self._executor = ThreadPoolExecutor(max_workers=max(2, 2 * len(self.backends)),
+                                            thread_name_prefix='recognizer')
+
+    def order(self) -> List[RecognitionBackend]:
+        """Beklenen maliyete göre sıralı backend'ler"""
+        ranked = sorted(enumerate(self.backends), key=lambda item: (item[1].stats.cost, item[0]))
+        return [backend for _, backend in ranked if backend.ready()]
+
+    def _hedge_after(self, backend: RecognitionBackend) -> float:
+        p90 = backend.stats.p90()
+        return min(p90, self.hedge_delay * 2) if p90 is not None else self.hedge_delay
+
+    def recognize(self, audio: sr.AudioData) -> Optional[str]:
+        """
+        Sesi metne çevir
+
+        Returns:
+            İlk kabul edilen sonuç; hiçbiri kabul edilmezse ya da süre dolarsa None
+        """
+        pending = self.order()
+        if not pending:
+            return None
+        self.rounds['total'] += 1
+        current = _Round()
+        started = time.monotonic()
+        deadline = started + self.timeout
+        running = 0
+        next_launch = started
+
+        while True:
+            now = time.monotonic()
+            # Sıradaki backend'i başlatma zamanı geldi mi?
+            if pending and (running == 0 or (self.mode != 'sequential' and now >= next_launch)):
+                backend = pending.pop(0)
+                if running:
+                    self.rounds['hedged'] += 1
+                    logger.debug(f"⏩ {backend.name} yedek olarak başlatıldı ({now - started:.2f} sn)")
+                self._launch(current, backend, audio)
+                running += 1
+                if self.mode == 'race':
+                    next_launch = now
+                else:
+                    next_launch = now + self._hedge_after(backend)
+                continue
+            if running == 0 or now >= deadline:
+                break
+
+            wait = deadline - now
+            if pending and self.mode != 'sequential':
+                wait = min(wait, next_launch - now)
+            try:
+                name, text = current.results.get(timeout=max(0.0, wait))
+            except queue.Empty:
+                continue
+            running -= 1
+            if text is not None:
+                self.rounds['recognized'] += 1
+                logger.debug(f"🏁 {name}: {time.monotonic() - started:.2f} sn")
+                return text
+
+        with current.lock:
+            current.done.set()
+        if running:
+            self.rounds['timeouts'] += 1
+            logger.warning(f"⏱️ Ses tanıma {self.timeout} sn içinde sonuçlanmadı")
+        return None
+
+    def _launch(self, current: _Round, backend: RecognitionBackend, audio: sr.AudioData):
+        future = self._executor.submit(self._run, current, backend, audio)
+        future.add_done_callback(lambda f: f.exception() and logger.error(f"Backend hatası: {f.exception()}"))
+
+    def _run(self, current: _Round, backend: RecognitionBackend, audio: sr.AudioData):
+        """İş parçacığında: backend'i çalıştır, sonucu tura bildir"""
+        if current.done.is_set():
+            # Kuyrukta beklerken tur bitti: hiç başlatma
+            backend.stats.cancelled += 1
+            return
+        started = time.monotonic()
+        text = None
+        try:
+            text = backend.recognize(audio, current.done) if backend.cancellable else backend.recognize(audio)
+            text = text.strip() if isinstance(text, str) else text
+            outcome = 'recognized' if self.accept(text) else 'unknown'
+        except sr.UnknownValueError:
+            outcome = 'unknown'
+        except OfflineBusy as e:
+            # Yuva yok: backend denenmedi sayılır, kabul oranı ve gecikme etkilenmez
+            logger.debug(f"{backend.name} meşgul: {e}")
+            with current.lock:
+                backend.stats.cancelled += 1
+                if not current.done.is_set():
+                    current.results.put((backend.name, None))
+            return
+        except Exception as e:
+            outcome = 'errors'
+            logger.debug(f"{backend.name} hatası: {e}")
+        latency = time.monotonic() - started
+
+        with current.lock:
+            backend.stats.record(outcome, latency)
+            if current.done.is_set():
+                # Kaybeden: sonucu atılır, kazananla karşılaştırılır
+                if outcome == 'recognized' and current.text:
+                    backend.stats.compared += 1
+                    if similarity(text, current.text) >= AGREEMENT_RATIO:
+                        backend.stats.agreed += 1
+                return
+            if outcome == 'recognized':
+                current.done.set()
+                current.winner, current.text = backend.name, text
+                backend.stats.wins += 1
+                current.results.put((backend.name, text))
+            else:
+                current.results.put((backend.name, None))
+
+    def stats(self) -> dict:
+        return {**self.rounds, 'mode': self.mode, 'order': [b.name for b in self.order()],
+                'backends': {b.name: b.stats.to_dict() for b in self.backends}}
+
+    def summary(self) -> str:
+        parts = [f"{b.name} {b.stats.wins}/{b.stats.calls} kazanç, {b.stats.latency * 1000:.0f} ms"
+                 for b in self.order()]
+        return f"{self.rounds['total']} tur ({self.rounds['hedged']} yedekli): " + '; '.join(parts)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+def similarity(a: str, b: str) -> float:
+    """Kelime düzeyinde benzerlik (0-1)"""
+    return difflib.SequenceMatcher(None, a.lower().split(), b.lower().split()).ratio()
+
+
+def build_backends(recognizer: sr.Recognizer, names: Optional[List[str]] = None,
+                   language: str = LANGUAGE) -> List[RecognitionBackend]:
+    """
+    Ayarlardaki backend adlarından backend listesi oluştur
+
+    Kurulu olmayan (whisper paketi yok) backend'ler atlanır. SPEECH_BACKEND
+    listede varsa başa alınır.
+    """
+    names = list(names or SPEECH_BACKENDS)
+    if SPEECH_BACKEND in names:
+        names.remove(SPEECH_BACKEND)
+        names.insert(0, SPEECH_BACKEND)
+
+    backends = []
+    for name in names:
+        if name == 'google':
+            backends.append(RecognitionBackend(
+                'google', lambda audio: recognizer.recognize_google(audio, language=language), prior_latency=1.0))
+        elif name == 'whisper':
+            offline = get_offline_recognizer()
+            if offline is not None:
+                # Kalıcı işçiler: model açılışta yüklenir, sıcak çözümleme
+                backends.append(RecognitionBackend(
+                    'whisper', offline.recognize, prior_latency=1.5, cancellable=True,
+                    ready=lambda: offline.ready))
+                continue
+            if find_spec('whisper') is None:
+                logger.info("ℹ️ Whisper kurulu değil (pip install openai-whisper) - yerel tanıma kapalı")
+                continue
+            # İlk çağrıda model yüklenir (soğuk başlangıç); önsel gecikme buna göre yüksek
+            backends.append(RecognitionBackend(
+                'whisper', lambda audio: recognizer.recognize_whisper(audio, language='turkish'),
+                prior_latency=3.0))
+        else:
+            logger.warning(f"⚠️ Bilinmeyen ses tanıma backend'i: {name}")
+    return backends
+
+
+# Test
+if __name__ == "__main__":
+    import json
+    import sys
+
+    logging.basicConfig(level=logging.DEBUG)
+
+    if len(sys.argv) < 2:
+        print("Kullanım: python -m modules.recognition_dispatcher dosya.wav")
+        sys.exit(1)
+
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(sys.argv[1]) as source:
+        audio = recognizer.record(source)
+
+    dispatcher = RecognitionDispatcher(build_backends(recognizer))
+    for _ in range(3):
+        print(f"📝 {dispatcher.recognize(audio)}")
+    print(json.dumps(dispatcher.stats(), indent=2, ensure_ascii=False))
+    dispatcher.close()
+    offline = get_offline_recognizer()
+    if offline is not None:
+        print(json.dumps(offline.health(), indent=2, ensure_ascii=False))
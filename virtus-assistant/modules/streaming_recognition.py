@@ -0,0 +1,401 @@
+"""
+Akışlı Ses Tanıma (ara ve kesin sonuçlar)
+- Ses, konuşma bitmesini beklemeden yakalandıkça motora verilir
+  (listen_segment(on_audio=...)); motor ara sonuçlar (partial) üretir,
+  konuşma bitince kesin sonuç (final) gelir
+- Sonuçlar callback'lerle (on_partial / on_final) ya da async iterator ile
+  (async for h in session.hypotheses()) alınır; sonraki aşamalar (bağlam
+  hazırlama, arayüz) kesin sonucu beklemeden başlayabilir
+- Motorlar (STREAM_ENGINE):
+    'vosk':    gerçek akışlı yerel motor (VOSK_MODEL_PATH'teki model)
+    'offline': sıcak yerel model havuzu (modules.offline_recognizer); büyüyen
+               ses STREAM_PARTIAL_INTERVAL'de bir yeniden çözümlenir, son ara
+               sonuç konuşmanın tamamını kapsıyorsa kesin sonuç olarak kullanılır
+    'cloud':   herhangi bir recognize(audio) fonksiyonu (varsayılan: backend
+               dağıtıcısı); yalnızca kesin sonuç
+    'paket.modul:Sinif': StreamingEngine alt sınıfı (ör. bulut akış API'si)
+    'auto':    yalnızca vosk (model klasörü varsa); yoksa akış kapalı ve
+               komut tek parça tanınır (SPEECH_BACKENDS dağıtıcısı + ön işleme).
+               Yerel havuzun kesin sonucu bulut backend'lerinin yerine geçtiği
+               için 'offline' ancak açıkça seçilince kullanılır
+
+Kullanım:
+    python -m modules.streaming_recognition dosya.wav
+"""
+import asyncio
+import importlib
+import json
+import logging
+import os
+import threading
+import time
+from importlib.util import find_spec
+from typing import Callable, List, Optional
+
+import speech_recognition as sr
+
+from modules.offline_recognizer import OfflineBusy, get_offline_recognizer
+
+try:
+    from config.settings import STREAM_ENGINE, STREAM_PARTIAL_INTERVAL, VOSK_MODEL_PATH, VAD_HANGOVER_MS
+except ImportError:
+    STREAM_ENGINE = 'auto'
+    STREAM_PARTIAL_INTERVAL = 0.8
+    VOSK_MODEL_PATH = 'data/models/vosk-model-small-tr-0.3'
+    VAD_HANGOVER_MS = 800
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_WIDTH = 2
+
+VOSK_AVAILABLE = find_spec('vosk') is not None and os.path.isdir(VOSK_MODEL_PATH)
+
+
+class Hypothesis:
+    """Ara ya da kesin tanıma sonucu"""
+
+    __slots__ = ('text', 'final', 'audio_seconds', 'at')
+
+    def __init__(self, text: str, final: bool, audio_seconds: float):
+        self.text = text
+        self.final = final
+        self.audio_seconds = audio_seconds   # Sonucun dayandığı ses süresi
+        self.at = time.monotonic()
+
+    def __repr__(self):
+        return f"Hypothesis({'final' if self.final else 'partial'}, {self.text!r})"
+
+
+class StreamingEngine:
+    """
+    Akışlı motor arayüzü
+
+    Her konuşma için: start() → accept(pcm)... → finish(). accept hızlı
+    dönmelidir (yakalama iş parçacığında çağrılır).
+    """
+
+    name = 'base'
+
+    def start(self, sample_rate: int):
+        self.sample_rate = sample_rate
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        """Yeni ses; değişen ara sonuç varsa döndür"""
+        return None
+
+    def finish(self) -> str:
+        """Konuşma bitti: kesin sonuç ('' = anlaşılamadı)"""
+        return ''
+
+    def cancel(self):
+        """Sonuç beklenmiyor (ör. dinleme iptal edildi)"""
+
+
+class VoskEngine(StreamingEngine):
+    """Vosk (Kaldi) ile gerçek akışlı yerel tanıma"""
+
+    name = 'vosk'
+    _model = None
+    _model_lock = threading.Lock()
+
+    def __init__(self, model_path: str = VOSK_MODEL_PATH):
+        import vosk
+        vosk.SetLogLevel(-1)
+        with VoskEngine._model_lock:
+            if VoskEngine._model is None:
+                VoskEngine._model = vosk.Model(model_path)
+        self._vosk = vosk
+        self._recognizer = None
+
+    def start(self, sample_rate: int):
+        super().start(sample_rate)
+        self._recognizer = self._vosk.KaldiRecognizer(VoskEngine._model, sample_rate)
+        self._texts: List[str] = []
+        self._partial = ''
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        if self._recognizer.AcceptWaveform(pcm):
+            # Motor kendi içinde bir cümleyi kesinleştirdi
+            text = json.loads(self._recognizer.Result()).get('text', '')
+            if text:
+                self._texts.append(text)
+            partial = ''
+        else:
+            partial = json.loads(self._recognizer.PartialResult()).get('partial', '')
+        combined = ' '.join(self._texts + ([partial] if partial else []))
+        if combined and combined != self._partial:
+            self._partial = combined
+            return combined
+        return None
+
+    def finish(self) -> str:
+        text = json.loads(self._recognizer.FinalResult()).get('text', '')
+        return ' '.join(self._texts + ([text] if text else []))
+
+
+class OfflinePoolEngine(StreamingEngine):
+    """
+    Sıcak yerel model havuzuyla ara sonuçlar
+
+    Büyüyen ses belirli aralıklarla (aynı anda en fazla bir iş) yeniden
+    çözümlenir. Konuşma bittiğinde son ara sonuç, kuyruktaki sessizlik
+    (VAD bekleme süresi) dışında tüm sesi kapsıyorsa kesin sonuç olur; ses
+    bittikten sonra ayrıca çözümleme beklenmez.
+    """
+
+    name = 'offline'
+
+    def __init__(self, offline=None, interval: float = STREAM_PARTIAL_INTERVAL,
+                 settle_seconds: float = VAD_HANGOVER_MS / 1000):
+        self.offline = offline or get_offline_recognizer()
+        if self.offline is None:
+            raise RuntimeError("Yerel model havuzu yok (faster-whisper / whisper kurulu değil)")
+        self.interval = interval
+        self.settle_seconds = settle_seconds
+
+    def start(self, sample_rate: int):
+        super().start(sample_rate)
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._inflight: Optional[threading.Thread] = None
+        self._requested = 0        # Son ara çözümlemenin kapsadığı bayt
+        self._partial = ('', 0)    # (metin, kapsadığı bayt)
+        self._reported = ''
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        self._buffer.extend(pcm)
+        bytes_per_second = self.sample_rate * SAMPLE_WIDTH
+        idle = self._inflight is None or not self._inflight.is_alive()
+        if idle and len(self._buffer) - self._requested >= self.interval * bytes_per_second:
+            self._requested = len(self._buffer)
+            snapshot = bytes(self._buffer)
+            self._inflight = threading.Thread(target=self._decode, args=(snapshot,), daemon=True)
+            self._inflight.start()
+        with self._lock:
+            text = self._partial[0]
+        if text and text != self._reported:
+            self._reported = text
+            return text
+        return None
+
+    def _decode(self, pcm: bytes):
+        try:
+            text = self.offline.transcribe(pcm, self.sample_rate, cancel=self._cancel)
+        except sr.RequestError as e:
+            # Kuyruk dolu / işçi hatası: bu ara sonuç atlanır
+            logger.debug(f"Ara çözümleme atlandı: {e}")
+            return
+        if text is not None:
+            with self._lock:
+                if len(pcm) >= self._partial[1]:
+                    self._partial = (text, len(pcm))
+
+    def finish(self) -> str:
+        settled = len(self._buffer) - int(self.settle_seconds * self.sample_rate) * SAMPLE_WIDTH
+        if self._inflight is not None and self._inflight.is_alive():
+            if self._requested >= settled:
+                # Süren çözümleme konuşmanın tamamını kapsıyor: onu bekle
+                self._inflight.join()
+            else:
+                self._cancel.set()
+        with self._lock:
+            text, covered = self._partial
+        if text and covered >= settled:
+            return text
+        try:
+            return self.offline.transcribe(bytes(self._buffer), self.sample_rate) or ''
+        except OfflineBusy:
+            return text
+
+    def cancel(self):
+        self._cancel.set()
+
+
+class CloudEngine(StreamingEngine):
+    """Tek parça bulut tanıma (ara sonuç yok); recognize(sr.AudioData) → metin"""
+
+    name = 'cloud'
+
+    def __init__(self, recognize: Callable[[sr.AudioData], Optional[str]]):
+        self.recognize = recognize
+
+    def start(self, sample_rate: int):
+        super().start(sample_rate)
+        self._buffer = bytearray()
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        self._buffer.extend(pcm)
+        return None
+
+    def finish(self) -> str:
+        return self.recognize(sr.AudioData(bytes(self._buffer), self.sample_rate, SAMPLE_WIDTH)) or ''
+
+
+def create_engine(name: str = STREAM_ENGINE,
+                  recognize: Optional[Callable[[sr.AudioData], Optional[str]]] = None) -> Optional[StreamingEngine]:
+    """
+    Ayardaki motoru oluştur
+
+    Args:
+        recognize: 'cloud' motoru için tanıma fonksiyonu
+
+    Returns:
+        Motor; 'auto' için vosk modeli yoksa None (akış kapalı)
+    """
+    try:
+        if name == 'auto':
+            # Yerel havuz (OFFLINE_WORKERS) kurulu olsa da seçilmez: kesin
+            # metni SPEECH_BACKEND'in yerine geçer, yalnızca 'offline' ile açılır
+            return VoskEngine() if VOSK_AVAILABLE else None
+        if name == 'vosk':
+            return VoskEngine()
+        if name == 'offline':
+            return OfflinePoolEngine()
+        if name == 'cloud':
+            return CloudEngine(recognize) if recognize else None
+        if ':' in name:
+            module_name, _, class_name = name.partition(':')
+            return getattr(importlib.import_module(module_name), class_name)()
+        logger.warning(f"⚠️ Bilinmeyen akış motoru: {name}")
+    except Exception as e:
+        logger.error(f"❌ Akış motoru başlatılamadı ({name}): {e}")
+    return None
+
+
+class StreamingSession:
+    """
+    Tek konuşmanın akışlı tanıması
+
+    feed() yakalama sırasında çağrılır; finish() kesin sonucu döndürür.
+    Callback'ler feed/finish'i çağıran iş parçacığında çalışır.
+    """
+
+    def __init__(self, engine: StreamingEngine, sample_rate: int,
+                 on_partial: Optional[Callable[[Hypothesis], None]] = None,
+                 on_final: Optional[Callable[[Hypothesis], None]] = None):
+        self.engine = engine
+        self.sample_rate = sample_rate
+        self.on_partial = on_partial
+        self.on_final = on_final
+        self.audio_bytes = 0
+        self.partials: List[Hypothesis] = []
+        self.final: Optional[Hypothesis] = None
+        self.first_audio = None
+        self.audio_end = None
+        self._listeners: List[Callable[[Hypothesis], None]] = []
+        engine.start(sample_rate)
+
+    @property
+    def audio_seconds(self) -> float:
+        return self.audio_bytes / (self.sample_rate * SAMPLE_WIDTH)
+
+    def feed(self, pcm: bytes):
+        """Yakalanan yeni ses"""
+        if self.first_audio is None:
+            self.first_audio = time.monotonic()
+        self.audio_bytes += len(pcm)
+        try:
+            text = self.engine.accept(pcm)
+        except Exception as e:
+            logger.debug(f"Akış motoru hatası: {e}")
+            return
+        if text:
+            hypothesis = Hypothesis(text, False, self.audio_seconds)
+            self.partials.append(hypothesis)
+            self._emit(hypothesis, self.on_partial)
+
+    def finish(self) -> Optional[str]:
+        """Konuşma bitti: kesin sonucu al (anlaşılamadıysa None)"""
+        self.audio_end = time.monotonic()
+        try:
+            text = self.engine.finish().strip()
+        except Exception as e:
+            logger.warning(f"Akış motoru kesin sonuç hatası: {e}")
+            text = ''
+        self.final = Hypothesis(text, True, self.audio_seconds)
+        self._emit(self.final, self.on_final)
+        return text or None
+
+    def cancel(self):
+        self.engine.cancel()
+        self.final = Hypothesis('', True, self.audio_seconds)
+        self._emit(self.final, None)
+
+    def _emit(self, hypothesis: Hypothesis, callback):
+        if callback is not None:
+            try:
+                callback(hypothesis)
+            except Exception as e:
+                logger.error(f"Akış callback hatası: {e}")
+        for listener in self._listeners:
+            listener(hypothesis)
+
+    async def hypotheses(self):
+        """
+        Ara ve kesin sonuçlar için async iterator (kesin sonuçla biter)
+
+        feed/finish başka bir iş parçacığında çalışırken kullanılır:
+            async for hypothesis in session.hypotheses(): ...
+        """
+        loop = asyncio.get_running_loop()
+        results: asyncio.Queue = asyncio.Queue()
+        listener = lambda hypothesis: loop.call_soon_threadsafe(results.put_nowait, hypothesis)
+        for hypothesis in list(self.partials):
+            results.put_nowait(hypothesis)
+        self._listeners.append(listener)
+        if self.final is not None:
+            results.put_nowait(self.final)
+        try:
+            while True:
+                hypothesis = await results.get()
+                yield hypothesis
+                if hypothesis.final:
+                    return
+        finally:
+            self._listeners.remove(listener)
+
+    def stats(self) -> dict:
+        """İlk ara sonuç (sesin başından) ve kesin sonuç (sesin bitişinden) gecikmeleri"""
+        first_partial = (self.partials[0].at - self.first_audio) if self.partials and self.first_audio else None
+        final = (self.final.at - self.audio_end) if self.final and self.audio_end else None
+        return {
+            'engine': self.engine.name,
+            'audio_seconds': round(self.audio_seconds, 2),
+            'partials': len(self.partials),
+            'first_partial_ms': round(first_partial * 1000) if first_partial is not None else None,
+            'final_latency_ms': round(final * 1000) if final is not None else None,
+        }
+
+
+# Test
+if __name__ == "__main__":
+    import sys
+    import wave
+
+    logging.basicConfig(level=logging.INFO)
+
+    if len(sys.argv) < 2:
+        print("Kullanım: python -m modules.streaming_recognition dosya.wav")
+        sys.exit(1)
+
+    engine = create_engine()
+    if engine is None:
+        print("Yerel akış motoru yok (vosk modeli ya da faster-whisper / whisper gerekli)")
+        sys.exit(1)
+    if isinstance(engine, OfflinePoolEngine):
+        engine.offline.wait_ready()
+
+    with wave.open(sys.argv[1], 'rb') as wav:
+        rate = wav.getframerate()
+        session = StreamingSession(engine, rate,
+                                   on_partial=lambda h: print(f"… {h.audio_seconds:5.1f}s  {h.text}"))
+        chunk = rate // 10
+        while True:
+            data = wav.readframes(chunk)
+            if not data:
+                break
+            session.feed(data)
+            time.sleep(0.1)   # gerçek zamanlı
+    print(f"✅ {session.finish()}")
+    print(session.stats())
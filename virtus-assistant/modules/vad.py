@@ -0,0 +1,349 @@
+"""
+Ses Etkinliği Algılama (VAD) ve Uç Nokta Belirleme
+- NumPy ile çerçeve grupları üzerinde vektörel: enerji (dB), sıfır geçiş oranı
+  (ZCR) ve spektral düzlük
+- Gürültü tabanı sürekli güncellenir: son VAD_NOISE_WINDOW saniyedeki çerçeve
+  enerjilerinin alt yüzdeliği (minimum istatistik); ortam değişince kendiliğinden
+  uyum sağlar, dinleme başına kalibrasyon (adjust_for_ambient_noise) gerekmez
+- Durum makinesi: VAD_MIN_SPEECH_MS art arda konuşma → 'start',
+  VAD_HANGOVER_MS konuşmasız → 'end' olayı
+- listen_segment: veriyolu okuyucusundan tek konuşma parçası (sr.listen yerine)
+- VADListener: veriyolu üzerinde arka planda çalışır, olayları callback'lere iletir
+
+Kullanım:
+    python -m modules.vad [dosya.wav]   # olayları ve CPU süresini yazdır
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from config.settings import (
+        VAD_THRESHOLD_DB, VAD_MIN_SPEECH_MS, VAD_HANGOVER_MS, VAD_PADDING_MS,
+        VAD_NOISE_WINDOW, VAD_NOISE_PERCENTILE, VAD_FLATNESS_MAX, VAD_ZCR_MIN
+    )
+except ImportError:
+    VAD_THRESHOLD_DB = 12.0
+    VAD_MIN_SPEECH_MS = 100
+    VAD_HANGOVER_MS = 800
+    VAD_PADDING_MS = 300
+    VAD_NOISE_WINDOW = 3.0
+    VAD_NOISE_PERCENTILE = 10
+    VAD_FLATNESS_MAX = 0.45
+    VAD_ZCR_MIN = 0.01
+
+from modules.audio_bus import AUDIO_FRAME_MS, AUDIO_SAMPLE_RATE, SAMPLE_WIDTH
+
+logger = logging.getLogger(__name__)
+
+VAD_AVAILABLE = NUMPY_AVAILABLE
+
+# Dijital sessizlikte taban -inf'e inmesin (RMS ~10)
+MIN_FLOOR_DB = 20.0
+# Bir seferde işlenen en fazla çerçeve (taban grup içinde sabit kalır)
+BATCH_FRAMES = 25
+# Canlı akışta en az bu kadar çerçeve birikince işlenir (tek çerçevede çağrı maliyeti baskın)
+MIN_BATCH_FRAMES = 5
+
+
+class VADEvent:
+    """Konuşma başladı / bitti olayı"""
+
+    __slots__ = ('kind', 'frame', 'emitted', 'seconds')
+
+    def __init__(self, kind: str, frame: int, emitted: int, frame_ms: int):
+        self.kind = kind          # 'start' | 'end'
+        self.frame = frame        # Konuşmanın başladığı / bittiği çerçeve
+        self.emitted = emitted    # Olayın kesinleştiği çerçeve (bekleme süresi sonrası)
+        self.seconds = frame * frame_ms / 1000
+
+    def __repr__(self):
+        return f"VADEvent({self.kind}, {self.seconds:.2f}s)"
+
+
+class VoiceActivityDetector:
+    """
+    Çerçeve tabanlı VAD (16-bit mono PCM)
+
+    Bir çerçeve, enerjisi gürültü tabanının `threshold_db` üstündeyse ve
+    gürültüye benzemiyorsa (spektral düzlük düşük ya da enerji çok yüksek)
+    konuşma sayılır; çok düşük ZCR (uğultu, titreşim) elenir.
+    """
+
+    def __init__(self, sample_rate: int = AUDIO_SAMPLE_RATE, frame_ms: int = AUDIO_FRAME_MS,
+                 threshold_db: float = VAD_THRESHOLD_DB, min_speech_ms: int = VAD_MIN_SPEECH_MS,
+                 hangover_ms: int = VAD_HANGOVER_MS, noise_window: float = VAD_NOISE_WINDOW):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("VAD için numpy gerekli: pip install numpy")
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_bytes = self.frame_samples * SAMPLE_WIDTH
+        self.threshold_db = threshold_db
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+
+        self._window = np.hanning(self.frame_samples).astype(np.float32)
+        self._history = deque(maxlen=max(1, int(noise_window * 1000 / frame_ms)))
+        self.noise_floor_db = MIN_FLOOR_DB
+
+        self.frames = 0            # İşlenen toplam çerçeve
+        self.speech_frames = 0
+        self.cpu_time = 0.0
+        self.reset()
+
+    def reset(self):
+        """Konuşma durumunu sıfırla (gürültü tabanı korunur)"""
+        self.in_speech = False
+        self._run = 0
+        self._silence = 0
+
+    @property
+    def energy_threshold(self) -> float:
+        """Eşik, RMS cinsinden (speech_recognition energy_threshold ile aynı birim)"""
+        return 10 ** ((self.noise_floor_db + self.threshold_db) / 20)
+
+    def features(self, samples: 'np.ndarray'):
+        """(çerçeve, örnek) dizisi → enerji dB, ZCR, spektral düzlük"""
+        power = np.mean(samples * samples, axis=1)
+        energy_db = 10 * np.log10(power + 1e-9)
+        signs = np.signbit(samples)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+        spectrum = np.abs(np.fft.rfft(samples * self._window, axis=1))[:, 1:] ** 2 + 1e-9
+        flatness = np.exp(np.mean(np.log(spectrum), axis=1)) / np.mean(spectrum, axis=1)
+        return energy_db, zcr, flatness
+
+    def classify(self, pcm: bytes) -> 'np.ndarray':
+        """Çerçeve başına konuşma kararı (taban güncellenir, durum değişmez)"""
+        count = len(pcm) // self.frame_bytes
+        samples = np.frombuffer(pcm, dtype='<i2', count=count * self.frame_samples)
+        samples = samples.reshape(count, self.frame_samples).astype(np.float32)
+        energy_db, zcr, flatness = self.features(samples)
+
+        if not self._history:
+            # İlk grup: taban kendi alt yüzdeliğinden
+            self.noise_floor_db = max(MIN_FLOOR_DB, float(np.percentile(energy_db, VAD_NOISE_PERCENTILE)))
+        above = energy_db - self.noise_floor_db
+        speech = ((above > self.threshold_db) & (zcr > VAD_ZCR_MIN)
+                  & ((flatness < VAD_FLATNESS_MAX) | (above > 2 * self.threshold_db)))
+
+        self._history.extend(energy_db.tolist())
+        self.noise_floor_db = max(MIN_FLOOR_DB, float(np.percentile(self._history, VAD_NOISE_PERCENTILE)))
+        return speech
+
+    def process(self, pcm: bytes) -> List[VADEvent]:
+        """
+        PCM'i işle (tam çerçeveler), konuşma olaylarını döndür
+
+        Çerçeve numaraları ilk çağrıdan itibaren mutlaktır.
+        """
+        started = time.process_time()
+        events = []
+        for offset in range(0, len(pcm) - self.frame_bytes + 1, BATCH_FRAMES * self.frame_bytes):
+            batch = pcm[offset:offset + BATCH_FRAMES * self.frame_bytes]
+            decisions = self.classify(batch)
+            self.speech_frames += int(decisions.sum())
+            for is_speech in decisions.tolist():
+                frame = self.frames
+                self.frames += 1
+                if not self.in_speech:
+                    self._run = self._run + 1 if is_speech else 0
+                    if self._run >= self.min_speech_frames:
+                        self.in_speech = True
+                        self._silence = 0
+                        events.append(VADEvent('start', frame - self._run + 1, frame, self.frame_ms))
+                elif is_speech:
+                    self._silence = 0
+                else:
+                    self._silence += 1
+                    if self._silence >= self.hangover_frames:
+                        self.in_speech = False
+                        self._run = 0
+                        events.append(VADEvent('end', frame - self._silence + 1, frame, self.frame_ms))
+        self.cpu_time += time.process_time() - started
+        return events
+
+    def stats(self) -> dict:
+        seconds = self.frames * self.frame_ms / 1000
+        return {
+            'seconds': round(seconds, 2),
+            'speech_ratio': round(self.speech_frames / self.frames, 3) if self.frames else 0.0,
+            'noise_floor_db': round(self.noise_floor_db, 1),
+            'cpu_ms_per_audio_s': round(self.cpu_time * 1000 / seconds, 3) if seconds else 0.0,
+        }
+
+
+def listen_segment(reader, vad: VoiceActivityDetector, timeout: Optional[float] = None,
+                   phrase_limit: Optional[float] = None, padding_ms: int = VAD_PADDING_MS,
+                   on_audio: Optional[Callable[[bytes], None]] = None) -> Optional[bytes]:
+    """
+    Okuyucudan bir konuşma parçası al (speech_recognition.listen karşılığı)
+
+    Parça, 'start' olayından `padding_ms` önce başlar ve 'end' olayıyla biter;
+    sonrasındaki ses okuyucuya geri bırakılır (bir sonraki dinleme kaybetmez).
+
+    Args:
+        reader: RingReader (BusMicrophone.reader)
+        timeout: Konuşma başlaması için en fazla beklenecek ses süresi (saniye)
+        phrase_limit: En uzun konuşma süresi (saniye)
+        on_audio: Parçanın yeni eklenen baytlarıyla, yakalandıkça çağrılır
+            (akışlı tanıma konuşma bitmeden başlayabilsin)
+
+    Returns:
+        PCM baytları veya konuşma başlamadan süre dolduysa None
+    """
+    frame_bytes = vad.frame_bytes
+    pad_frames = padding_ms // vad.frame_ms
+    # Başlangıç olayı önceki grupta başlamış bir koşuya dayanabilir
+    idle = deque(maxlen=pad_frames + vad.min_speech_frames + BATCH_FRAMES)
+    segment = None
+    idle_limit = None if timeout is None else int(timeout * 1000 / vad.frame_ms)
+    phrase_frames = None if phrase_limit is None else int(phrase_limit * 1000 / vad.frame_ms)
+    waited = 0
+    delivered = 0
+    vad.reset()
+
+    while True:
+        count = max(MIN_BATCH_FRAMES, min(reader.pending_frames, BATCH_FRAMES))
+        data = reader.read_bytes(count * frame_bytes, timeout=2.0)
+        if data is None:
+            # Kaynak durdu
+            return bytes(segment) if segment else None
+        base = vad.frames
+        events = vad.process(data)
+        frames = [data[i * frame_bytes:(i + 1) * frame_bytes] for i in range(count)]
+
+        if segment is None:
+            start = next((e for e in events if e.kind == 'start'), None)
+            if start is None:
+                idle.extend(frames)
+                waited += count
+                if idle_limit is not None and waited >= idle_limit:
+                    return None
+                continue
+            history = list(idle) + frames
+            first = max(0, start.frame - pad_frames - (base - len(idle)))
+            segment = bytearray(b''.join(history[first:]))
+            segment_start = base - len(idle) + first
+        else:
+            segment.extend(data)
+
+        end = next((e for e in events if e.kind == 'end'), None)
+        limit_reached = phrase_frames is not None and len(segment) // frame_bytes >= phrase_frames
+        if end is not None:
+            # Olaydan sonraki çerçeveler bir sonraki dinlemeye kalsın
+            keep = end.emitted + 1 - segment_start
+            unread = base + count - (end.emitted + 1)
+            reader.position -= unread * frame_bytes
+            del segment[keep * frame_bytes:]
+        elif limit_reached:
+            del segment[phrase_frames * frame_bytes:]
+        if on_audio is not None and len(segment) > delivered:
+            on_audio(bytes(segment[delivered:]))
+            delivered = len(segment)
+        if end is not None or limit_reached:
+            return bytes(segment)
+
+
+class VADListener:
+    """
+    Veriyolu üzerinde sürekli çalışan VAD
+
+    Kendi okuyucusuyla her çerçeveyi işler; 'start' / 'end' olaylarını
+    callback'lere iletir ve son konuşma aralıklarını (saniye) saklar.
+    """
+
+    def __init__(self, bus, on_start: Optional[Callable[[VADEvent], None]] = None,
+                 on_end: Optional[Callable[[VADEvent], None]] = None, name: str = 'vad', **vad_options):
+        self.bus = bus
+        self.on_start = on_start
+        self.on_end = on_end
+        self.vad = VoiceActivityDetector(bus.sample_rate, bus.ring.frame_ms, **vad_options)
+        self.reader = bus.reader(name)
+        # Okuyucunun başladığı an (çerçeve numaralarını veriyolu zamanına çevirmek için)
+        self._origin = self.reader.position // bus.ring.frame_bytes
+        self.segments = deque(maxlen=50)
+        self._start: Optional[VADEvent] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_speech(self) -> bool:
+        return self.vad.in_speech
+
+    def start(self):
+        if self._thread:
+            return self
+        if not self.bus.running:
+            self.bus.start()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='vad', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        frame_bytes = self.vad.frame_bytes
+        while not self._stop.is_set():
+            count = max(MIN_BATCH_FRAMES, min(self.reader.pending_frames, BATCH_FRAMES))
+            data = self.reader.read_bytes(count * frame_bytes, timeout=0.5)
+            if data is None:
+                continue
+            for event in self.vad.process(data):
+                try:
+                    if event.kind == 'start':
+                        self._start = event
+                        if self.on_start:
+                            self.on_start(event)
+                    else:
+                        if self._start:
+                            self.segments.append((self.seconds(self._start), self.seconds(event)))
+                        self._start = None
+                        if self.on_end:
+                            self.on_end(event)
+                except Exception as e:
+                    logger.error(f"VAD callback hatası: {e}")
+
+    def seconds(self, event: VADEvent) -> float:
+        """Olayın veriyolu zamanı (yakalamanın başından beri saniye)"""
+        return (self._origin + event.frame) * self.vad.frame_ms / 1000
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.bus.release(self.reader)
+
+    def stats(self) -> dict:
+        return {**self.vad.stats(), 'segments': len(self.segments), 'reader': self.reader.stats()}
+
+
+# Test
+if __name__ == "__main__":
+    import sys
+    import wave
+
+    from modules.audio_bus import WavFileSource
+
+    logging.basicConfig(level=logging.INFO)
+
+    if len(sys.argv) < 2:
+        print("Kullanım: python -m modules.vad dosya.wav")
+        sys.exit(1)
+
+    with wave.open(sys.argv[1], 'rb') as wav:
+        pcm = WavFileSource.convert(wav.readframes(wav.getnframes()), wav.getnchannels(),
+                                    wav.getsampwidth(), wav.getframerate(), AUDIO_SAMPLE_RATE)
+
+    detector = VoiceActivityDetector()
+    for event in detector.process(pcm):
+        print(f"{event.kind:>5}  {event.seconds:7.2f} sn")
+    print(detector.stats())
@@ -1,28 +1,36 @@
 """
 Wake Word Detection - "Virtus" kelimesini dinler
-Porcupine wake word engine kullanır
+Porcupine wake word engine kullanır; anahtar yoksa SimpleWakeWordDetector
+kayıtlı örneklerle yerel (MFCC + DTW) çalışır
+Ses, paylaşılan yakalama veriyolundan okunur (ayrı mikrofon akışı açılmaz)
 """
 import struct
 import logging
 from config.settings import PORCUPINE_ACCESS_KEY, WAKE_WORD
+from modules.audio_bus import get_audio_bus, SAMPLE_WIDTH
+from modules.keyword_spotter import KWS_AVAILABLE, KeywordSpotter
+from modules.vad import VAD_AVAILABLE, VoiceActivityDetector, listen_segment
 
 logger = logging.getLogger(__name__)
 
-# PyAudio ve Porcupine opsiyonel
+# Porcupine opsiyonel
 try:
-    import pyaudio
     import pvporcupine
     PORCUPINE_AVAILABLE = True
 except ImportError:
     PORCUPINE_AVAILABLE = False
-    logger.warning("PyAudio veya Porcupine bulunamadı - SimpleWakeWordDetector kullanılacak")
+    logger.warning("Porcupine bulunamadı - SimpleWakeWordDetector kullanılacak")
 
 
 class WakeWordDetector:
-    def __init__(self):
+    def __init__(self, bus=None):
+        """
+        Args:
+            bus: Ses veriyolu (varsayılan: paylaşılan mikrofon veriyolu)
+        """
         self.porcupine = None
-        self.audio_stream = None
-        self.pa = None
+        self.bus = bus
+        self.reader = None
         
     def initialize(self):
         """Wake word detector'ı başlat"""
@@ -38,15 +46,11 @@ class WakeWordDetector:
                 keywords=['jarvis']  # Yakın alternatif, sonra custom yapacağız
             )
             
-            self.pa = pyaudio.PyAudio()
-            
-            self.audio_stream = self.pa.open(
-                rate=self.porcupine.sample_rate,
-                channels=1,
-                format=pyaudio.paInt16,
-                input=True,
-                frames_per_buffer=self.porcupine.frame_length
-            )
+            self.bus = self.bus or get_audio_bus()
+            if self.bus.sample_rate != self.porcupine.sample_rate:
+                raise ValueError(f"Porcupine {self.porcupine.sample_rate} Hz bekliyor, "
+                                 f"veriyolu {self.bus.sample_rate} Hz")
+            self.reader = self.bus.reader('porcupine')
             
             logger.info("Wake word detector başlatıldı")
             return True
@@ -58,7 +62,9 @@ class WakeWordDetector:
     def listen(self):
         """Wake word'ü dinle, tespit edildiğinde True döndür"""
         try:
-            pcm = self.audio_stream.read(self.porcupine.frame_length)
+            pcm = self.reader.read_bytes(self.porcupine.frame_length * SAMPLE_WIDTH, timeout=1.0)
+            if pcm is None:
+                return False
             pcm = struct.unpack_from("h" * self.porcupine.frame_length, pcm)
             
             keyword_index = self.porcupine.process(pcm)
@@ -75,10 +81,10 @@ class WakeWordDetector:
     
     def cleanup(self):
         """Kaynakları temizle"""
-        if self.audio_stream:
-            self.audio_stream.close()
-        if self.pa:
-            self.pa.terminate()
+        if self.reader:
+            # Mikrofon paylaşılır: yalnızca okuyucu bırakılır
+            self.bus.release(self.reader)
+            self.reader = None
         if self.porcupine:
             self.porcupine.delete()
         logger.info("Wake word detector kapatıldı")
@@ -87,17 +93,34 @@ class WakeWordDetector:
 # Alternatif: Basit bir keyword spotter (API key gerektirmez)
 class SimpleWakeWordDetector:
     """Basit wake word detection (speech recognition ile)"""
-    def __init__(self):
+    def __init__(self, bus=None):
         import speech_recognition as sr
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        bus = bus or get_audio_bus()
+        self.microphone = bus.microphone('wake_word')
+        # VAD tabanı sürekli güncellenir: her dinlemede ortam ölçümü gerekmez
+        self.vad = VoiceActivityDetector(bus.sample_rate, bus.ring.frame_ms) if VAD_AVAILABLE else None
+        # Kayıtlı örnekler varsa buluta gerek yok
+        self.spotter = KeywordSpotter(sample_rate=bus.sample_rate) if KWS_AVAILABLE else None
         
     def listen(self):
         """Sürekli dinle ve 'virtus' kelimesini ara"""
         try:
             with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=2)
+                if self.vad:
+                    data = listen_segment(source.reader, self.vad, timeout=1, phrase_limit=2)
+                    if data is None:
+                        return False
+                    if self.spotter and self.spotter.ready:
+                        found = self.spotter.detect(data)
+                        if found:
+                            logger.info(f"🎤 Wake word tespit edildi (yerel, skor {self.spotter.last_score:.2f})")
+                        return found
+                    from speech_recognition import AudioData
+                    audio = AudioData(data, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                else:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                    audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=2)
                 
             text = self.recognizer.recognize_google(audio, language='tr-TR').lower()
             
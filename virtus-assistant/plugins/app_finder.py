@@ -3,10 +3,12 @@ Dinamik Uygulama Bulucu - Registry ve Start Menu'den uygulamaları tarar
 """
 import os
 import logging
-import winreg
 import subprocess
 from pathlib import Path
 
+from plugins.fs_walker import ScandirWalker
+from plugins.process_tracker import get_process_tracker
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,6 +18,7 @@ class AppFinder:
     def __init__(self):
         self.app_cache = {}
         self.steam_games = {}
+        self.processes = get_process_tracker()
         self._scan_applications()
     
     def _scan_applications(self):
@@ -36,8 +39,8 @@ class AppFinder:
     def _scan_start_menu(self):
         """Start Menu'deki kısayolları tara"""
         start_menu_paths = [
-            os.path.join(os.environ['APPDATA'], 'Microsoft', 'Windows', 'Start Menu', 'Programs'),
-            os.path.join(os.environ['PROGRAMDATA'], 'Microsoft', 'Windows', 'Start Menu', 'Programs')
+            os.path.join(os.environ[var], 'Microsoft', 'Windows', 'Start Menu', 'Programs')
+            for var in ('APPDATA', 'PROGRAMDATA') if var in os.environ
         ]
         
         for base_path in start_menu_paths:
@@ -147,19 +150,18 @@ class AppFinder:
                 # Steam apps klasörü
                 apps_path = os.path.join(steam_path, 'steamapps', 'common')
                 if os.path.exists(apps_path):
+                    walker = ScandirWalker(max_depth=4)
                     for game_folder in os.listdir(apps_path):
                         game_name = game_folder.lower()
                         game_path = os.path.join(apps_path, game_folder)
                         
                         # Oyun exe'sini bul
-                        for file in os.listdir(game_path):
-                            if file.endswith('.exe') and not file.startswith('Uninstall'):
-                                full_path = os.path.join(game_path, file)
-                                self.steam_games[game_name] = full_path
-                                self.app_cache[game_name] = full_path
-                                break
+                        full_path = walker.find_main_executable(game_path)
+                        if full_path:
+                            self.steam_games[game_name] = full_path
+                            self.app_cache[game_name] = full_path
                     
-                    logger.info(f"🎮 {len(self.steam_games)} Steam oyunu bulundu")
+                    logger.info(f"🎮 {len(self.steam_games)} Steam oyunu bulundu ({walker.summary()})")
                 break
                 
         except Exception as e:
@@ -197,13 +199,14 @@ class AppFinder:
         if not app_path:
             return False
         
+        process = None
         try:
             # .lnk kısayolu
             if app_path.endswith('.lnk'):
                 os.startfile(app_path)
             # Exe dosyası
             elif app_path.endswith('.exe'):
-                subprocess.Popen(app_path)
+                process = subprocess.Popen(app_path)
             # ms-settings: gibi protokoller
             elif ':' in app_path:
                 os.startfile(app_path)
@@ -212,6 +215,8 @@ class AppFinder:
                 os.startfile(app_path)
             
             logger.info(f"✅ {app_name} açıldı")
+            if self.processes and process:
+                self.processes.verify_launch(app_name.lower(), process, (os.path.basename(app_path),))
             return True
             
         except Exception as e:
@@ -232,6 +237,15 @@ class AppFinder:
             else:
                 exe_name = app_path
             
+            if self.processes:
+                # PID ile nazik kapatma, gerekirse zorla (taskkill çalıştırılmaz)
+                closed = self.processes.close(app_name.lower(), (exe_name,))
+                if closed:
+                    logger.info(f"✅ {app_name} kapatıldı")
+                else:
+                    logger.info(f"{app_name} çalışmıyor")
+                return closed > 0
+            
             subprocess.run(['taskkill', '/IM', exe_name, '/F'], 
                          capture_output=True, 
                          timeout=5)
@@ -2,69 +2,618 @@
 Gelişmiş Uygulama Yönetim Sistemi
 - Windows Registry tarama
 - Start Menu tarama
-- Steam, Epic, GOG oyunları
+- Steam, Epic, GOG oyunları (manifestlerden, klasör gezmeden)
+- Linux: XDG .desktop, Flatpak/Snap ve $PATH (platforma göre kaynak seti)
 - Dinamik uygulama bulma
 - Akıllı eşleştirme
+- Paralel ve artımlı tarama (kaynak bazında parmak izi)
+- Arka planda periyodik yenileme
+- İsteğe bağlı klasör izleme (kurulum/kaldırma anında kataloğa yansır)
+- Açılışta ikili anlık görüntü (mmap, hazır indeksler) - katalog boyutundan bağımsız
+- Kullanım ağırlıklı sıralama, sık açılanların hedefi arka planda önceden çözülür
+- Süreç takibi (psutil): açılış arka planda doğrulanır, kapatma PID ile
 """
 import os
 import logging
-import winreg
+import shlex
+import shutil
 import subprocess
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import json
+from collections import OrderedDict
+
+from core.storage import get_storage
+from core.decayed_counter import DecayedTopK
+from plugins.fuzzy_index import FuzzyIndex, normalize
+from plugins.catalog_snapshot import CatalogSnapshot, write_snapshot
+from plugins.fs_walker import ScandirWalker
+from plugins.game_libraries import GameLibraries
+from plugins.fs_watcher import FileSystemWatcher
+from plugins.linux_apps import LinuxApplications, xdg_application_dirs, path_dirs
+from plugins.process_tracker import get_process_tracker
+
+try:
+    import winreg
+except ImportError:
+    # Windows dışı: registry kaynağı boş döner
+    winreg = None
+
+try:
+    from config.settings import APP_CACHE_REFRESH
+except ImportError:
+    APP_CACHE_REFRESH = 3600
+
+try:
+    from config.settings import APP_WATCH_ENABLED, APP_WATCH_DEBOUNCE, APP_WATCH_POLL_INTERVAL
+except ImportError:
+    APP_WATCH_ENABLED = False
+    APP_WATCH_DEBOUNCE = 2.0
+    APP_WATCH_POLL_INTERVAL = 15
+
+try:
+    from config.settings import APP_USAGE_CAPACITY, APP_USAGE_HALF_LIFE_DAYS, APP_PRELOAD_TOP_N
+except ImportError:
+    APP_USAGE_CAPACITY = 200
+    APP_USAGE_HALF_LIFE_DAYS = 14
+    APP_PRELOAD_TOP_N = 10
 
 logger = logging.getLogger(__name__)
 
 
+def _dir_fingerprint(paths, max_depth=0):
+    """Klasör ağacının (yalnızca klasörler) mtime'larından özet çıkar"""
+    digest = hashlib.md5()
+    stack = [(str(p), 0) for p in paths]
+    while stack:
+        path, depth = stack.pop()
+        try:
+            digest.update(f"{path}:{os.stat(path).st_mtime_ns};".encode('utf-8', 'replace'))
+            if depth >= max_depth:
+                continue
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, depth + 1))
+        except OSError:
+            digest.update(f"{path}:-;".encode('utf-8', 'replace'))
+    return digest.hexdigest()
+
+
 class ApplicationMaster:
     """Tüm uygulamaları bulan ve yöneten master sınıf"""
     
-    def __init__(self):
+    # Bulunamayan sorgular için tutulan en fazla kayıt
+    MISS_CACHE_SIZE = 256
+    # Fuzzy eşleşme için en düşük benzerlik
+    FUZZY_THRESHOLD = 0.85
+    # Kısa sorgularda Jaro-Winkler önek ödülü tek başına eşiği aşabilir
+    # ('chrome' ~ 'chroot' ≈ 0.867): bu uzunluğa kadar daha sıkı eşik uygulanır
+    # (sorgu eşleşen ismin tam kelimesiyse eşik aranmaz)
+    SHORT_QUERY_LENGTH = 6
+    SHORT_FUZZY_THRESHOLD = 0.92
+    # Kelime başı eşleşmesi ('spot' -> 'spotify') için en kısa sorgu
+    PREFIX_MIN_LENGTH = 3
+    # Paralel tarama thread sayısı
+    SCAN_WORKERS = 6
+    # Fuzzy sıralamada kullanımın en fazla katkısı ve yarı doygunluk noktası
+    # (yaklaşık bu kadar sönümlenmiş açılışta katkı USAGE_WEIGHT / 2 olur)
+    USAGE_WEIGHT = 0.1
+    USAGE_SATURATION = 3.0
+    # Kullanımla yeniden sıralanacak fuzzy aday sayısı
+    RANK_CANDIDATES = 8
+    # Sorgu -> app_id hatırlanan son başarılı açılışlar
+    RECENT_QUERIES_SIZE = 256
+    
+    # Tarama kaynakları (birleştirme sırası önemli: sonraki kaynak öncekini ezer)
+    # (ad, tarama metodu, parmak izi metodu, mevcut kaydı ezer mi)
+    # Parmak izi None ise kaynak ucuzdur ve her yenilemede yeniden üretilir
+    SCAN_SOURCES = [
+        ('common', '_add_common_applications', None, True),
+        ('start_menu', '_scan_start_menu', '_fingerprint_start_menu', True),
+        ('registry', '_scan_registry', '_fingerprint_registry', True),
+        ('program_files', '_scan_program_files', '_fingerprint_program_files', False),
+        ('steam', '_scan_steam', '_fingerprint_steam', True),
+        ('epic', '_scan_epic_games', '_fingerprint_epic', True),
+        ('gog', '_scan_gog', '_fingerprint_gog', True),
+        ('shortcuts', '_add_shortcuts', None, True),
+    ]
+    
+    # Linux kaynakları: yaygın adlar ('chrome', 'code') kurulu komuta eşlenir;
+    # $PATH en düşük öncelikli, .desktop kayıtları onu ezer
+    LINUX_SCAN_SOURCES = [
+        ('common', '_scan_linux_common', '_fingerprint_path', True),
+        ('path', '_scan_path', '_fingerprint_path', True),
+        ('desktop', '_scan_desktop_entries', '_fingerprint_desktop', True),
+        ('steam', '_scan_steam', '_fingerprint_steam', True),
+        ('shortcuts', '_add_shortcuts', None, True),
+    ]
+    
+    # Tarayıcıların ürettiği kayıtlar değişince artırılır: eski katalog ve
+    # anlık görüntü geçersiz sayılır, ilk açılışta tam tarama yapılır
+    CATALOG_VERSION = 1
+    
+    # Oyun listeleri: platform -> katalogdaki uygulama türü
+    GAME_TYPES = {'steam': 'steam_game', 'epic': 'epic_game', 'gog': 'gog_game'}
+    
+    def __init__(self, storage=None, auto_refresh=True, watch=None, sources=None, catalog_path=None):
+        """
+        Args:
+            storage: Depolama katmanı (varsayılan: paylaşılan örnek)
+            auto_refresh: APP_CACHE_REFRESH aralığıyla arka planda yenile
+            watch: Tarama köklerini izle (varsayılan: APP_WATCH_ENABLED)
+            sources: Tarama kaynakları, SCAN_SOURCES biçiminde
+                (varsayılan: Windows'ta SCAN_SOURCES, diğerlerinde LINUX_SCAN_SOURCES)
+            catalog_path: İkili anlık görüntü dosyası (varsayılan: veritabanının yanında)
+        """
+        if sources is None:
+            sources = self.SCAN_SOURCES if os.name == 'nt' else self.LINUX_SCAN_SOURCES
+        self.scan_sources = list(sources)
+        
         self.app_database = {}
         self.steam_games = {}
         self.epic_games = {}
         self.gog_games = {}
         
-        # Cache dosyası
-        self.cache_file = Path('data/app_cache.json')
+        # İsim/takma ad -> app_id indeksi ve bulunamayan sorgular önbelleği
+        self._alias_index = {}
+        self._miss_cache = OrderedDict()
+        self._fuzzy_index = FuzzyIndex()
+        
+        # Katalog değişimi / okuma kilidi ve tek seferde tek yenileme
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        # Kaynak durumu: ad -> {'fingerprint', 'apps', 'scanned_at', 'shadowed'}
+        # Anlık görüntüden açılışta ilk yenilemeye kadar yüklenmez
+        self._sources = {}
+        # app_id -> katalogdaki kaydın geldiği kaynak (depolamada apps.source)
+        self._origins = {}
+        self._sources_loaded = False
+        self.last_scan = 0.0
+        # Oyun manifestleri ve .desktop dosyaları mtime'a göre önbelleğe alınır
+        self.game_libraries = GameLibraries()
+        self.linux_apps = LinuxApplications()
+        
+        # Kalıcı katalog (SQLite) ve ondan türetilen ikili anlık görüntü
+        self.storage = storage or get_storage()
+        self.catalog_path = Path(catalog_path or Path(self.storage.db_path).with_name('app_catalog.bin'))
+        self._snapshot = None
+        
+        # Açılış sıklığı/yakınlığı (forward decay) ve önceden çözülmüş hedefler
+        self.usage = DecayedTopK(capacity=APP_USAGE_CAPACITY, half_life_days=APP_USAGE_HALF_LIFE_DAYS,
+                                 k=APP_PRELOAD_TOP_N)
+        self._recent_queries = OrderedDict()
+        self._hot = {}
+        self._preload_wanted = threading.Event()
+        self.preload_stats = {'hits': 0, 'misses': 0, 'resolved': 0, 'invalid': 0}
+        # Açılan süreçler (psutil yoksa None: eski taskkill/pkill yolu)
+        self.processes = get_process_tracker()
+        try:
+            self.usage.load(self.storage.get_all('app_usage'))
+        except Exception as e:
+            logger.error(f"Kullanım verisi yükleme hatası: {e}")
         
         # Uygulamaları yükle veya tara
-        if self.cache_file.exists():
-            self._load_cache()
-        else:
-            self.scan_all_applications()
+        self._load_cache()
+        
+        self._stop = threading.Event()
+        self._preloader = threading.Thread(target=self._preload_loop, name='app-preload', daemon=True)
+        self._preloader.start()
+        self._refresher = None
+        if auto_refresh and APP_CACHE_REFRESH > 0:
+            self._refresher = threading.Thread(target=self._refresh_loop, name='app-refresh', daemon=True)
+            self._refresher.start()
+        
+        self._watcher = None
+        if APP_WATCH_ENABLED if watch is None else watch:
+            self.start_watching()
     
     def scan_all_applications(self):
-        """Tüm uygulamaları kapsamlı tara"""
-        logger.info("🔍 Uygulama taraması başlıyor...")
+        """Tüm uygulamaları kapsamlı tara (parmak izlerine bakmadan)"""
+        return self.refresh(force=True)
+    
+    def refresh(self, force=False, sources=None):
+        """
+        Kataloğu yenile
+        
+        Kaynaklar thread havuzunda paralel taranır. Parmak izi değişmeyen
+        kaynaklar yeniden taranmaz, önceki sonuçları kullanılır. Tam taramada
+        yeni katalog ve indeksler hazırlandıktan sonra tek adımda devreye
+        alınır; artımlı yenilemede yalnızca eklenen/silinen/değişen
+        uygulamalar indekse ve depolamaya yansıtılır.
+        
+        Args:
+            force: Tüm kaynakları parmak izine bakmadan tara
+            sources: Yalnızca bu kaynaklara bak (diğerlerinin parmak izi
+                hesaplanmaz, önceki sonuçları kullanılır)
+            
+        Returns:
+            bool: Katalog değiştiyse True
+        """
+        with self._refresh_lock:
+            self._ensure_sources()
+            # Kaynak durumu olmayan (eski sürümden kalan) katalog tam taranır
+            force = force or any(name not in self._sources for name, *_ in self.scan_sources)
+            if force:
+                sources = None
+            logger.info("🔍 Uygulama taraması başlıyor...")
+            started = time.perf_counter()
+            
+            with ThreadPoolExecutor(max_workers=self.SCAN_WORKERS, thread_name_prefix='app-scan') as pool:
+                futures = {
+                    name: pool.submit(self._scan_source, name, scan, fingerprint, force)
+                    for name, scan, fingerprint, _ in self.scan_sources
+                    if sources is None or name in sources
+                }
+                results = {name: future.result() for name, future in futures.items()}
+            
+            rescanned = [name for name, (_, changed) in results.items() if changed]
+            self._sources = {**self._sources, **{name: state for name, (state, _) in results.items()}}
+            if sources is None:
+                self.last_scan = time.time()
+            
+            if not force and not any(
+                    fingerprint and name in rescanned
+                    for name, _, fingerprint, _ in self.scan_sources):
+                logger.info("✅ Uygulama kataloğu güncel")
+                return False
+            
+            apps, origins = self._merge_sources()
+            if force or not self.app_database:
+                self._origins = origins
+                self._install_catalog(apps)
+                self._save_cache()
+            else:
+                upserts, deletes = self._catalog_delta(apps, origins)
+                self._origins = origins
+                self._apply_delta(apps, upserts, deletes)
+                self._save_delta(upserts, deletes)
+                logger.info(f"🔄 Katalog güncellendi: +{len(upserts)} / -{len(deletes)}")
+            
+            logger.info(f"✅ {len(self.app_database)} uygulama bulundu "
+                        f"({', '.join(rescanned)} tarandı, {time.perf_counter() - started:.2f} sn)")
+            logger.info(f"✅ {len(self.steam_games)} Steam oyunu")
+            logger.info(f"✅ {len(self.epic_games)} Epic oyunu")
+            return True
+    
+    def _scan_source(self, name, scan, fingerprint, force):
+        """
+        Tek kaynağı gerekiyorsa tara (havuz thread'inde çalışır)
+        
+        Returns:
+            (kaynak durumu, yeniden tarandı mı)
+        """
+        previous = self._sources.get(name)
+        try:
+            current = getattr(self, fingerprint)() if fingerprint else None
+        except Exception as e:
+            logger.debug(f"Parmak izi hatası ({name}): {e}")
+            current = None
         
-        # 1. Manuel bilinen uygulamalar
-        self._add_common_applications()
+        if not force and previous and fingerprint and current and previous.get('fingerprint') == current:
+            return previous, False
         
-        # 2. Start Menu
-        self._scan_start_menu()
+        try:
+            apps = getattr(self, scan)()
+        except Exception as e:
+            # Hatalı kaynak kataloğu boşaltmasın: önceki sonucu koru
+            logger.warning(f"Tarama hatası ({name}): {e}")
+            return (previous or {'fingerprint': None, 'apps': {}, 'scanned_at': 0}), False
         
-        # 3. Windows Registry
-        self._scan_registry()
+        return {'fingerprint': current, 'apps': apps, 'scanned_at': time.time()}, True
+    
+    def _merge_sources(self):
+        """
+        Kaynak sonuçlarını kaynak sırasıyla tek katalogda birleştir
         
-        # 4. Program Files
-        self._scan_program_files()
+        Depolamaya yalnızca kazanan kayıt (kaynağıyla) yazılır; kaydı başka
+        kaynakça ezilen kaynak 'shadowed' işaretlenir, yeniden açılışta
+        sonucu depolamadan kurulamayacağı için ilk yenilemede yeniden taranır.
         
-        # 5. Gaming platforms
-        self._scan_steam()
-        self._scan_epic_games()
-        self._scan_gog()
+        Returns:
+            (katalog, {app_id: kaynak})
+        """
+        apps, origins = {}, {}
+        for name, _, _, overwrite in self.scan_sources:
+            for app_id, data in self._sources.get(name, {}).get('apps', {}).items():
+                if overwrite or app_id not in apps:
+                    apps[app_id] = data
+                    origins[app_id] = name
+        for name, state in self._sources.items():
+            state['shadowed'] = any(origins.get(app_id) != name for app_id in state.get('apps', {}))
+        return apps, origins
+    
+    def _games_by_platform(self, apps):
+        return {
+            platform: {app_id.split('_', 1)[1]: data['exe']
+                       for app_id, data in apps.items() if data.get('type') == app_type}
+            for platform, app_type in self.GAME_TYPES.items()
+        }
+    
+    def _install_catalog(self, apps):
+        """Yeni kataloğu ve indekslerini hazırla, tek adımda devreye al"""
+        alias_index, fuzzy_index = self._build_indexes(apps)
+        games = self._games_by_platform(apps)
         
-        # 6. Kısayolları ekle
-        self._add_shortcuts()
+        with self._lock:
+            self.app_database = apps
+            self.steam_games = games['steam']
+            self.epic_games = games['epic']
+            self.gog_games = games['gog']
+            self._alias_index = alias_index
+            self._fuzzy_index = fuzzy_index
+            self._catalog_changed()
+            self._release_snapshot()
+    
+    def _install_snapshot(self, snapshot):
+        """mmap'lenmiş kataloğu salt okunur görünüm olarak devreye al (indeks kurulmaz)"""
+        games = snapshot.extras.get('games', {})
+        with self._lock:
+            self._release_snapshot()
+            self._snapshot = snapshot
+            self.app_database = snapshot.apps
+            self.steam_games = games.get('steam', {})
+            self.epic_games = games.get('epic', {})
+            self.gog_games = games.get('gog', {})
+            self._alias_index = snapshot.aliases
+            self._fuzzy_index = snapshot.fuzzy
+            self._catalog_changed()
+    
+    def _release_snapshot(self):
+        """Anlık görüntü artık kullanılmıyorsa mmap'i kapat (Windows'ta dosya değiştirilebilsin)"""
+        if self._snapshot is not None and self.app_database is not self._snapshot.apps:
+            self._snapshot.close()
+            self._snapshot = None
+    
+    def _thaw(self):
+        """
+        Salt okunur anlık görüntüden düzenlenebilir kataloğa geç (ilk değişiklikte)
         
-        logger.info(f"✅ {len(self.app_database)} uygulama bulundu")
-        logger.info(f"✅ {len(self.steam_games)} Steam oyunu")
-        logger.info(f"✅ {len(self.epic_games)} Epic oyunu")
+        Trigram indeksi dosyadan kopyalanır; isimler yeniden indekslenmez.
+        """
+        with self._lock:
+            if self._snapshot is None:
+                return
+            apps = dict(self.app_database.items())
+            self._fuzzy_index = self._fuzzy_index.thaw()
+            self._alias_index = self._build_alias_index(apps)
+            self.app_database = apps
+            self._release_snapshot()
+    
+    def _catalog_delta(self, apps, origins):
+        """
+        Mevcut katalogla yeni katalog arasındaki fark (kaynağı değişen kayıt da yazılır)
         
-        # Cache'e kaydet
-        self._save_cache()
+        Returns:
+            (eklenen/değişen {app_id: data}, silinen [app_id])
+        """
+        current = self.app_database
+        upserts = {app_id: data for app_id, data in apps.items()
+                   if current.get(app_id) != data or self._origins.get(app_id) != origins[app_id]}
+        deletes = [app_id for app_id in current if app_id not in apps]
+        return upserts, deletes
     
+    def _apply_delta(self, apps, upserts, deletes):
+        """
+        Farkı bellekteki kataloğa uygula
+        
+        Fuzzy indeks yerinde güncellenir (pahalı kısım); takma ad indeksi
+        "ilk kayıt kazanır" sırasını korumak için yeniden kurulur.
+        """
+        if not upserts and not deletes:
+            return
+        
+        alias_index = self._build_alias_index(apps)
+        games = self._games_by_platform(apps)
+        
+        with self._lock:
+            if self._snapshot is not None:
+                # Salt okunur indeks kopyalanır, fark kopyaya uygulanır
+                self._fuzzy_index = self._fuzzy_index.thaw()
+            for app_id in list(upserts) + deletes:
+                old = self.app_database.get(app_id)
+                if old:
+                    self._fuzzy_index.remove(app_id, app_id)
+                    for name in old.get('names', []):
+                        self._fuzzy_index.remove(name, app_id)
+            for app_id, data in upserts.items():
+                self._fuzzy_index.add(app_id, app_id)
+                for name in data.get('names', []):
+                    self._fuzzy_index.add(name, app_id)
+            
+            self.app_database = apps
+            self.steam_games = games['steam']
+            self.epic_games = games['epic']
+            self.gog_games = games['gog']
+            self._alias_index = alias_index
+            self._catalog_changed()
+            self._release_snapshot()
+    
+    def _catalog_changed(self):
+        """Katalog değişti: sorgu önbellekleri geçersiz, hedefler yeniden doğrulanır (kilit altında)"""
+        self._miss_cache.clear()
+        self._recent_queries.clear()
+        self._hot = {}
+        self._preload_wanted.set()
+    
+    # ------------------------------------------------------------------
+    # Klasör izleme
+    # ------------------------------------------------------------------
+    def _watch_roots(self):
+        """
+        İzlenecek klasörler: kaynak -> [(klasör, derinlik), ...]
+        
+        Registry izlenmez (periyodik yenileme yakalar).
+        """
+        roots = {
+            'start_menu': lambda: [(p, 8) for p in self._start_menu_paths()],
+            # Yeni kurulum yalnızca kökte klasör ekler
+            'program_files': lambda: [(p, 0) for p in self._program_dirs()],
+            'steam': lambda: [(p, 0) for p in self.game_libraries.steam_manifest_dirs(self._steam_paths())],
+            'epic': lambda: [(self._epic_manifest_dir(), 0)],
+            'gog': lambda: [(self._gog_dir(), 0)],
+            'desktop': lambda: [(p, 1) for p in xdg_application_dirs()],
+            'path': lambda: [(p, 0) for p in path_dirs()],
+        }
+        active = {name for name, *_ in self.scan_sources}
+        result = {}
+        for name, paths in roots.items():
+            if name not in active:
+                continue
+            try:
+                result[name] = [(str(path), depth) for path, depth in paths() if Path(path).is_dir()]
+            except (KeyError, OSError):
+                # Ortam değişkeni yok (Windows dışı) veya klasör okunamıyor
+                result[name] = []
+        return result
+    
+    def start_watching(self):
+        """Tarama köklerini izlemeye başla; değişen kaynaklar artımlı yenilenir"""
+        if self._watcher:
+            return
+        self._watch_map = self._watch_roots()
+        paths = [root for roots in self._watch_map.values() for root in roots]
+        if not paths:
+            logger.debug("İzlenecek uygulama klasörü bulunamadı")
+            return
+        self._watcher = FileSystemWatcher(
+            paths, self._on_fs_changes,
+            debounce=APP_WATCH_DEBOUNCE, poll_interval=APP_WATCH_POLL_INTERVAL
+        ).start()
+    
+    def _on_fs_changes(self, paths):
+        """İzleyici bildirimi: değişen yolları kaynaklara eşle ve yenile"""
+        changed = set()
+        for path in paths:
+            path = os.path.normcase(path)
+            for name, roots in self._watch_map.items():
+                if any(path == os.path.normcase(root) or
+                       path.startswith(os.path.normcase(root) + os.sep) for root, _ in roots):
+                    changed.add(name)
+        if not changed:
+            return
+        logger.debug(f"👁️ Değişiklik: {', '.join(sorted(changed))} ({len(paths)} yol)")
+        try:
+            self.refresh(sources=changed)
+        except Exception as e:
+            logger.error(f"Katalog güncelleme hatası: {e}")
+    
+    def _refresh_loop(self):
+        """APP_CACHE_REFRESH aralığıyla kataloğu yenile"""
+        while True:
+            wait = max(1.0, self.last_scan + APP_CACHE_REFRESH - time.time())
+            if self._stop.wait(wait):
+                return
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Katalog yenileme hatası: {e}")
+                self.last_scan = time.time()
+    
+    def stop(self):
+        """Arka plan yenilemesini, ön çözümlemeyi ve klasör izlemeyi durdur"""
+        self._stop.set()
+        self._preload_wanted.set()
+        if self._watcher:
+            self._watcher.stop()
+            self._watcher = None
+    
+    # ------------------------------------------------------------------
+    # Kaynak parmak izleri (ucuz: yalnızca klasör/anahtar zamanları)
+    # ------------------------------------------------------------------
+    def _start_menu_paths(self):
+        return [
+            Path(os.environ['APPDATA']) / 'Microsoft' / 'Windows' / 'Start Menu' / 'Programs',
+            Path(os.environ['PROGRAMDATA']) / 'Microsoft' / 'Windows' / 'Start Menu' / 'Programs'
+        ]
+    
+    def _program_dirs(self):
+        return [
+            Path(os.environ.get('PROGRAMFILES', 'C:\\Program Files')),
+            Path(os.environ.get('PROGRAMFILES(X86)', 'C:\\Program Files (x86)'))
+        ]
+    
+    def _steam_paths(self):
+        if os.name != 'nt':
+            home = Path.home()
+            return [
+                home / '.steam' / 'steam',
+                home / '.local' / 'share' / 'Steam',
+                home / '.var' / 'app' / 'com.valvesoftware.Steam' / '.local' / 'share' / 'Steam',
+            ]
+        return [
+            Path('C:/Program Files (x86)/Steam'),
+            Path('C:/Program Files/Steam'),
+            Path(os.environ.get('PROGRAMFILES(X86)', '')) / 'Steam',
+        ]
+    
+    def _epic_manifest_dir(self):
+        return Path(os.environ['PROGRAMDATA']) / 'Epic' / 'EpicGamesLauncher' / 'Data' / 'Manifests'
+    
+    def _gog_dir(self):
+        return Path(os.environ['PROGRAMDATA']) / 'GOG.com' / 'Galaxy' / 'storage'
+    
+    def _fingerprint_start_menu(self):
+        # Kısayol eklenip silinince bulunduğu klasörün mtime'ı değişir
+        return _dir_fingerprint(self._start_menu_paths(), max_depth=8)
+    
+    def _fingerprint_registry(self):
+        """Uninstall anahtarlarının son yazma zamanı ve alt anahtar sayısı"""
+        if winreg is None:
+            return None
+        parts = []
+        for hkey in (winreg.HKEY_LOCAL_MACHINE, winreg.HKEY_CURRENT_USER):
+            try:
+                with winreg.OpenKey(hkey, r'SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall') as key:
+                    subkeys, _, last_write = winreg.QueryInfoKey(key)
+                    parts.append(f"{hkey}:{subkeys}:{last_write}")
+            except OSError:
+                parts.append(f"{hkey}:-")
+        return hashlib.md5(';'.join(parts).encode()).hexdigest()
+    
+    def _fingerprint_program_files(self):
+        # Yeni kurulum Program Files altında klasör ekler
+        return _dir_fingerprint(self._program_dirs(), max_depth=1)
+    
+    @staticmethod
+    def _files_fingerprint(directories, prefix='', suffix=''):
+        """Klasörlerdeki eşleşen dosyaların adı, boyutu ve zamanı"""
+        digest = hashlib.md5()
+        for directory in directories:
+            try:
+                with os.scandir(directory) as entries:
+                    files = sorted(
+                        (e.name, e.stat().st_size, e.stat().st_mtime_ns) for e in entries
+                        if e.name.startswith(prefix) and e.name.endswith(suffix)
+                    )
+            except OSError:
+                files = []
+            digest.update(f"{directory}:{files};".encode('utf-8', 'replace'))
+        return digest.hexdigest()
+    
+    def _fingerprint_steam(self):
+        # libraryfolders.vdf de steamapps içinde: yeni kütüphane eklenince değişir
+        dirs = self.game_libraries.steam_manifest_dirs(self._steam_paths())
+        return self._files_fingerprint(dirs, suffix=('.acf', '.vdf'))
+    
+    def _fingerprint_epic(self):
+        return self._files_fingerprint([self._epic_manifest_dir()], suffix='.item')
+    
+    def _fingerprint_gog(self):
+        return self._files_fingerprint([self._gog_dir()], prefix='galaxy-2.0.db')
+    
+    def _fingerprint_desktop(self):
+        # Paket yöneticileri .desktop dosyalarını yeniden adlandırarak yazar: klasör mtime'ı değişir
+        return _dir_fingerprint(xdg_application_dirs(), max_depth=1)
+    
+    def _fingerprint_path(self):
+        return _dir_fingerprint(path_dirs())
+    
+    # ------------------------------------------------------------------
+    # Tarayıcılar (her biri kendi sonucunu döndürür, kataloğa dokunmaz)
+    # ------------------------------------------------------------------
     def _add_common_applications(self):
         """Yaygın uygulamalar - garantili liste"""
         common_apps = {
@@ -146,21 +695,20 @@ class ApplicationMaster:
             'teamviewer': {'exe': 'TeamViewer.exe', 'names': ['teamviewer']},
         }
         
-        for app_id, data in common_apps.items():
-            self.app_database[app_id] = {
+        return {
+            app_id: {
                 'exe': data['exe'],
                 'names': data['names'],
                 'type': 'common'
             }
+            for app_id, data in common_apps.items()
+        }
     
     def _scan_start_menu(self):
         """Start Menu kısayollarını tara"""
-        start_paths = [
-            Path(os.environ['APPDATA']) / 'Microsoft' / 'Windows' / 'Start Menu' / 'Programs',
-            Path(os.environ['PROGRAMDATA']) / 'Microsoft' / 'Windows' / 'Start Menu' / 'Programs'
-        ]
+        apps = {}
         
-        for base_path in start_paths:
+        for base_path in self._start_menu_paths():
             if not base_path.exists():
                 continue
             
@@ -172,14 +720,19 @@ class ApplicationMaster:
                 if any(kw in app_name for kw in skip_keywords):
                     continue
                 
-                self.app_database[app_name] = {
+                apps[app_name] = {
                     'exe': str(lnk_file),
                     'names': [app_name],
                     'type': 'shortcut'
                 }
+        
+        return apps
     
     def _scan_registry(self):
         """Windows Registry'den uygulamaları oku"""
+        apps = {}
+        if winreg is None:
+            return apps
         registry_paths = [
             (winreg.HKEY_LOCAL_MACHINE, r'SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall'),
             (winreg.HKEY_CURRENT_USER, r'SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall'),
@@ -199,7 +752,7 @@ class ApplicationMaster:
                                     install_location = winreg.QueryValueEx(subkey, 'InstallLocation')[0]
                                     if install_location:
                                         app_id = name.lower()
-                                        self.app_database[app_id] = {
+                                        apps[app_id] = {
                                             'exe': install_location,
                                             'names': [app_id],
                                             'type': 'registry'
@@ -210,15 +763,16 @@ class ApplicationMaster:
                             continue
             except Exception as e:
                 logger.debug(f"Registry okuma hatası: {e}")
+        
+        return apps
     
     def _scan_program_files(self):
-        """Program Files klasörlerini tara"""
-        program_dirs = [
-            Path(os.environ.get('PROGRAMFILES', 'C:\\Program Files')),
-            Path(os.environ.get('PROGRAMFILES(X86)', 'C:\\Program Files (x86)'))
-        ]
+        """Program Files klasörlerini tara (önceki kaynaklardaki kayıtları ezmez)"""
+        apps = {}
+        # Ana exe genelde kökte veya bin/ altında: sığ tarama yeterli
+        walker = ScandirWalker(max_depth=2)
         
-        for base_dir in program_dirs:
+        for base_dir in self._program_dirs():
             if not base_dir.exists():
                 continue
             
@@ -226,94 +780,56 @@ class ApplicationMaster:
                 if not app_dir.is_dir():
                     continue
                 
-                # Exe dosyalarını ara
-                for exe_file in app_dir.rglob('*.exe'):
-                    # Ana exe olabilecekleri seç
-                    if exe_file.parent == app_dir or 'bin' in exe_file.parts:
-                        app_name = app_dir.name.lower()
-                        
-                        if app_name not in self.app_database:
-                            self.app_database[app_name] = {
-                                'exe': str(exe_file),
-                                'names': [app_name],
-                                'type': 'program_files'
-                            }
-                        break
-    
-    def _scan_steam(self):
-        """Steam oyunlarını tara"""
-        steam_paths = [
-            Path('C:/Program Files (x86)/Steam'),
-            Path('C:/Program Files/Steam'),
-            Path(os.environ.get('PROGRAMFILES(X86)', '')) / 'Steam',
-        ]
-        
-        for steam_path in steam_paths:
-            if not steam_path.exists():
-                continue
-            
-            steamapps = steam_path / 'steamapps' / 'common'
-            if not steamapps.exists():
-                continue
-            
-            for game_dir in steamapps.iterdir():
-                if not game_dir.is_dir():
+                app_name = app_dir.name.lower()
+                if app_name in apps:
                     continue
                 
-                game_name = game_dir.name.lower()
-                
-                # Exe bul
-                for exe_file in game_dir.rglob('*.exe'):
-                    # Uninstall değilse
-                    if 'unins' not in exe_file.name.lower():
-                        self.steam_games[game_name] = str(exe_file)
-                        self.app_database[f"steam_{game_name}"] = {
-                            'exe': str(exe_file),
-                            'names': [game_name, f"steam {game_name}"],
-                            'type': 'steam_game'
-                        }
-                        break
-            
-            logger.info(f"🎮 {len(self.steam_games)} Steam oyunu bulundu")
-            break
+                # Ana exe'yi bul
+                exe_file = walker.find_main_executable(app_dir)
+                if exe_file:
+                    apps[app_name] = {
+                        'exe': exe_file,
+                        'names': [app_name],
+                        'type': 'program_files'
+                    }
+        
+        logger.debug(f"📂 Program Files: {walker.summary()}")
+        return apps
+    
+    def _scan_steam(self):
+        """Steam oyunlarını tara (tüm kütüphanelerin appmanifest dosyaları)"""
+        apps = self.game_libraries.steam_apps(self._steam_paths())
+        if apps:
+            logger.info(f"🎮 {len(apps)} Steam oyunu bulundu")
+        return apps
     
     def _scan_epic_games(self):
-        """Epic Games oyunlarını tara"""
-        epic_path = Path(os.environ['PROGRAMDATA']) / 'Epic' / 'EpicGamesLauncher' / 'Data' / 'Manifests'
-        
-        if not epic_path.exists():
-            return
-        
-        for manifest_file in epic_path.glob('*.item'):
-            try:
-                import json
-                with open(manifest_file, 'r') as f:
-                    data = json.load(f)
-                    game_name = data.get('DisplayName', '').lower()
-                    install_location = data.get('InstallLocation', '')
-                    
-                    if game_name and install_location:
-                        self.epic_games[game_name] = install_location
-                        self.app_database[f"epic_{game_name}"] = {
-                            'exe': install_location,
-                            'names': [game_name, f"epic {game_name}"],
-                            'type': 'epic_game'
-                        }
-            except:
-                continue
-        
-        if self.epic_games:
-            logger.info(f"🎮 {len(self.epic_games)} Epic oyunu bulundu")
+        """Epic Games oyunlarını tara (LaunchExecutable)"""
+        apps = self.game_libraries.epic_apps(self._epic_manifest_dir())
+        if apps:
+            logger.info(f"🎮 {len(apps)} Epic oyunu bulundu")
+        return apps
     
     def _scan_gog(self):
-        """GOG oyunlarını tara"""
-        gog_path = Path(os.environ['PROGRAMDATA']) / 'GOG.com' / 'Galaxy' / 'storage'
-        
-        if not gog_path.exists():
-            return
-        
-        # GOG tarama mantığı buraya eklenebilir
-        pass
+        """GOG Galaxy oyunlarını tara"""
+        apps = self.game_libraries.gog_apps(self._gog_dir())
+        if apps:
+            logger.info(f"🎮 {len(apps)} GOG oyunu bulundu")
+        return apps
+    
+    def _scan_desktop_entries(self):
+        """XDG .desktop, Flatpak ve Snap uygulamaları"""
+        apps = self.linux_apps.desktop_apps()
+        logger.debug(f"🐧 {len(apps)} .desktop uygulaması")
+        return apps
+    
+    def _scan_linux_common(self):
+        """Yaygın uygulamalar (ActionExecutor ile aynı tablo, yalnızca kurulu komutlar)"""
+        return self.linux_apps.common_apps()
+    
+    def _scan_path(self):
+        """$PATH çalıştırılabilirleri"""
+        return self.linux_apps.path_apps()
     
     def _add_shortcuts(self):
         """Özel kısayollar ekle"""
@@ -327,75 +843,278 @@ class ApplicationMaster:
             'netflix': {'exe': 'https://netflix.com', 'names': ['netflix']},
         }
         
-        for app_id, data in shortcuts.items():
-            self.app_database[app_id] = {
+        return {
+            app_id: {
                 'exe': data['exe'],
                 'names': data['names'],
                 'type': 'web'
             }
+            for app_id, data in shortcuts.items()
+        }
+    
+    # ------------------------------------------------------------------
+    # İndeks ve arama
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _build_alias_index(apps):
+        index = {}
+        for app_id, app_data in apps.items():
+            for name in app_data.get('names', []):
+                # Aynı isim birden fazla uygulamada varsa ilk kayıt kazanır
+                index.setdefault(name.lower(), app_id)
+        return index
+    
+    @classmethod
+    def _build_indexes(cls, apps):
+        """Takma ad ve fuzzy indekslerini katalogdan oluştur"""
+        fuzzy = FuzzyIndex()
+        for app_id, app_data in apps.items():
+            fuzzy.add(app_id, app_id)
+            for name in app_data.get('names', []):
+                fuzzy.add(name, app_id)
+        return cls._build_alias_index(apps), fuzzy
+    
+    def add_application(self, app_id, app_data):
+        """Kataloğa uygulama ekle/güncelle ve indeksi güncel tut"""
+        app_id = app_id.lower()
+        with self._lock:
+            self._thaw()
+            old = self.app_database.get(app_id)
+            if old:
+                for name in old.get('names', []):
+                    self._fuzzy_index.remove(name, app_id)
+                    if self._alias_index.get(name.lower()) == app_id:
+                        del self._alias_index[name.lower()]
+            
+            self.app_database[app_id] = app_data
+            self._fuzzy_index.add(app_id, app_id)
+            for name in app_data.get('names', []):
+                self._alias_index.setdefault(name.lower(), app_id)
+                self._fuzzy_index.add(name, app_id)
+            self._catalog_changed()
     
     def find_application(self, query):
         """
         Uygulamayı akıllı şekilde bul
         
+        Tam ve takma ad eşleşmeleri indeksten O(1) bulunur; fuzzy arama
+        yalnızca kalan sorgular için çalışır, bulunamayan sorgular
+        önbelleğe alınır.
+        
         Args:
             query: Aranacak uygulama adı
             
         Returns:
             dict: Uygulama bilgisi veya None
         """
+        return self._lookup(query)[1]
+    
+    def _lookup(self, query):
+        """find_application ile aynı; (app_id, uygulama bilgisi) veya (None, None) döndürür"""
         query = query.lower().strip()
         
-        # 1. Tam eşleşme
-        if query in self.app_database:
-            return self.app_database[query]
-        
-        # 2. İsim eşleşmesi
-        for app_id, app_data in self.app_database.items():
-            if query in app_data['names']:
-                return app_data
-        
-        # 3. Kısmi eşleşme
-        for app_id, app_data in self.app_database.items():
-            # Query, app isminin içinde mi?
-            if query in app_id:
-                return app_data
+        with self._lock:
+            # Yenileme kataloğu değiştirebilir: aynı nesline ait referanslar
+            database, aliases = self.app_database, self._alias_index
+            
+            # 1. Tam eşleşme
+            if query in database:
+                return query, database[query]
+            
+            # 2. İsim eşleşmesi (indeks)
+            app_id = aliases.get(query)
+            if app_id is not None and app_id in database:
+                return app_id, database[app_id]
             
-            # Query, alternatif isimlerin içinde mi?
-            for name in app_data['names']:
-                if query in name or name in query:
-                    return app_data
+            # Daha önce bulunamadıysa tekrar tarama
+            if query in self._miss_cache:
+                self._miss_cache.move_to_end(query)
+                return None, None
+            
+            # 3. Kelime başı eşleşmesi (kısa sorguda fuzzy eşiği önekleri eler)
+            app_id = self._prefix_match(query)
+            if app_id is not None:
+                return app_id, database[app_id]
+            
+            matches = self.search_applications(query, limit=1)
+            if not matches:
+                self._miss_cache[query] = True
+                if len(self._miss_cache) > self.MISS_CACHE_SIZE:
+                    self._miss_cache.popitem(last=False)
+                return None, None
+            return matches[0][0], database[matches[0][0]]
+    
+    def search_applications(self, query, limit=5):
+        """
+        Sorguya en çok benzeyen uygulamalar
         
-        # 4. Fuzzy matching (benzer isimler)
-        best_match = None
-        best_score = 0
+        Trigram indeksinden aday seçilir, adaylar Jaro-Winkler ile
+        puanlanır; FUZZY_THRESHOLD (kısa sorgularda SHORT_FUZZY_THRESHOLD)
+        altındakiler elenir. Kalan adaylar
+        benzerlik + kullanım katkısıyla sıralanır: sönümlenmiş açılış
+        sayısı (forward decay) hem sıklığı hem yakınlığı yansıtır, böylece
+        benzer isimli uygulamalardan sık ve yakın zamanda açılan öne geçer.
         
-        for app_id, app_data in self.app_database.items():
-            score = self._fuzzy_match(query, app_id)
-            if score > best_score and score > 0.7:
-                best_score = score
-                best_match = app_data
+        Returns:
+            list: [(app_id, skor), ...] (en iyi önce)
+        """
+        with self._lock:
+            results = self._fuzzy_index.search(query, k=max(limit, self.RANK_CANDIDATES),
+                                               threshold=self.FUZZY_THRESHOLD)
+            ranked = [
+                (app_id, score + self._usage_boost(app_id))
+                for app_id, score, name in results
+                if app_id in self.app_database and self._fuzzy_accepts(query, score, name)
+            ]
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return [(app_id, round(score, 4)) for app_id, score in ranked[:limit]]
+    
+    def _prefix_match(self, query):
+        """
+        Bir isim kelimesi sorguyla başlıyorsa o uygulama ('disc' -> 'discord')
         
-        return best_match
+        Tam kelime eşleşmesi önekten öne geçer; eşitlikte kullanım, sonra
+        kısa isim seçilir.
+        """
+        norm = normalize(query)
+        if len(norm) < self.PREFIX_MIN_LENGTH:
+            return None
+        matches = [
+            (app_id, name)
+            for app_id, name in self._fuzzy_index.prefix_search(norm, k=self.RANK_CANDIDATES)
+            if app_id in self.app_database
+        ]
+        if not matches:
+            return None
+        padded_query = f" {norm} "
+        app_id, _ = max(matches, key=lambda match: (padded_query in f" {match[1]} ",
+                                                    self._usage_boost(match[0]), -len(match[1])))
+        return app_id
+    
+    def _fuzzy_accepts(self, query, score, name):
+        """Uzunluğa bağlı eşik: kısa sorguda yalnızca önek benzerliği yetmez"""
+        query = normalize(query)
+        if len(query) > self.SHORT_QUERY_LENGTH or score >= self.SHORT_FUZZY_THRESHOLD:
+            return True
+        # Tam kelime içerme ('chrome' -> 'google chrome') kısa sorguda da geçerli
+        return f" {query} " in f" {name} "
+    
+    def _usage_boost(self, app_id):
+        """Sönümlenmiş açılış sayısının doyan katkısı (0..USAGE_WEIGHT)"""
+        if app_id not in self.usage:
+            return 0.0
+        count = self.usage.count(app_id)
+        return self.USAGE_WEIGHT * count / (count + self.USAGE_SATURATION)
     
-    def _fuzzy_match(self, query, target):
-        """Basit fuzzy matching"""
-        query = query.lower()
-        target = target.lower()
+    # ------------------------------------------------------------------
+    # Kullanım kaydı ve ön çözümleme
+    # ------------------------------------------------------------------
+    def record_launch(self, app_id, query=None):
+        """Başarılı açılışı say; değişen kayıtlar 'app_usage' namespace'ine yazılır"""
+        with self._lock:
+            self.usage.add(app_id)
+            if query:
+                self._recent_queries[query] = app_id
+                self._recent_queries.move_to_end(query)
+                if len(self._recent_queries) > self.RECENT_QUERIES_SIZE:
+                    self._recent_queries.popitem(last=False)
+            # Yeni bir uygulama en sık kullanılanlara girdiyse hedefi önceden çözülsün
+            if app_id not in self._hot and any(key == app_id for key, _ in self.usage.top()):
+                self._preload_wanted.set()
+            upserts, deletes = self.usage.pop_changes()
+        try:
+            self.storage.update_namespace('app_usage', upserts, deletes)
+        except Exception as e:
+            logger.error(f"Kullanım verisi kaydetme hatası: {e}")
+    
+    def import_usage(self, favorite_apps, limit=20):
+        """
+        Hafızadaki favori uygulamalardan (isim -> sayaç) kullanım verisi oluştur
         
-        # Aynıysa
-        if query == target:
-            return 1.0
+        Yalnızca kullanım verisi boşken çalışır (ilk açılış / eski kurulum).
+        """
+        if self.usage:
+            return 0
+        imported = 0
+        for name, count in favorite_apps.top(limit):
+            app_id, _ = self._lookup(name)
+            if app_id and count > 0:
+                self.usage.add(app_id, amount=count)
+                imported += 1
+        if imported:
+            self._preload_wanted.set()
+            try:
+                self.storage.update_namespace('app_usage', *self.usage.pop_changes())
+            except Exception as e:
+                logger.error(f"Kullanım verisi kaydetme hatası: {e}")
+        return imported
+    
+    def _preload_loop(self):
+        """Katalog veya en sık kullanılanlar değişince hedefleri yeniden çöz"""
+        while True:
+            self._preload_wanted.wait()
+            if self._stop.is_set():
+                return
+            self._preload_wanted.clear()
+            try:
+                self._preresolve()
+            except Exception as e:
+                logger.error(f"Ön çözümleme hatası: {e}")
+    
+    def _preresolve(self):
+        """En sık açılan APP_PRELOAD_TOP_N uygulamanın hedefini doğrula"""
+        with self._lock:
+            database = self.app_database
+            candidates = [(app_id, database.get(app_id)) for app_id, _ in self.usage.top()]
+        
+        hot, invalid = {}, []
+        for app_id, app_data in candidates:
+            if not app_data:
+                continue
+            target = self._resolve_target(app_data)
+            if target:
+                hot[app_id] = (app_data, target)
+            else:
+                invalid.append(app_id)
+        
+        with self._lock:
+            # Bu sırada katalog değiştiyse sonuç eskidir: yeni istek zaten bekliyor
+            if self.app_database is database:
+                self._hot = hot
+        self.preload_stats['resolved'] += len(hot)
+        self.preload_stats['invalid'] += len(invalid)
+        if invalid:
+            # Kaldırılmış/taşınmış uygulama: katalog yenilenince düzelir
+            logger.info(f"⚠️ Hedefi bulunamayan sık uygulamalar: {', '.join(invalid)}")
+        logger.debug(f"⚡ {len(hot)} uygulama önceden çözüldü")
+    
+    def _resolve_target(self, app_data):
+        """
+        Başlatma hedefini doğrula ve mümkünse kesinleştir
         
-        # İçeriyorsa
-        if query in target or target in query:
-            return 0.9
+        Returns:
+            str: Başlatılacak hedef veya geçersizse None
+        """
+        exe_path = app_data['exe']
+        if exe_path.startswith('http') or exe_path.startswith('ms-') or '://' in exe_path:
+            return exe_path
         
-        # Karakter benzerliği
-        common_chars = sum(1 for c in query if c in target)
-        similarity = common_chars / max(len(query), len(target))
+        if os.name != 'nt':
+            try:
+                command = shlex.split(exe_path)[0]
+            except (ValueError, IndexError):
+                return None
+            if os.path.isabs(command):
+                return exe_path if os.access(command, os.X_OK) else None
+            return exe_path if shutil.which(command) else None
         
-        return similarity
+        if os.path.isdir(exe_path):
+            # Registry kaydı kurulum klasörünü verir: ana exe bulunur
+            return ScandirWalker(max_depth=2).find_main_executable(exe_path)
+        if os.path.isabs(exe_path):
+            return exe_path if os.path.exists(exe_path) else None
+        # 'chrome.exe' gibi çıplak isimler: PATH'te yoksa da App Paths ile açılabilir
+        return shutil.which(exe_path) or exe_path
     
     def launch_application(self, query):
         """
@@ -404,48 +1123,127 @@ class ApplicationMaster:
         Args:
             query: Uygulama adı
             
+        Sık açılan uygulamaların hedefi arka planda önceden doğrulanır; bu
+        uygulamalar için arama ve dosya sistemi kontrolü atlanır.
+        
         Returns:
             bool: Başarılı ise True
         """
-        app_data = self.find_application(query)
-        
-        if not app_data:
-            logger.warning(f"Uygulama bulunamadı: {query}")
-            return False
+        key = query.lower().strip()
+        with self._lock:
+            app_id = self._recent_queries.get(key, key)
+            if app_id not in self._hot:
+                app_id = self._alias_index.get(key, app_id)
+            hot = self._hot.get(app_id)
         
-        exe_path = app_data['exe']
+        if hot:
+            self.preload_stats['hits'] += 1
+            app_data, exe_path = hot
+        else:
+            self.preload_stats['misses'] += 1
+            app_id, app_data = self._lookup(query)
+            if not app_data:
+                logger.warning(f"Uygulama bulunamadı: {query}")
+                return False
+            exe_path = app_data['exe']
         
+        process = None
         try:
             if exe_path.startswith('http'):
                 # Web URL
                 import webbrowser
                 webbrowser.open(exe_path)
+            elif os.name != 'nt':
+                # Linux: protokoller xdg-open ile, .desktop / $PATH komutları doğrudan
+                if '://' in exe_path:
+                    process = subprocess.Popen(['xdg-open', exe_path], start_new_session=True)
+                else:
+                    process = subprocess.Popen(shlex.split(exe_path), start_new_session=True)
             elif exe_path.endswith('.lnk'):
                 # Kısayol
                 os.startfile(exe_path)
-            elif exe_path.startswith('ms-'):
-                # MS protokol
+            elif exe_path.startswith('ms-') or '://' in exe_path:
+                # MS / oyun platformu protokolü (steam://rungameid/...)
                 os.startfile(exe_path)
             else:
                 # Normal exe
-                subprocess.Popen(exe_path)
+                process = subprocess.Popen(exe_path)
             
             logger.info(f"✅ Başlatıldı: {query}")
+            self.record_launch(app_id, key)
+            if self.processes and not exe_path.startswith('http'):
+                names, under = self._process_match(app_data, exe_path)
+                self.processes.verify_launch(app_id, process, names, under, callback=self._on_launch_verified)
             return True
             
         except Exception as e:
             logger.error(f"Başlatma hatası: {e}")
+            if hot:
+                # Önceden çözülen hedef artık geçersiz: yeniden doğrulansın
+                with self._lock:
+                    self._hot.pop(app_id, None)
+                self._preload_wanted.set()
             return False
     
+    def _on_launch_verified(self, app_id, result):
+        """Açılış doğrulanamadıysa önceden çözülen hedef yeniden doğrulansın"""
+        if result['status'] != 'failed':
+            return
+        with self._lock:
+            dropped = self._hot.pop(app_id, None)
+        if dropped:
+            self._preload_wanted.set()
+    
+    @staticmethod
+    def _process_match(app_data, exe_path):
+        """
+        Uygulamanın sürecini tanımak için (süreç adları, kurulum klasörü)
+        
+        Protokolle açılan oyunlar kurulum klasörüyle, diğerleri exe / komut
+        adıyla eşleşir; kısayol ve Flatpak için ad bilinmez (başlatıcı PID'i kullanılır).
+        """
+        under = app_data.get('install_dir')
+        if '://' in exe_path or exe_path.startswith('ms-') or exe_path.endswith('.lnk'):
+            return (), under
+        if os.name != 'nt':
+            if app_data.get('flatpak'):
+                return (), under
+            try:
+                return (os.path.basename(shlex.split(exe_path)[0]),), under
+            except (ValueError, IndexError):
+                return (), under
+        return (Path(exe_path).name,), under
+    
     def close_application(self, query):
-        """Uygulamayı kapat"""
-        app_data = self.find_application(query)
+        """
+        Uygulamayı kapat
+        
+        psutil varsa Virtus'un açtığı PID'ler (yoksa ada/klasöre göre bulunan
+        süreçler) nazikçe, gerekirse zorla kapatılır; ayrı komut çalıştırılmaz.
+        
+        Returns:
+            bool: En az bir süreç kapatıldıysa True
+        """
+        app_id, app_data = self._lookup(query)
         
         if not app_data:
             return False
         
         exe_path = app_data['exe']
-        exe_name = Path(exe_path).name if not exe_path.startswith('http') else None
+        if self.processes:
+            names, under = self._process_match(app_data, exe_path)
+            closed = self.processes.close(app_id, names, under)
+            if closed:
+                logger.info(f"✅ Kapatıldı: {query} ({closed} süreç)")
+                return True
+            if not app_data.get('flatpak'):
+                logger.info(f"Çalışan süreç yok: {query}")
+                return False
+        
+        # psutil yok / Virtus'un açmadığı Flatpak uygulaması: komutla kapatılır
+        if os.name != 'nt' and '://' not in exe_path:
+            return self._close_linux_application(query, app_data)
+        exe_name = Path(exe_path).name if '://' not in exe_path else None
         
         if not exe_name:
             return False
@@ -458,31 +1256,136 @@ class ApplicationMaster:
         except:
             return False
     
+    def _close_linux_application(self, query, app_data):
+        """Flatpak uygulamasını 'flatpak kill', diğerlerini komut adıyla kapat"""
+        try:
+            if app_data.get('flatpak'):
+                command = ['flatpak', 'kill', app_data['flatpak']]
+            else:
+                command = ['pkill', '-x', os.path.basename(shlex.split(app_data['exe'])[0])[:15]]
+            result = subprocess.run(command, capture_output=True, timeout=5)
+            if result.returncode == 0:
+                logger.info(f"✅ Kapatıldı: {query}")
+            return result.returncode == 0
+        except (OSError, ValueError, IndexError, subprocess.SubprocessError):
+            return False
+    
+    def _games(self):
+        return {'steam': self.steam_games, 'epic': self.epic_games, 'gog': self.gog_games}
+    
+    def _catalog_meta(self):
+        # Nesil her kayıtta değişir: anlık görüntü dosyası yalnızca aynı nesille kullanılır
+        return {'version': self.CATALOG_VERSION, 'generation': time.time_ns(), 'scanned_at': self.last_scan}
+    
     def _save_cache(self):
-        """Cache'e kaydet"""
+        """Kataloğu ve kaynak durumlarını depolamaya kaydet (tek atomik işlem)"""
+        meta = self._catalog_meta()
         try:
-            os.makedirs('data', exist_ok=True)
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'apps': self.app_database,
-                    'steam': self.steam_games,
-                    'epic': self.epic_games
-                }, f, indent=2, ensure_ascii=False)
+            self.storage.save_catalog(self.app_database, self._games(), sources=self._sources,
+                                      catalog_meta=meta, origins=self._origins)
         except Exception as e:
             logger.error(f"Cache kaydetme hatası: {e}")
+            return
+        self._write_snapshot(meta['generation'])
+    
+    def _save_delta(self, upserts, deletes):
+        """
+        Yalnızca değişen uygulamaları depolamaya yaz
+        
+        Fark boşsa nesil değişmez: anlık görüntü geçerli kalır, yeniden yazılmaz.
+        """
+        changed = bool(upserts or deletes)
+        meta = self._catalog_meta() if changed else {'scanned_at': self.last_scan}
+        try:
+            self.storage.update_catalog(upserts, deletes, self._games(), sources=self._sources,
+                                        catalog_meta=meta, origins=self._origins)
+        except Exception as e:
+            logger.error(f"Cache kaydetme hatası: {e}")
+            return
+        if changed:
+            self._write_snapshot(meta['generation'])
+    
+    def _write_snapshot(self, generation):
+        """
+        Kataloğu ve hazır indekslerini ikili dosyaya yaz
+        
+        Hata olursa dosya eski nesilde kalır; sonraki açılış SQLite'tan yükler.
+        """
+        started = time.perf_counter()
+        try:
+            with self._lock:
+                write_snapshot(str(self.catalog_path), self.app_database, self._alias_index,
+                               self._fuzzy_index, self.CATALOG_VERSION, generation,
+                               extras={'games': self._games()})
+            logger.debug(f"💾 Katalog anlık görüntüsü yazıldı ({(time.perf_counter() - started) * 1000:.0f} ms)")
+        except Exception as e:
+            logger.warning(f"Katalog anlık görüntüsü yazılamadı: {e}")
+    
+    def _ensure_sources(self):
+        """
+        Kaynak durumlarını gerektiğinde depolamadan yükle
+        
+        Parmak izleri 'app_sources' namespace'inden, sonuçlar apps
+        tablosundan (kaynak sütununa göre) kurulur. Kaydı ezilen kaynağın
+        sonucu eksik kalacağı için parmak izi atılır: yeniden taranır.
+        """
+        if self._sources_loaded:
+            return
+        try:
+            states = self.storage.get_all('app_sources')
+            by_source = self.storage.load_apps_by_source()
+            for name, state in states.items():
+                state['apps'] = by_source.get(name, {})
+                if state.pop('shadowed', False):
+                    state['fingerprint'] = None
+            self._sources = states
+            self._origins = {app_id: name for name, apps in by_source.items() for app_id in apps}
+        except Exception as e:
+            logger.error(f"Kaynak durumu yükleme hatası: {e}")
+        self._sources_loaded = True
     
     def _load_cache(self):
-        """Cache'den yükle"""
+        """
+        Kataloğu yükle: önce ikili anlık görüntü, olmazsa SQLite, boşsa tara
+        
+        Anlık görüntü yalnızca tarayıcı sürümü ve SQLite'taki katalog nesli
+        tutuyorsa kullanılır; açılış yalnızca dosya başlığını okur. Tarayıcı
+        sürümü değiştiyse kayıtlı katalog güvenilmez, tam tarama yapılır.
+        """
         try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.app_database = data.get('apps', {})
-                self.steam_games = data.get('steam', {})
-                self.epic_games = data.get('epic', {})
-            
-            logger.info(f"✅ Cache yüklendi: {len(self.app_database)} uygulama")
+            meta = self.storage.get_all('app_catalog')
+        except Exception as e:
+            logger.error(f"Cache yükleme hatası: {e}")
+            meta = {}
+        
+        if meta.get('version') != self.CATALOG_VERSION:
+            if meta:
+                logger.info("🔄 Tarayıcı sürümü değişti, katalog yeniden taranıyor")
+            self.scan_all_applications()
+            return
+        
+        # Son taramadan bu yana geçen süre yenileme zamanını belirler
+        self.last_scan = meta.get('scanned_at', 0)
+        try:
+            snapshot = CatalogSnapshot(str(self.catalog_path), self.CATALOG_VERSION, meta.get('generation'))
+        except (OSError, ValueError) as e:
+            logger.debug(f"Anlık görüntü kullanılamıyor: {e}")
+        else:
+            self._install_snapshot(snapshot)
+            logger.info(f"✅ Cache yüklendi: {len(self.app_database)} uygulama (anlık görüntü)")
+            return
+        
+        apps = {}
+        try:
+            apps = self.storage.load_apps()
         except Exception as e:
             logger.error(f"Cache yükleme hatası: {e}")
+        
+        if apps:
+            self._install_catalog(apps)
+            self._write_snapshot(meta.get('generation', 0))
+            logger.info(f"✅ Cache yüklendi: {len(self.app_database)} uygulama")
+        else:
             self.scan_all_applications()
 
 
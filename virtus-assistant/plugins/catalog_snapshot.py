@@ -0,0 +1,481 @@
+"""
+Uygulama Kataloğu Anlık Görüntüsü (ikili, sürümlü, mmap)
+- Kalıcı kaynak SQLite'tır; bu dosya açılışı hızlandıran türetilmiş bir önbellektir
+- Tekrarsız (interned) dize tablosu + ofsetler, uygulama kayıtları kompakt JSON
+- Kimlik ve takma ad indeksleri dosyanın içinde hazır (açık adresli hash tablosu)
+- Fuzzy trigram indeksi de hazır: açılışta yeniden kurulmaz
+- Geçici dosyaya yazılıp os.replace ile atomik olarak değiştirilir
+- Açılış yalnızca başlığı okur; kayıtlar erişildikçe mmap'ten çözülür
+
+Dosya düzeni (little-endian):
+    başlık: magic, biçim sürümü, bölüm sayısı, tarayıcı sürümü, nesil, kayıt sayısı, boyut
+    bölüm tablosu: (ofset, uzunluk) x bölüm sayısı
+    bölümler: dize ofsetleri, dize verisi, uygulamalar, kimlik tablosu, takma ad tablosu,
+              fuzzy kayıtları, trigram tablosu, posting ofsetleri, posting'ler, ekler (JSON)
+
+Kullanım:
+    python -m plugins.catalog_snapshot [kayıt_sayısı ...]   # SQLite yükleme ile karşılaştırma
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+from plugins.fuzzy_index import FuzzyIndex
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'VCAT'
+# Dosya düzeni değişince artırılır (tarayıcı sürümünden bağımsız)
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<4sHHIQII')
+_SECTION = struct.Struct('<II')
+(_STR_OFFSETS, _STR_DATA, _APPS, _ID_TABLE, _ALIAS_TABLE,
+ _FUZZY_ENTRIES, _GRAM_TABLE, _POSTING_OFFSETS, _POSTINGS, _EXTRAS) = range(10)
+_SECTION_COUNT = 10
+
+
+def _hash(data: bytes) -> int:
+    return zlib.crc32(data)
+
+
+def _u32(values) -> bytes:
+    data = array('I', values)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return data.tobytes()
+
+
+class _StringTable:
+    """Yazarken dizeleri tekilleştirir"""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.encoded: List[bytes] = []
+
+    def add(self, text: str) -> int:
+        idx = self.index.get(text)
+        if idx is None:
+            idx = self.index[text] = len(self.encoded)
+            self.encoded.append(text.encode('utf-8'))
+        return idx
+
+    def sections(self) -> Tuple[bytes, bytes]:
+        offsets = [0]
+        for data in self.encoded:
+            offsets.append(offsets[-1] + len(data))
+        return _u32(offsets), b''.join(self.encoded)
+
+
+def _hash_table(keys: List[Tuple[int, bytes, int]]) -> bytes:
+    """
+    Açık adresli (doğrusal yoklama) hash tablosu
+
+    Args:
+        keys: [(dize indeksi, dize baytları, değer), ...]
+
+    Yuva: (dize indeksi + 1, değer); 0 = boş. Doluluk en fazla %50.
+    """
+    capacity = 8
+    while capacity < len(keys) * 2:
+        capacity *= 2
+    slots = [0] * (capacity * 2)
+    mask = capacity - 1
+    for str_idx, data, value in keys:
+        pos = _hash(data) & mask
+        while slots[pos * 2]:
+            pos = (pos + 1) & mask
+        slots[pos * 2] = str_idx + 1
+        slots[pos * 2 + 1] = value
+    return _u32(slots)
+
+
+def write_snapshot(path: str, apps: Dict[str, Dict], aliases: Dict[str, str], fuzzy: FuzzyIndex,
+                   scanner_version: int, generation: int, extras: Optional[Dict] = None):
+    """
+    Kataloğu ve hazır indekslerini ikili dosyaya atomik yaz
+
+    Args:
+        apps: app_id -> uygulama verisi (sıra korunur)
+        aliases: küçük harf isim -> app_id
+        fuzzy: Katalogdan kurulmuş fuzzy indeks
+        scanner_version: Tarayıcılar değişince artan sürüm (uyuşmazsa dosya yok sayılır)
+        generation: SQLite'taki katalog nesli (eski dosyayı tanımak için)
+        extras: JSON'a çevrilebilir küçük ek veri (oyun listeleri vb.)
+    """
+    strings = _StringTable()
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    app_index = {}
+    app_rows = []
+    for app_id, data in apps.items():
+        app_index[app_id] = len(app_index)
+        app_rows += [strings.add(app_id), strings.add(encode(data))]
+
+    def keyed(mapping):
+        rows = []
+        for key, value in mapping:
+            idx = strings.add(key)
+            rows.append((idx, strings.encoded[idx], value))
+        return rows
+
+    id_table = _hash_table(keyed((app_id, idx) for app_id, idx in app_index.items()))
+    alias_table = _hash_table(keyed(
+        (name, app_index[app_id]) for name, app_id in aliases.items() if app_id in app_index
+    ))
+
+    # Fuzzy indeks: silinmiş kayıtlar atlanır, kimlikler sıkıştırılır
+    entry_ids = {}
+    fuzzy_rows = []
+    for old_id, entry in enumerate(fuzzy._entries):
+        if entry is None or entry[1] not in app_index:
+            continue
+        entry_ids[old_id] = len(entry_ids)
+        fuzzy_rows += [strings.add(entry[0]), app_index[entry[1]]]
+
+    # Silinen kayıt yoksa kimlikler aynı kalır: yeniden eşleme gerekmez
+    identity = all(old == new for old, new in entry_ids.items())
+    grams = []
+    posting_offsets = [0]
+    postings = []
+    for gram, ids in fuzzy._postings.items():
+        live = sorted(ids) if identity else sorted(entry_ids[i] for i in ids if i in entry_ids)
+        if not live:
+            continue
+        grams.append((gram, len(grams)))
+        postings += live
+        posting_offsets.append(len(postings))
+    gram_table = _hash_table(keyed(grams))
+
+    str_offsets, str_data = strings.sections()
+    sections = [
+        str_offsets, str_data, _u32(app_rows), id_table, alias_table, _u32(fuzzy_rows),
+        gram_table, _u32(posting_offsets), _u32(postings),
+        json.dumps(extras or {}, ensure_ascii=False).encode('utf-8'),
+    ]
+
+    offset = _HEADER.size + _SECTION.size * len(sections)
+    table = []
+    for data in sections:
+        # u32 dizileri hizalı olsun (memoryview.cast hizasız ofsette de çalışır, ama hızlı değil)
+        offset += -offset % 4
+        table.append((offset, len(data)))
+        offset += len(data)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(sections), scanner_version, generation,
+                          len(apps), offset)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            for entry in table:
+                f.write(_SECTION.pack(*entry))
+            for (start, _), data in zip(table, sections):
+                f.write(b'\0' * (start - f.tell()))
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class CatalogSnapshot:
+    """mmap'lenmiş katalog dosyası; yalnızca okunur"""
+
+    def __init__(self, path: str, scanner_version: int, generation: Optional[int] = None):
+        """
+        Raises:
+            ValueError: Dosya bozuk, başka sürüm veya başka nesil
+            OSError: Dosya açılamadı
+        """
+        if sys.byteorder != 'little':
+            raise ValueError("Yalnızca little-endian sistemler desteklenir")
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open(scanner_version, generation)
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self, scanner_version, generation):
+        buf = self._mmap
+        if len(buf) < _HEADER.size:
+            raise ValueError("Dosya çok kısa")
+        magic, fmt, count, version, gen, app_count, size = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION or count != _SECTION_COUNT:
+            raise ValueError("Tanınmayan biçim")
+        if size != len(buf):
+            raise ValueError("Dosya boyutu uyuşmuyor")
+        if version != scanner_version:
+            raise ValueError(f"Tarayıcı sürümü farklı ({version} != {scanner_version})")
+        if generation is not None and gen != generation:
+            raise ValueError("Katalog nesli farklı")
+        self.generation = gen
+        self.app_count = app_count
+
+        view = memoryview(buf)
+        self._view = view
+        sections = []
+        for i in range(count):
+            start, length = _SECTION.unpack_from(buf, _HEADER.size + i * _SECTION.size)
+            if start + length > size:
+                raise ValueError("Bölüm dosya dışına taşıyor")
+            sections.append(view[start:start + length])
+        self._sections = sections
+
+        u32 = lambda i: sections[i].cast('I')
+        self._str_offsets = u32(_STR_OFFSETS)
+        self._str_data = sections[_STR_DATA]
+        self._apps = u32(_APPS)
+        self._id_table = u32(_ID_TABLE)
+        self._alias_table = u32(_ALIAS_TABLE)
+        self._fuzzy_entries = u32(_FUZZY_ENTRIES)
+        self._gram_table = u32(_GRAM_TABLE)
+        self._posting_offsets = u32(_POSTING_OFFSETS)
+        self._postings = u32(_POSTINGS)
+        self.extras = json.loads(bytes(sections[_EXTRAS]) or b'{}')
+
+        self.apps = SnapshotApps(self)
+        self.aliases = _SnapshotLookup(self, self._alias_table)
+        self.fuzzy = FrozenFuzzyIndex(self)
+
+    def close(self):
+        """mmap'i bırak (Windows'ta dosyanın değiştirilebilmesi için gerekli)"""
+        for name in ('_str_offsets', '_apps', '_id_table', '_alias_table', '_fuzzy_entries',
+                     '_gram_table', '_posting_offsets', '_postings', '_str_data'):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        for view in getattr(self, '_sections', []):
+            view.release()
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+        self._mmap.close()
+
+    # ------------------------------------------------------------------
+    # Düşük seviye erişim
+    # ------------------------------------------------------------------
+    def string_bytes(self, idx: int) -> memoryview:
+        return self._str_data[self._str_offsets[idx]:self._str_offsets[idx + 1]]
+
+    def string(self, idx: int) -> str:
+        return str(self.string_bytes(idx), 'utf-8')
+
+    def lookup(self, table: memoryview, key: str) -> Optional[int]:
+        """Hash tablosunda anahtarın değeri (yoksa None)"""
+        data = key.encode('utf-8')
+        capacity = len(table) // 2
+        pos = _hash(data) & (capacity - 1)
+        while True:
+            str_idx = table[pos * 2]
+            if not str_idx:
+                return None
+            if self.string_bytes(str_idx - 1) == data:
+                return table[pos * 2 + 1]
+            pos = (pos + 1) & (capacity - 1)
+
+    def app_id(self, idx: int) -> str:
+        return self.string(self._apps[idx * 2])
+
+    def app_data(self, idx: int) -> Dict:
+        return json.loads(self.string(self._apps[idx * 2 + 1]))
+
+
+class SnapshotApps(Mapping):
+    """app_id -> uygulama verisi; kayıtlar ilk erişimde çözülüp saklanır"""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self._snapshot = snapshot
+        self._decoded: Dict[int, Dict] = {}
+
+    def _get(self, idx: int) -> Dict:
+        data = self._decoded.get(idx)
+        if data is None:
+            data = self._decoded[idx] = self._snapshot.app_data(idx)
+        return data
+
+    def __getitem__(self, app_id: str) -> Dict:
+        idx = self._snapshot.lookup(self._snapshot._id_table, app_id)
+        if idx is None:
+            raise KeyError(app_id)
+        return self._get(idx)
+
+    def __contains__(self, app_id) -> bool:
+        return isinstance(app_id, str) and self._snapshot.lookup(self._snapshot._id_table, app_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._snapshot.app_id(i) for i in range(self._snapshot.app_count))
+
+    def __len__(self) -> int:
+        return self._snapshot.app_count
+
+    def items(self):
+        return [(self._snapshot.app_id(i), self._get(i)) for i in range(self._snapshot.app_count)]
+
+
+class _SnapshotLookup:
+    """isim -> app_id (takma ad indeksi, dict.get arayüzüyle)"""
+
+    def __init__(self, snapshot: CatalogSnapshot, table: memoryview):
+        self._snapshot = snapshot
+        self._table = table
+
+    def get(self, key: str, default=None):
+        idx = self._snapshot.lookup(self._table, key)
+        return default if idx is None else self._snapshot.app_id(idx)
+
+
+class _Entries:
+    """Fuzzy kayıt kimliği -> (normalize isim, app_id)"""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self._snapshot = snapshot
+
+    def __getitem__(self, entry_id: int) -> Tuple[str, Hashable]:
+        rows = self._snapshot._fuzzy_entries
+        return self._snapshot.string(rows[entry_id * 2]), self._snapshot.app_id(rows[entry_id * 2 + 1])
+
+    def __len__(self) -> int:
+        return len(self._snapshot._fuzzy_entries) // 2
+
+
+class _Postings:
+    """trigram -> kayıt kimlikleri (mmap dilimi, kopyalanmaz)"""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self._snapshot = snapshot
+
+    def get(self, gram: str, default=()):
+        snapshot = self._snapshot
+        idx = snapshot.lookup(snapshot._gram_table, gram)
+        if idx is None:
+            return default
+        return snapshot._postings[snapshot._posting_offsets[idx]:snapshot._posting_offsets[idx + 1]]
+
+    def __len__(self) -> int:
+        return len(self._snapshot._posting_offsets) - 1
+
+    def items(self) -> Iterator[Tuple[str, memoryview]]:
+        snapshot = self._snapshot
+        table, offsets = snapshot._gram_table, snapshot._posting_offsets
+        for pos in range(0, len(table), 2):
+            if table[pos]:
+                idx = table[pos + 1]
+                yield snapshot.string(table[pos] - 1), snapshot._postings[offsets[idx]:offsets[idx + 1]]
+
+
+class FrozenFuzzyIndex(FuzzyIndex):
+    """Dosyadaki hazır trigram indeksi üzerinde FuzzyIndex.search; değiştirilemez"""
+
+    def __init__(self, snapshot: CatalogSnapshot, max_candidates: int = 64):
+        self.max_candidates = max_candidates
+        self._entries = _Entries(snapshot)
+        self._postings = _Postings(snapshot)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, name: str, key: Hashable):
+        raise TypeError("Anlık görüntü indeksi salt okunur")
+
+    remove = add
+
+    def clear(self):
+        raise TypeError("Anlık görüntü indeksi salt okunur")
+
+    def thaw(self) -> FuzzyIndex:
+        """Düzenlenebilir kopya; kayıtlar ve trigram listeleri kopyalanır, isimler yeniden indekslenmez"""
+        index = FuzzyIndex(self.max_candidates)
+        index._entries = [self._entries[i] for i in range(len(self._entries))]
+        index._by_name = {entry: i for i, entry in enumerate(index._entries)}
+        for gram, ids in self._postings.items():
+            index._postings[gram] = set(ids)
+        return index
+
+
+def _benchmark(sizes=(1000, 10000, 100000)):
+    """SQLite'tan yükleyip indeks kurma ile anlık görüntü açma karşılaştırması"""
+    import random
+    import shutil
+    import tempfile
+    import time
+
+    from core.storage import Storage
+
+    rng = random.Random(3)
+    words = [''.join(rng.choice('abcdefghijklmnoprstuvyz') for _ in range(rng.randint(3, 9)))
+             for _ in range(4000)]
+    workdir = tempfile.mkdtemp(prefix='virtus_snap_')
+    try:
+        for size in sizes:
+            apps = {}
+            while len(apps) < size:
+                name = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 3)))
+                apps[name] = {'exe': f"C:\\Program Files\\{name}\\{name}.exe", 'names': [name],
+                              'type': 'program_files'}
+            fuzzy = FuzzyIndex()
+            aliases = {}
+            for app_id, data in apps.items():
+                fuzzy.add(app_id, app_id)
+                for name in data['names']:
+                    aliases.setdefault(name, app_id)
+                    fuzzy.add(name, app_id)
+
+            storage = Storage(os.path.join(workdir, f"{size}.db"), legacy_dir=workdir)
+            storage.save_catalog(apps, {})
+            started = time.perf_counter()
+            loaded = storage.load_apps()
+            rebuilt = FuzzyIndex()
+            for app_id, data in loaded.items():
+                rebuilt.add(app_id, app_id)
+                for name in data['names']:
+                    rebuilt.add(name, app_id)
+            sqlite_ms = (time.perf_counter() - started) * 1000
+            storage.close()
+
+            path = os.path.join(workdir, f"{size}.bin")
+            started = time.perf_counter()
+            write_snapshot(path, apps, aliases, fuzzy, scanner_version=1, generation=1)
+            write_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            snapshot = CatalogSnapshot(path, scanner_version=1, generation=1)
+            open_ms = (time.perf_counter() - started) * 1000
+
+            probes = rng.sample(list(apps), 200)
+            started = time.perf_counter()
+            assert all(snapshot.apps[p]['exe'] == apps[p]['exe'] for p in probes)
+            lookup_us = (time.perf_counter() - started) / len(probes) * 1e6
+
+            query = probes[0][:-1] + 'x'
+            started = time.perf_counter()
+            frozen = snapshot.fuzzy.search(query, k=5)
+            search_ms = (time.perf_counter() - started) * 1000
+            assert [k for k, *_ in frozen] == [k for k, *_ in fuzzy.search(query, k=5)]
+
+            print(f"{size:>7} kayıt: dosya {os.path.getsize(path) / 1024:8.0f} KB | yazma {write_ms:7.1f} ms | "
+                  f"açma {open_ms:5.2f} ms | arama {lookup_us:5.1f} µs | fuzzy {search_ms:5.2f} ms | "
+                  f"SQLite+indeks {sqlite_ms:8.1f} ms")
+            snapshot.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# Test
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sizes = [int(a) for a in sys.argv[1:]] or [1000, 10000, 100000]
+    _benchmark(sizes)
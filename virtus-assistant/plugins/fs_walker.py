@@ -0,0 +1,300 @@
+"""
+Derinlik Sınırlı Klasör Tarayıcı
+- os.scandir tabanlı, katman katman (BFS) tarama
+- Derinlik sınırı ve gereksiz klasör budama (redist, cache, locales...)
+- Ana çalıştırılabilir dosya için sezgisel puanlama, iyi aday bulununca erken çıkış
+- Ziyaret edilen klasör / geçen süre istatistikleri
+
+Kullanım:
+    python -m plugins.fs_walker [oyun_sayısı]   # sentetik ağaçta rglob ile karşılaştırma
+"""
+import os
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Ana exe barındırmayan, genelde çok büyük alt ağaçlar
+PRUNE_DIRS = {
+    '_commonredist', 'redist', 'redistributable', 'redistributables', 'directx', 'vcredist',
+    'dotnet', 'prereqs', 'prerequisites', 'installer', 'installers', 'support', 'uninstall',
+    'logs', 'cache', 'shadercache', 'crashreporter', 'crashpad', 'locales', 'localization',
+    'docs', 'documentation', 'samples', 'examples', 'sdk', 'engine', 'content', 'assets',
+    'data', 'resources', 'movies', 'sounds', 'audio', 'textures', 'maps', 'mods', 'temp',
+    'tmp', 'backup', 'node_modules', '__pycache__', '.git', 'plugins', 'third_party',
+    'thirdparty', 'tools', 'jre', 'python',
+}
+
+# Ana exe olmayan dosyalar: ad bu öneklerle başlar, bir kelimesi listededir ya da
+# bir kelimesi (sondaki sayılar atılarak) bu eklerle biter. Alt dize aranmaz:
+# 'mediaserver', 'texteditor' gibi asıl uygulamalar elenmez
+SKIP_NAME_PREFIXES = (
+    'unins', 'setup', 'install', 'update', 'patch', 'crash', 'redist', 'vcredist', 'vc_redist',
+    'dxsetup', 'prereq', 'cleanup', 'repair', 'diagnos', 'cefprocess', 'createdump',
+)
+SKIP_NAME_WORDS = {
+    'setup', 'install', 'installer', 'uninstall', 'uninstaller', 'update', 'updater', 'patch',
+    'patcher', 'crash', 'report', 'reporter', 'helper', 'redist', 'cleanup', 'repair',
+    'diagnostics', 'benchmark', 'server', 'dedicated', 'editor', 'config', 'notification',
+}
+SKIP_NAME_SUFFIXES = (
+    'setup', 'installer', 'updater', 'patcher', 'crashhandler', 'crashreporter', 'reporter',
+    'helper', 'redist', 'dedicatedserver',
+)
+
+# Ana exe'nin sık bulunduğu alt klasörler
+BIN_DIRS = {'bin', 'bin64', 'binaries', 'win64', 'x64', 'win32', 'x86', 'game', 'app'}
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def _words(text: str) -> set:
+    return set(_WORD.findall(text.lower()))
+
+
+def _is_helper_name(stem: str) -> bool:
+    """Kurulum, güncelleme, hata raporu gibi yardımcı exe adı mı (uzantısız, küçük harf)"""
+    if stem.startswith(SKIP_NAME_PREFIXES):
+        return True
+    for word in _WORD.findall(stem):
+        if word in SKIP_NAME_WORDS or word.rstrip('0123456789').endswith(SKIP_NAME_SUFFIXES):
+            return True
+    return False
+
+
+def _compact(text: str) -> str:
+    """'Counter-Strike 2' -> 'counterstrike2'"""
+    return ''.join(_WORD.findall(text.lower()))
+
+
+class ScandirWalker:
+    """Ana çalıştırılabilir dosyayı bulan, istatistik tutan tarayıcı"""
+
+    def __init__(self, max_depth: int = 3, prune_dirs: Iterable[str] = PRUNE_DIRS,
+                 extensions: Tuple[str, ...] = ('.exe',), good_score: float = 5.0):
+        """
+        Args:
+            max_depth: Kök klasörün altında inilecek en fazla seviye
+            prune_dirs: İçine girilmeyecek klasör adları (küçük harf)
+            extensions: Aday dosya uzantıları
+            good_score: Bu puana ulaşan aday bulununca tarama durur
+        """
+        self.max_depth = max_depth
+        self.prune_dirs = {d.lower() for d in prune_dirs}
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.good_score = good_score
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats: Dict[str, float] = {
+            'roots': 0,            # Taranan kök klasör
+            'dirs_visited': 0,     # Listelenen klasör
+            'dirs_pruned': 0,      # Budanan klasör
+            'files_seen': 0,       # Görülen dosya
+            'candidates': 0,       # Puanlanan aday
+            'early_exits': 0,      # İyi aday sayesinde erken biten tarama
+            'seconds': 0.0,        # Toplam süre
+        }
+
+    # ------------------------------------------------------------------
+    # Puanlama
+    # ------------------------------------------------------------------
+    def score(self, file_name: str, rel_dirs: List[str], hint: str = '', size: int = 0) -> float:
+        """
+        Dosyanın ana exe olma puanı (negatif = aday değil)
+
+        - İsim ipucuyla (klasör/oyun adı) benzerlik
+        - Sığ konum, bin/win64 gibi klasörler
+        - Büyük dosya (ana exe genelde yardımcılardan büyüktür)
+        """
+        stem = os.path.splitext(file_name)[0].lower()
+        if _is_helper_name(stem):
+            return -1.0
+
+        score = 0.0
+        hint_words = _words(hint)
+        if hint_words:
+            score += 4.0 * len(_words(stem) & hint_words) / len(hint_words)
+            compact_stem = _compact(stem)
+            compact_hint = _compact(hint)
+            if compact_stem == compact_hint:
+                score += 5.0
+            elif compact_stem and (compact_stem in compact_hint or compact_hint in compact_stem):
+                score += 3.0
+
+        score -= 1.5 * sum(1 for d in rel_dirs if d.lower() not in BIN_DIRS)
+        score += 1.0 * sum(1 for d in rel_dirs if d.lower() in BIN_DIRS)
+        if size:
+            score += min(3.0, size / (20 * 1024 * 1024))
+        if 'launcher' in stem:
+            score -= 1.0
+        return score
+
+    # ------------------------------------------------------------------
+    # Tarama
+    # ------------------------------------------------------------------
+    def find_main_executable(self, root, hint: Optional[str] = None,
+                             max_depth: Optional[int] = None) -> Optional[str]:
+        """
+        Klasördeki ana çalıştırılabilir dosyayı bul
+
+        Klasör ağacı katman katman gezilir; her katman bittiğinde en iyi
+        aday `good_score` puanını geçtiyse daha derine inilmez.
+
+        Args:
+            root: Uygulama/oyun klasörü
+            hint: İsim ipucu (genelde klasör veya oyun adı)
+            max_depth: Bu tarama için derinlik sınırı
+
+        Returns:
+            En yüksek puanlı dosyanın yolu veya None
+        """
+        started = time.perf_counter()
+        max_depth = self.max_depth if max_depth is None else max_depth
+        hint = hint if hint is not None else os.path.basename(str(root))
+        self.stats['roots'] += 1
+
+        best: Tuple[float, Optional[str]] = (float('-inf'), None)
+        level: List[Tuple[str, List[str]]] = [(str(root), [])]
+        depth = 0
+        try:
+            while level and depth <= max_depth:
+                next_level = []
+                for path, rel_dirs in level:
+                    try:
+                        entries = os.scandir(path)
+                    except OSError:
+                        continue
+                    self.stats['dirs_visited'] += 1
+                    with entries:
+                        for entry in entries:
+                            try:
+                                if entry.is_dir(follow_symlinks=False):
+                                    if entry.name.lower() in self.prune_dirs or entry.name.startswith('.'):
+                                        self.stats['dirs_pruned'] += 1
+                                    elif depth < max_depth:
+                                        next_level.append((entry.path, rel_dirs + [entry.name]))
+                                    continue
+
+                                self.stats['files_seen'] += 1
+                                if not entry.name.lower().endswith(self.extensions):
+                                    continue
+                                # Windows'ta scandir boyutu önbellekten verir (ek sistem çağrısı yok)
+                                size = entry.stat().st_size
+                            except OSError:
+                                continue
+
+                            self.stats['candidates'] += 1
+                            score = self.score(entry.name, rel_dirs, hint, size)
+                            if score >= 0 and score > best[0]:
+                                best = (score, entry.path)
+
+                if best[1] is not None and best[0] >= self.good_score:
+                    self.stats['early_exits'] += 1
+                    break
+                level = next_level
+                depth += 1
+        finally:
+            self.stats['seconds'] += time.perf_counter() - started
+
+        return best[1]
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"{int(s['roots'])} kök, {int(s['dirs_visited'])} klasör "
+                f"({int(s['dirs_pruned'])} budandı), {int(s['files_seen'])} dosya, "
+                f"{s['seconds'] * 1000:.0f} ms")
+
+
+def _make_synthetic_tree(base: str, games: int, seed: int = 7) -> List[Tuple[str, Optional[str]]]:
+    """
+    Gerçekçi oyun/uygulama klasörlerine benzeyen sentetik ağaç oluştur
+
+    Returns:
+        [(kök klasör, beklenen ana exe adı veya None), ...]
+    """
+    import random
+
+    rng = random.Random(seed)
+    roots = []
+    for i in range(games):
+        name = f"Game {i} {rng.choice(['Saga', 'Online', 'Remastered', 'Tactics', 'World'])}"
+        root = os.path.join(base, name)
+        os.makedirs(root)
+
+        # Her 5 klasörden biri exe'siz (araç/veri klasörü, Linux sürümü vb.)
+        expected = None
+        if i % 5:
+            expected = name.replace(' ', '') + '.exe'
+            main_dir = rng.choice(['', os.path.join('bin', 'win64'), os.path.join('Binaries', 'Win64')])
+            os.makedirs(os.path.join(root, main_dir), exist_ok=True)
+            with open(os.path.join(root, main_dir, expected), 'wb') as f:
+                f.write(b'\0' * 64)
+            open(os.path.join(root, 'unins000.exe'), 'wb').close()
+        roots.append((root, expected))
+
+        # Büyük içerik / yeniden dağıtım ağaçları
+        for junk in ('_CommonRedist', 'Content', 'Engine', 'locales', 'Shaders', 'Saved'):
+            for a in range(rng.randint(3, 6)):
+                for b in range(rng.randint(3, 6)):
+                    leaf = os.path.join(root, junk, f"d{a}", f"e{b}")
+                    os.makedirs(leaf, exist_ok=True)
+                    for c in range(rng.randint(2, 5)):
+                        open(os.path.join(leaf, f"f{c}.{'exe' if c == 0 else 'pak'}"), 'wb').close()
+    return roots
+
+
+def _benchmark(games: int = 150):
+    """Eski rglob('*.exe') taramasıyla ScandirWalker karşılaştırması"""
+    import shutil
+    import tempfile
+    from pathlib import Path
+
+    base = tempfile.mkdtemp(prefix='virtus_walk_')
+    try:
+        roots = _make_synthetic_tree(base, games)
+        total_dirs = sum(1 for root, _ in roots for _ in os.walk(root))
+
+        # Eski yöntem (Program Files kuralı): kökte veya 'bin' altında ilk exe
+        started = time.perf_counter()
+        rglob_found = 0
+        for root, expected in roots:
+            result = None
+            for exe in Path(root).rglob('*.exe'):
+                if exe.parent == Path(root) or 'bin' in exe.parts:
+                    result = exe.name
+                    break
+            rglob_found += result == expected
+        rglob_time = time.perf_counter() - started
+
+        walker = ScandirWalker(max_depth=3)
+        found = 0
+        for root, expected in roots:
+            exe = walker.find_main_executable(root)
+            found += (os.path.basename(exe) if exe else None) == expected
+
+        print(f"Sentetik ağaç: {games} klasör, {total_dirs} alt klasör")
+        print(f"rglob:   {rglob_time * 1000:7.0f} ms, doğru sonuç {rglob_found}/{games}")
+        print(f"scandir: {walker.stats['seconds'] * 1000:7.0f} ms, doğru sonuç {found}/{games}")
+        print(f"         {walker.summary()}, {int(walker.stats['early_exits'])} erken çıkış")
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+# Test
+if __name__ == "__main__":
+    import sys
+
+    # (dosya adı, yardımcı mı)
+    name_cases = [
+        ('unins000', True), ('UnityCrashHandler64', True), ('vc_redist.x64', True),
+        ('UE4PrereqSetup_x64', True), ('steamwebhelper', True), ('dedicated_server', True),
+        ('CefProcess', True), ('MediaServer', False), ('TextEditor', False),
+        ('ObserverMode', False), ('Game 3 Saga', False),
+    ]
+    wrong = [name for name, helper in name_cases if _is_helper_name(name.lower()) != helper]
+    if wrong:
+        print(f"❌ Hatalı ad sınıflandırması: {', '.join(wrong)}")
+        sys.exit(1)
+    print(f"✅ Ad sınıflandırması: {len(name_cases)} dosya")
+
+    _benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 150)
@@ -0,0 +1,302 @@
+"""
+Dosya Sistemi İzleyici
+- Linux: inotify (ctypes ile, ek paket gerektirmez)
+- Diğer sistemler / inotify yoksa: periyodik yoklama (polling)
+- Değişiklikler toplanır ve sessizlik süresi (debounce) dolunca tek seferde bildirilir
+
+Kullanım:
+    python -m plugins.fs_watcher [klasör]   # değişiklikleri yazdırır
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# inotify sabitleri (<sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+               IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class _InotifyBackend:
+    """ctypes üzerinden Linux inotify"""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or not libc_name:
+            raise OSError("inotify yalnızca Linux'ta kullanılabilir")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 başarısız")
+        self._watches: Dict[int, Tuple[str, int]] = {}   # wd -> (klasör, kalan derinlik)
+        self._roots: List[str] = []
+
+    def add(self, root: str, max_depth: int):
+        self._roots.append(root)
+        self._add_tree(root, max_depth)
+
+    def _add_tree(self, path: str, depth: int, found: Optional[Set[str]] = None):
+        """Klasörü ve alt klasörlerini izlemeye al; `found` verilirse içerik de toplanır"""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK | IN_ONLYDIR)
+        if wd < 0:
+            return
+        self._watches[wd] = (path, depth)
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if found is not None:
+                        found.add(entry.path)
+                    if depth > 0 and entry.is_dir(follow_symlinks=False):
+                        self._add_tree(entry.path, depth - 1, found)
+        except OSError:
+            pass
+
+    def poll(self, timeout: float) -> Set[str]:
+        """Olayları bekle, değişen yolları döndür"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Kuyruk taştı: hangi dosyaların değiştiği bilinmiyor, kökler bildirilir
+                changed.update(self._roots)
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            parent, depth = self._watches.get(wd, (None, 0))
+            if parent is None:
+                continue
+            path = os.path.join(parent, name) if name else parent
+            changed.add(path)
+            # Yeni klasörler de izlenir; izleme eklenmeden önce oluşan içerik kaçmasın diye listelenir
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and depth > 0:
+                self._add_tree(path, depth - 1, changed)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class _PollingBackend:
+    """Klasör anlık görüntülerini karşılaştıran yoklama"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._roots: List[Tuple[str, int]] = []
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+        self._last_scan = time.monotonic()
+        # Tüm köklerin taranma sayısı (boşta CPU kullanımını izlemek için)
+        self.scans = 0
+
+    def add(self, root: str, max_depth: int):
+        self._roots.append((root, max_depth))
+        self._snapshot.update(self._scan(root, max_depth))
+        self._last_scan = time.monotonic()
+
+    @staticmethod
+    def _scan(root: str, max_depth: int) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        stack = [(root, max_depth)]
+        while stack:
+            path, depth = stack.pop()
+            try:
+                stat = os.stat(path)
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if depth > 0:
+                                stack.append((entry.path, depth - 1))
+                            else:
+                                st = entry.stat(follow_symlinks=False)
+                                snapshot[entry.path] = (st.st_mtime_ns, 0)
+                        else:
+                            st = entry.stat(follow_symlinks=False)
+                            snapshot[entry.path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                continue
+        return snapshot
+
+    def poll(self, timeout: float) -> Set[str]:
+        """
+        En fazla timeout kadar bekle; tarama yalnızca son taramadan interval
+        geçtiyse yapılır (çağıran sık yoklasa da kökler aralıkta bir taranır)
+        """
+        remaining = self._last_scan + self.interval - time.monotonic()
+        if remaining > 0:
+            time.sleep(min(timeout, remaining))
+            if remaining > timeout:
+                return set()
+        self._last_scan = time.monotonic()
+        self.scans += 1
+        current = {}
+        for root, max_depth in self._roots:
+            current.update(self._scan(root, max_depth))
+        changed = {p for p in current.keys() | self._snapshot.keys()
+                   if current.get(p) != self._snapshot.get(p)}
+        self._snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class FileSystemWatcher:
+    """Klasörleri izler, değişiklikleri toplu (debounce) bildirir"""
+
+    def __init__(self, paths: Iterable, callback: Callable[[Set[str]], None],
+                 debounce: float = 2.0, max_delay: float = 30.0, max_depth: int = 3,
+                 poll_interval: float = 10.0, backend: str = 'auto'):
+        """
+        Args:
+            paths: İzlenecek klasörler veya (klasör, derinlik) çiftleri (olmayanlar atlanır)
+            callback: Değişen yollar kümesiyle çağrılır (izleyici thread'inde)
+            debounce: Son olaydan sonra beklenecek sessizlik süresi (saniye)
+            max_delay: Sürekli olay gelse bile en geç bu sürede bildirilir
+            max_depth: Derinliği belirtilmeyen kökler için alt klasör derinliği
+            poll_interval: Yoklama aralığı (yalnızca polling)
+            backend: 'auto', 'inotify' veya 'polling'
+        """
+        roots = [p if isinstance(p, tuple) else (p, max_depth) for p in paths]
+        self.paths = [(str(p), depth) for p, depth in roots if os.path.isdir(str(p))]
+        self.callback = callback
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.stats = {'events': 0, 'batches': 0}
+
+        self.backend = None
+        if backend in ('auto', 'inotify'):
+            try:
+                self.backend = _InotifyBackend()
+            except (OSError, AttributeError) as e:
+                if backend == 'inotify':
+                    raise
+                logger.debug(f"inotify kullanılamıyor, yoklamaya geçiliyor: {e}")
+        if self.backend is None:
+            self.backend = _PollingBackend(poll_interval)
+        self.backend_name = 'inotify' if isinstance(self.backend, _InotifyBackend) else 'polling'
+
+        for path, depth in self.paths:
+            self.backend.add(path, depth)
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if not self.paths:
+            logger.debug("İzlenecek klasör yok")
+            return self
+        self._thread = threading.Thread(target=self._run, name='fs-watcher', daemon=True)
+        self._thread.start()
+        logger.info(f"👁️ {len(self.paths)} klasör izleniyor ({self.backend_name})")
+        return self
+
+    def _run(self):
+        pending: Set[str] = set()
+        first_event = last_event = 0.0
+        while not self._stop.is_set():
+            timeout = self.debounce if pending else 1.0
+            try:
+                changed = self.backend.poll(timeout)
+            except Exception as e:
+                logger.error(f"İzleme hatası: {e}")
+                changed = set()
+                self._stop.wait(1.0)
+
+            now = time.monotonic()
+            if changed:
+                if not pending:
+                    first_event = now
+                pending |= changed
+                last_event = now
+                self.stats['events'] += len(changed)
+
+            if pending and (now - last_event >= self.debounce or now - first_event >= self.max_delay):
+                batch, pending = pending, set()
+                self.stats['batches'] += 1
+                try:
+                    self.callback(batch)
+                except Exception as e:
+                    logger.error(f"İzleyici geri çağırma hatası: {e}")
+
+        self.backend.close()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+# Test
+if __name__ == "__main__":
+    import tempfile
+
+    logging.basicConfig(level=logging.INFO)
+    target = sys.argv[1] if len(sys.argv) > 1 else tempfile.mkdtemp(prefix='virtus_watch_')
+
+    for name in ('inotify', 'polling'):
+        batches = []
+        watcher = FileSystemWatcher([target], batches.append, debounce=0.3, poll_interval=0.2,
+                                    backend=name).start()
+        time.sleep(0.3)
+        os.makedirs(os.path.join(target, name, 'alt'), exist_ok=True)
+        for i in range(20):
+            with open(os.path.join(target, name, 'alt', f"dosya{i}.txt"), 'w') as f:
+                f.write('x')
+        time.sleep(1.5)
+        watcher.stop()
+        print(f"{name}: {len(batches)} toplu bildirim, "
+              f"{sum(len(b) for b in batches)} değişen yol, {watcher.stats}")
+
+    # Boşta yoklama aralığa uymalı: 15 sn aralıkla 5 sn'de hiç tarama olmamalı
+    watcher = FileSystemWatcher([target], lambda batch: None, poll_interval=15, backend='polling').start()
+    time.sleep(5)
+    watcher.stop()
+    scans = watcher.backend.scans
+    print(f"{'✅' if scans == 0 else '❌'} Boşta yoklama: 5 sn'de {scans} tarama (aralık 15 sn)")
+    if scans:
+        sys.exit(1)
@@ -0,0 +1,268 @@
+"""
+Trigram Tabanlı Fuzzy Arama
+- İsimler normalize edilir (küçük harf, aksan/Türkçe karakter, noktalama)
+- Trigram ters indeksi ile az sayıda aday seçilir
+- Adaylar Jaro-Winkler benzerliği ile sıralanır
+- Artımlı ekleme/silme desteklenir
+
+Kullanım:
+    python -m plugins.fuzzy_index [kayıt_sayısı]   # sentetik katalogda benchmark
+"""
+import heapq
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+_TURKISH = str.maketrans({'ı': 'i', 'İ': 'i', 'ş': 's', 'ğ': 'g', 'ç': 'c', 'ö': 'o', 'ü': 'u'})
+_NON_ALNUM = re.compile(r'[^a-z0-9+]+')
+
+
+def normalize(text: str) -> str:
+    """Karşılaştırma için ismi sadeleştir: 'Counter-Strike 2' -> 'counter strike 2'"""
+    text = text.translate(_TURKISH).lower()
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    """Kelime sınırı dolgulu trigramlar ('ab' -> '  a', ' ab', 'ab ')"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def jaro_winkler(a: str, b: str, prefix_scale: float = 0.1) -> float:
+    """Jaro-Winkler benzerliği (0..1); ortak önek ödüllendirilir"""
+    if a == b:
+        return 1.0
+    len_a, len_b = len(a), len(b)
+    if not len_a or not len_b:
+        return 0.0
+
+    window = max(len_a, len_b) // 2 - 1
+    matched_b = [False] * len_b
+    matches_a = []
+    for i, ch in enumerate(a):
+        start = max(0, i - window)
+        end = min(i + window + 1, len_b)
+        for j in range(start, end):
+            if not matched_b[j] and b[j] == ch:
+                matched_b[j] = True
+                matches_a.append(ch)
+                break
+
+    m = len(matches_a)
+    if not m:
+        return 0.0
+
+    matches_b = [b[j] for j in range(len_b) if matched_b[j]]
+    transpositions = sum(x != y for x, y in zip(matches_a, matches_b)) / 2
+    jaro = (m / len_a + m / len_b + (m - transpositions) / m) / 3
+
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+class FuzzyIndex:
+    """İsim -> anahtar fuzzy arama indeksi"""
+
+    def __init__(self, max_candidates: int = 64):
+        """
+        Args:
+            max_candidates: Jaro-Winkler ile puanlanacak en fazla aday
+        """
+        self.max_candidates = max_candidates
+        # entry id -> (normalize isim, anahtar); silinenler None olur
+        self._entries: List[Optional[Tuple[str, Hashable]]] = []
+        self._by_name: Dict[Tuple[str, Hashable], int] = {}
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def add(self, name: str, key: Hashable):
+        """İsmi anahtara bağla (aynı anahtarın birden fazla ismi olabilir)"""
+        norm = normalize(name)
+        if not norm or (norm, key) in self._by_name:
+            return
+        entry_id = self._free.pop() if self._free else len(self._entries)
+        if entry_id == len(self._entries):
+            self._entries.append(None)
+        self._entries[entry_id] = (norm, key)
+        self._by_name[(norm, key)] = entry_id
+        for gram in trigrams(norm):
+            self._postings[gram].add(entry_id)
+
+    def remove(self, name: str, key: Hashable):
+        norm = normalize(name)
+        entry_id = self._by_name.pop((norm, key), None)
+        if entry_id is None:
+            return
+        for gram in trigrams(norm):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(entry_id)
+                if not postings:
+                    del self._postings[gram]
+        self._entries[entry_id] = None
+        self._free.append(entry_id)
+
+    def clear(self):
+        self._entries = []
+        self._by_name = {}
+        self._postings = defaultdict(set)
+        self._free = []
+
+    def search(self, query: str, k: int = 5, threshold: float = 0.0) -> List[Tuple[Hashable, float, str]]:
+        """
+        En benzer anahtarlar: [(anahtar, skor, eşleşen isim), ...]
+
+        Her anahtar sonuçta bir kez (en iyi ismiyle) yer alır.
+        """
+        norm = normalize(query)
+        if not norm:
+            return []
+        query_grams = trigrams(norm)
+
+        # 1. Aday üretimi: ortak trigram sayısı
+        shared: Counter = Counter()
+        for gram in query_grams:
+            shared.update(self._postings.get(gram, ()))
+        if not shared:
+            return []
+
+        # Çok az ortak trigramı olanlar elenir (uzunluğa göre Dice alt sınırı)
+        min_shared = max(1, len(query_grams) // 4)
+        candidates = heapq.nlargest(
+            self.max_candidates,
+            (item for item in shared.items() if item[1] >= min_shared),
+            key=lambda item: item[1]
+        )
+
+        # 2. Sıralama: Jaro-Winkler (+ tam kelime içerme)
+        best: Dict[Hashable, Tuple[float, str]] = {}
+        padded_query = f" {norm} "
+        for entry_id, _ in candidates:
+            name, key = self._entries[entry_id]
+            score = jaro_winkler(norm, name)
+            if padded_query in f" {name} " or f" {name} " in padded_query:
+                score = max(score, 0.9)
+            if score >= threshold and score > best.get(key, (-1.0, ''))[0]:
+                best[key] = (score, name)
+
+        ranked = heapq.nlargest(k, best.items(), key=lambda item: item[1][0])
+        return [(key, round(score, 4), name) for key, (score, name) in ranked]
+
+    def prefix_search(self, query: str, k: int = 5) -> List[Tuple[Hashable, str]]:
+        """
+        Bir kelimesi sorguyla başlayan isimler: [(anahtar, isim), ...] (kısa isim önce)
+
+        'spot' -> 'spotify', 'studio co' -> 'visual studio code'. Adaylar
+        sorgunun kelime başı trigramlarının ortak kayıtlarıdır; tarama yapılmaz.
+        """
+        norm = normalize(query)
+        grams = [g for g in trigrams(norm) if not g.startswith('  ') and not g.endswith(' ')]
+        if not grams:
+            return []
+
+        postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+        candidates = set(postings[0])
+        for entry_ids in postings[1:]:
+            if not candidates:
+                return []
+            candidates.intersection_update(entry_ids)
+
+        best: Dict[Hashable, str] = {}
+        padded_query = f" {norm}"
+        for entry_id in candidates:
+            name, key = self._entries[entry_id]
+            if padded_query in f" {name}" and len(name) < len(best.get(key, name + ' ')):
+                best[key] = name
+
+        ranked = heapq.nsmallest(k, best.items(), key=lambda item: (len(item[1]), item[1]))
+        return [(key, name) for key, name in ranked]
+
+
+def _benchmark(size: int = 50000, queries: int = 500):
+    """Sentetik katalogda indeks kurma ve arama süresi"""
+    import random
+    import time
+
+    rng = random.Random(42)
+    consonants, vowels = 'bcdfghjklmnprstvyz', 'aeiou'
+    syllables = [c + v for c in consonants for v in vowels] + [v + c for v in vowels for c in 'nrstlx']
+    words = [''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(5000)]
+    names = [' '.join(rng.choice(words) for _ in range(rng.randint(1, 3))) for _ in range(size)]
+
+    start = time.perf_counter()
+    index = FuzzyIndex()
+    for i, name in enumerate(names):
+        index.add(name, i)
+    build = time.perf_counter() - start
+
+    def typo(text):
+        chars = list(text)
+        pos = rng.randrange(len(chars))
+        op = rng.choice(['drop', 'swap', 'replace'])
+        if op == 'drop' and len(chars) > 3:
+            del chars[pos]
+        elif op == 'swap' and pos < len(chars) - 1:
+            chars[pos], chars[pos + 1] = chars[pos + 1], chars[pos]
+        else:
+            chars[pos] = rng.choice('abcdefghijklmnopqrstuvwxyz')
+        return ''.join(chars)
+
+    targets = [rng.randrange(size) for _ in range(queries)]
+    hits = 0
+    timings = []
+    for target in targets:
+        query = typo(names[target])
+        t = time.perf_counter()
+        results = index.search(query, k=5)
+        timings.append(time.perf_counter() - t)
+        if any(names[key] == names[target] for key, _, _ in results):
+            hits += 1
+
+    # Karşılaştırma: eski yöntem (tüm katalogda karakter sayımı)
+    def linear(query):
+        return max(range(size), key=lambda i: sum(1 for c in query if c in names[i]) / max(len(query), len(names[i])))
+
+    sample = targets[:20]
+    t = time.perf_counter()
+    linear_hits = sum(names[linear(typo(names[target]))] == names[target] for target in sample)
+    linear_ms = (time.perf_counter() - t) / len(sample) * 1000
+
+    timings.sort()
+    print(f"Katalog: {size} isim, {len(index._postings)} trigram")
+    print(f"İndeks kurma: {build * 1000:.0f} ms")
+    print(f"Arama: ort {sum(timings) / len(timings) * 1000:.2f} ms, "
+          f"p95 {timings[int(len(timings) * 0.95)] * 1000:.2f} ms")
+    print(f"Yazım hatalı sorguda top-5 isabet: {hits / queries:.1%}")
+    print(f"Doğrusal tarama (eski): ort {linear_ms:.1f} ms, top-1 isabet {linear_hits / len(sample):.0%}")
+
+
+# Test
+if __name__ == "__main__":
+    import sys
+
+    demo = FuzzyIndex()
+    for app_id, app_names in {
+        'discord': ['discord'],
+        'steam_counter-strike 2': ['counter-strike 2', 'steam counter-strike 2'],
+        'league of legends': ['league of legends'],
+        'calculator': ['calculator', 'hesap makinesi'],
+    }.items():
+        for app_name in app_names:
+            demo.add(app_name, app_id)
+
+    for q in ['discrd', 'counter strike', 'league', 'hesap makinası', 'dsicord', 'xyz']:
+        print(f"{q!r:18} -> {demo.search(q, k=2)}")
+    print()
+
+    _benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
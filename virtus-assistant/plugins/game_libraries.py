@@ -0,0 +1,368 @@
+"""
+Oyun Kütüphaneleri
+- Steam: libraryfolders.vdf (tüm kütüphane klasörleri) + appmanifest_*.acf
+- Epic: Manifests/*.item (LaunchExecutable)
+- GOG Galaxy: galaxy-2.0.db + goggame-<id>.info
+- Klasör gezmeden, doğrudan manifestlerden başlatma hedefi çözülür
+- Manifestler dosya mtime'ına göre önbelleğe alınır (değişmeyen dosya tekrar okunmaz)
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Oyun olmayan Steam uygulamaları (çalışma ortamları, yeniden dağıtımlar)
+STEAM_TOOL_APPIDS = {'228980', '1070560', '1391110', '1628350', '1493710', '2180100', '1826330'}
+STEAM_STATE_INSTALLED = 4
+
+
+def parse_vdf(text: str) -> Dict:
+    """
+    Valve KeyValues (VDF/ACF) metnini sözlüğe çevir
+
+    '"key" "value"' çiftleri ve '"key" { ... }' blokları desteklenir;
+    anahtarlar küçük harfe çevrilmez, tekrar eden anahtarda son değer kalır.
+    """
+    root: Dict = {}
+    stack = [root]
+    key = None
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        if ch == '"':
+            j = i + 1
+            chars = []
+            while j < n and text[j] != '"':
+                if text[j] == '\\' and j + 1 < n:
+                    j += 1
+                    chars.append({'n': '\n', 't': '\t'}.get(text[j], text[j]))
+                else:
+                    chars.append(text[j])
+                j += 1
+            token = ''.join(chars)
+            i = j + 1
+            if key is None:
+                key = token
+            else:
+                stack[-1][key] = token
+                key = None
+        elif ch == '{':
+            block: Dict = {}
+            stack[-1][key if key is not None else ''] = block
+            stack.append(block)
+            key = None
+            i += 1
+        elif ch == '}':
+            if len(stack) > 1:
+                stack.pop()
+            key = None
+            i += 1
+        elif ch == '/' and text.startswith('//', i):
+            newline = text.find('\n', i)
+            i = n if newline < 0 else newline + 1
+        else:
+            i += 1
+    return root
+
+
+def _read_text(path: str) -> str:
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def _parse_vdf_file(path: str) -> Dict:
+    return parse_vdf(_read_text(path))
+
+
+def _parse_json_file(path: str) -> Dict:
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        return json.load(f)
+
+
+class ManifestCache:
+    """Dosya yolu -> ayrıştırılmış içerik; mtime/boyut değişmedikçe yeniden okunmaz"""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[tuple, object]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self, path, parser: Callable[[str], object], companions: Iterable[str] = ()):
+        """
+        Dosyayı ayrıştır (önbellekte güncel kopya varsa onu döndür)
+
+        Args:
+            companions: Anahtara katılan yan dosya sonekleri; ör. SQLite WAL
+                modunda değişiklikler önce '-wal' dosyasına yazılır, ana
+                dosyanın zamanı değişmeyebilir
+        """
+        path = str(path)
+        main = self._stat_key(path)
+        if main is None:
+            with self._lock:
+                self._entries.pop(path, None)
+            return None
+        key = (main,) + tuple(self._stat_key(path + suffix) for suffix in companions)
+
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached and cached[0] == key:
+                self.hits += 1
+                return cached[1]
+
+        try:
+            value = parser(path)
+        except Exception as e:
+            logger.debug(f"Manifest okunamadı ({path}): {e}")
+            value = None
+
+        with self._lock:
+            self.misses += 1
+            self._entries[path] = (key, value)
+        return value
+
+    def forget_missing(self, seen: Iterable[str], prefix: str):
+        """Önek altında olup artık görülmeyen (silinmiş) dosyaları unut"""
+        seen = set(map(str, seen))
+        with self._lock:
+            for path in [p for p in self._entries if p.startswith(prefix) and p not in seen]:
+                del self._entries[path]
+
+
+class SteamLibrary:
+    """Steam kütüphaneleri ve kurulu oyunlar"""
+
+    def __init__(self, steam_root, cache: ManifestCache):
+        self.root = Path(steam_root)
+        self.cache = cache
+
+    def library_folders(self) -> List[Path]:
+        """Tüm kütüphane kök klasörleri (ana Steam klasörü dahil)"""
+        folders = [self.root]
+        vdf = self.cache.load(self.root / 'steamapps' / 'libraryfolders.vdf', _parse_vdf_file) or {}
+        entries = vdf.get('libraryfolders') or vdf.get('LibraryFolders') or {}
+        for key, value in entries.items():
+            # Yeni format: "0" { "path" "D:\\SteamLibrary" ... } / eski format: "1" "D:\\SteamLibrary"
+            path = value.get('path') if isinstance(value, dict) else (value if key.isdigit() else None)
+            if path:
+                folder = Path(path)
+                if folder not in folders:
+                    folders.append(folder)
+        return folders
+
+    def manifest_dirs(self) -> List[Path]:
+        return [folder / 'steamapps' for folder in self.library_folders()]
+
+    def games(self) -> List[Dict]:
+        """Kurulu oyunlar: [{'appid', 'name', 'install_dir', 'launch'}, ...]"""
+        games = []
+        for steamapps in self.manifest_dirs():
+            try:
+                manifests = [entry.path for entry in os.scandir(steamapps)
+                             if entry.name.startswith('appmanifest_') and entry.name.endswith('.acf')]
+            except OSError:
+                continue
+            self.cache.forget_missing(manifests, str(steamapps / 'appmanifest_'))
+
+            for manifest in manifests:
+                state = (self.cache.load(manifest, _parse_vdf_file) or {}).get('AppState', {})
+                appid = state.get('appid')
+                name = state.get('name')
+                if not appid or not name or appid in STEAM_TOOL_APPIDS:
+                    continue
+                try:
+                    installed = int(state.get('StateFlags', STEAM_STATE_INSTALLED)) & STEAM_STATE_INSTALLED
+                except ValueError:
+                    installed = True
+                if not installed:
+                    continue
+                games.append({
+                    'appid': appid,
+                    'name': name,
+                    'install_dir': str(steamapps / 'common' / state.get('installdir', name)),
+                    'launch': f"steam://rungameid/{appid}",
+                })
+        return games
+
+
+class EpicLibrary:
+    """Epic Games Launcher manifestleri"""
+
+    def __init__(self, manifest_dir, cache: ManifestCache):
+        self.dir = Path(manifest_dir)
+        self.cache = cache
+
+    def games(self) -> List[Dict]:
+        """Kurulu oyunlar: [{'app_name', 'name', 'install_dir', 'launch'}, ...]"""
+        try:
+            manifests = [entry.path for entry in os.scandir(self.dir) if entry.name.endswith('.item')]
+        except OSError:
+            return []
+        self.cache.forget_missing(manifests, str(self.dir))
+
+        games = []
+        for manifest in manifests:
+            data = self.cache.load(manifest, _parse_json_file) or {}
+            name = data.get('DisplayName')
+            install_dir = data.get('InstallLocation')
+            executable = data.get('LaunchExecutable')
+            if not name or not install_dir:
+                continue
+            games.append({
+                'app_name': data.get('AppName', ''),
+                'name': name,
+                'install_dir': install_dir,
+                'launch': os.path.join(install_dir, executable) if executable else install_dir,
+            })
+        return games
+
+
+class GogLibrary:
+    """GOG Galaxy veritabanı ve oyun bilgi dosyaları"""
+
+    def __init__(self, galaxy_storage, cache: ManifestCache):
+        self.db_path = Path(galaxy_storage) / 'galaxy-2.0.db'
+        self.cache = cache
+
+    @staticmethod
+    def _read_installed(path: str) -> List[Tuple[str, str]]:
+        # Galaxy açıkken de okunabilmesi için salt okunur bağlantı
+        conn = sqlite3.connect(f"file:{Path(path).as_posix()}?mode=ro", uri=True, timeout=1)
+        try:
+            return [(str(pid), loc) for pid, loc in
+                    conn.execute('SELECT productId, installationPath FROM InstalledBaseProducts')]
+        finally:
+            conn.close()
+
+    def games(self) -> List[Dict]:
+        """Kurulu oyunlar: [{'product_id', 'name', 'install_dir', 'launch'}, ...]"""
+        # Galaxy WAL modunda: değişiklikler checkpoint'e kadar yalnızca -wal dosyasında
+        installed = self.cache.load(self.db_path, self._read_installed, companions=('-wal',)) or []
+        games = []
+        for product_id, install_dir in installed:
+            if not install_dir:
+                continue
+            info = self.cache.load(Path(install_dir) / f"goggame-{product_id}.info", _parse_json_file) or {}
+            tasks = info.get('playTasks') or []
+            primary = next((t for t in tasks if t.get('isPrimary') and t.get('path')), None)
+            primary = primary or next((t for t in tasks if t.get('category') == 'game' and t.get('path')), None)
+            if not primary:
+                continue
+            games.append({
+                'product_id': product_id,
+                'name': info.get('name') or Path(install_dir).name,
+                'install_dir': install_dir,
+                'launch': os.path.join(install_dir, primary['path']),
+            })
+        return games
+
+
+class GameLibraries:
+    """Tüm platformların oyunlarını katalog kaydına çeviren yardımcı"""
+
+    def __init__(self, cache: Optional[ManifestCache] = None):
+        self.cache = cache or ManifestCache()
+
+    @staticmethod
+    def _entry(prefix: str, game: Dict, app_type: str, **meta) -> Tuple[str, Dict]:
+        name = game['name'].lower()
+        names = [name, f"{prefix} {name}"]
+        folder = Path(game['install_dir']).name.lower()
+        if folder and folder not in names:
+            names.append(folder)
+        return f"{prefix}_{name}", {
+            'exe': game['launch'],
+            'names': names,
+            'type': app_type,
+            'install_dir': game['install_dir'],
+            **meta,
+        }
+
+    def steam_apps(self, steam_roots: Iterable) -> Dict[str, Dict]:
+        apps = {}
+        for root in steam_roots:
+            if not (Path(root) / 'steamapps').exists():
+                continue
+            for game in SteamLibrary(root, self.cache).games():
+                app_id, entry = self._entry('steam', game, 'steam_game', steam_appid=game['appid'])
+                apps[app_id] = entry
+            # İlk bulunan Steam kurulumu yeterli (diğer kütüphaneler vdf'ten gelir)
+            break
+        return apps
+
+    def steam_manifest_dirs(self, steam_roots: Iterable) -> List[Path]:
+        for root in steam_roots:
+            if (Path(root) / 'steamapps').exists():
+                return SteamLibrary(root, self.cache).manifest_dirs()
+        return []
+
+    def epic_apps(self, manifest_dir) -> Dict[str, Dict]:
+        apps = {}
+        for game in EpicLibrary(manifest_dir, self.cache).games():
+            app_id, entry = self._entry('epic', game, 'epic_game', epic_app=game['app_name'])
+            apps[app_id] = entry
+        return apps
+
+    def gog_apps(self, galaxy_storage) -> Dict[str, Dict]:
+        apps = {}
+        for game in GogLibrary(galaxy_storage, self.cache).games():
+            app_id, entry = self._entry('gog', game, 'gog_game', gog_product=game['product_id'])
+            apps[app_id] = entry
+        return apps
+
+
+# Test
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    import time
+
+    logging.basicConfig(level=logging.INFO)
+
+    if len(sys.argv) > 1:
+        # Gerçek Steam klasörü: python -m plugins.game_libraries "C:/Program Files (x86)/Steam"
+        libraries = GameLibraries()
+        for app_id, entry in libraries.steam_apps([sys.argv[1]]).items():
+            print(f"{app_id}: {entry['exe']} ({entry['install_dir']})")
+        sys.exit(0)
+
+    # Sentetik kütüphane: 2 kütüphane klasörü, N oyun
+    count = 5000
+    base = Path(tempfile.mkdtemp(prefix='virtus_steam_'))
+    second = base / 'SteamLibrary'
+    (base / 'steamapps').mkdir(parents=True)
+    (second / 'steamapps').mkdir(parents=True)
+    (base / 'steamapps' / 'libraryfolders.vdf').write_text(
+        '"libraryfolders"\n{\n'
+        f'\t"0"\n\t{{\n\t\t"path"\t\t"{base.as_posix()}"\n\t}}\n'
+        f'\t"1"\n\t{{\n\t\t"path"\t\t"{second.as_posix()}"\n\t}}\n'
+        '}\n'
+    )
+    for i in range(count):
+        folder = base if i % 2 else second
+        (folder / 'steamapps' / f"appmanifest_{1000 + i}.acf").write_text(
+            f'"AppState"\n{{\n\t"appid"\t\t"{1000 + i}"\n\t"name"\t\t"Game {i}"\n'
+            f'\t"StateFlags"\t\t"4"\n\t"installdir"\t\t"Game{i}"\n}}\n'
+        )
+
+    libraries = GameLibraries()
+    for label in ('İlk tarama', 'Tekrar (önbellek)'):
+        started = time.perf_counter()
+        apps = libraries.steam_apps([base])
+        print(f"{label}: {len(apps)} oyun, {(time.perf_counter() - started) * 1000:.0f} ms "
+              f"(önbellek {libraries.cache.hits} isabet / {libraries.cache.misses} okuma)")
+    print(apps['steam_game 42'])
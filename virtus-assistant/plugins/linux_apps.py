@@ -0,0 +1,284 @@
+"""
+Linux Uygulama Keşfi
+- XDG .desktop dosyaları (Name, Name[tr], GenericName, Keywords, Exec)
+- Flatpak ve Snap dışa aktarımları (aynı .desktop biçimi)
+- $PATH altındaki çalıştırılabilir dosyalar
+- Yaygın uygulamalar: 'chrome', 'code' gibi günlük adlar kurulu komuta eşlenir
+- Ayrıştırma mtime/boyuta göre önbelleklenir (yalnızca değişen dosya yeniden okunur)
+
+Kullanım:
+    python -m plugins.linux_apps [arama]   # bulunan uygulamaları ve süreleri yazdırır
+"""
+import logging
+import os
+import shlex
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from plugins.game_libraries import ManifestCache
+
+logger = logging.getLogger(__name__)
+
+# Exec alanındaki alan kodları (%f dosya, %u URL, %i ikon...)
+_FIELD_CODES = ('%f', '%F', '%u', '%U', '%d', '%D', '%n', '%N', '%i', '%c', '%k', '%v', '%m')
+# Flatpak dosya yönlendirme işaretleri ('--file-forwarding @@u %U @@')
+_FLATPAK_MARKERS = ('@@', '@@u', '@@f', '--file-forwarding')
+
+# Takma ad olarak kullanılmayacak kadar genel anahtar kelimeler
+_MIN_KEYWORD_LEN = 3
+
+# Yaygın uygulamalar: ad -> (takma adlar, aday komutlar; ilk kurulu olan kullanılır)
+COMMON_COMMANDS = {
+    'chrome': (['chrome', 'google chrome'],
+               ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser']),
+    'firefox': (['firefox', 'mozilla firefox'], ['firefox']),
+    'edge': (['edge', 'microsoft edge'], ['microsoft-edge', 'microsoft-edge-stable']),
+    'vscode': (['vscode', 'visual studio code', 'code'], ['code', 'codium']),
+    'notepad': (['notepad', 'not defteri'], ['gnome-text-editor', 'gedit', 'kate', 'mousepad', 'xed']),
+    'calculator': (['calculator', 'hesap makinesi'], ['gnome-calculator', 'kcalc', 'galculator', 'qalculate-gtk']),
+    'paint': (['paint', 'resim'], ['pinta', 'kolourpaint', 'gimp']),
+    'word': (['word', 'microsoft word'], ['libreoffice --writer']),
+    'excel': (['excel', 'microsoft excel'], ['libreoffice --calc']),
+    'spotify': (['spotify'], ['spotify']),
+    'discord': (['discord'], ['discord']),
+    'telegram': (['telegram'], ['telegram-desktop', 'telegram']),
+    'whatsapp': (['whatsapp'], ['whatsapp-for-linux']),
+}
+
+
+def xdg_application_dirs() -> List[Path]:
+    """
+    .desktop klasörleri, XDG öncelik sırasıyla (kullanıcı önce)
+
+    Flatpak/Snap dışa aktarımları genelde XDG_DATA_DIRS içindedir; yoksa
+    bilinen yolları da eklenir.
+    """
+    home = Path.home()
+    data_home = Path(os.environ.get('XDG_DATA_HOME') or home / '.local' / 'share')
+    data_dirs = [Path(p) for p in
+                 (os.environ.get('XDG_DATA_DIRS') or '/usr/local/share:/usr/share').split(':') if p]
+    data_dirs += [
+        data_home / 'flatpak' / 'exports' / 'share',
+        Path('/var/lib/flatpak/exports/share'),
+        Path('/var/lib/snapd/desktop'),
+    ]
+
+    dirs = []
+    for base in [data_home] + data_dirs:
+        path = base / 'applications'
+        if path not in dirs:
+            dirs.append(path)
+    return dirs
+
+
+def path_dirs() -> List[Path]:
+    """$PATH klasörleri (tekrarsız, sırası korunur)"""
+    dirs = []
+    for entry in os.environ.get('PATH', '').split(os.pathsep):
+        path = Path(entry) if entry else None
+        if path and path not in dirs:
+            dirs.append(path)
+    return dirs
+
+
+def common_commands() -> Dict[str, str]:
+    """Yaygın uygulama adı -> kurulu komut ('chrome' -> 'google-chrome')"""
+    mappings = {}
+    for name, (_, commands) in COMMON_COMMANDS.items():
+        for command in commands:
+            if shutil.which(command.split()[0]):
+                mappings[name] = command
+                break
+    return mappings
+
+
+def clean_exec(command: str) -> str:
+    """Exec alanından alan kodlarını çıkar: 'firefox %u' -> 'firefox'"""
+    parts = []
+    for token in command.split():
+        if token in _FIELD_CODES or token in _FLATPAK_MARKERS:
+            continue
+        parts.append(token.replace('%%', '%'))
+    return ' '.join(parts)
+
+
+def parse_desktop_entry(path: str) -> Optional[Dict]:
+    """
+    .desktop dosyasının [Desktop Entry] grubunu oku
+
+    Returns:
+        {'name', 'name_tr', 'generic', 'keywords', 'exec', 'hidden', ...} veya
+        uygulama olmayan girdiler için None
+    """
+    values = {}
+    in_entry = False
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('['):
+                if in_entry:
+                    break
+                in_entry = line == '[Desktop Entry]'
+                continue
+            if in_entry and '=' in line:
+                key, value = line.split('=', 1)
+                values[key.strip()] = value.strip()
+
+    if values.get('Type', 'Application') != 'Application':
+        return None
+
+    def keywords(key):
+        return [k.strip() for k in values.get(key, '').split(';') if len(k.strip()) >= _MIN_KEYWORD_LEN]
+
+    return {
+        'name': values.get('Name', ''),
+        'name_tr': values.get('Name[tr]', ''),
+        'generic': values.get('GenericName[tr]') or values.get('GenericName', ''),
+        'keywords': keywords('Keywords') + keywords('Keywords[tr]'),
+        'exec': clean_exec(values.get('Exec', '')),
+        'try_exec': values.get('TryExec', ''),
+        'hidden': values.get('Hidden') == 'true' or values.get('NoDisplay') == 'true',
+        'flatpak': values.get('X-Flatpak', ''),
+        'snap': values.get('X-SnapInstanceName', ''),
+    }
+
+
+class LinuxApplications:
+    """.desktop ve $PATH kaynaklarını katalog kayıtlarına çevirir"""
+
+    def __init__(self):
+        self.cache = ManifestCache()
+
+    def desktop_apps(self, dirs: Optional[Iterable] = None) -> Dict[str, Dict]:
+        """
+        .desktop girdilerinden katalog
+
+        Aynı masaüstü kimliği (ör. 'org.gnome.Calculator.desktop') birden
+        fazla klasörde varsa öndeki (kullanıcı) kazanır; Hidden/NoDisplay
+        girdisi alttakini de gizler.
+        """
+        dirs = xdg_application_dirs() if dirs is None else [Path(d) for d in dirs]
+        seen_ids = set()
+        apps = {}
+        for base in dirs:
+            seen_files = []
+            for path in self._desktop_files(base):
+                seen_files.append(path)
+                desktop_id = os.path.relpath(path, base).replace(os.sep, '-')
+                if desktop_id in seen_ids:
+                    continue
+                seen_ids.add(desktop_id)
+
+                entry = self.cache.load(path, parse_desktop_entry)
+                if not entry or entry['hidden'] or not entry['name'] or not entry['exec']:
+                    continue
+                if entry['try_exec'] and not self._executable_exists(entry['try_exec']):
+                    continue
+
+                app = self._desktop_app(entry, desktop_id, path)
+                apps.setdefault(entry['name'].lower(), app)
+            self.cache.forget_missing(seen_files, str(base))
+        return apps
+
+    @staticmethod
+    def _desktop_files(base: Path) -> List[str]:
+        files = []
+        stack = [str(base)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            stack.append(entry.path)
+                        elif entry.name.endswith('.desktop'):
+                            files.append(entry.path)
+            except OSError:
+                continue
+        return sorted(files)
+
+    @staticmethod
+    def _desktop_app(entry: Dict, desktop_id: str, path: str) -> Dict:
+        names = [entry['name'], entry['name_tr'], entry['generic']] + entry['keywords']
+        # Kimlik ve komut adı da takma ad: 'org.gnome.Calculator' -> 'calculator', 'code'
+        names.append(desktop_id[:-len('.desktop')].rsplit('.', 1)[-1])
+        try:
+            names.append(os.path.basename(shlex.split(entry['exec'])[0]))
+        except (ValueError, IndexError):
+            pass
+
+        unique = []
+        for name in names:
+            name = name.strip().lower()
+            if name and name not in unique:
+                unique.append(name)
+
+        app = {'exe': entry['exec'], 'names': unique, 'type': 'desktop', 'desktop_file': path}
+        if entry['flatpak']:
+            app['flatpak'] = entry['flatpak']
+        if entry['snap']:
+            app['snap'] = entry['snap']
+        return app
+
+    @staticmethod
+    def _executable_exists(command: str) -> bool:
+        if os.path.isabs(command):
+            return os.access(command, os.X_OK)
+        return any(os.access(os.path.join(d, command), os.X_OK) for d in path_dirs())
+
+    @staticmethod
+    def common_apps() -> Dict[str, Dict]:
+        """Yaygın uygulamalar (yalnızca komutu kurulu olanlar), takma adlarıyla"""
+        return {
+            name: {'exe': command, 'names': list(COMMON_COMMANDS[name][0]), 'type': 'common'}
+            for name, command in common_commands().items()
+        }
+
+    @staticmethod
+    def path_apps(dirs: Optional[Iterable] = None) -> Dict[str, Dict]:
+        """$PATH çalıştırılabilirleri (öndeki klasör kazanır)"""
+        dirs = path_dirs() if dirs is None else [Path(d) for d in dirs]
+        apps = {}
+        for directory in dirs:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        name = entry.name.lower()
+                        if name in apps or name.startswith('.'):
+                            continue
+                        try:
+                            if not entry.is_file() or not os.access(entry.path, os.X_OK):
+                                continue
+                        except OSError:
+                            continue
+                        apps[name] = {'exe': entry.path, 'names': [name], 'type': 'path'}
+            except OSError:
+                continue
+        return apps
+
+
+# Test
+if __name__ == "__main__":
+    import sys
+    import time
+
+    logging.basicConfig(level=logging.INFO)
+    linux = LinuxApplications()
+
+    for label in ('soğuk', 'sıcak'):
+        started = time.perf_counter()
+        desktop = linux.desktop_apps()
+        desktop_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        binaries = linux.path_apps()
+        path_ms = (time.perf_counter() - started) * 1000
+        print(f"{label}: {len(desktop)} .desktop ({desktop_ms:.1f} ms, önbellek {linux.cache.hits} isabet / "
+              f"{linux.cache.misses} okuma), {len(binaries)} $PATH ({path_ms:.1f} ms)")
+    print(f"Yaygın: {common_commands()}")
+
+    query = sys.argv[1].lower() if len(sys.argv) > 1 else ''
+    for app_id, app in list(desktop.items())[:20]:
+        if query in app_id or any(query in n for n in app['names']):
+            print(f"  {app_id}: {app['exe']}  {app['names']}")
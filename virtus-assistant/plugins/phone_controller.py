@@ -151,54 +151,25 @@ class ADBPhoneController:
 class ContactManager:
     """Kişi yönetimi - isimden telefon numarası bul"""
     
-    def __init__(self):
-        self.contacts = self._load_contacts()
-    
-    def _load_contacts(self):
-        """Kişileri yükle (basit JSON dosyası)"""
-        import json
-        import os
-        
-        contacts_file = 'data/contacts.json'
+    def __init__(self, storage=None):
+        from core.storage import get_storage
         
-        if os.path.exists(contacts_file):
-            try:
-                with open(contacts_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return {}
-        
-        # Varsayılan boş
-        return {}
+        # Kişiler depolamada tutulur, aramalar doğrudan sorgulanır
+        self.storage = storage or get_storage()
     
-    def save_contacts(self):
-        """Kişileri kaydet"""
-        import json
-        import os
-        
-        os.makedirs('data', exist_ok=True)
-        
-        with open('data/contacts.json', 'w', encoding='utf-8') as f:
-            json.dump(self.contacts, f, ensure_ascii=False, indent=2)
+    @property
+    def contacts(self):
+        """Tüm kişiler (isim -> bilgiler)"""
+        return self.storage.load_contacts()
     
     def find_contact(self, name):
         """İsimden kişi bul"""
         # Büyük/küçük harf duyarsız arama
-        name_lower = name.lower()
-        
-        for contact_name, contact_data in self.contacts.items():
-            if name_lower in contact_name.lower():
-                return contact_data
-        
-        return None
+        return self.storage.find_contact(name)
     
     def add_contact(self, name, phone_number, email=None):
         """Yeni kişi ekle"""
-        self.contacts[name] = {
-            'phone': phone_number,
-            'email': email
-        }
-        self.save_contacts()
+        self.storage.upsert_contact(name, phone_number, email)
     
     def get_phone_number(self, name):
         """İsimden telefon numarası al"""
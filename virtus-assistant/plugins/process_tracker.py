@@ -0,0 +1,390 @@
+"""
+Süreç Takibi (psutil)
+- PID -> (başlangıç zamanı, ad, exe) tablosu önbelleklenir; yenilemede yalnızca
+  yeni PID'ler sorgulanır, bitenler tablodan düşer
+- Virtus'un açtığı uygulamaların PID'leri hatırlanır
+- Kapatma PID ile: önce nazikçe (SIGTERM / Windows'ta WM_CLOSE), süre dolunca zorla
+- Açılış arka planda doğrulanır (süreç yaşıyor mu, eşleşen süreç göründü mü)
+- Kapatma/doğrulama için ayrı komut (taskkill, pkill) çalıştırılmaz
+
+Kullanım:
+    python -m plugins.process_tracker   # tablo yenileme süreleri ve kapatma testi
+"""
+import logging
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
+try:
+    import win32con
+    import win32gui
+    import win32process
+    WIN32_AVAILABLE = True
+except ImportError:
+    WIN32_AVAILABLE = False
+
+try:
+    from config.settings import PROCESS_TABLE_MAX_AGE, PROCESS_CLOSE_TIMEOUT, PROCESS_LAUNCH_TIMEOUT
+except ImportError:
+    PROCESS_TABLE_MAX_AGE = 1.0
+    PROCESS_CLOSE_TIMEOUT = 3.0
+    PROCESS_LAUNCH_TIMEOUT = 10.0
+
+logger = logging.getLogger(__name__)
+
+# Başlatıcı sürecin hemen hata ile çıkıp çıkmadığı için beklenen süre
+_LAUNCH_GRACE = 1.0
+# Eşleşen süreç aranırken yoklama aralığı
+_LAUNCH_POLL = 0.25
+
+
+class ProcessTracker:
+    """Önbellekli süreç tablosu, açılan uygulamaların PID'leri ve PID ile kapatma"""
+
+    def __init__(self, max_age: float = PROCESS_TABLE_MAX_AGE, close_timeout: float = PROCESS_CLOSE_TIMEOUT,
+                 launch_timeout: float = PROCESS_LAUNCH_TIMEOUT):
+        """
+        Args:
+            max_age: Tablo bu süreden (saniye) eskiyse sorguda yenilenir
+            close_timeout: Nazik kapatmadan sonra zorla sonlandırmaya kadar bekleme
+            launch_timeout: Açılıştan sonra sürecin görünmesi için süre
+        """
+        if not PSUTIL_AVAILABLE:
+            raise RuntimeError("psutil yüklü değil")
+        self.max_age = max_age
+        self.close_timeout = close_timeout
+        self.launch_timeout = launch_timeout
+
+        self._lock = threading.RLock()
+        # pid -> (create_time, küçük harf ad, exe yolu)
+        self._table: Dict[int, Tuple[float, str, str]] = {}
+        self._refreshed_at = 0.0
+        # app_id -> Virtus'un başlattığı PID'ler
+        self._launched: Dict[str, Set[int]] = {}
+        # app_id -> son açılış doğrulaması
+        self.launches: Dict[str, Dict] = {}
+        self.stats = {'refreshes': 0, 'queried': 0, 'closed': 0, 'killed': 0,
+                      'verified': 0, 'failed': 0, 'unconfirmed': 0}
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='launch-verify')
+
+    # ------------------------------------------------------------------
+    # Süreç tablosu
+    # ------------------------------------------------------------------
+    def refresh(self, force: bool = False):
+        """Tabloyu güncelle: yalnızca yeni PID'ler sorgulanır"""
+        with self._lock:
+            if not force and time.monotonic() - self._refreshed_at < self.max_age:
+                return
+            pids = set(psutil.pids())
+            for pid in self._table.keys() - pids:
+                del self._table[pid]
+            new_pids = pids - self._table.keys()
+            for pid in new_pids:
+                info = self._query(pid)
+                if info:
+                    self._table[pid] = info
+            self._refreshed_at = time.monotonic()
+            self.stats['refreshes'] += 1
+            self.stats['queried'] += len(new_pids)
+
+    @staticmethod
+    def _query(pid: int) -> Optional[Tuple[float, str, str]]:
+        try:
+            proc = psutil.Process(pid)
+            with proc.oneshot():
+                if proc.status() == psutil.STATUS_ZOMBIE:
+                    # Bitmiş ama beklenmemiş çocuk: çalışıyor sayılmaz
+                    return None
+                create_time = proc.create_time()
+                name = proc.name().lower()
+                try:
+                    exe = proc.exe()
+                except (psutil.AccessDenied, psutil.ZombieProcess):
+                    # Başka kullanıcının / korumalı süreç: ad ile eşleştirilebilir
+                    exe = ''
+            return create_time, name, exe
+        except (psutil.NoSuchProcess, psutil.AccessDenied, OSError):
+            return None
+
+    def _process(self, pid: int):
+        """Tablodaki kayıtla aynı süreç ise psutil.Process (PID yeniden kullanılmışsa None)"""
+        try:
+            proc = psutil.Process(pid)
+            cached = self._table.get(pid)
+            if cached and abs(proc.create_time() - cached[0]) > 0.01:
+                return None
+            return proc
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+
+    def find(self, names: Iterable[str] = (), under: Optional[str] = None,
+             since: Optional[float] = None) -> List[int]:
+        """
+        Eşleşen süreçlerin PID'leri
+
+        Args:
+            names: Süreç/exe adları ('chrome.exe', 'kate'; büyük/küçük harf duyarsız)
+            under: Bu klasör altındaki exe'ler (oyun kurulum klasörü)
+            since: Yalnızca bu zamandan (time.time) sonra başlayanlar
+        """
+        names = {n.lower() for n in names if n}
+        prefix = os.path.join(os.path.normcase(os.path.abspath(under)), '') if under else None
+        if not names and not prefix:
+            return []
+
+        self.refresh()
+        found = []
+        with self._lock:
+            for pid, (create_time, name, exe) in self._table.items():
+                if since is not None and create_time < since:
+                    continue
+                if names and (name in names or (exe and os.path.basename(exe).lower() in names)):
+                    found.append(pid)
+                elif prefix and exe and os.path.normcase(exe).startswith(prefix):
+                    found.append(pid)
+        return found
+
+    def is_running(self, app_id: str) -> bool:
+        return bool(self.tracked(app_id))
+
+    # ------------------------------------------------------------------
+    # Açılan uygulamalar
+    # ------------------------------------------------------------------
+    def track(self, app_id: str, pid: int):
+        """Virtus'un başlattığı süreci hatırla"""
+        with self._lock:
+            if pid not in self._table:
+                info = self._query(pid)
+                if info:
+                    self._table[pid] = info
+            self._launched.setdefault(app_id, set()).add(pid)
+
+    def tracked(self, app_id: str) -> List[int]:
+        """app_id için hâlâ çalışan, Virtus'un başlattığı PID'ler"""
+        self.refresh()
+        with self._lock:
+            pids = self._launched.get(app_id)
+            if not pids:
+                return []
+            pids.intersection_update(self._table.keys())
+            if not pids:
+                del self._launched[app_id]
+            return sorted(pids)
+
+    def verify_launch(self, app_id: str, popen: Optional[subprocess.Popen] = None,
+                      names: Iterable[str] = (), under: Optional[str] = None,
+                      callback: Optional[Callable[[str, Dict], None]] = None) -> Future:
+        """
+        Açılışı arka planda doğrula
+
+        Başlatıcı süreç (Popen) verilmişse önce onun hata ile çıkıp çıkmadığına
+        bakılır; çıkmadıysa uygulama odur. os.startfile / protokol (steam://)
+        açılışlarında veya başlatıcı hemen çıktığında eşleşen yeni süreç aranır.
+
+        Returns:
+            Future: {'status': 'running'|'handed_off'|'unconfirmed'|'failed', 'pids', 'elapsed_ms'}
+        """
+        started = time.time()
+        return self._executor.submit(self._verify, app_id, popen, tuple(names), under, started, callback)
+
+    def _verify(self, app_id, popen, names, under, started, callback):
+        begin = time.monotonic()
+        status, pids, detail = 'unconfirmed', [], ''
+
+        if popen is not None:
+            try:
+                code = popen.wait(timeout=_LAUNCH_GRACE)
+            except subprocess.TimeoutExpired:
+                code = None
+            if code is None:
+                status, pids = 'running', [popen.pid]
+            elif code != 0:
+                status, detail = 'failed', f"çıkış kodu {code}"
+            elif not names and not under:
+                # xdg-open gibi başlatıcılar işi devredip başarıyla çıkar
+                status = 'handed_off'
+
+        if status == 'unconfirmed' and (names or under):
+            deadline = begin + self.launch_timeout
+            # Saat farkları için küçük pay: başlatıcının çocuğu aynı saniyede doğabilir
+            since = started - 1.0
+            while time.monotonic() < deadline:
+                self.refresh(force=True)
+                pids = self.find(names, under, since=since)
+                if pids:
+                    status = 'running'
+                    break
+                time.sleep(_LAUNCH_POLL)
+            else:
+                if popen is not None:
+                    # Başlatıcı başarıyla çıktı, uygulama başka adla çalışıyor olabilir
+                    status = 'handed_off'
+                else:
+                    status, detail = 'failed', 'süreç görünmedi'
+
+        for pid in pids:
+            self.track(app_id, pid)
+
+        result = {'status': status, 'pids': pids, 'elapsed_ms': (time.monotonic() - begin) * 1000}
+        if detail:
+            result['detail'] = detail
+        self.launches[app_id] = result
+        if status == 'running':
+            self.stats['verified'] += 1
+            logger.debug(f"✅ {app_id} çalışıyor (PID {', '.join(map(str, pids))})")
+        elif status == 'failed':
+            self.stats['failed'] += 1
+            logger.warning(f"⚠️ {app_id} açılamadı: {detail}")
+        elif status == 'unconfirmed':
+            self.stats['unconfirmed'] += 1
+
+        if callback:
+            try:
+                callback(app_id, result)
+            except Exception as e:
+                logger.error(f"Açılış doğrulama geri çağırma hatası: {e}")
+        return result
+
+    # ------------------------------------------------------------------
+    # Kapatma
+    # ------------------------------------------------------------------
+    def close(self, app_id: Optional[str] = None, names: Iterable[str] = (), under: Optional[str] = None,
+              timeout: Optional[float] = None) -> int:
+        """
+        Uygulamayı kapat
+
+        Virtus'un başlattığı PID'ler önceliklidir; yoksa (kullanıcı kendisi
+        açmışsa) ad / klasör eşleşmesine bakılır. Çocuk süreçler de kapatılır.
+
+        Returns:
+            int: Sonlanan süreç sayısı (0: çalışan süreç yok veya kapatılamadı)
+        """
+        # Kullanıcı uygulamayı az önce açmış olabilir: tablo yaşına bakılmadan güncellenir
+        self.refresh(force=True)
+        pids = self.tracked(app_id) if app_id else []
+        if not pids:
+            pids = self.find(names, under)
+        if not pids:
+            return 0
+        return self.terminate(pids, self.close_timeout if timeout is None else timeout)
+
+    def terminate(self, pids: Iterable[int], timeout: float) -> int:
+        """Süreçleri ve çocuklarını nazikçe kapat, süre dolunca zorla sonlandır"""
+        procs = {}
+        for pid in pids:
+            proc = self._process(pid)
+            if proc is None:
+                continue
+            procs[proc.pid] = proc
+            try:
+                for child in proc.children(recursive=True):
+                    procs.setdefault(child.pid, child)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        if not procs:
+            return 0
+
+        self._request_close(list(procs.values()))
+        gone, alive = psutil.wait_procs(list(procs.values()), timeout=timeout)
+        killed = 0
+        for proc in alive:
+            try:
+                proc.kill()
+                killed += 1
+            except psutil.NoSuchProcess:
+                pass
+            except psutil.AccessDenied:
+                logger.warning(f"⚠️ Süreç sonlandırma izni yok: {proc.pid}")
+        if alive:
+            more_gone, alive = psutil.wait_procs(alive, timeout=1.0)
+            gone += more_gone
+
+        with self._lock:
+            for proc in gone:
+                self._table.pop(proc.pid, None)
+            for app_pids in self._launched.values():
+                app_pids.difference_update(p.pid for p in gone)
+        self.stats['closed'] += len(gone)
+        self.stats['killed'] += killed
+        return len(gone)
+
+    @staticmethod
+    def _request_close(procs):
+        """Nazik kapatma: POSIX'te SIGTERM, Windows'ta pencerelere WM_CLOSE"""
+        if os.name == 'nt' and WIN32_AVAILABLE:
+            pids = {p.pid for p in procs}
+
+            def post_close(hwnd, _):
+                if win32gui.IsWindowVisible(hwnd):
+                    _, pid = win32process.GetWindowThreadProcessId(hwnd)
+                    if pid in pids:
+                        win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
+                return True
+
+            try:
+                win32gui.EnumWindows(post_close, None)
+                return
+            except Exception as e:
+                logger.debug(f"WM_CLOSE gönderilemedi: {e}")
+
+        for proc in procs:
+            try:
+                proc.terminate()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_tracker: Optional[ProcessTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_process_tracker() -> Optional[ProcessTracker]:
+    """Süreç genelinde paylaşılan takipçi (psutil yoksa None)"""
+    global _tracker
+    if not PSUTIL_AVAILABLE:
+        return None
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = ProcessTracker()
+        return _tracker
+
+
+# Test
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    tracker = ProcessTracker()
+
+    for label in ('ilk', 'artımlı'):
+        started = time.perf_counter()
+        tracker.refresh(force=True)
+        print(f"{label} yenileme: {len(tracker._table)} süreç, "
+              f"{(time.perf_counter() - started) * 1000:.1f} ms, sorgulanan toplam {tracker.stats['queried']}")
+
+    # SIGTERM'i yok sayan süreç: nazik kapatma sonrası zorla sonlandırılmalı
+    stubborn = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); time.sleep(60)"
+    child = subprocess.Popen([sys.executable, '-c', stubborn if os.name != 'nt' else 'import time; time.sleep(60)'])
+    print("doğrulama:", tracker.verify_launch('deneme', popen=child).result())
+
+    started = time.perf_counter()
+    closed = tracker.close('deneme', timeout=0.5)
+    print(f"kapatılan: {closed} ({(time.perf_counter() - started) * 1000:.0f} ms), çıkış kodu {child.wait()}, "
+          f"{tracker.stats}")
+
+    failing = subprocess.Popen([sys.executable, '-c', 'raise SystemExit(3)'])
+    print("hatalı açılış:", tracker.verify_launch('hatali', popen=failing).result())
+    tracker.shutdown()
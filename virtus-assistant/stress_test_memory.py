@@ -0,0 +1,110 @@
+"""
+Hafıza Eşzamanlılık Testi
+- Birden fazla kullanıcı ve oturum aynı anda konuşur
+- Geçici veritabanı ve arşiv kullanılır (gerçek veriye dokunmaz)
+- Kayıp/bozuk etkileşim, profil sayacı ve bölüm sızıntısı kontrol edilir
+
+Kullanım:
+    python stress_test_memory.py [kullanıcı] [oturum/kullanıcı] [etkileşim/oturum]
+"""
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.storage import Storage
+from core.memory_manager import MemoryManager
+
+
+def run(users=4, sessions_per_user=3, turns_per_session=120):
+    workdir = tempfile.mkdtemp(prefix='virtus_stress_')
+    storage = Storage(os.path.join(workdir, 'virtus.db'), legacy_dir=workdir)
+    manager = MemoryManager(storage, archive_root=os.path.join(workdir, 'archive'), idle_timeout=0)
+
+    errors = []
+    barrier = threading.Barrier(users * sessions_per_user)
+
+    def worker(user_id, session_id):
+        try:
+            barrier.wait()
+            for i in range(turns_per_session):
+                # Oturumu her seferinde yöneticiden iste: tembel yükleme yarışını da test eder
+                memory = manager.get_session(user_id, session_id)
+                memory.add_interaction(
+                    f"{user_id} {session_id} soru{i} python",
+                    f"cevap {user_id}/{session_id}/{i}",
+                    intent='information' if i % 2 else 'open_app',
+                    entities={'app_name': f"app{i % 5}"}
+                )
+                memory.get_context_for_ai("python nedir")
+        except Exception as e:
+            errors.append(f"{user_id}/{session_id}: {e!r}")
+
+    threads = [
+        threading.Thread(target=worker, args=(f"user{u}", f"s{s}"))
+        for u in range(users) for s in range(sessions_per_user)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    expected_per_user = sessions_per_user * turns_per_session
+    for u in range(users):
+        user_id = f"user{u}"
+        user = manager.get_user(user_id)
+
+        hot = storage.count_interactions(user_id)
+        cold = user.archive.total_turns
+        if hot + cold != expected_per_user:
+            errors.append(f"{user_id}: {hot}+{cold} kayıt, beklenen {expected_per_user}")
+
+        total = user.profile.get('total_interactions', 0)
+        if total != expected_per_user:
+            errors.append(f"{user_id}: profil sayacı {total}, beklenen {expected_per_user}")
+
+        stored = storage.get(user.namespace('profile'), 'total_interactions')
+        if stored != expected_per_user:
+            errors.append(f"{user_id}: kayıtlı profil sayacı {stored}, beklenen {expected_per_user}")
+
+        turns = list(user.archive.iter_turns()) + storage.recent_interactions(hot, user_id)
+        for turn in turns:
+            owner, session, _ = turn['user'].split(' ', 2)
+            if owner != user_id or not turn['assistant'].startswith(f"cevap {owner}/{session}/"):
+                errors.append(f"{user_id}: başka bölüme ait/bozuk kayıt: {turn['user']!r}")
+                break
+
+        for s in range(sessions_per_user):
+            session = manager.get_session(user_id, f"s{s}")
+            if session.user_memory is not user:
+                errors.append(f"{user_id}/s{s}: kullanıcı hafızası paylaşılmıyor")
+            foreign = [t for t in session.conversation_history
+                       if not t['user'].startswith(f"{user_id} s{s} ")]
+            if foreign:
+                errors.append(f"{user_id}/s{s}: oturuma {len(foreign)} yabancı kayıt karışmış")
+
+    manager.close()
+    storage.close()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    total_turns = users * expected_per_user
+    print(f"{len(threads)} thread, {total_turns} etkileşim, {elapsed:.2f} sn "
+          f"({total_turns / elapsed:.0f} etkileşim/sn)")
+    return errors
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    problems = run(*args)
+    if problems:
+        print(f"❌ {len(problems)} hata:")
+        for problem in problems[:20]:
+            print(f"   - {problem}")
+        sys.exit(1)
+    print("✅ Eşzamanlılık testi başarılı")